@@ -7,6 +7,7 @@ Usage (subprocess provider):
     set MESH_NODE_ID=sandbox_worker_a
     set MESH_CAPABILITIES=sandbox_exec
     set SANDBOX_PROVIDER=subprocess
+    set SANDBOX_POOL_SIZE=4  (optional: warm Python interpreters)
     python examples/redis_sandbox_worker.py
 
 Usage (E2B provider):
@@ -55,9 +56,11 @@ def _build_provider():
     if provider_name == "subprocess":
         allow_shell = _as_bool(os.environ.get("SANDBOX_ALLOW_SHELL"), default=True)
         python_executable = os.environ.get("SANDBOX_PYTHON_EXECUTABLE", "python")
+        pool_size = int(os.environ.get("SANDBOX_POOL_SIZE", "0"))
         return SubprocessSandboxProvider(
             allow_shell_mode=allow_shell,
             python_executable=python_executable,
+            pool_size=pool_size,
         )
 
     if provider_name == "e2b":
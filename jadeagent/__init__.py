@@ -21,11 +21,14 @@ from .state import (
     JadeStateEvent,
     JadeStateManifest,
     SessionSnapshot,
+    ShardedSqliteStateStore,
     SqliteStateStore,
     event_chain_hash,
     inspect_jgx,
     load_jgx,
+    pack_jgx,
     redact_secrets,
+    unpack_jgx,
     verify_capsule,
     write_jgx,
 )
@@ -54,11 +57,14 @@ __all__ = [
     "JadeStateEvent",
     "JadeStateManifest",
     "SessionSnapshot",
+    "ShardedSqliteStateStore",
     "SqliteStateStore",
     "event_chain_hash",
     "inspect_jgx",
     "load_jgx",
+    "pack_jgx",
     "redact_secrets",
+    "unpack_jgx",
     "verify_capsule",
     "write_jgx",
 ]
@@ -13,8 +13,18 @@ from types import ModuleType
 from typing import Any
 
 from .eval import build_eval_report_payload, run_eval_suite, write_markdown_report
-from .state import FileStateStore, SqliteStateStore, StateStore
-from .state.integrity import redact_secrets, verify_capsule
+from .state import (
+    FileStateStore,
+    RetentionPolicy,
+    ShardedSqliteStateStore,
+    SqliteStateStore,
+    StateStore,
+    collect_garbage,
+    pack_jgx,
+    unpack_jgx,
+)
+from .state.sharded_store import SHARD_LAYOUT
+from .state.integrity import redact_secrets, verify_run
 
 
 def _choose_store(path: str, store_type: str = "auto") -> StateStore:
@@ -24,6 +34,8 @@ def _choose_store(path: str, store_type: str = "auto") -> StateStore:
         suffix = raw.suffix.lower()
         if suffix in {".db", ".sqlite", ".sqlite3"} or (raw.exists() and raw.is_file()):
             selected = "sqlite"
+        elif (raw / SHARD_LAYOUT).is_file():
+            selected = "sharded"
         else:
             selected = "file"
 
@@ -31,6 +43,8 @@ def _choose_store(path: str, store_type: str = "auto") -> StateStore:
         return SqliteStateStore(raw)
     if selected == "file":
         return FileStateStore(raw)
+    if selected == "sharded":
+        return ShardedSqliteStateStore(raw)
     raise ValueError(f"unsupported store type: {store_type}")
 
 
@@ -201,6 +215,42 @@ def _state_export(args: argparse.Namespace) -> int:
         _close_store(store)
 
 
+def _state_pack(args: argparse.Namespace) -> int:
+    source = Path(args.source)
+    store: StateStore | None = None
+    try:
+        if source.is_dir():
+            output = pack_jgx(source, args.out)
+        else:
+            store = _choose_store(args.store, args.store_type)
+            output = pack_jgx(store.load_run(args.source), args.out)
+        size = output.stat().st_size
+        if args.json:
+            _print_json({"source": args.source, "output": str(output), "bytes": size})
+        else:
+            print(f"packed {args.source} -> {output} ({size} bytes)")
+        return 0
+    except Exception as exc:
+        print(f"jade state pack failed: {exc}", file=sys.stderr)
+        return 1
+    finally:
+        if store is not None:
+            _close_store(store)
+
+
+def _state_unpack(args: argparse.Namespace) -> int:
+    try:
+        output = unpack_jgx(args.packed, args.out)
+        if args.json:
+            _print_json({"source": args.packed, "output": str(output)})
+        else:
+            print(f"unpacked {args.packed} -> {output}")
+        return 0
+    except Exception as exc:
+        print(f"jade state unpack failed: {exc}", file=sys.stderr)
+        return 1
+
+
 def _timeline_items(capsule: Any) -> list[dict[str, Any]]:
     items: list[dict[str, Any]] = []
     for event in capsule.events:
@@ -338,12 +388,14 @@ def _state_timeline(args: argparse.Namespace) -> int:
 def _state_verify(args: argparse.Namespace) -> int:
     store = _choose_store(args.store, args.store_type)
     try:
-        report = verify_capsule(store.load_run(args.run_id))
+        mode = "full" if args.full else "sample" if args.sample else "incremental"
+        report = verify_run(store, args.run_id, mode=mode, sample_size=args.sample or 0)
         if args.json:
             _print_json(report)
         else:
             print(f"run_id: {report['run_id']}")
             print(f"ok: {report['ok']}")
+            print(f"mode: {report['mode']} ({report['checked_events']}/{report['event_count']} events re-hashed)")
             print(f"event_chain_hash: {report['event_chain_hash']}")
             print(f"snapshot_hash: {report['snapshot_hash']}")
             print(f"secret_leak_count: {report['secret_leak_count']}")
@@ -359,6 +411,55 @@ def _state_verify(args: argparse.Namespace) -> int:
         _close_store(store)
 
 
+def _state_gc(args: argparse.Namespace) -> int:
+    store = _choose_store(args.store, args.store_type)
+    try:
+        policy = RetentionPolicy(
+            keep_last_snapshots=args.keep_snapshots,
+            keep_phase_keyframes=not args.no_keyframes,
+            completed_ttl=args.completed_days * 86400 if args.completed_days is not None else None,
+            failed_ttl=args.failed_days * 86400 if args.failed_days is not None else None,
+            blob_grace=args.blob_grace,
+            vacuum=not args.no_vacuum,
+        )
+        report = collect_garbage(store, policy, dry_run=args.dry_run)
+        if args.json:
+            _print_json(report.to_dict())
+        else:
+            verb = "would reclaim" if report.dry_run else "reclaimed"
+            print(f"runs scanned: {report.runs_scanned}")
+            print(f"runs deleted: {len(report.deleted_runs)}")
+            print(f"snapshots deleted: {report.deleted_snapshots} across {len(report.compacted_runs)} run(s)")
+            print(f"blobs deleted: {report.deleted_blobs}")
+            print(f"{verb}: {report.reclaimed_bytes} bytes")
+            if not report.dry_run:
+                print(f"vacuumed: {report.vacuumed_bytes} bytes")
+        return 0
+    except Exception as exc:
+        print(f"jade state gc failed: {exc}", file=sys.stderr)
+        return 1
+    finally:
+        _close_store(store)
+
+
+def _state_reshard(args: argparse.Namespace) -> int:
+    store = _choose_store(args.store, "sharded")
+    try:
+        before = store.shard_count
+        result = store.reshard(args.shards, remove_old=not args.keep_old)
+        if args.json:
+            _print_json({"from_shards": before, **result})
+        else:
+            print(f"shards: {before} -> {result['shards']}")
+            print(f"runs moved: {result['moved_runs']}")
+        return 0
+    except Exception as exc:
+        print(f"jade state reshard failed: {exc}", file=sys.stderr)
+        return 1
+    finally:
+        _close_store(store)
+
+
 def _eval_run(args: argparse.Namespace) -> int:
     store = _choose_store(args.store, args.store_type)
     try:
@@ -491,11 +592,14 @@ def build_parser() -> argparse.ArgumentParser:
         p.add_argument(
             "--store",
             default=".jade_state",
-            help="State store path. Directories use FileStateStore; .db/.sqlite files use SqliteStateStore.",
+            help=(
+                "State store path. Directories use FileStateStore, or ShardedSqliteStateStore when they "
+                "contain shards.json; .db/.sqlite files use SqliteStateStore."
+            ),
         )
         p.add_argument(
             "--store-type",
-            choices=("auto", "file", "sqlite"),
+            choices=("auto", "file", "sqlite", "sharded"),
             default="auto",
             help="Override automatic store type detection.",
         )
@@ -527,13 +631,45 @@ def build_parser() -> argparse.ArgumentParser:
     export.add_argument("--out", required=True, help="Output .jgx directory")
     export.set_defaults(func=_state_export)
 
+    pack = state_sub.add_parser("pack", help="Pack a .jgx directory or stored run into a single file")
+    pack.add_argument("source", help="A .jgx directory, or a run id in --store")
+    add_store_options(pack)
+    pack.add_argument("--out", required=True, help="Output packed .jgx file")
+    pack.set_defaults(func=_state_pack)
+
+    unpack = state_sub.add_parser("unpack", help="Expand a packed .jgx file into a directory capsule")
+    unpack.add_argument("packed", help="Packed .jgx file")
+    unpack.add_argument("--out", required=True, help="Output .jgx directory")
+    unpack.add_argument("--json", action="store_true", help="Emit JSON")
+    unpack.set_defaults(func=_state_unpack)
+
     timeline = state_sub.add_parser("timeline", help="Show a merged event/snapshot timeline")
     add_run_store_args(timeline)
     timeline.add_argument("--html", help="Write an HTML timeline")
     timeline.set_defaults(func=_state_timeline)
 
+    gc = state_sub.add_parser("gc", help="Apply retention, compact snapshots, and vacuum a store")
+    add_store_options(gc)
+    gc.add_argument("--dry-run", action="store_true", help="Report what would be removed without changing anything")
+    gc.add_argument("--keep-snapshots", type=int, default=5, help="Snapshots to keep per run, besides phase keyframes")
+    gc.add_argument("--no-keyframes", action="store_true", help="Do not keep the newest snapshot of each phase")
+    gc.add_argument("--completed-days", type=float, default=None, help="Delete COMPLETED runs older than this many days (default: keep them)")
+    gc.add_argument("--failed-days", type=float, default=None, help="Delete FAILED runs older than this many days (default: keep them)")
+    gc.add_argument("--blob-grace", type=float, default=3600.0, help="Keep unreferenced blobs written within this many seconds (default: 3600)")
+    gc.add_argument("--no-vacuum", action="store_true", help="Skip the vacuum step")
+    gc.set_defaults(func=_state_gc)
+
+    reshard = state_sub.add_parser("reshard", help="Move runs of a sharded SQLite store to a new shard count; refuses while the store is open elsewhere")
+    add_store_options(reshard)
+    reshard.add_argument("--shards", type=int, required=True, help="New number of shard files")
+    reshard.add_argument("--keep-old", action="store_true", help="Keep the previous shard files after moving")
+    reshard.set_defaults(func=_state_reshard)
+
     verify = state_sub.add_parser("verify", help="Verify JGX integrity and secret hygiene")
     add_run_store_args(verify)
+    verify_mode = verify.add_mutually_exclusive_group()
+    verify_mode.add_argument("--full", action="store_true", help="Re-hash every event instead of resuming")
+    verify_mode.add_argument("--sample", type=int, default=0, help="Re-hash N random events against stored chain records")
     verify.set_defaults(func=_state_verify)
 
     demo = sub.add_parser("demo", help="Run JadeAgent demos")
@@ -55,6 +55,8 @@ class Agent:
         self.run_id = run_id
         self._configured_run_id = run_id
         self._state_manifest: JadeStateManifest | None = None
+        # idempotency key -> recorded tool result for self.run_id, loaded on first lookup
+        self._tool_results: dict[str, str] | None = None
 
         self._system_prompt = system_prompt or (
             f"You are {name}, a helpful and intelligent AI assistant. "
@@ -365,13 +367,12 @@ class Agent:
         if isinstance(snapshot_or_run_id, str):
             if store is None:
                 raise ValueError("restore_state(run_id) requires a StateStore")
-            capsule = store.load_run(snapshot_or_run_id)
-            manifest = capsule.manifest
-            snapshot = capsule.latest_snapshot
+            manifest, snapshot = store.restore_latest(snapshot_or_run_id)
             if snapshot is None:
                 raise ValueError(f"run {snapshot_or_run_id!r} has no snapshots")
             self.run_id = snapshot_or_run_id
             self._state_manifest = manifest
+            self._tool_results = None
         else:
             snapshot = (
                 snapshot_or_run_id
@@ -425,6 +426,7 @@ class Agent:
         self.state_store.create_run(manifest)
         self.run_id = manifest.run_id
         self._state_manifest = manifest
+        self._tool_results = None
         self._emit_state_event(
             "run_started",
             phase="NEW",
@@ -557,19 +559,18 @@ class Agent:
     def _lookup_tool_result(self, idempotency_key: str) -> str | None:
         if self.state_store is None or not self.run_id or not idempotency_key:
             return None
-        try:
-            events = self.state_store.list_events(self.run_id, limit=10_000)
-        except Exception:
-            logger.debug("Failed to read state events for tool replay", exc_info=True)
-            return None
-
-        for event in reversed(events):
-            if event.event_type != "tool_result_recorded":
-                continue
-            payload = event.payload or {}
-            if payload.get("idempotency_key") == idempotency_key:
-                return str(payload.get("result", ""))
-        return None
+        if self._tool_results is None:
+            try:
+                results: dict[str, str] = {}
+                for event in self.state_store.view_run(self.run_id).iter_events():
+                    if event.event_type == "tool_result_recorded":
+                        payload = event.payload or {}
+                        results[str(payload.get("idempotency_key", ""))] = str(payload.get("result", ""))
+            except Exception:
+                logger.debug("Failed to read state events for tool replay", exc_info=True)
+                return None
+            self._tool_results = results
+        return self._tool_results.get(idempotency_key)
 
     def _record_tool_result(
         self,
@@ -598,6 +599,8 @@ class Agent:
                 "reused": reused,
             },
         )
+        if not reused and self._tool_results is not None:
+            self._tool_results[idempotency_key] = result
 
     def _execute_tool_call_idempotent(self, tool_call: ToolCall, step: int) -> str:
         if self.state_store is None or not self.run_id:
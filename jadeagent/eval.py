@@ -21,7 +21,7 @@ from .core.types import Message, Response, StreamChunk, ToolCall, Usage
 from .mesh import InMemoryMeshBus, InMemoryTaskStore, MeshNode, MeshRouter, MeshTask
 from .state.compatibility import validate_restore_compatibility
 from .state.events import JadeStateEvent
-from .state.integrity import verify_capsule
+from .state.integrity import verify_run
 from .state.manifest import JadeStateManifest
 from .state.snapshot import AgentRuntimeSnapshot
 from .state.store import StateStore
@@ -184,7 +184,7 @@ def _tag_run(
     extra: dict[str, Any] | None = None,
 ) -> None:
     try:
-        manifest = store.load_run(run_id).manifest
+        manifest = store.view_run(run_id).manifest
     except Exception:
         manifest = JadeStateManifest(run_id=run_id)
     manifest.metadata.update({
@@ -245,26 +245,34 @@ def _complete_manual_run(
 def capsule_metrics(store: StateStore, run_id: str) -> dict[str, Any]:
     """Compute stable presentation metrics for one stored JGX run."""
 
-    capsule = store.load_run(run_id)
-    latest = capsule.latest_snapshot
-    event_counts = Counter(event.event_type for event in capsule.events)
-    phase_counts = Counter(snapshot.phase for snapshot in capsule.snapshots)
-    timestamps = [event.timestamp for event in capsule.events]
-    timestamps.extend(snapshot.created_at for snapshot in capsule.snapshots)
-    duration_ms = 0.0
-    if timestamps:
-        duration_ms = max(0.0, (max(timestamps) - min(timestamps)) * 1000.0)
-
+    view = store.view_run(run_id)
+    latest = view.latest_snapshot()
+    event_counts: Counter[str] = Counter()
     idempotency_counts: Counter[str] = Counter()
-    for event in capsule.events:
+    first_ts: float | None = None
+    last_ts: float | None = None
+    for event in view.iter_events():
+        event_counts[event.event_type] += 1
+        first_ts = event.timestamp if first_ts is None else min(first_ts, event.timestamp)
+        last_ts = event.timestamp if last_ts is None else max(last_ts, event.timestamp)
         if event.event_type != "tool_result_recorded":
             continue
         key = str((event.payload or {}).get("idempotency_key", ""))
         if key:
             idempotency_counts[key] += 1
+    phase_counts: Counter[str] = Counter()
+    for snapshot in view.iter_snapshots():
+        phase_counts[snapshot.phase] += 1
+        first_ts = snapshot.created_at if first_ts is None else min(first_ts, snapshot.created_at)
+        last_ts = snapshot.created_at if last_ts is None else max(last_ts, snapshot.created_at)
+    duration_ms = 0.0
+    if first_ts is not None and last_ts is not None:
+        duration_ms = max(0.0, (last_ts - first_ts) * 1000.0)
     duplicate_tool_executions = sum(max(0, count - 1) for count in idempotency_counts.values())
 
-    integrity = verify_capsule(capsule)
+    integrity = verify_run(store, run_id)
+    event_count = sum(event_counts.values())
+    snapshot_count = sum(phase_counts.values())
     recovery_success = (
         event_counts.get("simulated_crash", 0) > 0
         and latest is not None
@@ -277,14 +285,14 @@ def capsule_metrics(store: StateStore, run_id: str) -> dict[str, Any]:
         "task_status": (latest.phase.lower() if latest is not None else "missing"),
         "task_completed": bool(latest is not None and latest.phase == "COMPLETED"),
         "duration_ms": round(duration_ms, 3),
-        "event_count": len(capsule.events),
-        "snapshot_count": len(capsule.snapshots),
+        "event_count": event_count,
+        "snapshot_count": snapshot_count,
         "checkpoint_count": event_counts.get("checkpoint", 0),
         "tool_results_recorded": event_counts.get("tool_result_recorded", 0),
         "tool_results_reused": event_counts.get("tool_result_reused", 0),
         "duplicate_tool_executions": duplicate_tool_executions,
         "recovery_success": recovery_success,
-        "audit_complete": bool(capsule.manifest.run_id and capsule.events and capsule.snapshots),
+        "audit_complete": bool(view.manifest.run_id and event_count and snapshot_count),
         "event_counts": dict(sorted(event_counts.items())),
         "phase_counts": dict(sorted(phase_counts.items())),
         "integrity_ok": bool(integrity["ok"]),
@@ -446,7 +454,7 @@ def _case_crash_recovery(
 
     def latest_stage(stage: str) -> AgentRuntimeSnapshot | None:
         try:
-            snapshots = store.load_run(run_id).snapshots
+            snapshots = list(store.view_run(run_id).iter_snapshots())
         except Exception:
             return None
         for snapshot in reversed(snapshots):
@@ -1113,8 +1121,7 @@ def collect_eval_results(store: StateStore, *, suite: str | None = None) -> list
 
     results: list[EvalCaseResult] = []
     for run_id in list_runs():
-        capsule = store.load_run(run_id)
-        metadata = capsule.manifest.metadata
+        metadata = store.view_run(run_id).manifest.metadata
         if not metadata.get("eval_case"):
             continue
         if metadata.get("eval_case_role", "primary") != "primary":
@@ -1137,7 +1144,7 @@ def collect_eval_results(store: StateStore, *, suite: str | None = None) -> list
 def build_eval_report_payload(store: StateStore, *, suite: str | None = None) -> dict[str, Any]:
     results = collect_eval_results(store, suite=suite)
     suites = sorted({
-        str(store.load_run(result.run_id).manifest.metadata.get("eval_suite", ""))
+        str(store.view_run(result.run_id).manifest.metadata.get("eval_suite", ""))
         for result in results
     })
     return {
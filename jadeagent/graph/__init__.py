@@ -1,6 +1,9 @@
 """Graph-based orchestration engine."""
 
-from .state import START, END, GraphState, merge_state
-from .graph import StateGraph, CompiledGraph
+from .state import START, END, AppendList, GraphState, merge_state
+from .graph import StateGraph, CompiledGraph, load_graph_state
 
-__all__ = ["START", "END", "GraphState", "StateGraph", "CompiledGraph", "merge_state"]
+__all__ = [
+    "START", "END", "GraphState", "StateGraph", "CompiledGraph", "merge_state",
+    "AppendList", "load_graph_state",
+]
@@ -6,6 +6,9 @@ Build complex agent workflows as directed graphs with:
 - Edges: fixed or conditional transitions
 - Cycles: loops with automatic termination
 - State: typed dict passed through the graph
+- Fan-out: Pregel-style supersteps run every ready node concurrently,
+  then merge their updates in a fixed order at a barrier
+- Checkpoints: per-superstep diffs on top of periodic full snapshots
 
 Inspired by LangGraph, implemented for JadeAgent.
 """
@@ -14,10 +17,11 @@ from __future__ import annotations
 
 import logging
 import uuid
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass, field
-from typing import Any, Callable
+from typing import Any, Callable, Sequence
 
-from .state import START, END, merge_state
+from .state import START, END, merge_into, share_lists, unshare_lists
 from ..state.events import JadeStateEvent
 from ..state.manifest import JadeStateManifest, canonical_json_hash
 from ..state.snapshot import AgentRuntimeSnapshot, GraphRuntimeSnapshot
@@ -25,6 +29,9 @@ from ..state.store import StateStore
 
 logger = logging.getLogger("jadeagent.graph")
 
+# Every Nth graph checkpoint stores the full state; the rest store diffs.
+DEFAULT_FULL_CHECKPOINT_EVERY = 16
+
 
 @dataclass
 class Edge:
@@ -37,7 +44,14 @@ class Edge:
 class ConditionalEdge:
     """A dynamic transition based on state."""
     source: str
-    router: Callable[[dict], str]  # fn(state) → next_node_name
+    router: Callable[[dict], str | list[str]]  # fn(state) → next node name(s)
+
+
+@dataclass
+class JoinEdge:
+    """A transition that fires once every source node has completed."""
+    sources: tuple[str, ...]
+    target: str
 
 
 class CompiledGraph:
@@ -45,6 +59,21 @@ class CompiledGraph:
     An executable graph compiled from a StateGraph.
 
     Use StateGraph.compile() to create this. Then call run() to execute.
+
+    Execution proceeds in supersteps: every node in the current frontier
+    runs against the same state (concurrently when there is more than
+    one), their updates are merged with `merge_state` in frontier order,
+    and the successors of all of them form the next frontier. A node
+    reached from several branches in the same superstep runs once.
+    Concurrent nodes share the values inside the state, so a node must
+    return its changes as an update instead of mutating state in place.
+
+    By default nodes see plain lists and dicts. With `structural_sharing`,
+    every list value in the state, including lists a node adds later, is
+    passed to nodes as a read-only `AppendList` view that shares items
+    across steps, so long-running graphs stop copying their histories.
+    Nodes then cannot append in place and must call `tolist()` before
+    JSON-encoding state; run() still returns plain lists.
     """
 
     def __init__(
@@ -53,39 +82,69 @@ class CompiledGraph:
         edges: list[Edge],
         conditional_edges: list[ConditionalEdge],
         max_iterations: int = 50,
+        join_edges: list[JoinEdge] | None = None,
+        max_workers: int | None = None,
+        structural_sharing: bool = False,
     ):
         self.nodes = nodes
         self.edges = edges
         self.conditional_edges = conditional_edges
+        self.join_edges = list(join_edges or [])
         self.max_iterations = max_iterations
+        self.max_workers = max_workers
+        self.structural_sharing = structural_sharing
 
         # Build adjacency lookup
-        self._fixed_edges: dict[str, str] = {}
+        self._fixed_edges: dict[str, list[str]] = {}
         self._cond_edges: dict[str, Callable] = {}
 
         for e in edges:
-            self._fixed_edges[e.source] = e.target
+            targets = self._fixed_edges.setdefault(e.source, [])
+            if e.target not in targets:
+                targets.append(e.target)
         for ce in conditional_edges:
             self._cond_edges[ce.source] = ce.router
+        self._join_sources = {source for je in self.join_edges for source in je.sources}
 
-    def _get_next(self, current: str, state: dict) -> str | None:
-        """Determine the next node given current node and state."""
+    def _get_next(self, current: str, state: dict) -> list[str]:
+        """Determine the next nodes given current node and state."""
         # Conditional edges take priority
         if current in self._cond_edges:
             router = self._cond_edges[current]
-            next_node = router(state)
-            if next_node not in self.nodes and next_node != END:
-                raise ValueError(
-                    f"Router from '{current}' returned '{next_node}', "
-                    f"which is not a valid node. Available: {list(self.nodes.keys()) + [END]}"
-                )
-            return next_node
+            routed = router(state)
+            next_nodes = [routed] if isinstance(routed, str) else list(routed)
+            for next_node in next_nodes:
+                if next_node not in self.nodes and next_node != END:
+                    raise ValueError(
+                        f"Router from '{current}' returned '{next_node}', "
+                        f"which is not a valid node. Available: {list(self.nodes.keys()) + [END]}"
+                    )
+            return next_nodes
 
         # Fixed edges
-        if current in self._fixed_edges:
-            return self._fixed_edges[current]
-
-        return None
+        return list(self._fixed_edges.get(current, []))
+
+    def _run_superstep(self, frontier: list[str], state: dict) -> list[tuple[str, Any, BaseException | None]]:
+        """Run every frontier node against `state`; returns (node, result, error) in frontier order."""
+        if len(frontier) == 1:
+            node = frontier[0]
+            try:
+                return [(node, self.nodes[node](state), None)]
+            except Exception as exc:
+                return [(node, None, exc)]
+
+        workers = min(len(frontier), self.max_workers or len(frontier))
+        outcomes = []
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="jade-graph") as pool:
+            # Branches get a shallow copy: adding or replacing keys stays private,
+            # but mutable values are shared with every other branch.
+            futures = [pool.submit(self.nodes[node], dict(state)) for node in frontier]
+            for node, future in zip(frontier, futures):
+                try:
+                    outcomes.append((node, future.result(), None))
+                except Exception as exc:
+                    outcomes.append((node, None, exc))
+        return outcomes
 
     def run(
         self,
@@ -94,18 +153,34 @@ class CompiledGraph:
         state_store: StateStore | None = None,
         run_id: str | None = None,
         manifest: JadeStateManifest | None = None,
+        full_checkpoint_every: int = DEFAULT_FULL_CHECKPOINT_EVERY,
     ) -> dict:
         """
         Execute the graph from START to END.
 
+        Each iteration is one superstep; independent branches run
+        concurrently and the run completes once END has been reached and
+        no branch is still active.
+
+        With a `state_store`, the first checkpoint and every
+        `full_checkpoint_every`-th one after it store the full state; the
+        others store only the node updates of their superstep plus a link
+        to the previous checkpoint. Completed and failed snapshots are
+        always full. Use `load_graph_state` to rebuild the state at any
+        checkpoint.
+
         Args:
             initial_state: Initial state dict.
             verbose: Print execution trace.
+            full_checkpoint_every: Checkpoint interval for full snapshots;
+                1 stores the full state every step.
 
         Returns:
             Final state after reaching END.
         """
-        state = dict(initial_state)
+        state = share_lists(initial_state) if self.structural_sharing else dict(initial_state)
+        base_snapshot_id = ""
+        parent_snapshot_id = ""
         active_run_id = ""
         if state_store is not None:
             manifest = manifest or JadeStateManifest(
@@ -120,6 +195,8 @@ class CompiledGraph:
                     "edges_hash": canonical_json_hash({
                         "fixed": [(edge.source, edge.target) for edge in self.edges],
                         "conditional": [edge.source for edge in self.conditional_edges],
+                        **({"join": [(list(edge.sources), edge.target) for edge in self.join_edges]}
+                           if self.join_edges else {}),
                     }),
                 },
             )
@@ -131,15 +208,21 @@ class CompiledGraph:
                 phase="GRAPH_START",
                 message="graph execution started",
             ))
-        current = self._get_next(START, state)
+        frontier = self._get_next(START, state)
 
-        if current is None:
+        if not frontier:
             raise ValueError("No edge from START. Add: graph.add_edge(START, 'first_node')")
 
         visited_count: dict[str, int] = {}
+        join_pending: list[set[str]] = [set() for _ in self.join_edges]
+        reached_end = END in frontier
+        frontier = [node for node in frontier if node != END]
 
         for iteration in range(self.max_iterations):
-            if current == END:
+            if not frontier:
+                if not reached_end:
+                    waiting = [je.target for je, seen in zip(self.join_edges, join_pending) if seen]
+                    raise ValueError(f"Graph stalled before END: join barrier(s) for {waiting} never completed")
                 if verbose:
                     print(f"  [OK] Reached END after {iteration} steps")
                 if state_store is not None and active_run_id:
@@ -151,6 +234,7 @@ class CompiledGraph:
                             variables=state,
                             iteration=iteration,
                         ),
+                        metadata={"checkpoint": "full"},
                     )
                     state_store.save_snapshot(active_run_id, snapshot)
                     state_store.append_event(active_run_id, JadeStateEvent(
@@ -161,22 +245,26 @@ class CompiledGraph:
                         message="graph execution completed",
                         payload={"snapshot_id": snapshot.snapshot_id},
                     ))
-                return state
+                return unshare_lists(state)
 
-            if current not in self.nodes:
-                raise ValueError(f"Node '{current}' not found in graph")
-
-            # Track visits for cycle detection
-            visited_count[current] = visited_count.get(current, 0) + 1
+            for node in frontier:
+                if node not in self.nodes:
+                    raise ValueError(f"Node '{node}' not found in graph")
+                # Track visits for cycle detection
+                visited_count[node] = visited_count.get(node, 0) + 1
+            current = ",".join(frontier)
 
             if verbose:
-                print(f"  > [{iteration+1}] Node: {current} (visit #{visited_count[current]})")
-
-            # Execute node
-            node_fn = self.nodes[current]
-            try:
-                result = node_fn(state)
-            except Exception as exc:
+                if len(frontier) == 1:
+                    print(f"  > [{iteration+1}] Node: {current} (visit #{visited_count[current]})")
+                else:
+                    print(f"  > [{iteration+1}] Superstep: {', '.join(frontier)}")
+
+            # Execute the superstep; the barrier is the end of _run_superstep
+            outcomes = self._run_superstep(frontier, state)
+            failed = next(((node, exc) for node, _, exc in outcomes if exc is not None), None)
+            if failed is not None:
+                failed_node, exc = failed
                 if state_store is not None and active_run_id:
                     snapshot = AgentRuntimeSnapshot(
                         phase="FAILED",
@@ -186,7 +274,7 @@ class CompiledGraph:
                             variables=state,
                             iteration=iteration + 1,
                         ),
-                        metadata={"error": repr(exc)},
+                        metadata={"checkpoint": "full", "error": repr(exc)},
                     )
                     state_store.save_snapshot(active_run_id, snapshot)
                     state_store.append_event(active_run_id, JadeStateEvent(
@@ -195,44 +283,85 @@ class CompiledGraph:
                         phase="FAILED",
                         step=iteration + 1,
                         message=repr(exc),
-                        payload={"snapshot_id": snapshot.snapshot_id, "node": current},
+                        payload={"snapshot_id": snapshot.snapshot_id, "node": failed_node},
                     ))
-                raise
+                raise exc
 
-            # Merge result into state
-            if result is not None and isinstance(result, dict):
-                state = merge_state(state, result)
-
-            # Get next node
-            next_node = self._get_next(current, state)
-            if next_node is None:
-                raise ValueError(
-                    f"No edge from node '{current}'. "
-                    f"Add an edge: graph.add_edge('{current}', 'next_node')"
-                )
+            # Merge results into state, in frontier order for determinism.
+            # One copy of the top-level dict per superstep; values are shared.
+            updates = [(node, result) for node, result, _ in outcomes if isinstance(result, dict)]
+            if updates:
+                state = dict(state)
+                for _, result in updates:
+                    merge_into(state, result, share=self.structural_sharing)
+
+            # Collect the next frontier
+            next_frontier: list[str] = []
+            for node in frontier:
+                targets = self._get_next(node, state)
+                for join_edge, seen in zip(self.join_edges, join_pending):
+                    if node in join_edge.sources:
+                        seen.add(node)
+                        if seen.issuperset(join_edge.sources):
+                            seen.clear()
+                            targets.append(join_edge.target)
+                if not targets and node not in self._join_sources:
+                    raise ValueError(
+                        f"No edge from node '{node}'. "
+                        f"Add an edge: graph.add_edge('{node}', 'next_node')"
+                    )
+                for target in targets:
+                    if target == END:
+                        reached_end = True
+                    elif target not in next_frontier:
+                        next_frontier.append(target)
 
             if state_store is not None and active_run_id:
-                snapshot = AgentRuntimeSnapshot(
-                    phase="GRAPH_NODE",
-                    step=iteration + 1,
-                    graph=GraphRuntimeSnapshot(
+                next_nodes = next_frontier or [END]
+                if not base_snapshot_id or full_checkpoint_every <= 1 or iteration % full_checkpoint_every == 0:
+                    graph_snapshot = GraphRuntimeSnapshot(
                         current_node=current,
-                        next_nodes=[next_node],
+                        next_nodes=next_nodes,
                         variables=state,
                         iteration=iteration + 1,
-                    ),
+                    )
+                    checkpoint_meta = {"checkpoint": "full"}
+                else:
+                    graph_snapshot = GraphRuntimeSnapshot(
+                        current_node=current,
+                        next_nodes=next_nodes,
+                        outputs={"updates": [[node, result] for node, result in updates]},
+                        iteration=iteration + 1,
+                    )
+                    checkpoint_meta = {
+                        "checkpoint": "diff",
+                        "base_snapshot_id": base_snapshot_id,
+                        "parent_snapshot_id": parent_snapshot_id,
+                    }
+                snapshot = AgentRuntimeSnapshot(
+                    phase="GRAPH_NODE",
+                    step=iteration + 1,
+                    graph=graph_snapshot,
+                    metadata=checkpoint_meta,
                 )
                 state_store.save_snapshot(active_run_id, snapshot)
+                if checkpoint_meta["checkpoint"] == "full":
+                    base_snapshot_id = snapshot.snapshot_id
+                parent_snapshot_id = snapshot.snapshot_id
+                payload = {"node": current, "next_node": next_nodes[0], "snapshot_id": snapshot.snapshot_id}
+                if len(frontier) > 1 or len(next_nodes) > 1:
+                    payload["nodes"] = list(frontier)
+                    payload["next_nodes"] = list(next_nodes)
                 state_store.append_event(active_run_id, JadeStateEvent(
                     event_type="checkpoint",
                     run_id=active_run_id,
                     phase="GRAPH_NODE",
                     step=iteration + 1,
                     message="graph checkpoint saved",
-                    payload={"node": current, "next_node": next_node, "snapshot_id": snapshot.snapshot_id},
+                    payload=payload,
                 ))
 
-            current = next_node
+            frontier = next_frontier
 
         logger.warning(f"Graph hit max iterations ({self.max_iterations})")
         if state_store is not None and active_run_id:
@@ -240,11 +369,11 @@ class CompiledGraph:
                 phase="FAILED",
                 step=self.max_iterations,
                 graph=GraphRuntimeSnapshot(
-                    current_node=current or "",
+                    current_node=",".join(frontier),
                     variables=state,
                     iteration=self.max_iterations,
                 ),
-                metadata={"error": f"Graph hit max iterations ({self.max_iterations})"},
+                metadata={"checkpoint": "full", "error": f"Graph hit max iterations ({self.max_iterations})"},
             )
             state_store.save_snapshot(active_run_id, snapshot)
             state_store.append_event(active_run_id, JadeStateEvent(
@@ -255,7 +384,42 @@ class CompiledGraph:
                 message="graph hit max iterations",
                 payload={"snapshot_id": snapshot.snapshot_id},
             ))
-        return state
+        return unshare_lists(state)
+
+
+def load_graph_state(state_store: StateStore, run_id: str, snapshot_id: str | None = None) -> dict:
+    """
+    Rebuild the graph state recorded at a checkpoint.
+
+    Diff checkpoints are resolved by walking back to their full base and
+    replaying each superstep's updates with `merge_state`.
+
+    Args:
+        state_store: Store the graph run was checkpointed to.
+        run_id: Graph run id.
+        snapshot_id: Checkpoint to load (default: the latest snapshot).
+
+    Returns:
+        The state dict at that checkpoint, with plain lists.
+    """
+    view = state_store.view_run(run_id)
+    snapshot = view.get_snapshot(snapshot_id) if snapshot_id else view.latest_snapshot()
+    if snapshot is None:
+        raise KeyError(f"No snapshot {snapshot_id or 'latest'!r} for run {run_id!r}")
+
+    diffs = []
+    while snapshot.metadata.get("checkpoint") == "diff":
+        diffs.append(snapshot)
+        parent_id = snapshot.metadata.get("parent_snapshot_id", "")
+        snapshot = view.get_snapshot(parent_id)
+        if snapshot is None:
+            raise ValueError(f"Graph checkpoint chain of run {run_id!r} is broken at {parent_id!r}")
+
+    state = share_lists(snapshot.graph.variables if snapshot.graph is not None else {})
+    for diff in reversed(diffs):
+        for _, update in diff.graph.outputs.get("updates", []):
+            merge_into(state, update, share=True)
+    return unshare_lists(state)
 
 
 class StateGraph:
@@ -285,12 +449,18 @@ class StateGraph:
             return "search" if len(state["results"]) < 3 else END
 
         graph.add_conditional_edge("analyze", should_continue)
+
+    Fan-out / join example:
+        graph.add_edge("plan", "search_web")
+        graph.add_edge("plan", "search_docs")       # both run in parallel
+        graph.add_edge(["search_web", "search_docs"], "summarize")
     """
 
     def __init__(self):
         self.nodes: dict[str, Callable] = {}
         self.edges: list[Edge] = []
         self.conditional_edges: list[ConditionalEdge] = []
+        self.join_edges: list[JoinEdge] = []
 
     def add_node(self, name: str, fn: Callable[[dict], dict | None]):
         """
@@ -309,28 +479,41 @@ class StateGraph:
             raise ValueError(f"Node '{name}' already exists")
         self.nodes[name] = fn
 
-    def add_edge(self, source: str, target: str):
+    def add_edge(self, source: str | Sequence[str], target: str):
         """
         Add a fixed transition between nodes.
 
+        Several edges from the same source fan out: all targets run in
+        the next superstep. A list of sources adds a join edge instead,
+        and the target runs only after every source has completed.
+
         Args:
-            source: Source node name (or START).
+            source: Source node name (or START), or a list of node names to join.
             target: Target node name (or END).
         """
-        self._validate_node_ref(source, allow_start=True)
         self._validate_node_ref(target, allow_end=True)
+        if not isinstance(source, str):
+            sources = tuple(source)
+            if not sources:
+                raise ValueError("Join edge needs at least one source node")
+            for name in sources:
+                self._validate_node_ref(name)
+            self.join_edges.append(JoinEdge(sources=sources, target=target))
+            return
+        self._validate_node_ref(source, allow_start=True)
         self.edges.append(Edge(source=source, target=target))
 
-    def add_conditional_edge(self, source: str, router: Callable[[dict], str]):
+    def add_conditional_edge(self, source: str, router: Callable[[dict], str | list[str]]):
         """
         Add a dynamic transition based on state.
 
         The router function receives the current state and returns
-        the name of the next node to execute (or END).
+        the name of the next node to execute (or END), or a list of
+        names to fan out to.
 
         Args:
             source: Source node name.
-            router: Function(state) → next_node_name.
+            router: Function(state) → next_node_name or [names].
         """
         self._validate_node_ref(source, allow_start=True)
         self.conditional_edges.append(
@@ -347,14 +530,24 @@ class StateGraph:
             # Lazy validation — node might be added later
             pass
 
-    def compile(self, max_iterations: int = 50) -> CompiledGraph:
+    def compile(
+        self,
+        max_iterations: int = 50,
+        max_workers: int | None = None,
+        structural_sharing: bool = False,
+    ) -> CompiledGraph:
         """
         Compile the graph into an executable CompiledGraph.
 
         Validates the graph structure and returns a runnable graph.
 
         Args:
-            max_iterations: Max iterations before forced termination (cycle safety).
+            max_iterations: Max supersteps before forced termination (cycle safety).
+            max_workers: Cap on nodes run concurrently in one superstep
+                (default: the superstep's width).
+            structural_sharing: Hand nodes read-only `AppendList` views of
+                list values that share items across steps, instead of
+                plain lists (see `CompiledGraph`).
 
         Returns:
             CompiledGraph ready to run.
@@ -376,4 +569,7 @@ class StateGraph:
             edges=list(self.edges),
             conditional_edges=list(self.conditional_edges),
             max_iterations=max_iterations,
+            join_edges=list(self.join_edges),
+            max_workers=max_workers,
+            structural_sharing=structural_sharing,
         )
@@ -3,11 +3,19 @@ Graph state management for JadeAgent's graph engine.
 
 Provides TypedDict-based state containers with merge strategies,
 inspired by LangGraph's state management.
+
+Graphs compiled with ``structural_sharing=True`` hold list values in
+`AppendList` views during execution, so appending a node's output shares
+the existing items instead of copying them; a run that accumulates n
+messages does O(n) work instead of O(n^2).
 """
 
 from __future__ import annotations
 
-from typing import Any, TypedDict
+import itertools
+import threading
+from collections.abc import Sequence
+from typing import Any, Iterable, Iterator, TypedDict
 
 
 # Sentinel values for graph control flow
@@ -29,6 +37,95 @@ class GraphState(TypedDict, total=False):
     pass
 
 
+_append_lock = threading.Lock()
+
+
+class AppendList(Sequence):
+    """
+    Read-only list view over a shared, append-only buffer.
+
+    `extended()` returns a new view and leaves this one untouched. When this
+    view is the newest version of its buffer, the new items are appended to
+    the buffer in place and both views share it (each sees its own prefix);
+    extending an older view copies its prefix once. Compares equal to a list
+    with the same items; use `tolist()` for a mutable copy.
+    """
+
+    __slots__ = ("_items", "_length")
+
+    def __init__(self, items: Iterable[Any] = ()):
+        self._items = list(items)
+        self._length = len(self._items)
+
+    @classmethod
+    def _view(cls, items: list, length: int) -> AppendList:
+        view = cls.__new__(cls)
+        view._items = items
+        view._length = length
+        return view
+
+    def extended(self, values: Iterable[Any]) -> AppendList:
+        """Return a view with `values` appended."""
+        values = list(values)
+        with _append_lock:
+            if self._length == len(self._items):
+                items = self._items
+            else:
+                items = self._items[:self._length]
+            items.extend(values)
+            return AppendList._view(items, len(items))
+
+    def tolist(self) -> list:
+        return self._items[:self._length]
+
+    def __len__(self) -> int:
+        return self._length
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return self._items[slice(*index.indices(self._length))]
+        if index < 0:
+            index += self._length
+        if not 0 <= index < self._length:
+            raise IndexError("AppendList index out of range")
+        return self._items[index]
+
+    def __iter__(self) -> Iterator[Any]:
+        return itertools.islice(self._items, self._length)
+
+    def __eq__(self, other: object) -> bool:
+        if isinstance(other, (AppendList, list)):
+            return len(self) == len(other) and all(a == b for a, b in zip(self, other))
+        return NotImplemented
+
+    __hash__ = None  # type: ignore[assignment]
+
+    def __add__(self, other: Iterable[Any]) -> list:
+        return self.tolist() + list(other)
+
+    def __radd__(self, other: Iterable[Any]) -> list:
+        return list(other) + self.tolist()
+
+    def __repr__(self) -> str:
+        return f"AppendList({self.tolist()!r})"
+
+
+def share_lists(state: dict) -> dict:
+    """Copy of `state` with its list values wrapped as `AppendList` views."""
+    return {
+        key: AppendList(value) if isinstance(value, list) else value
+        for key, value in state.items()
+    }
+
+
+def unshare_lists(state: dict) -> dict:
+    """Copy of `state` with `AppendList` views turned back into plain lists."""
+    return {
+        key: value.tolist() if isinstance(value, AppendList) else value
+        for key, value in state.items()
+    }
+
+
 def merge_state(current: dict, update: dict) -> dict:
     """
     Merge an update into the current state.
@@ -37,11 +134,29 @@ def merge_state(current: dict, update: dict) -> dict:
     - New keys are added
     - Existing list values are extended (append strategy)
     - Other values are overwritten
+
+    `AppendList` values are extended without copying their items.
     """
     merged = dict(current)
+    merge_into(merged, update)
+    return merged
+
+
+def merge_into(state: dict, update: dict, share: bool = False) -> dict:
+    """
+    Apply `merge_state` rules to `state` in place and return it.
+
+    With `share`, list values that are added or overwritten are wrapped as
+    `AppendList` views too, so every list in `state` stays shared.
+    """
     for key, value in update.items():
-        if key in merged and isinstance(merged[key], list) and isinstance(value, list):
-            merged[key] = merged[key] + value  # Append strategy
+        existing = state.get(key)
+        if isinstance(existing, AppendList) and isinstance(value, (list, AppendList)):
+            state[key] = existing.extended(value)  # Append strategy, shared
+        elif key in state and isinstance(existing, list) and isinstance(value, (list, AppendList)):
+            state[key] = existing + list(value)  # Append strategy
+        elif share and isinstance(value, list):
+            state[key] = AppendList(value)  # Overwrite strategy, shared from now on
         else:
-            merged[key] = value  # Overwrite strategy
-    return merged
+            state[key] = value  # Overwrite strategy
+    return state
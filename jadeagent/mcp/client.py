@@ -11,6 +11,10 @@ Based on MCP spec 2025-03-26:
 - Execution: tools/call
 - Protocol: JSON-RPC 2.0
 
+Tool listings can be cached on disk so a lazy client only launches its
+server on the first tool call, and idle servers can be shut down and
+relaunched on demand.
+
 Example:
     from jadeagent.mcp import MCPClient
 
@@ -21,16 +25,24 @@ Example:
 
 from __future__ import annotations
 
+import hashlib
 import json
 import logging
+import os
 import subprocess
 import sys
 import threading
-import uuid
-from typing import Any
+import time
+from collections import deque
+from concurrent.futures import CancelledError, Future, InvalidStateError
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from pathlib import Path
+from typing import Any, Callable
 
 logger = logging.getLogger("jadeagent.mcp")
 
+DEFAULT_MCP_CACHE_DIR = os.path.expanduser("~/.jadeagent/mcp_cache")
+
 
 class MCPClient:
     """
@@ -39,12 +51,30 @@ class MCPClient:
     Launches the server as a subprocess, initializes the protocol,
     discovers tools, and provides methods to call them.
 
+    Requests are pipelined: a reader thread matches responses to requests
+    by JSON-RPC id, so any number of calls from different threads can be
+    in flight on one connection. Each call has its own timeout, and a
+    timed-out or cancelled call sends ``notifications/cancelled``.
+
+    Tool listings are cached per server command (and environment) when a
+    cache directory is configured. A lazy client with a cached listing
+    does not launch the server until the first tool call; when the server
+    then reports a different name or version than the cached entry, the
+    listing is fetched again and the cache rewritten.
+
     Args:
         command: Shell command to launch the MCP server.
             E.g.: "npx @modelcontextprotocol/server-filesystem /tmp"
             Or: "python my_mcp_server.py"
         env: Optional environment variables for the subprocess.
-        timeout: Timeout in seconds for JSON-RPC calls.
+        timeout: Default timeout in seconds for JSON-RPC calls.
+        lazy: Defer launching the server until the first tool call when a
+            cached tool listing is available.
+        cache_dir: Directory for cached tool listings. Defaults to
+            ``~/.jadeagent/mcp_cache`` for lazy clients; eager clients only
+            cache when a directory is given.
+        idle_timeout: Shut the server down after this many seconds without
+            requests. The next call launches it again.
 
     Example:
         mcp = MCPClient("npx @modelcontextprotocol/server-filesystem /tmp")
@@ -56,6 +86,13 @@ class MCPClient:
         # Use with an agent
         agent = Agent(backend, tools=tools)
         result = agent.run("Read the file /tmp/hello.txt")
+
+        # Several calls in flight at once
+        futures = [mcp.call_tool_async("read_file", {"path": p}) for p in paths]
+        contents = [f.result(timeout=10) for f in futures]
+
+        # Declared up front, launched only if the agent uses it
+        git = MCPClient("uvx mcp-server-git", lazy=True, idle_timeout=300)
     """
 
     def __init__(
@@ -63,41 +100,88 @@ class MCPClient:
         command: str,
         env: dict[str, str] | None = None,
         timeout: float = 30.0,
+        *,
+        lazy: bool = False,
+        cache_dir: str | Path | None = None,
+        idle_timeout: float | None = None,
     ):
         self.command = command
         self.timeout = timeout
+        self.lazy = lazy
+        self.idle_timeout = idle_timeout
+        self._env = dict(env) if env else None
+        self._cache_path: Path | None = None
+        if cache_dir is not None or lazy:
+            cache_root = Path(cache_dir or DEFAULT_MCP_CACHE_DIR).expanduser()
+            self._cache_path = cache_root / f"{_cache_key(command, env)}.json"
+        self._closed = False
         self._process: subprocess.Popen | None = None
-        self._lock = threading.Lock()
+        self._start_lock = threading.RLock()
+        self._write_lock = threading.Lock()
+        self._pending_lock = threading.Lock()
+        self._pending: dict[int, Future] = {}
         self._msg_id = 0
+        self._connection_error: Exception | None = None
+        self._stderr_lines: deque[str] = deque(maxlen=200)
+        self._io_threads: list[threading.Thread] = []
         self._raw_tools: list[dict] = []
+        self._server_info: dict = {}
         self._initialized = False
+        self._idle_lock = threading.Lock()
+        self._idle_timer: threading.Timer | None = None
+        self._last_activity = time.monotonic()
+
+        cached = self._load_tool_cache() if lazy else None
+        if cached is not None:
+            self._raw_tools = cached["tools"]
+            self._server_info = cached.get("server_info") or {}
+            logger.info(f"Loaded {len(self._raw_tools)} cached MCP tools for: {self.command}")
+        else:
+            self._ensure_started()
 
-        # Start the server
-        self._start_server(env)
-
-        # Give server time to start
-        import time
-        time.sleep(1.0)
-
-        # Check if server is still alive
-        if self._process.poll() is not None:
-            stderr = self._process.stderr.read() if self._process.stderr else ""
-            raise RuntimeError(
-                f"MCP server exited immediately (code={self._process.returncode}).\n"
-                f"Command: {self.command}\n"
-                f"Stderr: {stderr[:500] if stderr else '(empty)'}"
-            )
-
-        # Initialize MCP protocol
-        self._initialize()
-
-        # Discover tools
-        self._discover_tools()
+    @property
+    def is_running(self) -> bool:
+        """Whether the server process is currently running."""
+        return self._process is not None and self._process.poll() is None
+
+    def _ensure_started(self):
+        """Launch the server and complete the handshake unless it was already started."""
+        with self._start_lock:
+            if self._closed:
+                raise RuntimeError("MCP client is closed")
+            if self._process is not None:
+                return
+
+            self._start_server(self._env)
+            process = self._process
+            try:
+                self._initialize()
+            except (RuntimeError, TimeoutError):
+                try:
+                    code = process.wait(timeout=1.0)
+                except subprocess.TimeoutExpired:
+                    code = None
+                stderr = self._stderr_tail()
+                self._stop_server()
+                if code is None:
+                    raise
+                raise RuntimeError(
+                    f"MCP server exited immediately (code={code}).\n"
+                    f"Command: {self.command}\n"
+                    f"Stderr: {stderr or '(empty)'}"
+                ) from None
+
+            cached = self._load_tool_cache()
+            if cached is not None and cached.get("server_info") == self._server_info:
+                self._raw_tools = cached["tools"]
+            else:
+                if self._raw_tools:
+                    logger.info(f"MCP server changed since its tools were cached; refreshing: {self.command}")
+                self._discover_tools()
 
     def _start_server(self, env: dict | None = None):
-        """Launch the MCP server as a subprocess."""
+        """Launch the MCP server as a subprocess and start its reader threads."""
         import shlex
-        import os
 
         full_env = dict(os.environ)
         if env:
@@ -113,7 +197,7 @@ class MCPClient:
 
         logger.info(f"Starting MCP server: {self.command}")
 
-        self._process = subprocess.Popen(
+        process = subprocess.Popen(
             args,
             stdin=subprocess.PIPE,
             stdout=subprocess.PIPE,
@@ -123,30 +207,152 @@ class MCPClient:
             text=True,
             bufsize=0,
         )
+        with self._pending_lock:
+            self._connection_error = None
+        self._stderr_lines.clear()
+        self._process = process
+        self._io_threads = []
+        for target, name in ((self._read_responses, "reader"), (self._read_stderr, "stderr")):
+            thread = threading.Thread(
+                target=target, args=(process,), name=f"mcp-{name}-{process.pid}", daemon=True,
+            )
+            thread.start()
+            self._io_threads.append(thread)
+
+    def _stop_server(self):
+        """Shut the server process down; the next call launches a new one."""
+        process, self._process = self._process, None
+        self._initialized = False
+        if process is None:
+            return
+        if process.poll() is None:
+            try:
+                process.stdin.close()
+                process.wait(timeout=5)
+            except Exception:
+                process.kill()
+            logger.info("MCP server shut down")
 
     def _next_id(self) -> int:
         """Generate unique JSON-RPC message ID."""
-        self._msg_id += 1
-        return self._msg_id
+        with self._pending_lock:
+            self._msg_id += 1
+            return self._msg_id
+
+    def _stderr_tail(self, wait: float = 0.5) -> str:
+        """Last lines the server wrote to stderr, once it has had a moment to flush them."""
+        if len(self._io_threads) > 1 and self._process and self._process.poll() is not None:
+            self._io_threads[1].join(timeout=wait)
+        return "".join(self._stderr_lines)[-500:]
+
+    def _read_stderr(self, process: subprocess.Popen):
+        # Drained continuously so a chatty server never blocks on a full pipe.
+        for line in iter(process.stderr.readline, ""):
+            if process is self._process:
+                self._stderr_lines.append(line)
+
+    def _read_responses(self, process: subprocess.Popen):
+        """Reader thread: route each response to the request waiting for its id."""
+        try:
+            for line in iter(process.stdout.readline, ""):
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    message = json.loads(line)
+                except json.JSONDecodeError:
+                    logger.warning("Ignoring non-JSON line from MCP server: %s", line[:200])
+                    continue
+                if isinstance(message, dict):
+                    self._dispatch(message)
+        except (OSError, ValueError):
+            pass
+        if process is not self._process:
+            return  # stopped on purpose; a restarted server has its own reader
+        self._fail_pending(RuntimeError(
+            f"MCP server closed connection.\n"
+            f"Command: {self.command}\n"
+            f"Stderr: {self._stderr_tail() or '(empty)'}"
+        ))
+
+    def _dispatch(self, message: dict):
+        if "method" in message:
+            if "id" in message:
+                self._answer_server_request(message)
+            elif message["method"] == "notifications/tools/list_changed":
+                self._invalidate_tool_cache()
+                # Re-listing needs this reader thread, so it cannot happen inline.
+                threading.Thread(target=self._refresh_tools_quietly, daemon=True).start()
+            else:
+                logger.debug("MCP notification: %s", message["method"])
+            return
 
-    def _send_request(self, method: str, params: dict | None = None) -> Any:
-        """
-        Send a JSON-RPC 2.0 request and wait for response.
+        with self._pending_lock:
+            future = self._pending.pop(message.get("id"), None)
+        if future is None:
+            logger.debug("Dropping MCP response for unknown or cancelled id %r", message.get("id"))
+            return
+        try:
+            if "error" in message:
+                err = message["error"] or {}
+                future.set_exception(RuntimeError(
+                    f"MCP error ({err.get('code', '?')}): {err.get('message', 'Unknown')}"
+                ))
+            else:
+                future.set_result(message.get("result", {}))
+        except InvalidStateError:
+            pass  # cancelled by the caller while the response was in transit
+
+    def _answer_server_request(self, message: dict):
+        """Reply to requests the server sends us; only ``ping`` is supported."""
+        if message["method"] == "ping":
+            reply = {"jsonrpc": "2.0", "id": message["id"], "result": {}}
+        else:
+            reply = {
+                "jsonrpc": "2.0",
+                "id": message["id"],
+                "error": {"code": -32601, "message": f"Method not found: {message['method']}"},
+            }
+        try:
+            self._write(reply)
+        except RuntimeError:
+            logger.debug("Could not answer MCP server request %s", message["method"])
+
+    def _fail_pending(self, error: Exception):
+        with self._pending_lock:
+            self._connection_error = error
+            pending, self._pending = self._pending, {}
+        for future in pending.values():
+            try:
+                future.set_exception(error)
+            except InvalidStateError:
+                pass
+
+    def _write(self, message: dict):
+        line = json.dumps(message) + "\n"
+        process = self._process
+        if process is None:
+            raise RuntimeError("MCP server is not running")
+        with self._write_lock:
+            try:
+                process.stdin.write(line)
+                process.stdin.flush()
+            except (BrokenPipeError, OSError, ValueError) as e:
+                raise RuntimeError(
+                    f"MCP server pipe broken (method: {message.get('method', 'response')}).\n"
+                    f"Stderr: {self._stderr_tail() or '(empty)'}\n"
+                    f"Error: {e}"
+                )
 
-        Args:
-            method: JSON-RPC method name.
-            params: Optional parameters dict.
+    def _submit(self, method: str, params: dict | None = None) -> Future:
+        """
+        Send a JSON-RPC 2.0 request without waiting for the response.
 
         Returns:
-            The 'result' field from the response.
-
-        Raises:
-            RuntimeError: If the server returns an error.
-            TimeoutError: If no response within timeout.
+            A Future that resolves to the response's 'result' field, or
+            raises RuntimeError if the server returns an error. Cancelling
+            the Future tells the server to stop working on the request.
         """
-        if not self._process or self._process.poll() is not None:
-            raise RuntimeError("MCP server is not running")
-
         msg_id = self._next_id()
         request = {
             "jsonrpc": "2.0",
@@ -156,40 +362,91 @@ class MCPClient:
         if params is not None:
             request["params"] = params
 
-        request_line = json.dumps(request) + "\n"
-
-        with self._lock:
-            try:
-                self._process.stdin.write(request_line)
-                self._process.stdin.flush()
-            except (BrokenPipeError, OSError) as e:
-                stderr = self._process.stderr.read() if self._process.stderr else ""
-                raise RuntimeError(
-                    f"MCP server pipe broken (method: {method}).\n"
-                    f"Stderr: {stderr[:500] if stderr else '(empty)'}\n"
-                    f"Error: {e}"
-                )
-
-            # Read response (blocking, line-delimited)
-            response_line = self._process.stdout.readline()
+        future: Future = Future()
+        # Registering under the start lock keeps an idle shutdown from
+        # stopping the server between the liveness check and the write.
+        with self._start_lock:
+            self._ensure_started()
+            if not self._process or self._process.poll() is not None:
+                raise RuntimeError("MCP server is not running")
+            with self._pending_lock:
+                if self._connection_error is not None:
+                    raise RuntimeError(str(self._connection_error))
+                self._pending[msg_id] = future
+            self._last_activity = time.monotonic()
+        future.add_done_callback(lambda done: self._on_request_done(msg_id, done))
+        try:
+            self._write(request)
+        except RuntimeError:
+            with self._pending_lock:
+                self._pending.pop(msg_id, None)
+            raise
+        return future
+
+    def _on_request_done(self, msg_id: int, future: Future):
+        self._last_activity = time.monotonic()
+        if future.cancelled():
+            with self._pending_lock:
+                was_pending = self._pending.pop(msg_id, None) is not None
+            if was_pending:
+                self._send_notification("notifications/cancelled", {
+                    "requestId": msg_id,
+                    "reason": "cancelled by client",
+                })
+        if self.idle_timeout is not None and not self._pending:
+            self._arm_idle_timer(self.idle_timeout)
+
+    def _arm_idle_timer(self, delay: float):
+        with self._idle_lock:
+            if self._idle_timer is not None:
+                self._idle_timer.cancel()
+            self._idle_timer = threading.Timer(delay, self._stop_if_idle)
+            self._idle_timer.daemon = True
+            self._idle_timer.start()
+
+    def _stop_if_idle(self):
+        """Idle timer callback: stop the server if nothing ran for `idle_timeout` seconds."""
+        with self._start_lock:
+            if self._process is None or self._closed:
+                return
+            with self._pending_lock:
+                busy = bool(self._pending)
+            if busy:
+                return  # re-armed when the last request finishes
+            idle_for = time.monotonic() - self._last_activity
+            if idle_for < self.idle_timeout:
+                self._arm_idle_timer(self.idle_timeout - idle_for)
+                return
+            logger.info(f"Stopping MCP server idle for {idle_for:.1f}s: {self.command}")
+            self._stop_server()
+
+    def _send_request(self, method: str, params: dict | None = None, timeout: float | None = None) -> Any:
+        """
+        Send a JSON-RPC 2.0 request and wait for response.
 
-        if not response_line:
-            stderr = self._process.stderr.read() if self._process.stderr else ""
-            raise RuntimeError(
-                f"MCP server closed connection (method: {method}).\n"
-                f"Command: {self.command}\n"
-                f"Stderr: {stderr[:500] if stderr else '(empty)'}"
-            )
+        Other requests may be in flight at the same time; only this call
+        waits for this response.
 
-        response = json.loads(response_line.strip())
+        Args:
+            method: JSON-RPC method name.
+            params: Optional parameters dict.
+            timeout: Seconds to wait; defaults to the client timeout.
 
-        if "error" in response:
-            err = response["error"]
-            raise RuntimeError(
-                f"MCP error ({err.get('code', '?')}): {err.get('message', 'Unknown')}"
-            )
+        Returns:
+            The 'result' field from the response.
 
-        return response.get("result", {})
+        Raises:
+            RuntimeError: If the server returns an error.
+            TimeoutError: If no response within timeout. The request is
+                cancelled on the server.
+        """
+        wait = self.timeout if timeout is None else timeout
+        future = self._submit(method, params)
+        try:
+            return future.result(timeout=wait)
+        except FutureTimeoutError:
+            future.cancel()
+            raise TimeoutError(f"MCP request {method!r} timed out after {wait}s") from None
 
     def _send_notification(self, method: str, params: dict | None = None):
         """Send a JSON-RPC 2.0 notification (no response expected)."""
@@ -203,11 +460,10 @@ class MCPClient:
         if params is not None:
             notification["params"] = params
 
-        notification_line = json.dumps(notification) + "\n"
-
-        with self._lock:
-            self._process.stdin.write(notification_line)
-            self._process.stdin.flush()
+        try:
+            self._write(notification)
+        except RuntimeError:
+            logger.debug("Could not send MCP notification %s", method)
 
     def _initialize(self):
         """Perform MCP protocol initialization handshake."""
@@ -220,7 +476,8 @@ class MCPClient:
             },
         })
 
-        logger.info(f"MCP server initialized: {result.get('serverInfo', {})}")
+        self._server_info = result.get("serverInfo") or {}
+        logger.info(f"MCP server initialized: {self._server_info}")
 
         # Send initialized notification
         self._send_notification("notifications/initialized")
@@ -231,14 +488,75 @@ class MCPClient:
         result = self._send_request("tools/list")
         self._raw_tools = result.get("tools", [])
         logger.info(f"Discovered {len(self._raw_tools)} MCP tools")
+        self._write_tool_cache()
+
+    def refresh_tools(self) -> list[str]:
+        """
+        Fetch the tool listing from the server again, launching it if
+        needed, and rewrite the cache.
 
-    def call_tool(self, name: str, arguments: dict | None = None) -> str:
+        Returns:
+            The refreshed tool names.
+        """
+        self._ensure_started()
+        self._discover_tools()
+        return self.tool_names
+
+    def _refresh_tools_quietly(self):
+        try:
+            self.refresh_tools()
+        except (RuntimeError, TimeoutError) as exc:
+            logger.warning("Could not refresh MCP tools after list_changed: %s", exc)
+
+    def _load_tool_cache(self) -> dict | None:
+        if self._cache_path is None:
+            return None
+        try:
+            entry = json.loads(self._cache_path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return None
+        if not isinstance(entry, dict) or entry.get("command") != self.command:
+            return None
+        if not isinstance(entry.get("tools"), list):
+            return None
+        return entry
+
+    def _write_tool_cache(self):
+        if self._cache_path is None:
+            return
+        entry = {
+            "command": self.command,
+            "server_info": self._server_info,
+            "tools": self._raw_tools,
+            "cached_at": time.time(),
+        }
+        tmp_path = self._cache_path.with_name(f"{self._cache_path.name}.{os.getpid()}.tmp")
+        try:
+            self._cache_path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path.write_text(json.dumps(entry, indent=2), encoding="utf-8")
+            os.replace(tmp_path, self._cache_path)
+        except OSError as exc:
+            logger.warning("Could not write MCP tool cache %s: %s", self._cache_path, exc)
+
+    def _invalidate_tool_cache(self):
+        if self._cache_path is not None:
+            try:
+                self._cache_path.unlink()
+            except OSError:
+                pass
+
+    def call_tool(self, name: str, arguments: dict | None = None, timeout: float | None = None) -> str:
         """
         Call a tool on the MCP server.
 
+        Safe to call from several threads at once; the calls run
+        concurrently on the server. Launches the server first if it is
+        lazy or was stopped for being idle.
+
         Args:
             name: Tool name.
             arguments: Tool arguments dict.
+            timeout: Seconds to wait; defaults to the client timeout.
 
         Returns:
             Tool result as a string.
@@ -246,23 +564,20 @@ class MCPClient:
         result = self._send_request("tools/call", {
             "name": name,
             "arguments": arguments or {},
-        })
+        }, timeout=timeout)
+        return _tool_result_text(result)
 
-        # Extract text from content array
-        content = result.get("content", [])
-        texts = []
-        for item in content:
-            if isinstance(item, dict):
-                if item.get("type") == "text":
-                    texts.append(item.get("text", ""))
-                elif item.get("type") == "image":
-                    texts.append(f"[image: {item.get('mimeType', 'unknown')}]")
-                else:
-                    texts.append(json.dumps(item))
-            elif isinstance(item, str):
-                texts.append(item)
-
-        return "\n".join(texts) if texts else json.dumps(result)
+    def call_tool_async(self, name: str, arguments: dict | None = None) -> Future:
+        """
+        Start a tool call and return a Future for its text result.
+
+        ``future.result(timeout)`` waits for it; ``future.cancel()``
+        abandons it and notifies the server.
+        """
+        return _chain(self._submit("tools/call", {
+            "name": name,
+            "arguments": arguments or {},
+        }), _tool_result_text)
 
     @property
     def tool_names(self) -> list[str]:
@@ -286,14 +601,15 @@ class MCPClient:
         return bridge_mcp_tools(self)
 
     def close(self):
-        """Shut down the MCP server."""
-        if self._process and self._process.poll() is None:
-            try:
-                self._process.stdin.close()
-                self._process.wait(timeout=5)
-            except Exception:
-                self._process.kill()
-            logger.info("MCP server shut down")
+        """Shut down the MCP server and fail any calls still waiting."""
+        self._closed = True
+        timer = getattr(self, "_idle_timer", None)
+        if timer is not None:
+            timer.cancel()
+        if hasattr(self, "_process"):
+            self._stop_server()
+        if hasattr(self, "_pending"):
+            self._fail_pending(RuntimeError("MCP client is closed"))
 
     def __enter__(self):
         return self
@@ -305,5 +621,56 @@ class MCPClient:
         self.close()
 
     def __repr__(self) -> str:
-        status = "running" if self._process and self._process.poll() is None else "stopped"
+        status = "running" if self.is_running else "stopped"
         return f"<MCPClient(tools={len(self._raw_tools)}, status={status})>"
+
+
+def _cache_key(command: str, env: dict[str, str] | None) -> str:
+    """Cache file stem for a server; env values are hashed, never written to disk."""
+    identity = json.dumps({"command": command, "env": env or {}}, sort_keys=True)
+    return hashlib.sha256(identity.encode("utf-8")).hexdigest()[:32]
+
+
+def _tool_result_text(result: dict) -> str:
+    """Flatten a tools/call result's content array to text."""
+    content = result.get("content", [])
+    texts = []
+    for item in content:
+        if isinstance(item, dict):
+            if item.get("type") == "text":
+                texts.append(item.get("text", ""))
+            elif item.get("type") == "image":
+                texts.append(f"[image: {item.get('mimeType', 'unknown')}]")
+            else:
+                texts.append(json.dumps(item))
+        elif isinstance(item, str):
+            texts.append(item)
+
+    return "\n".join(texts) if texts else json.dumps(result)
+
+
+def _chain(source: Future, transform: Callable[[Any], Any]) -> Future:
+    """Future for ``transform(source.result())``; cancelling it cancels `source`."""
+    target: Future = Future()
+
+    def forward(done: Future):
+        if done.cancelled():
+            target.cancel()
+            return
+        try:
+            target.set_result(transform(done.result()))
+        except (CancelledError, InvalidStateError):
+            pass
+        except Exception as exc:
+            try:
+                target.set_exception(exc)
+            except InvalidStateError:
+                pass
+
+    def backward(done: Future):
+        if done.cancelled():
+            source.cancel()
+
+    target.add_done_callback(backward)
+    source.add_done_callback(forward)
+    return target
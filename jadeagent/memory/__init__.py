@@ -3,6 +3,7 @@
 from .base import BaseMemory
 from .buffer import BufferMemory
 from .router import InMemorySharedMemoryStore, MemoryRouter, MemoryStore, RedisMemoryStore
+from .vector_index import ChromaVectorIndex, NumpyVectorIndex, VectorIndex, VectorMatch
 
 __all__ = [
     "BaseMemory",
@@ -12,6 +13,10 @@ __all__ = [
     "RedisMemoryStore",
     "MemoryRouter",
     "ShoreStoneMemory",
+    "VectorIndex",
+    "VectorMatch",
+    "ChromaVectorIndex",
+    "NumpyVectorIndex",
 ]
 
 
@@ -3,19 +3,48 @@ Sliding window buffer memory.
 
 Simple memory that keeps the last N messages.
 Useful for lightweight agents that don't need persistent storage.
+
+Search uses an inverted index with BM25 ranking that is updated as entries
+are added and evicted, so term scoring only touches the postings of the
+query's terms. The phrase boost checks only entries holding every character
+trigram of the query; queries shorter than three characters, which nearly
+every entry matches anyway, scan the buffer.
 """
 
 from __future__ import annotations
 
-from collections import deque
+import heapq
+import math
+import re
+from collections import Counter, deque
+from typing import Callable, Iterable
 
 from .base import BaseMemory
 
+_WORD_RE = re.compile(r"\w+", re.UNICODE)
+
+TOKENIZERS: dict[str, Callable[[str], list[str]]] = {
+    "words": lambda text: _WORD_RE.findall(text.lower()),
+    "whitespace": lambda text: text.lower().split(),
+}
+
 
 class BufferMemory(BaseMemory):
     """
     In-memory sliding window of recent memories.
 
+    Args:
+        max_size: Entries kept; the oldest is evicted (and unindexed) first.
+        tokenizer: ``"words"`` (lowercased ``\\w+`` runs), ``"whitespace"``
+            (lowercased whitespace split), or a callable returning tokens.
+        stopwords: Tokens ignored when indexing and querying.
+        k1: BM25 term-frequency saturation.
+        b: BM25 length normalization.
+        phrase_boost: Added to the score of entries that contain the whole
+            query as a substring, including entries that share no term with
+            it (``"pyth"`` still finds ``"User likes Python"``). 0 disables
+            the substring scan.
+
     Example:
         memory = BufferMemory(max_size=100)
         memory.memorize("User likes Python")
@@ -23,52 +52,160 @@ class BufferMemory(BaseMemory):
         results = memory.remember("programming language preference")
     """
 
-    def __init__(self, max_size: int = 100):
+    def __init__(
+        self,
+        max_size: int = 100,
+        tokenizer: str | Callable[[str], list[str]] = "words",
+        stopwords: Iterable[str] | None = None,
+        k1: float = 1.5,
+        b: float = 0.75,
+        phrase_boost: float = 2.0,
+    ):
         self.max_size = max_size
+        if callable(tokenizer):
+            self._tokenize = tokenizer
+        elif tokenizer in TOKENIZERS:
+            self._tokenize = TOKENIZERS[tokenizer]
+        else:
+            raise ValueError(f"Unknown tokenizer {tokenizer!r}; expected one of {sorted(TOKENIZERS)} or a callable")
+        self._stopwords = frozenset(word.lower() for word in stopwords or ())
+        self.k1 = k1
+        self.b = b
+        self.phrase_boost = phrase_boost
+
         self._buffer: deque[dict] = deque(maxlen=max_size)
+        self._next_id = 0
+        self._entries: dict[int, dict] = {}
+        self._postings: dict[str, dict[int, int]] = {}
+        self._doc_terms: dict[int, Counter] = {}
+        self._doc_length: dict[int, int] = {}
+        self._lowered: dict[int, str] = {}
+        self._trigrams: dict[str, set[int]] = {}
+        self._total_length = 0
+
+    @staticmethod
+    def _grams(text: str) -> set[str]:
+        return {text[i:i + 3] for i in range(len(text) - 2)}
+
+    def _terms(self, text: str) -> list[str]:
+        return [term for term in self._tokenize(text) if term not in self._stopwords]
+
+    def _index(self, entry: dict):
+        terms = Counter(self._terms(entry["content"]))
+        doc_id = entry["id"]
+        self._entries[doc_id] = entry
+        self._lowered[doc_id] = entry["content"].lower()
+        self._doc_terms[doc_id] = terms
+        self._doc_length[doc_id] = sum(terms.values())
+        self._total_length += self._doc_length[doc_id]
+        for term, count in terms.items():
+            self._postings.setdefault(term, {})[doc_id] = count
+        for gram in self._grams(self._lowered[doc_id]):
+            self._trigrams.setdefault(gram, set()).add(doc_id)
+
+    def _unindex(self, entry: dict):
+        doc_id = entry["id"]
+        self._entries.pop(doc_id, None)
+        for gram in self._grams(self._lowered.pop(doc_id, "")):
+            docs = self._trigrams.get(gram)
+            if docs is not None:
+                docs.discard(doc_id)
+                if not docs:
+                    del self._trigrams[gram]
+        terms = self._doc_terms.pop(doc_id, Counter())
+        self._total_length -= self._doc_length.pop(doc_id, 0)
+        for term in terms:
+            postings = self._postings.get(term)
+            if postings is None:
+                continue
+            postings.pop(doc_id, None)
+            if not postings:
+                del self._postings[term]
+
+    def search(self, query: str, k: int = 5) -> list[tuple[str, float]]:
+        """
+        Rank entries against `query` with BM25.
+
+        Returns:
+            Up to `k` ``(content, score)`` pairs, best first; ties go to
+            the older entry. Entries that neither share a term with the
+            query nor contain it as a substring are not returned.
+        """
+        terms = set(self._terms(query))
+        query_lower = query.lower()
+        phrase = bool(self.phrase_boost and query_lower.strip())
+        if not (terms or phrase) or not self._buffer or k <= 0:
+            return []
+
+        count = len(self._buffer)
+        avg_length = (self._total_length / count) or 1.0
+        scores: dict[int, float] = {}
+        for term in terms:
+            postings = self._postings.get(term)
+            if not postings:
+                continue
+            df = len(postings)
+            idf = math.log(1.0 + (count - df + 0.5) / (df + 0.5))
+            for doc_id, tf in postings.items():
+                norm = tf + self.k1 * (1.0 - self.b + self.b * self._doc_length[doc_id] / avg_length)
+                scores[doc_id] = scores.get(doc_id, 0.0) + idf * tf * (self.k1 + 1.0) / norm
+
+        if phrase:
+            for doc_id in self._phrase_candidates(query_lower):
+                if query_lower in self._lowered[doc_id]:
+                    scores[doc_id] = scores.get(doc_id, 0.0) + self.phrase_boost
+        if not scores:
+            return []
+
+        best = heapq.nsmallest(k, scores.items(), key=lambda item: (-item[1], item[0]))
+        return [(self._entries[doc_id]["content"], score) for doc_id, score in best]
+
+    def _phrase_candidates(self, query_lower: str) -> Iterable[int]:
+        """Entries that may contain `query_lower`: those holding all of its trigrams."""
+        grams = self._grams(query_lower)
+        if not grams:
+            return list(self._lowered)
+        docs = sorted((self._trigrams.get(gram, set()) for gram in grams), key=len)
+        return docs[0].intersection(*docs[1:])
 
     def remember(self, query: str, k: int = 5) -> list[str]:
         """
-        Simple keyword-based search over buffer.
+        BM25 keyword search over the buffer.
 
+        Falls back to the most recent memories when nothing matches.
         For semantic search, use ShoreStoneMemory instead.
         """
-        query_lower = query.lower()
-        query_words = set(query_lower.split())
-
-        # Score each memory by keyword overlap
-        scored = []
-        for entry in self._buffer:
-            content = entry["content"]
-            content_lower = content.lower()
-            content_words = set(content_lower.split())
-
-            # Score: number of matching words
-            overlap = len(query_words & content_words)
-            if overlap > 0 or query_lower in content_lower:
-                score = overlap + (2 if query_lower in content_lower else 0)
-                scored.append((score, content))
-
-        # Sort by score descending
-        scored.sort(key=lambda x: x[0], reverse=True)
-
-        # Return top-k, or all if fewer than k
-        if not scored:
+        results = self.search(query, k=k)
+        if not results:
             # Return most recent memories as fallback
             return [e["content"] for e in list(self._buffer)[-k:]]
-
-        return [content for _, content in scored[:k]]
+        return [content for content, _ in results]
 
     def memorize(self, content: str, metadata: dict | None = None):
         """Store a memory in the buffer."""
-        self._buffer.append({
+        if self._buffer.maxlen == 0:
+            return
+        if len(self._buffer) == self._buffer.maxlen:
+            self._unindex(self._buffer.popleft())
+        entry = {
+            "id": self._next_id,
             "content": content,
             "metadata": metadata or {},
-        })
+        }
+        self._next_id += 1
+        self._buffer.append(entry)
+        self._index(entry)
 
     def clear(self):
         """Clear all memories."""
         self._buffer.clear()
+        self._entries.clear()
+        self._postings.clear()
+        self._doc_terms.clear()
+        self._doc_length.clear()
+        self._lowered.clear()
+        self._trigrams.clear()
+        self._total_length = 0
 
     @property
     def size(self) -> int:
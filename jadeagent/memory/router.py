@@ -5,13 +5,20 @@ Shared memory routing and storage primitives for mesh nodes.
 from __future__ import annotations
 
 import json
+import logging
+import threading
+import time
 from abc import ABC, abstractmethod
-from collections import defaultdict
-from typing import Any
+from collections import OrderedDict, defaultdict
+from typing import Any, Mapping, Sequence
 
 from .buffer import BufferMemory
 from ..governance import MemoryMount, NodeManifest, ResourceRequirement, TaskPolicy, check_access, memory_mount_allowed
 
+logger = logging.getLogger("jadeagent.memory.router")
+
+MountKey = tuple[str, str]  # (task_id, mount_name)
+
 
 class MemoryStore(ABC):
     @abstractmethod
@@ -30,6 +37,24 @@ class MemoryStore(ABC):
     def read_state(self, task_id: str, mount_name: str) -> dict[str, Any]:
         ...
 
+    def read_states(self, keys: Sequence[MountKey]) -> dict[MountKey, dict[str, Any]]:
+        """Read the state of several ``(task_id, mount_name)`` mounts at once."""
+        return {key: self.read_state(*key) for key in keys}
+
+    def write_states(self, states: Mapping[MountKey, dict[str, Any]], node_id: str):
+        """Write the state of several ``(task_id, mount_name)`` mounts at once."""
+        for (task_id, mount_name), state in states.items():
+            self.write_state(task_id, mount_name, state, node_id)
+
+    def list_notes_many(self, keys: Sequence[MountKey], limit: int = 100) -> dict[MountKey, list[dict[str, Any]]]:
+        """List the latest notes of several ``(task_id, mount_name)`` mounts at once."""
+        return {key: self.list_notes(*key, limit=limit) for key in keys}
+
+    def append_notes(self, notes: Sequence[tuple[str, str, str, dict | None]], node_id: str):
+        """Append ``(task_id, mount_name, note, metadata)`` notes in one call."""
+        for task_id, mount_name, note, metadata in notes:
+            self.append_note(task_id, mount_name, note, node_id, metadata)
+
 
 class InMemorySharedMemoryStore(MemoryStore):
     def __init__(self):
@@ -60,6 +85,27 @@ class InMemorySharedMemoryStore(MemoryStore):
 
 
 class RedisMemoryStore(MemoryStore):
+    """
+    Shared memory store in Redis, with a versioned local read-through cache.
+
+    State lives in a hash per mount whose ``version`` field is incremented
+    on every write; notes live in an append-only list whose length serves
+    as its version. Cached reads are validated one of two ways:
+
+    - ``invalidation="version"`` (default): a read fetches only the version
+      (``HGET``/``LLEN``) and reuses the cached value when it matches.
+    - ``invalidation="keyspace"``: a background subscriber evicts entries
+      on keyspace notifications, so cache hits cost no round trip at all.
+      The server needs ``notify-keyspace-events`` to include ``Khl`` (or
+      ``KA``); while the subscription is down, reads fall back to version
+      checks.
+
+    Batched `read_states`, `write_states`, `list_notes_many` and
+    `append_notes` send one pipeline per call. The cache keeps the JSON text
+    stored in Redis and decodes it on every read, so callers never share
+    nested objects with the cache, with each other, or with the writer.
+    """
+
     def __init__(
         self,
         redis_url: str = "redis://localhost:6379/0",
@@ -70,57 +116,287 @@ class RedisMemoryStore(MemoryStore):
         tls_keyfile: str | None = None,
         tls_cert_reqs: str | None = "required",
         redis_kwargs: dict[str, Any] | None = None,
+        client: Any = None,
+        local_cache: bool = True,
+        cache_size: int = 1024,
+        invalidation: str = "version",
     ):
-        try:
-            import redis
-        except ImportError as exc:
-            raise ImportError(
-                "RedisMemoryStore requires redis package. Install with: pip install redis"
-            ) from exc
-
-        kwargs = dict(redis_kwargs or {})
-        if tls:
-            kwargs.setdefault("ssl", True)
-            if tls_ca_certs:
-                kwargs["ssl_ca_certs"] = tls_ca_certs
-            if tls_certfile:
-                kwargs["ssl_certfile"] = tls_certfile
-            if tls_keyfile:
-                kwargs["ssl_keyfile"] = tls_keyfile
-            if tls_cert_reqs:
-                kwargs["ssl_cert_reqs"] = tls_cert_reqs
-
-        self._client = redis.Redis.from_url(redis_url, decode_responses=True, **kwargs)
+        if invalidation not in ("version", "keyspace"):
+            raise ValueError("invalidation must be 'version' or 'keyspace'")
+
+        if client is None:
+            try:
+                import redis
+            except ImportError as exc:
+                raise ImportError(
+                    "RedisMemoryStore requires redis package. Install with: pip install redis"
+                ) from exc
+
+            kwargs = dict(redis_kwargs or {})
+            if tls:
+                kwargs.setdefault("ssl", True)
+                if tls_ca_certs:
+                    kwargs["ssl_ca_certs"] = tls_ca_certs
+                if tls_certfile:
+                    kwargs["ssl_certfile"] = tls_certfile
+                if tls_keyfile:
+                    kwargs["ssl_keyfile"] = tls_keyfile
+                if tls_cert_reqs:
+                    kwargs["ssl_cert_reqs"] = tls_cert_reqs
+
+            client = redis.Redis.from_url(redis_url, decode_responses=True, **kwargs)
+        self._client = client
         self._client.ping()
         self.key_prefix = key_prefix.rstrip(":")
 
+        self.local_cache = bool(local_cache)
+        self.cache_size = max(1, int(cache_size))
+        self.invalidation = invalidation
+        self._cache: OrderedDict[str, tuple[Any, ...]] = OrderedDict()
+        self._cache_lock = threading.Lock()
+        self._epoch = 0
+        self._invalidated_at: dict[str, int] = {}
+        self._epoch_floor = 0
+        self._subscribed = False
+        self._closed = False
+        self._listener: threading.Thread | None = None
+        if self.local_cache and invalidation == "keyspace" and self._keyspace_events_enabled():
+            self._listener = threading.Thread(
+                target=self._listen_for_invalidations, name="jade-memory-invalidation", daemon=True,
+            )
+            self._listener.start()
+
     def _notes_key(self, task_id: str, mount_name: str) -> str:
         return f"{self.key_prefix}:notes:{task_id}:{mount_name}"
 
     def _state_key(self, task_id: str, mount_name: str) -> str:
         return f"{self.key_prefix}:state:{task_id}:{mount_name}"
 
-    def append_note(self, task_id: str, mount_name: str, note: str, node_id: str, metadata: dict | None = None):
-        self._client.rpush(
-            self._notes_key(task_id, mount_name),
-            json.dumps({"node_id": node_id, "note": note, "metadata": dict(metadata or {})}, separators=(",", ":")),
+    # -- local cache ---------------------------------------------------------
+
+    def _keyspace_events_enabled(self) -> bool:
+        try:
+            setting = self._client.config_get("notify-keyspace-events").get("notify-keyspace-events", "")
+        except Exception:
+            return True  # CONFIG is often disabled on managed Redis; trust the operator
+        if "K" in setting and ("A" in setting or ("h" in setting and "l" in setting)):
+            return True
+        logger.warning(
+            "notify-keyspace-events is %r; RedisMemoryStore falls back to version-checked caching",
+            setting,
         )
+        self.invalidation = "version"
+        return False
+
+    def _listen_for_invalidations(self):
+        db = self._client.connection_pool.connection_kwargs.get("db", 0)
+        channel_prefix = f"__keyspace@{db}__:"
+        pattern = f"{channel_prefix}{self.key_prefix}:*"
+        while not self._closed:
+            pubsub = self._client.pubsub()
+            try:
+                pubsub.psubscribe(pattern)
+                while not self._closed:
+                    message = pubsub.get_message(timeout=1.0)
+                    if not message:
+                        continue
+                    if message["type"] == "psubscribe":
+                        # Anything cached before the subscription may have missed events.
+                        self._clear_cache()
+                        self._subscribed = True
+                    elif message["type"] == "pmessage":
+                        self._invalidate(str(message["channel"])[len(channel_prefix):])
+            except Exception as exc:
+                if not self._closed:
+                    logger.warning("Memory invalidation subscription lost: %s", exc)
+                    time.sleep(1.0)
+            finally:
+                self._subscribed = False
+                try:
+                    pubsub.close()
+                except Exception:
+                    pass
+
+    def _cache_trusted(self) -> bool:
+        return self.invalidation == "keyspace" and self._subscribed
+
+    def _invalidate(self, redis_key: str):
+        with self._cache_lock:
+            self._epoch += 1
+            self._cache.pop(redis_key, None)
+            self._invalidated_at[redis_key] = self._epoch
+            if len(self._invalidated_at) > 4 * self.cache_size:
+                self._invalidated_at.clear()
+                self._epoch_floor = self._epoch
+
+    def _clear_cache(self):
+        with self._cache_lock:
+            self._epoch += 1
+            self._cache.clear()
+            self._invalidated_at.clear()
+            self._epoch_floor = self._epoch
+
+    def _cache_get(self, redis_key: str) -> tuple[Any, ...] | None:
+        with self._cache_lock:
+            entry = self._cache.get(redis_key)
+            if entry is not None:
+                self._cache.move_to_end(redis_key)
+            return entry
+
+    def _cache_put(self, redis_key: str, entry: tuple[Any, ...], fetched_at_epoch: int):
+        with self._cache_lock:
+            if max(self._epoch_floor, self._invalidated_at.get(redis_key, 0)) > fetched_at_epoch:
+                return  # invalidated while the value was in flight
+            self._cache[redis_key] = entry
+            self._cache.move_to_end(redis_key)
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+
+    def clear_cache(self):
+        """Drop every locally cached value."""
+        self._clear_cache()
+
+    def close(self):
+        """Stop the invalidation subscriber, if one is running."""
+        self._closed = True
+        if self._listener is not None:
+            self._listener.join(timeout=2.0)
+
+    # -- notes ---------------------------------------------------------------
+
+    def append_note(self, task_id: str, mount_name: str, note: str, node_id: str, metadata: dict | None = None):
+        self.append_notes([(task_id, mount_name, note, metadata)], node_id)
+
+    def append_notes(self, notes: Sequence[tuple[str, str, str, dict | None]], node_id: str):
+        if not notes:
+            return
+        pipe = self._client.pipeline(transaction=False)
+        for task_id, mount_name, note, metadata in notes:
+            pipe.rpush(
+                self._notes_key(task_id, mount_name),
+                json.dumps({"node_id": node_id, "note": note, "metadata": dict(metadata or {})}, separators=(",", ":")),
+            )
+        pipe.execute()
 
     def list_notes(self, task_id: str, mount_name: str, limit: int = 100) -> list[dict[str, Any]]:
-        values = self._client.lrange(self._notes_key(task_id, mount_name), max(0, -limit), -1)
-        return [json.loads(value) for value in values]
+        key = (task_id, mount_name)
+        return self.list_notes_many([key], limit=limit)[key]
+
+    def list_notes_many(self, keys: Sequence[MountKey], limit: int = 100) -> dict[MountKey, list[dict[str, Any]]]:
+        keys = list(dict.fromkeys(keys))
+        start = -limit if limit > 0 else 0
+        result: dict[MountKey, list[dict[str, Any]]] = {}
+        if not self.local_cache:
+            pipe = self._client.pipeline(transaction=False)
+            for key in keys:
+                pipe.lrange(self._notes_key(*key), start, -1)
+            for key, values in zip(keys, pipe.execute()):
+                result[key] = [json.loads(value) for value in values]
+            return result
+
+        def covers(entry, length=None) -> bool:
+            cached_length, cached_limit, _ = entry
+            if length is not None and cached_length != length:
+                return False
+            return cached_limit <= 0 or (limit > 0 and cached_limit >= limit) or cached_length <= cached_limit
+
+        cached = {key: self._cache_get(self._notes_key(*key)) for key in keys}
+        if self._cache_trusted():
+            stale = [key for key in keys if cached[key] is None or not covers(cached[key])]
+        else:
+            checked = [key for key in keys if cached[key] is not None and covers(cached[key])]
+            stale = [key for key in keys if key not in checked]
+            if checked:
+                pipe = self._client.pipeline(transaction=False)
+                for key in checked:
+                    pipe.llen(self._notes_key(*key))
+                stale += [key for key, length in zip(checked, pipe.execute()) if not covers(cached[key], length)]
+
+        if stale:
+            epoch = self._epoch
+            pipe = self._client.pipeline(transaction=True)
+            for key in stale:
+                pipe.llen(self._notes_key(*key))
+                pipe.lrange(self._notes_key(*key), start, -1)
+            replies = pipe.execute()
+            for index, key in enumerate(stale):
+                length, values = replies[2 * index], replies[2 * index + 1]
+                entry = (int(length), limit, list(values))
+                self._cache_put(self._notes_key(*key), entry, epoch)
+                cached[key] = entry
+
+        for key in keys:
+            notes = cached[key][2]
+            result[key] = [json.loads(value) for value in (notes[-limit:] if limit > 0 else notes)]
+        return result
+
+    # -- state ---------------------------------------------------------------
 
     def write_state(self, task_id: str, mount_name: str, state: dict[str, Any], node_id: str):
-        self._client.hset(self._state_key(task_id, mount_name), mapping={
-            "node_id": node_id,
-            "state": json.dumps(dict(state), separators=(",", ":")),
-        })
+        self.write_states({(task_id, mount_name): state}, node_id)
+
+    def write_states(self, states: Mapping[MountKey, dict[str, Any]], node_id: str):
+        if not states:
+            return
+        items = [(key, json.dumps(dict(state), separators=(",", ":"))) for key, state in states.items()]
+        epoch = self._epoch
+        pipe = self._client.pipeline(transaction=True)
+        for (task_id, mount_name), raw in items:
+            state_key = self._state_key(task_id, mount_name)
+            pipe.hset(state_key, mapping={"node_id": node_id, "state": raw})
+            pipe.hincrby(state_key, "version", 1)
+        replies = pipe.execute()
+        if self.local_cache:
+            for index, ((task_id, mount_name), raw) in enumerate(items):
+                self._cache_put(self._state_key(task_id, mount_name), (str(replies[2 * index + 1]), raw), epoch)
 
     def read_state(self, task_id: str, mount_name: str) -> dict[str, Any]:
-        raw = self._client.hget(self._state_key(task_id, mount_name), "state")
-        if not raw:
-            return {}
-        return json.loads(raw)
+        key = (task_id, mount_name)
+        return self.read_states([key])[key]
+
+    def read_states(self, keys: Sequence[MountKey]) -> dict[MountKey, dict[str, Any]]:
+        keys = list(dict.fromkeys(keys))
+        if not self.local_cache:
+            pipe = self._client.pipeline(transaction=False)
+            for key in keys:
+                pipe.hget(self._state_key(*key), "state")
+            return {key: json.loads(raw) if raw else {} for key, raw in zip(keys, pipe.execute())}
+
+        cached = {key: self._cache_get(self._state_key(*key)) for key in keys}
+        if self._cache_trusted():
+            stale = [key for key in keys if cached[key] is None]
+        else:
+            # One round trip: versions for cached mounts, full values for the rest.
+            epoch = self._epoch
+            pipe = self._client.pipeline(transaction=False)
+            for key in keys:
+                if cached[key] is None:
+                    pipe.hmget(self._state_key(*key), ["state", "version"])
+                else:
+                    pipe.hget(self._state_key(*key), "version")
+            stale = []
+            for key, reply in zip(keys, pipe.execute()):
+                if cached[key] is None:
+                    cached[key] = self._store_state(key, reply, epoch)
+                elif reply is None or reply != cached[key][0]:
+                    stale.append(key)
+
+        if stale:
+            epoch = self._epoch
+            pipe = self._client.pipeline(transaction=False)
+            for key in stale:
+                pipe.hmget(self._state_key(*key), ["state", "version"])
+            for key, reply in zip(stale, pipe.execute()):
+                cached[key] = self._store_state(key, reply, epoch)
+
+        return {key: json.loads(cached[key][1]) if cached[key][1] else {} for key in keys}
+
+    def _store_state(self, key: MountKey, reply: list, epoch: int) -> tuple[Any, ...]:
+        raw, version = reply
+        entry = (version, raw or "")
+        if version is not None:  # states written before versioning are never cached
+            self._cache_put(self._state_key(*key), entry, epoch)
+        return entry
 
 
 class MemoryRouter:
@@ -318,6 +594,53 @@ class MemoryRouter:
         self._check_mount_access(node_manifest, mount_name, "read", task_policy=task_policy)
         return self.shared_store.read_state(task_id, mount_name)
 
+    def read_states(
+        self,
+        task_id: str,
+        mount_names: Sequence[str],
+        *,
+        node_manifest: NodeManifest,
+        task_policy: TaskPolicy | None = None,
+    ) -> dict[str, dict[str, Any]]:
+        """Read several scratchpad mounts of a task in one store call."""
+        for mount_name in mount_names:
+            mount = self._mount_for(node_manifest, mount_name)
+            if mount.backend != "task_scratchpad":
+                raise ValueError(f"Mount '{mount_name}' does not support task state.")
+            self._check_mount_access(node_manifest, mount_name, "read", task_policy=task_policy)
+        states = self.shared_store.read_states([(task_id, mount_name) for mount_name in mount_names])
+        return {mount_name: states[(task_id, mount_name)] for mount_name in mount_names}
+
+    def write_states(
+        self,
+        task_id: str,
+        states: Mapping[str, dict[str, Any]],
+        *,
+        node_manifest: NodeManifest,
+        task_policy: TaskPolicy | None = None,
+    ):
+        """Write several scratchpad mounts of a task in one store call."""
+        for mount_name in states:
+            mount = self._mount_for(node_manifest, mount_name)
+            if mount.backend != "task_scratchpad":
+                raise ValueError(f"Mount '{mount_name}' does not support task state.")
+            if "w" not in mount.mode:
+                raise PermissionError(f"Mount '{mount_name}' is not writable.")
+            self._check_mount_access(node_manifest, mount_name, "write", task_policy=task_policy)
+
+        if self.task_store is not None:
+            record = self.task_store.get(task_id)
+            if record is None:
+                raise KeyError(f"Task '{task_id}' not found in task store.")
+            if record.lease_owner != node_manifest.node_id:
+                raise PermissionError("Only the current lease owner can write task scratchpad state.")
+
+        self.shared_store.write_states(
+            {(task_id, mount_name): state for mount_name, state in states.items()},
+            node_manifest.node_id,
+        )
+        self._emit("memory_written", task_id=task_id, node_id=node_manifest.node_id, message="state written", metadata={"mounts": list(states)})
+
     def semantic_memory(self, tenant_id: str, memory_scope: str):
         key = (tenant_id or "default", memory_scope or "default")
         if key not in self._semantic_memories:
@@ -2,29 +2,55 @@
 ShoreStone v2 — Persistent vector memory with RFR-Score curation.
 
 Evolution of JADE's ShoreStone memory system:
-- ChromaDB-backed persistent vector store
-- Semantic search via sentence embeddings
-- RFR-Score curation (Relevance, Frequency, Recency)
-- Automatic maintenance (prune low-quality memories)
+- Persistent vector store: ChromaDB, or an in-process NumPy index
+- Semantic search via sentence embeddings (batched on ingest)
+- RFR-Score curation (Relevance, Frequency, Recency), with access
+  statistics persisted in the vector index
+- Automatic maintenance (prune or archive low-quality memories in chunks)
 """
 
 from __future__ import annotations
 
+import json
 import logging
+import os
+import threading
 import time
-from typing import Any
+from typing import Any, Sequence
 
 from .base import BaseMemory
+from .vector_index import ChromaVectorIndex, NumpyVectorIndex, VectorIndex
 
 logger = logging.getLogger("jadeagent.memory.shorestone")
 
 
+def rfr_scores(access_counts: Any, last_access: Any, now: float):
+    """
+    Vectorized RFR score for arrays of access counts and last access times.
+
+    Score = 0.4 * frequency + 0.6 * recency, where frequency saturates at
+    10 accesses and recency decays with a 24-hour half-life. Memories that
+    were never accessed get a recency of 0.1.
+    """
+    import numpy as np
+
+    counts = np.asarray(access_counts, dtype=np.float64)
+    last = np.asarray(last_access, dtype=np.float64)
+    hours_since = (now - last) / 3600
+    recency = np.where(last > 0, np.exp2(-hours_since / 24), 0.1)
+    return 0.4 * np.minimum(counts / 10, 1.0) + 0.6 * recency
+
+
 class ShoreStoneMemory(BaseMemory):
     """
-    Persistent vector memory backed by ChromaDB.
+    Persistent vector memory backed by a pluggable vector index.
 
-    Uses sentence-transformers for embeddings and ChromaDB for
-    persistent storage + semantic similarity search.
+    Uses sentence-transformers for embeddings and a `VectorIndex` for
+    persistent storage + semantic similarity search. ``index="chroma"``
+    (the default) uses ChromaDB; ``index="numpy"`` keeps a memory-mapped
+    NumPy index under ``persist_dir/collection`` with no database to start.
+    Any `VectorIndex` instance, e.g. ``NumpyVectorIndex(path, ivf_lists=256)``,
+    can be passed instead.
 
     RFR-Score: Each memory has a relevance score based on:
     - Relevance: cosine similarity to queries
@@ -38,6 +64,9 @@ class ShoreStoneMemory(BaseMemory):
 
         results = memory.remember("what framework does the user like?")
         # → ["User prefers Python for ML projects"]
+
+        # Bulk ingest: one model call for the whole batch
+        memory.memorize_many(["fact one", "fact two", "fact three"])
     """
 
     def __init__(
@@ -45,28 +74,25 @@ class ShoreStoneMemory(BaseMemory):
         collection: str = "jade_default",
         persist_dir: str = "./.shorestone",
         embedding_model: str = "all-MiniLM-L6-v2",
+        index: str | VectorIndex = "chroma",
+        embedder: Any | None = None,
+        batch_size: int = 64,
     ):
-        try:
-            import chromadb
-        except ImportError:
-            raise ImportError(
-                "ShoreStone requires chromadb: pip install chromadb"
-            )
-
         self._persist_dir = persist_dir
         self._embedding_model_name = embedding_model
-        self._embedder = None  # Lazy load
+        self._embedder = embedder  # Lazy load unless provided
+        self._batch_size = batch_size
 
-        # Initialize ChromaDB
-        self._client = chromadb.PersistentClient(path=persist_dir)
-        self._collection = self._client.get_or_create_collection(
-            name=collection,
-            metadata={"hnsw:space": "cosine"},
-        )
+        if isinstance(index, VectorIndex):
+            self._index = index
+        elif index == "chroma":
+            self._index = ChromaVectorIndex(persist_dir, collection)
+        elif index == "numpy":
+            self._index = NumpyVectorIndex(os.path.join(persist_dir, collection))
+        else:
+            raise ValueError(f"Unknown ShoreStone index backend: {index!r}")
 
-        # RFR tracking
-        self._access_count: dict[str, int] = {}
-        self._last_access: dict[str, float] = {}
+        self._maintenance_lock = threading.Lock()
 
     def _get_embedder(self):
         """Lazy-load sentence transformer."""
@@ -81,11 +107,10 @@ class ShoreStoneMemory(BaseMemory):
             self._embedder = SentenceTransformer(self._embedding_model_name)
         return self._embedder
 
-    def _embed(self, texts: list[str]) -> list[list[float]]:
-        """Embed texts using sentence transformer."""
+    def _embed(self, texts: list[str]):
+        """Embed texts using sentence transformer; returns a 2-D array."""
         embedder = self._get_embedder()
-        embeddings = embedder.encode(texts, convert_to_numpy=True)
-        return embeddings.tolist()
+        return embedder.encode(texts, convert_to_numpy=True, batch_size=self._batch_size)
 
     def remember(self, query: str, k: int = 5) -> list[str]:
         """
@@ -98,31 +123,19 @@ class ShoreStoneMemory(BaseMemory):
         Returns:
             List of relevant memory strings, ordered by relevance.
         """
-        if self._collection.count() == 0:
+        if self._index.count() == 0:
             return []
 
         # Embed query
         query_embedding = self._embed([query])[0]
 
-        # Search ChromaDB
-        results = self._collection.query(
-            query_embeddings=[query_embedding],
-            n_results=min(k, self._collection.count()),
-        )
-
-        if not results or not results["documents"]:
-            return []
-
-        memories = results["documents"][0]
-        ids = results["ids"][0]
+        matches = self._index.query(query_embedding, k=k)
 
-        # Update RFR tracking
-        now = time.time()
-        for mem_id in ids:
-            self._access_count[mem_id] = self._access_count.get(mem_id, 0) + 1
-            self._last_access[mem_id] = now
+        # Update RFR tracking (persisted by the index)
+        if matches:
+            self._index.record_access([match.id for match in matches], time.time())
 
-        return memories
+        return [match.document for match in matches]
 
     def memorize(self, content: str, metadata: dict | None = None):
         """
@@ -132,72 +145,149 @@ class ShoreStoneMemory(BaseMemory):
             content: Text content to memorize.
             metadata: Optional metadata dict.
         """
-        mem_id = f"mem_{int(time.time() * 1000)}_{self._collection.count()}"
-        embedding = self._embed([content])[0]
+        (mem_id,) = self.memorize_many([content], [metadata])
+        logger.debug(f"Memorized: {content[:50]}... (id={mem_id})")
 
-        meta = metadata or {}
-        meta["created_at"] = time.time()
-        meta["rfr_score"] = 1.0  # Initial score
+    def memorize_many(
+        self,
+        contents: Sequence[str],
+        metadatas: Sequence[dict | None] | None = None,
+    ) -> list[str]:
+        """
+        Store several memories, embedding them in one model call.
 
-        self._collection.add(
-            ids=[mem_id],
-            embeddings=[embedding],
-            documents=[content],
-            metadatas=[meta],
-        )
+        Args:
+            contents: Text contents to memorize.
+            metadatas: Optional metadata dict per content.
 
-        logger.debug(f"Memorized: {content[:50]}... (id={mem_id})")
+        Returns:
+            The new memory ids, in input order.
+        """
+        contents = list(contents)
+        if not contents:
+            return []
+        if metadatas is None:
+            metadatas = [None] * len(contents)
+        if len(metadatas) != len(contents):
+            raise ValueError("memorize_many needs one metadata entry per content")
 
-    def run_maintenance(self, min_score: float = 0.3):
+        now = time.time()
+        stamp = int(now * 1000)
+        start = self._index.count()
+        ids = [f"mem_{stamp}_{start + offset}" for offset in range(len(contents))]
+        embeddings = self._embed(contents)
+
+        metas = []
+        for metadata in metadatas:
+            meta = dict(metadata or {})
+            meta["created_at"] = now
+            meta["rfr_score"] = 1.0  # Initial score
+            metas.append(meta)
+
+        self._index.add(ids, embeddings, contents, metas)
+        if len(contents) > 1:
+            logger.debug(f"Memorized {len(contents)} items")
+        return ids
+
+    def run_maintenance(
+        self,
+        min_score: float = 0.3,
+        chunk_size: int = 10_000,
+        archive_path: str | None = None,
+        background: bool = False,
+    ) -> int | threading.Thread:
         """
         RFR-Score curation: prune low-quality memories.
 
         Score = relevance_weight * frequency + recency_weight * recency
         Memories below min_score are removed.
-        """
-        if self._collection.count() == 0:
-            return
 
-        all_data = self._collection.get(include=["metadatas"])
-        ids_to_remove = []
-        now = time.time()
-
-        for mem_id in all_data["ids"]:
-            freq = self._access_count.get(mem_id, 0)
-            last = self._last_access.get(mem_id, 0)
-
-            # Recency score: exponential decay (half-life = 24 hours)
-            if last > 0:
-                hours_since = (now - last) / 3600
-                recency = 2 ** (-hours_since / 24)
-            else:
-                recency = 0.1  # Never accessed
-
-            # Combined RFR score
-            rfr = 0.4 * min(freq / 10, 1.0) + 0.6 * recency
+        Memories are scored `chunk_size` at a time with vectorized math, and
+        each chunk's evictions are applied in one delete, so remember() and
+        memorize() calls can interleave with a long pass.
 
-            if rfr < min_score:
-                ids_to_remove.append(mem_id)
+        Args:
+            min_score: Memories scoring below this are evicted.
+            chunk_size: Memories scored per batch.
+            archive_path: If set, evicted memories are appended to this
+                JSONL file (document, metadata, score, access stats) before
+                they are deleted.
+            background: Run in a daemon thread and return it immediately.
 
-        if ids_to_remove:
-            self._collection.delete(ids=ids_to_remove)
-            logger.info(f"Maintenance: pruned {len(ids_to_remove)} low-quality memories")
+        Returns:
+            The number of memories pruned, or the thread if `background`.
+        """
+        if background:
+            thread = threading.Thread(
+                target=self._maintain,
+                args=(min_score, chunk_size, archive_path),
+                name="shorestone-maintenance",
+                daemon=True,
+            )
+            thread.start()
+            return thread
+        return self._maintain(min_score, chunk_size, archive_path)
+
+    def _maintain(self, min_score: float, chunk_size: int, archive_path: str | None) -> int:
+        import numpy as np
+
+        with self._maintenance_lock:
+            ids = self._index.ids()
+            if not ids:
+                return 0
+
+            now = time.time()
+            pruned = 0
+            chunk_size = max(1, int(chunk_size))
+            for start in range(0, len(ids), chunk_size):
+                chunk = ids[start:start + chunk_size]
+                counts, last = self._index.access_stats(chunk)
+                scores = rfr_scores(counts, last, now)
+                evict = np.flatnonzero(scores < min_score)
+                if not len(evict):
+                    continue
+                evict_ids = [chunk[i] for i in evict]
+                if archive_path:
+                    self._archive(evict_ids, scores[evict], np.asarray(counts)[evict], np.asarray(last)[evict],
+                                  archive_path, now)
+                self._index.delete(evict_ids)
+                pruned += len(evict_ids)
+
+            flush = getattr(self._index, "flush", None)
+            if callable(flush):
+                flush()
+            if pruned:
+                logger.info(f"Maintenance: pruned {pruned} low-quality memories")
+            return pruned
+
+    def _archive(self, ids, scores, counts, last, archive_path: str, now: float):
+        by_id = {match.id: match for match in self._index.get(ids)}
+        lines = []
+        for mem_id, score, count, last_access in zip(ids, scores, counts, last):
+            match = by_id.get(mem_id)
+            if match is None:
+                continue
+            lines.append(json.dumps({
+                "id": mem_id,
+                "document": match.document,
+                "metadata": match.metadata,
+                "rfr_score": float(score),
+                "access_count": int(count),
+                "last_access": float(last_access),
+                "archived_at": now,
+            }))
+        if lines:
+            os.makedirs(os.path.dirname(os.path.abspath(archive_path)), exist_ok=True)
+            with open(archive_path, "a", encoding="utf-8") as handle:
+                handle.write("\n".join(lines) + "\n")
 
     def clear(self):
         """Clear all memories."""
-        # ChromaDB doesn't have a clear method, so we delete and recreate
-        name = self._collection.name
-        meta = self._collection.metadata
-        self._client.delete_collection(name)
-        self._collection = self._client.get_or_create_collection(
-            name=name, metadata=meta,
-        )
-        self._access_count.clear()
-        self._last_access.clear()
+        self._index.clear()
 
     @property
     def size(self) -> int:
-        return self._collection.count()
+        return self._index.count()
 
     def __repr__(self) -> str:
-        return f"<ShoreStoneMemory(collection='{self._collection.name}', size={self.size})>"
+        return f"<ShoreStoneMemory(collection='{self._index.name}', size={self.size})>"
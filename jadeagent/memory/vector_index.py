@@ -0,0 +1,707 @@
+"""
+Vector index backends for ShoreStone memory.
+
+`ShoreStoneMemory` stores embeddings through a `VectorIndex`:
+
+- `ChromaVectorIndex` — a persistent ChromaDB collection (the original backend).
+- `NumpyVectorIndex` — an in-process flat index over a memory-mapped float32
+  matrix, with an optional IVF mode that partitions vectors around k-means
+  centroids and scans only the closest partitions for each query.
+
+Both use cosine similarity, and both persist per-item access statistics
+(access count and last access time) next to the vectors so RFR curation
+survives restarts.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import os
+import threading
+from abc import ABC, abstractmethod
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Sequence
+
+logger = logging.getLogger("jadeagent.memory.vector_index")
+
+_STATS_ROW_BYTES = 16  # float64 access_count, float64 last_access
+
+
+def _require_numpy():
+    try:
+        import numpy as np
+    except ImportError:
+        raise ImportError(
+            "NumpyVectorIndex requires numpy: pip install numpy"
+        )
+    return np
+
+
+def _as_lists(vectors: Any) -> list[list[float]]:
+    tolist = getattr(vectors, "tolist", None)
+    return tolist() if callable(tolist) else [list(vector) for vector in vectors]
+
+
+@dataclass
+class VectorMatch:
+    """One query hit: the stored item and its cosine similarity to the query."""
+
+    id: str
+    document: str
+    score: float
+    metadata: dict[str, Any] = field(default_factory=dict)
+
+
+class VectorIndex(ABC):
+    """Abstract storage for embedded memories."""
+
+    name: str = ""
+
+    @abstractmethod
+    def add(
+        self,
+        ids: Sequence[str],
+        embeddings: Any,
+        documents: Sequence[str],
+        metadatas: Sequence[dict[str, Any]],
+    ) -> None:
+        """Insert items; `embeddings` is a 2-D array or a list of vectors."""
+        ...
+
+    @abstractmethod
+    def query(self, embedding: Any, k: int = 5) -> list[VectorMatch]:
+        """Return up to `k` items most similar to `embedding`, best first."""
+        ...
+
+    @abstractmethod
+    def ids(self) -> list[str]:
+        """Ids of all stored items."""
+        ...
+
+    @abstractmethod
+    def get(self, ids: Sequence[str]) -> list[VectorMatch]:
+        """Stored documents and metadata for `ids` (missing ids are skipped; score is 0)."""
+        ...
+
+    @abstractmethod
+    def record_access(self, ids: Sequence[str], when: float) -> None:
+        """Increment the access count of `ids` and set their last access time."""
+        ...
+
+    @abstractmethod
+    def access_stats(self, ids: Sequence[str]) -> tuple[list[float], list[float]]:
+        """``(access_counts, last_access_times)`` for `ids`; 0 for never accessed or missing."""
+        ...
+
+    @abstractmethod
+    def delete(self, ids: Sequence[str]) -> None:
+        ...
+
+    @abstractmethod
+    def clear(self) -> None:
+        ...
+
+    @abstractmethod
+    def count(self) -> int:
+        ...
+
+
+class ChromaVectorIndex(VectorIndex):
+    """Vector index backed by a persistent ChromaDB collection."""
+
+    def __init__(self, persist_dir: str = "./.shorestone", collection: str = "jade_default"):
+        try:
+            import chromadb
+        except ImportError:
+            raise ImportError(
+                "ShoreStone requires chromadb: pip install chromadb"
+            )
+
+        self._client = chromadb.PersistentClient(path=persist_dir)
+        self._collection = self._client.get_or_create_collection(
+            name=collection,
+            metadata={"hnsw:space": "cosine"},
+        )
+
+    @property
+    def name(self) -> str:
+        return self._collection.name
+
+    def add(self, ids, embeddings, documents, metadatas) -> None:
+        self._collection.add(
+            ids=list(ids),
+            embeddings=_as_lists(embeddings),
+            documents=list(documents),
+            metadatas=[dict(meta) for meta in metadatas],
+        )
+
+    def query(self, embedding: Any, k: int = 5) -> list[VectorMatch]:
+        total = self._collection.count()
+        if total == 0:
+            return []
+        results = self._collection.query(
+            query_embeddings=_as_lists([embedding]),
+            n_results=min(k, total),
+        )
+        if not results or not results["documents"]:
+            return []
+        distances = (results.get("distances") or [[]])[0] or [0.0] * len(results["ids"][0])
+        metadatas = (results.get("metadatas") or [[]])[0] or [{}] * len(results["ids"][0])
+        return [
+            VectorMatch(id=mem_id, document=document, score=1.0 - float(distance), metadata=dict(meta or {}))
+            for mem_id, document, distance, meta in zip(
+                results["ids"][0], results["documents"][0], distances, metadatas,
+            )
+        ]
+
+    def ids(self) -> list[str]:
+        return list(self._collection.get(include=[])["ids"])
+
+    def get(self, ids: Sequence[str]) -> list[VectorMatch]:
+        if not ids:
+            return []
+        results = self._collection.get(ids=list(ids), include=["documents", "metadatas"])
+        return [
+            VectorMatch(id=mem_id, document=document, score=0.0, metadata=dict(meta or {}))
+            for mem_id, document, meta in zip(results["ids"], results["documents"], results["metadatas"])
+        ]
+
+    def record_access(self, ids: Sequence[str], when: float) -> None:
+        if not ids:
+            return
+        hits: dict[str, int] = {}
+        for mem_id in ids:
+            hits[mem_id] = hits.get(mem_id, 0) + 1
+        existing = self._collection.get(ids=list(hits), include=["metadatas"])
+        metadatas = []
+        for mem_id, meta in zip(existing["ids"], existing["metadatas"]):
+            meta = dict(meta or {})
+            meta["access_count"] = int(meta.get("access_count", 0)) + hits[mem_id]
+            meta["last_access"] = float(when)
+            metadatas.append(meta)
+        if metadatas:
+            self._collection.update(ids=list(existing["ids"]), metadatas=metadatas)
+
+    def access_stats(self, ids: Sequence[str]) -> tuple[list[float], list[float]]:
+        if not ids:
+            return [], []
+        existing = self._collection.get(ids=list(ids), include=["metadatas"])
+        by_id = {mem_id: meta or {} for mem_id, meta in zip(existing["ids"], existing["metadatas"])}
+        counts = [float(by_id.get(mem_id, {}).get("access_count", 0)) for mem_id in ids]
+        last = [float(by_id.get(mem_id, {}).get("last_access", 0.0)) for mem_id in ids]
+        return counts, last
+
+    def delete(self, ids: Sequence[str]) -> None:
+        if ids:
+            self._collection.delete(ids=list(ids))
+
+    def clear(self) -> None:
+        # ChromaDB doesn't have a clear method, so we delete and recreate
+        name = self._collection.name
+        meta = self._collection.metadata
+        self._client.delete_collection(name)
+        self._collection = self._client.get_or_create_collection(
+            name=name, metadata=meta,
+        )
+
+    def count(self) -> int:
+        return self._collection.count()
+
+
+class NumpyVectorIndex(VectorIndex):
+    """
+    In-process cosine index over a memory-mapped float32 matrix.
+
+    Files under `path`:
+
+    - ``vectors.f32`` — normalized vectors, one row per item, append-only.
+    - ``items.jsonl`` — id, document and metadata per row, plus delete records.
+    - ``stats.f64`` — access count and last access time per row, updated in
+      place through a writable memory map.
+    - ``index.json`` — dimension, IVF training state and file generation.
+    - ``centroids.npy`` / ``lists.i32`` — IVF centroids and each row's list.
+
+    Compaction writes the row-aligned files (vectors, items, stats, lists)
+    under the next generation's names, e.g. ``vectors.1.f32``, and switches
+    over by rewriting ``index.json``; a crash mid-compaction leaves the old
+    generation intact and the next open removes the partial one.
+
+    Opening an index maps the vector file instead of reading it, so cold
+    start costs one pass over ``items.jsonl``. Deleted rows become tombstones
+    and are compacted away once they outnumber live rows.
+
+    Args:
+        path: Directory holding the index files.
+        ivf_lists: Number of IVF partitions; 0 keeps a flat (exact) index.
+            Partitions are trained with k-means once the index holds
+            ``train_factor * ivf_lists`` items, and retrained when it has
+            doubled since the last training.
+        nprobe: Partitions scanned per query in IVF mode.
+        train_factor: Items per partition needed before training.
+    """
+
+    def __init__(
+        self,
+        path: str | Path,
+        *,
+        ivf_lists: int = 0,
+        nprobe: int = 8,
+        train_factor: int = 16,
+    ):
+        self._np = _require_numpy()
+        self.path = Path(path)
+        self.path.mkdir(parents=True, exist_ok=True)
+        self.ivf_lists = max(0, int(ivf_lists))
+        self.nprobe = max(1, int(nprobe))
+        self.train_factor = max(1, int(train_factor))
+        self._lock = threading.RLock()
+        self._reset_state()
+        self._load()
+
+    @property
+    def name(self) -> str:
+        return self.path.name
+
+    @property
+    def dim(self) -> int | None:
+        return self._dim
+
+    @property
+    def is_trained(self) -> bool:
+        return self._centroids is not None
+
+    def _reset_state(self):
+        np = self._np
+        self._dim: int | None = None
+        self._row_ids: list[str | None] = []
+        self._documents: list[str | None] = []
+        self._metadatas: list[dict[str, Any] | None] = []
+        self._rows: dict[str, int] = {}
+        self._deleted_rows: list[int] = []
+        self._matrix = None
+        self._stats_map = None
+        self._centroids = None
+        self._lists = np.zeros(0, dtype=np.int32)
+        self._trained_rows = 0
+        self._generation = 0
+
+    # -- files ---------------------------------------------------------------
+
+    def _row_files(self, generation: int) -> dict[str, Path]:
+        """Row-aligned files of one generation; generation 0 keeps the plain names."""
+        tag = f".{generation}" if generation else ""
+        return {
+            name: self.path / f"{name}{tag}.{ext}"
+            for name, ext in (("vectors", "f32"), ("items", "jsonl"), ("stats", "f64"), ("lists", "i32"))
+        }
+
+    @property
+    def _vectors_path(self) -> Path:
+        return self._row_files(self._generation)["vectors"]
+
+    @property
+    def _items_path(self) -> Path:
+        return self._row_files(self._generation)["items"]
+
+    @property
+    def _meta_path(self) -> Path:
+        return self.path / "index.json"
+
+    @property
+    def _stats_path(self) -> Path:
+        return self._row_files(self._generation)["stats"]
+
+    @property
+    def _centroids_path(self) -> Path:
+        return self.path / "centroids.npy"
+
+    @property
+    def _lists_path(self) -> Path:
+        return self._row_files(self._generation)["lists"]
+
+    def _write_meta(self):
+        tmp = self._meta_path.with_suffix(".json.tmp")
+        tmp.write_text(json.dumps({
+            "dim": self._dim,
+            "ivf_lists": self.ivf_lists if self._centroids is not None else 0,
+            "trained_rows": self._trained_rows,
+            "generation": self._generation,
+        }), encoding="utf-8")
+        os.replace(tmp, self._meta_path)
+
+    def _remove_other_generations(self):
+        current = set(self._row_files(self._generation).values())
+        for pattern in ("vectors*.f32", "items*.jsonl", "stats*.f64", "lists*.i32", "*.tmp"):
+            for path in self.path.glob(pattern):
+                if path not in current:
+                    path.unlink(missing_ok=True)
+
+    def _load(self):
+        np = self._np
+        if self._meta_path.exists():
+            meta = json.loads(self._meta_path.read_text(encoding="utf-8"))
+            self._dim = meta.get("dim")
+            self._trained_rows = int(meta.get("trained_rows", 0))
+            self._generation = int(meta.get("generation", 0))
+        self._remove_other_generations()
+        if self._dim is None:
+            return
+        rewrite = False
+
+        if self._items_path.exists():
+            complete = 0
+            with self._items_path.open("rb") as handle:
+                for line in handle:
+                    if not line.endswith(b"\n"):
+                        break  # torn final write
+                    try:
+                        record = json.loads(line)
+                    except json.JSONDecodeError:
+                        break
+                    complete += len(line)
+                    if "delete" in record:
+                        for mem_id in record["delete"]:
+                            row = self._rows.pop(mem_id, None)
+                            if row is not None:
+                                self._tombstone(row)
+                        continue
+                    self._append_row(record["id"], record.get("document", ""), record.get("metadata") or {})
+            # Later appends must start on a fresh line, or they are lost behind the torn one.
+            logged = self._items_path.stat().st_size
+            if complete < logged:
+                logger.warning("Dropping %d bytes of incomplete item log in %s", logged - complete, self.path)
+                os.truncate(self._items_path, complete)
+
+        row_bytes = 4 * self._dim
+        stored_rows = self._vectors_path.stat().st_size // row_bytes if self._vectors_path.exists() else 0
+        if stored_rows < len(self._row_ids):
+            logger.warning("Vector file shorter than item log in %s; dropping %d items",
+                           self.path, len(self._row_ids) - stored_rows)
+            for row in range(stored_rows, len(self._row_ids)):
+                if self._row_ids[row] is not None:
+                    self._rows.pop(self._row_ids[row], None)
+            del self._row_ids[stored_rows:], self._documents[stored_rows:], self._metadatas[stored_rows:]
+            self._deleted_rows = [row for row in self._deleted_rows if row < stored_rows]
+            rewrite = True  # the item log still holds the dropped rows
+        elif stored_rows > len(self._row_ids):
+            os.truncate(self._vectors_path, len(self._row_ids) * row_bytes)
+
+        # Indexes written before stats existed, or torn appends, get zero rows.
+        stats_bytes = self._stats_path.stat().st_size if self._stats_path.exists() else 0
+        expected = len(self._row_ids) * _STATS_ROW_BYTES
+        if stats_bytes < expected:
+            with self._stats_path.open("ab") as handle:
+                handle.write(bytes(expected - stats_bytes))
+        elif stats_bytes > expected:
+            os.truncate(self._stats_path, expected)
+
+        if self.ivf_lists and self._centroids_path.exists() and self._lists_path.exists():
+            lists = np.fromfile(self._lists_path, dtype=np.int32)
+            if len(lists) >= len(self._row_ids):
+                self._centroids = np.load(self._centroids_path)
+                self._lists = lists[:len(self._row_ids)].copy()
+                if len(lists) > len(self._row_ids):
+                    os.truncate(self._lists_path, len(self._row_ids) * 4)
+        if rewrite:
+            self.compact(force=True)
+
+    def _append_row(self, mem_id: str, document: str, metadata: dict[str, Any]) -> int:
+        previous = self._rows.get(mem_id)
+        if previous is not None:
+            self._tombstone(previous)
+        row = len(self._row_ids)
+        self._row_ids.append(mem_id)
+        self._documents.append(document)
+        self._metadatas.append(metadata)
+        self._rows[mem_id] = row
+        return row
+
+    def _tombstone(self, row: int):
+        self._row_ids[row] = None
+        self._documents[row] = None
+        self._metadatas[row] = None
+        self._deleted_rows.append(row)
+
+    def _vectors(self):
+        """Memory-mapped view of every stored row, tombstones included."""
+        np = self._np
+        rows = len(self._row_ids)
+        if self._matrix is None or self._matrix.shape[0] != rows:
+            if rows == 0:
+                self._matrix = np.zeros((0, self._dim or 0), dtype=np.float32)
+            else:
+                self._matrix = np.memmap(self._vectors_path, dtype=np.float32, mode="r", shape=(rows, self._dim))
+        return self._matrix
+
+    def _stats(self):
+        """Writable memory map of ``[access_count, last_access]`` per row."""
+        np = self._np
+        rows = len(self._row_ids)
+        if self._stats_map is None or self._stats_map.shape[0] != rows:
+            if rows == 0:
+                self._stats_map = np.zeros((0, 2), dtype=np.float64)
+            else:
+                self._stats_map = np.memmap(self._stats_path, dtype=np.float64, mode="r+", shape=(rows, 2))
+        return self._stats_map
+
+    def _release_maps(self):
+        if self._stats_map is not None and hasattr(self._stats_map, "flush"):
+            self._stats_map.flush()
+        self._matrix = None
+        self._stats_map = None
+
+    def _normalize(self, vectors):
+        np = self._np
+        vectors = np.asarray(vectors, dtype=np.float32)
+        if vectors.ndim == 1:
+            vectors = vectors.reshape(1, -1)
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        return np.ascontiguousarray(vectors / norms, dtype=np.float32)
+
+    # -- VectorIndex ---------------------------------------------------------
+
+    def add(self, ids, embeddings, documents, metadatas) -> None:
+        ids = list(ids)
+        if not ids:
+            return
+        vectors = self._normalize(embeddings)
+        if not (len(ids) == len(documents) == len(metadatas) == vectors.shape[0]):
+            raise ValueError("ids, embeddings, documents and metadatas must have the same length")
+
+        with self._lock:
+            if self._dim is None:
+                self._dim = int(vectors.shape[1])
+                self._write_meta()
+            elif vectors.shape[1] != self._dim:
+                raise ValueError(f"Embedding dimension {vectors.shape[1]} does not match index dimension {self._dim}")
+
+            # Vectors first: a crash before the item log is written leaves
+            # trailing rows that the next open truncates.
+            with self._vectors_path.open("ab") as handle:
+                vectors.tofile(handle)
+            with self._stats_path.open("ab") as handle:
+                handle.write(bytes(len(ids) * _STATS_ROW_BYTES))
+            lines = []
+            for mem_id, document, metadata in zip(ids, documents, metadatas):
+                self._append_row(str(mem_id), str(document), dict(metadata or {}))
+                lines.append(json.dumps({"id": str(mem_id), "document": str(document), "metadata": dict(metadata or {})}))
+            with self._items_path.open("a", encoding="utf-8") as handle:
+                handle.write("\n".join(lines) + "\n")
+
+            if self._centroids is not None:
+                assigned = self._assign(vectors)
+                with self._lists_path.open("ab") as handle:
+                    assigned.tofile(handle)
+                self._lists = self._np.concatenate([self._lists, assigned])
+            self._maybe_train()
+
+    def query(self, embedding: Any, k: int = 5) -> list[VectorMatch]:
+        np = self._np
+        with self._lock:
+            if self._dim is None or k <= 0 or not self._rows:
+                return []
+            query = self._normalize(embedding)[0]
+            matrix = self._vectors()
+
+            if self._centroids is not None:
+                probes = np.argsort(self._centroids @ query)[-self.nprobe:]
+                candidates = np.flatnonzero(np.isin(self._lists, probes))
+                scores = matrix[candidates] @ query if len(candidates) else np.zeros(0, dtype=np.float32)
+            else:
+                candidates = None
+                scores = np.asarray(matrix @ query)
+                if self._deleted_rows:
+                    scores[np.asarray(self._deleted_rows)] = -np.inf
+
+            if candidates is not None and self._deleted_rows and len(candidates):
+                alive = np.fromiter((self._row_ids[row] is not None for row in candidates), dtype=bool, count=len(candidates))
+                candidates, scores = candidates[alive], scores[alive]
+
+            take = min(k, len(scores))
+            if take == 0:
+                return []
+            top = np.argpartition(-scores, take - 1)[:take]
+            top = top[np.argsort(-scores[top])]
+            matches = []
+            for position in top:
+                score = float(scores[position])
+                if score == -np.inf:
+                    break
+                row = int(candidates[position]) if candidates is not None else int(position)
+                matches.append(VectorMatch(
+                    id=self._row_ids[row],
+                    document=self._documents[row],
+                    score=score,
+                    metadata=dict(self._metadatas[row]),
+                ))
+            return matches
+
+    def ids(self) -> list[str]:
+        with self._lock:
+            return [mem_id for mem_id in self._row_ids if mem_id is not None]
+
+    def get(self, ids: Sequence[str]) -> list[VectorMatch]:
+        with self._lock:
+            return [
+                VectorMatch(id=mem_id, document=self._documents[row], score=0.0, metadata=dict(self._metadatas[row]))
+                for mem_id in ids
+                if (row := self._rows.get(mem_id)) is not None
+            ]
+
+    def record_access(self, ids: Sequence[str], when: float) -> None:
+        np = self._np
+        with self._lock:
+            rows = [self._rows[mem_id] for mem_id in ids if mem_id in self._rows]
+            if not rows:
+                return
+            stats = self._stats()
+            rows = np.asarray(rows, dtype=np.int64)
+            np.add.at(stats[:, 0], rows, 1.0)
+            stats[rows, 1] = when
+
+    def access_stats(self, ids: Sequence[str]):
+        """Like `VectorIndex.access_stats`, but returns NumPy arrays."""
+        np = self._np
+        with self._lock:
+            rows = np.fromiter((self._rows.get(mem_id, -1) for mem_id in ids), dtype=np.int64, count=len(ids))
+            counts = np.zeros(len(rows), dtype=np.float64)
+            last = np.zeros(len(rows), dtype=np.float64)
+            known = rows >= 0
+            if known.any():
+                stats = self._stats()
+                counts[known] = stats[rows[known], 0]
+                last[known] = stats[rows[known], 1]
+            return counts, last
+
+    def flush(self) -> None:
+        """Write pending access statistics to disk."""
+        with self._lock:
+            if self._stats_map is not None and hasattr(self._stats_map, "flush"):
+                self._stats_map.flush()
+
+    def delete(self, ids: Sequence[str]) -> None:
+        with self._lock:
+            removed = []
+            for mem_id in ids:
+                row = self._rows.pop(mem_id, None)
+                if row is not None:
+                    self._tombstone(row)
+                    removed.append(mem_id)
+            if not removed:
+                return
+            with self._items_path.open("a", encoding="utf-8") as handle:
+                handle.write(json.dumps({"delete": removed}) + "\n")
+            if len(self._deleted_rows) > len(self._rows):
+                self.compact()
+
+    def clear(self) -> None:
+        with self._lock:
+            self._release_maps()
+            for path in (*self._row_files(self._generation).values(), self._meta_path, self._centroids_path):
+                try:
+                    path.unlink()
+                except FileNotFoundError:
+                    pass
+            self._reset_state()
+
+    def count(self) -> int:
+        return len(self._rows)
+
+    # -- maintenance ---------------------------------------------------------
+
+    def compact(self, *, force: bool = False) -> None:
+        """Rewrite the index files without tombstoned rows, as a new generation.
+
+        `force` rewrites them even when no row is tombstoned.
+        """
+        np = self._np
+        with self._lock:
+            if not self._deleted_rows and not force:
+                return
+            live = np.asarray([row for row, mem_id in enumerate(self._row_ids) if mem_id is not None], dtype=np.int64)
+            vectors = np.array(self._vectors()[live]) if len(live) else np.zeros((0, self._dim), dtype=np.float32)
+            stats = np.array(self._stats()[live]) if len(live) else np.zeros((0, 2), dtype=np.float64)
+            records = [(self._row_ids[row], self._documents[row], self._metadatas[row]) for row in live]
+            lists = self._lists[live] if self._centroids is not None else None
+            self._release_maps()  # maps must be closed before their files are removed
+
+            files = self._row_files(self._generation + 1)
+            self._write_atomic(files["vectors"], vectors.astype(np.float32).tobytes())
+            self._write_atomic(files["stats"], stats.astype(np.float64).tobytes())
+            self._write_atomic(files["items"], "".join(
+                json.dumps({"id": mem_id, "document": document, "metadata": metadata}) + "\n"
+                for mem_id, document, metadata in records
+            ).encode("utf-8"))
+            if lists is not None:
+                self._write_atomic(files["lists"], lists.astype(np.int32).tobytes())
+            # The meta rewrite is the commit point for the new generation.
+            self._generation += 1
+            try:
+                self._write_meta()
+            except BaseException:
+                self._generation -= 1
+                raise
+            self._remove_other_generations()
+
+            self._row_ids, self._documents, self._metadatas = [], [], []
+            self._rows, self._deleted_rows = {}, []
+            for mem_id, document, metadata in records:
+                self._append_row(mem_id, document, metadata)
+            if lists is not None:
+                self._lists = lists
+
+    def _write_atomic(self, path: Path, data: bytes):
+        tmp = path.with_name(path.name + ".tmp")
+        tmp.write_bytes(data)
+        os.replace(tmp, path)
+
+    def _maybe_train(self):
+        if not self.ivf_lists:
+            return
+        live = len(self._rows)
+        if live < self.ivf_lists * self.train_factor:
+            return
+        if self._centroids is not None and live < 2 * self._trained_rows:
+            return
+        self.train()
+
+    def train(self, iterations: int = 10, sample_size: int | None = None, seed: int = 0) -> None:
+        """(Re)build IVF partitions with spherical k-means over a sample of rows."""
+        np = self._np
+        with self._lock:
+            if not self.ivf_lists or not self._rows:
+                return
+            live = np.asarray([row for row, mem_id in enumerate(self._row_ids) if mem_id is not None], dtype=np.int64)
+            matrix = self._vectors()
+            rng = np.random.default_rng(seed)
+            sample_size = sample_size or self.ivf_lists * 256
+            sample_rows = np.sort(rng.choice(live, size=min(sample_size, len(live)), replace=False))
+            sample = np.asarray(matrix[sample_rows])
+            lists = min(self.ivf_lists, len(sample))
+            centroids = sample[rng.choice(len(sample), size=lists, replace=False)].copy()
+            for _ in range(iterations):
+                assigned = np.argmax(sample @ centroids.T, axis=1)
+                for index in range(lists):
+                    members = sample[assigned == index]
+                    if len(members):
+                        centroids[index] = members.sum(axis=0)
+                centroids = self._normalize(centroids)
+
+            self._centroids = centroids
+            self._lists = self._assign(matrix)
+            self._trained_rows = len(live)
+            np.save(self._centroids_path, centroids)
+            self._write_atomic(self._lists_path, self._lists.tobytes())
+            self._write_meta()
+            logger.info("Trained %d IVF lists over %d vectors in %s", lists, len(live), self.path)
+
+    def _assign(self, vectors, chunk: int = 65536):
+        np = self._np
+        out = np.empty(len(vectors), dtype=np.int32)
+        for start in range(0, len(vectors), chunk):
+            block = np.asarray(vectors[start:start + chunk])
+            out[start:start + chunk] = np.argmax(block @ self._centroids.T, axis=1)
+        return out
@@ -14,7 +14,12 @@ from .router import MeshRouter, NodeState
 from .node import MeshNode, InMemoryMeshBus
 from .transport import MeshTransport
 from .async_transport import AsyncInMemoryMeshBus, AsyncMeshTransport, AsyncMeshTransportAdapter
-from .async_task_store import AsyncInMemoryTaskStore, AsyncTaskStore, AsyncTaskStoreAdapter
+from .async_task_store import (
+    AsyncInMemoryTaskStore,
+    AsyncRedisTaskStore,
+    AsyncTaskStore,
+    AsyncTaskStoreAdapter,
+)
 from .async_node import AsyncMeshNode
 from .lease_wheel import LeaseDeadlineIndex, LeaseRecord
 from .reducer import (
@@ -25,7 +30,8 @@ from .reducer import (
     hillis_steele_reduce,
     hillis_steele_scan,
 )
-from .sharding import ShardAssignment, ShardDirectory, SupervisorSpec
+from .rollup import IncrementalReducer, ShardAggregate
+from .sharding import ShardAssignment, ShardDirectory, ShardMove, SupervisorSpec
 from .shard_runtime import ShardRuntime
 from .supervisor import ShardSupervisor
 from .worker_pool import LocalWorkerIndex, WorkerState
@@ -45,6 +51,11 @@ try:
 except Exception:  # pragma: no cover - optional dependency at runtime
     RedisMeshTransport = None
 
+try:
+    from .async_redis_transport import AsyncRedisMeshTransport
+except Exception:  # pragma: no cover - optional dependency at runtime
+    AsyncRedisMeshTransport = None
+
 __all__ = [
     "AuditEvent",
     "AuditSink",
@@ -71,11 +82,14 @@ __all__ = [
     "TenantBudgetSummary",
     "ReductionSummary",
     "ReducerNode",
+    "IncrementalReducer",
+    "ShardAggregate",
     "hillis_steele_scan",
     "hillis_steele_reduce",
     "ShardDirectory",
     "SupervisorSpec",
     "ShardAssignment",
+    "ShardMove",
     "ShardRuntime",
     "ShardSupervisor",
     "WorkerState",
@@ -86,11 +100,13 @@ __all__ = [
     "AsyncTaskStore",
     "AsyncTaskStoreAdapter",
     "AsyncInMemoryTaskStore",
+    "AsyncRedisTaskStore",
     "MeshTransport",
     "HMACSigner",
     "ReplayConfig",
     "ReplayProtector",
     "RedisMeshTransport",
+    "AsyncRedisMeshTransport",
     "MeshDelegationClient",
     "AsyncMeshDelegationClient",
     "extract_mesh_answer",
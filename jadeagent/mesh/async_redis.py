@@ -0,0 +1,74 @@
+"""
+Shared redis.asyncio connection handling for the async mesh runtime.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import weakref
+from typing import Any
+
+_POOLS: weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, dict[str, Any]] = weakref.WeakKeyDictionary()
+
+
+def redis_connection_kwargs(
+    tls: bool = False,
+    tls_ca_certs: str | None = None,
+    tls_certfile: str | None = None,
+    tls_keyfile: str | None = None,
+    tls_cert_reqs: str | None = "required",
+    redis_kwargs: dict[str, Any] | None = None,
+) -> dict[str, Any]:
+    """Build redis client kwargs, including the optional TLS settings."""
+    kwargs = dict(redis_kwargs or {})
+    if tls:
+        kwargs.setdefault("ssl", True)
+        if tls_ca_certs:
+            kwargs["ssl_ca_certs"] = tls_ca_certs
+        if tls_certfile:
+            kwargs["ssl_certfile"] = tls_certfile
+        if tls_keyfile:
+            kwargs["ssl_keyfile"] = tls_keyfile
+        if tls_cert_reqs:
+            kwargs["ssl_cert_reqs"] = tls_cert_reqs
+    return kwargs
+
+
+def shared_async_redis_client(redis_url: str, redis_kwargs: dict[str, Any] | None = None) -> Any:
+    """
+    Return a redis.asyncio client backed by a connection pool shared per event loop.
+
+    Async stores and transports created with the same URL and kwargs reuse one
+    pool, so a worker holds a bounded number of sockets no matter how many
+    mesh components it runs. Pools are keyed by the running loop because
+    redis.asyncio connections cannot migrate between loops.
+    """
+    try:
+        import redis.asyncio as redis_asyncio
+    except ImportError as exc:
+        raise ImportError(
+            "Async Redis mesh components require redis package. Install with: pip install redis"
+        ) from exc
+
+    kwargs = dict(redis_kwargs or {})
+    kwargs["decode_responses"] = True
+    loop = asyncio.get_running_loop()
+    pools = _POOLS.setdefault(loop, {})
+    pool_key = json.dumps([redis_url, kwargs], sort_keys=True, default=str)
+    pool = pools.get(pool_key)
+    if pool is None:
+        pool = redis_asyncio.ConnectionPool.from_url(redis_url, **kwargs)
+        pools[pool_key] = pool
+    return redis_asyncio.Redis(connection_pool=pool)
+
+
+async def close_async_redis(resource: Any):
+    """Close a redis.asyncio client or pubsub across redis-py versions."""
+    closer = getattr(resource, "aclose", None) or getattr(resource, "close", None)
+    if closer is None:
+        return
+    try:
+        await closer()
+    except Exception:
+        pass
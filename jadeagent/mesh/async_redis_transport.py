@@ -0,0 +1,151 @@
+"""
+Native redis.asyncio mesh transport with optional TLS + HMAC authentication.
+"""
+
+from __future__ import annotations
+
+import time
+from typing import Any
+
+from .async_redis import close_async_redis, redis_connection_kwargs, shared_async_redis_client
+from .protocol import MeshEnvelope, envelope_to_dict
+from .redis_transport import decode_wire, encode_wire
+from .security import HMACSigner, ReplayProtector
+
+
+class AsyncRedisMeshTransport:
+    """
+    Async publish/subscribe transport for distributed mesh nodes.
+
+    Wire-compatible with RedisMeshTransport. `recv` awaits the subscription
+    socket directly instead of polling from a worker thread, and `send_many`
+    publishes a batch of envelopes in one pipelined round trip.
+    """
+
+    def __init__(
+        self,
+        redis_url: str = "redis://localhost:6379/0",
+        channel_prefix: str = "jade:mesh:",
+        tls: bool = False,
+        tls_ca_certs: str | None = None,
+        tls_certfile: str | None = None,
+        tls_keyfile: str | None = None,
+        tls_cert_reqs: str | None = "required",
+        signer: HMACSigner | None = None,
+        replay_protector: ReplayProtector | None = None,
+        redis_kwargs: dict[str, Any] | None = None,
+        client: Any = None,
+    ):
+        try:
+            import redis.asyncio  # noqa: F401
+        except ImportError as exc:
+            raise ImportError(
+                "AsyncRedisMeshTransport requires redis package. Install with: pip install redis"
+            ) from exc
+
+        self.redis_url = redis_url
+        self.channel_prefix = channel_prefix
+        self.signer = signer
+        self.replay = replay_protector
+        self._redis_kwargs = redis_connection_kwargs(
+            tls=tls,
+            tls_ca_certs=tls_ca_certs,
+            tls_certfile=tls_certfile,
+            tls_keyfile=tls_keyfile,
+            tls_cert_reqs=tls_cert_reqs,
+            redis_kwargs=redis_kwargs,
+        )
+        self._client = client
+        self._owns_client = client is None
+        self._pubsubs: dict[str, Any] = {}
+
+    @property
+    def client(self) -> Any:
+        if self._client is None:
+            self._client = shared_async_redis_client(self.redis_url, self._redis_kwargs)
+        return self._client
+
+    @property
+    def broadcast_channel(self) -> str:
+        return f"{self.channel_prefix}broadcast"
+
+    def _node_channel(self, node_id: str) -> str:
+        return f"{self.channel_prefix}node:{node_id}"
+
+    def _channel_for(self, envelope: MeshEnvelope) -> str:
+        if envelope.destination is None:
+            return self.broadcast_channel
+        return self._node_channel(envelope.destination)
+
+    async def register(self, node: Any):
+        node_id = getattr(node, "node_id", None) or str(node)
+        await self._ensure_subscription(node_id)
+
+    async def unregister(self, node_id: str):
+        pubsub = self._pubsubs.pop(node_id, None)
+        if pubsub is not None:
+            await close_async_redis(pubsub)
+
+    async def send(self, envelope: MeshEnvelope) -> int:
+        wire_payload = encode_wire(envelope_to_dict(envelope), self.signer)
+        return int(await self.client.publish(self._channel_for(envelope), wire_payload))
+
+    async def send_many(self, envelopes: list[MeshEnvelope]) -> int:
+        """Publish several envelopes in one pipelined round trip."""
+        if not envelopes:
+            return 0
+        pipe = self.client.pipeline(transaction=False)
+        for envelope in envelopes:
+            pipe.publish(self._channel_for(envelope), encode_wire(envelope_to_dict(envelope), self.signer))
+        return sum(int(delivered) for delivered in await pipe.execute())
+
+    async def recv(
+        self,
+        node_id: str,
+        max_messages: int = 32,
+        timeout: float | None = None,
+    ) -> list[MeshEnvelope]:
+        if max_messages <= 0:
+            return []
+        pubsub = await self._ensure_subscription(node_id)
+        deadline = None if timeout is None else time.time() + max(float(timeout), 0.0)
+        envelopes: list[MeshEnvelope] = []
+
+        while len(envelopes) < max_messages:
+            if envelopes:
+                wait = 0.0
+            elif deadline is None:
+                wait = None
+            else:
+                wait = max(deadline - time.time(), 0.0)
+            item = await pubsub.get_message(ignore_subscribe_messages=True, timeout=wait)
+            if item is None:
+                # Subscribe confirmations also surface as None; keep waiting
+                # for real traffic until the deadline passes.
+                if envelopes or (deadline is not None and time.time() >= deadline):
+                    break
+                continue
+            if item.get("type") != "message":
+                continue
+            envelope = decode_wire(item.get("data"), self.signer, self.replay)
+            if envelope is not None:
+                envelopes.append(envelope)
+
+        return envelopes
+
+    async def close(self):
+        for node_id in list(self._pubsubs.keys()):
+            await self.unregister(node_id)
+        if self._owns_client and self._client is not None:
+            await close_async_redis(self._client)
+        self._client = None
+
+    async def _ensure_subscription(self, node_id: str):
+        existing = self._pubsubs.get(node_id)
+        if existing is not None:
+            return existing
+
+        pubsub = self.client.pubsub(ignore_subscribe_messages=True)
+        await pubsub.subscribe(self._node_channel(node_id), self.broadcast_channel)
+        self._pubsubs[node_id] = pubsub
+        return pubsub
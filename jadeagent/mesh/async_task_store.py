@@ -5,16 +5,22 @@ Async task lifecycle storage for mesh execution.
 from __future__ import annotations
 
 import asyncio
+import json
 import time
 from abc import ABC, abstractmethod
 from collections import defaultdict
 from typing import Any
 
+from .async_redis import close_async_redis, redis_connection_kwargs, shared_async_redis_client
 from .audit import AuditEvent, coerce_audit_event
 from .lease_wheel import LeaseDeadlineIndex
 from .protocol import MeshTask, TaskResult, TaskState
 from .task_store import InMemoryTaskStore, TaskRecord, TaskStore
 
+_TERMINAL_STATES = {TaskState.COMPLETED, TaskState.FAILED, TaskState.CANCELLED}
+# Wake tokens kept per capability; more only cause extra empty peeks.
+_WAKE_TOKENS_MAX = 64
+
 
 class AsyncTaskStore(ABC):
     @abstractmethod
@@ -449,6 +455,453 @@ class AsyncInMemoryTaskStore(AsyncTaskStore):
         return await self.get(task_id)
 
 
+class AsyncRedisTaskStore(AsyncTaskStore):
+    """
+    Native redis.asyncio task store.
+
+    Uses the same key layout as RedisTaskStore, so sync and async workers can
+    share one queue. A claim removes the task from its queue and leases it in
+    one WATCH/MULTI transaction, so a crash or connection error can never
+    leave a task dequeued without a lease. Idle claimers block on a
+    per-capability wake list (BLPOP) that this store pushes to whenever it
+    queues a task, instead of polling; tasks queued by a sync RedisTaskStore
+    are picked up within `block_timeout`. All state transitions are
+    WATCH/MULTI transactions that carry their audit event in the same round
+    trip, and terminal waits subscribe to a per-task channel.
+    """
+
+    def __init__(
+        self,
+        redis_url: str = "redis://localhost:6379/0",
+        key_prefix: str = "jade:taskstore",
+        tls: bool = False,
+        tls_ca_certs: str | None = None,
+        tls_certfile: str | None = None,
+        tls_keyfile: str | None = None,
+        tls_cert_reqs: str | None = "required",
+        redis_kwargs: dict[str, Any] | None = None,
+        client: Any = None,
+        block_timeout: float = 1.0,
+    ):
+        try:
+            from redis.exceptions import WatchError
+        except ImportError as exc:
+            raise ImportError(
+                "AsyncRedisTaskStore requires redis package. Install with: pip install redis"
+            ) from exc
+
+        self._watch_error = WatchError
+        self.redis_url = redis_url
+        self.key_prefix = key_prefix.rstrip(":")
+        self.block_timeout = max(float(block_timeout), 0.01)
+        self._redis_kwargs = redis_connection_kwargs(
+            tls=tls,
+            tls_ca_certs=tls_ca_certs,
+            tls_certfile=tls_certfile,
+            tls_keyfile=tls_keyfile,
+            tls_cert_reqs=tls_cert_reqs,
+            redis_kwargs=redis_kwargs,
+        )
+        self._client = client
+        self._owns_client = client is None
+        self._releases: set[asyncio.Task[Any]] = set()
+
+    @property
+    def client(self) -> Any:
+        if self._client is None:
+            self._client = shared_async_redis_client(self.redis_url, self._redis_kwargs)
+        return self._client
+
+    def _task_key(self, task_id: str) -> str:
+        return f"{self.key_prefix}:task:{task_id}"
+
+    def _queue_key(self, capability: str) -> str:
+        return f"{self.key_prefix}:queue:{capability}"
+
+    def _wake_key(self, capability: str) -> str:
+        return f"{self.key_prefix}:wake:{capability}"
+
+    def _worker_key(self, node_id: str) -> str:
+        return f"{self.key_prefix}:worker:{node_id}"
+
+    def _events_key(self) -> str:
+        return f"{self.key_prefix}:events"
+
+    def _leases_key(self) -> str:
+        return f"{self.key_prefix}:leases"
+
+    def _terminal_channel(self, task_id: str) -> str:
+        return f"{self.key_prefix}:terminal:{task_id}"
+
+    def _score(self, task: MeshTask) -> float:
+        return time.time() - (float(task.priority) * 1_000_000.0)
+
+    def _enqueue(self, pipe: Any, task: MeshTask):
+        """Queue `task` on `pipe` and wake one blocked claimer."""
+        wake_key = self._wake_key(task.capability)
+        pipe.zadd(self._queue_key(task.capability), {task.task_id: self._score(task)})
+        pipe.rpush(wake_key, "1")
+        pipe.ltrim(wake_key, -_WAKE_TOKENS_MAX, -1)
+
+    @staticmethod
+    def _dump_record(record: TaskRecord) -> str:
+        return json.dumps(record.to_dict(), separators=(",", ":"))
+
+    @staticmethod
+    def _event_fields(event: AuditEvent | dict[str, Any]) -> dict[str, Any]:
+        payload = coerce_audit_event(event).to_dict()
+        payload["metadata"] = json.dumps(payload.get("metadata", {}), separators=(",", ":"))
+        return payload
+
+    def _record_event_for(
+        self,
+        event_type: str,
+        record: TaskRecord,
+        node_id: str = "",
+        message: str = "",
+        metadata: dict[str, Any] | None = None,
+    ) -> dict[str, Any]:
+        return self._event_fields(AuditEvent(
+            event_type=event_type,
+            task_id=record.task_id,
+            node_id=node_id,
+            tenant_id=record.task.tenant_id,
+            parent_task_id=record.task.parent_task_id or "",
+            message=message,
+            metadata=dict(metadata or {}),
+        ))
+
+    async def _transition(self, task_id: str, mutate) -> TaskRecord | None:
+        """
+        Apply one optimistic read-modify-write to a task record.
+
+        `mutate(record, pipe)` runs after MULTI; it edits the record, queues
+        extra commands and returns False to abort without writing.
+        """
+        task_key = self._task_key(task_id)
+        async with self.client.pipeline(transaction=True) as pipe:
+            while True:
+                try:
+                    await pipe.watch(task_key)
+                    raw = await pipe.hget(task_key, "record")
+                    if not raw:
+                        await pipe.reset()
+                        return None
+                    record = TaskRecord.from_dict(json.loads(raw))
+                    pipe.multi()
+                    if mutate(record, pipe) is False:
+                        await pipe.reset()
+                        return None
+                    pipe.hset(task_key, "record", self._dump_record(record))
+                    await pipe.execute()
+                    return record
+                except self._watch_error:
+                    continue
+
+    async def submit(self, task: MeshTask) -> TaskRecord:
+        now = time.time()
+        record = TaskRecord(task=task, created_at=now, updated_at=now)
+        pipe = self.client.pipeline(transaction=False)
+        pipe.hset(self._task_key(task.task_id), mapping={"record": self._dump_record(record)})
+        self._enqueue(pipe, task)
+        pipe.xadd(self._events_key(), self._record_event_for("task_submitted", record, message="task submitted"))
+        await pipe.execute()
+        return record
+
+    async def _claim_head(self, node_id: str, queue_key: str) -> TaskRecord | None:
+        """
+        Lease the head of one queue.
+
+        The queue entry is removed (ZREM) in the same MULTI that writes the
+        lease, with both keys watched, so the task is either still queued or
+        leased; entries for missing or non-pending tasks are dropped.
+        """
+        async with self.client.pipeline(transaction=True) as pipe:
+            while True:
+                try:
+                    await pipe.watch(queue_key)
+                    candidates = await pipe.zrange(queue_key, 0, 0)
+                    if not candidates:
+                        await pipe.reset()
+                        return None
+                    task_id = str(candidates[0])
+                    task_key = self._task_key(task_id)
+                    await pipe.watch(task_key)
+                    raw = await pipe.hget(task_key, "record")
+                    record = TaskRecord.from_dict(json.loads(raw)) if raw else None
+                    pipe.multi()
+                    pipe.zrem(queue_key, task_id)
+                    if record is None or record.state != TaskState.PENDING:
+                        await pipe.execute()
+                        continue
+                    now = time.time()
+                    record.state = TaskState.RUNNING
+                    record.attempts += 1
+                    record.lease_owner = node_id
+                    record.lease_deadline = now + max(record.task.lease_seconds, 0.1)
+                    record.updated_at = now
+                    pipe.hset(task_key, "record", self._dump_record(record))
+                    pipe.sadd(self._worker_key(node_id), task_id)
+                    pipe.zadd(self._leases_key(), {task_id: record.lease_deadline})
+                    pipe.xadd(self._events_key(), self._record_event_for(
+                        "task_claimed", record, node_id=node_id, message="task claimed",
+                    ))
+                    await pipe.execute()
+                    return record
+                except self._watch_error:
+                    continue
+
+    async def _release(self, record: TaskRecord):
+        """Return a claim that was cancelled before reaching its caller."""
+
+        def mutate(current: TaskRecord, pipe: Any):
+            if current.state != TaskState.RUNNING or current.lease_owner != record.lease_owner:
+                return False
+            current.state = TaskState.PENDING
+            current.attempts = max(current.attempts - 1, 0)
+            current.lease_owner = ""
+            current.lease_deadline = 0.0
+            current.updated_at = time.time()
+            pipe.zrem(self._leases_key(), current.task_id)
+            pipe.srem(self._worker_key(record.lease_owner), current.task_id)
+            self._enqueue(pipe, current.task)
+
+        await self._transition(record.task_id, mutate)
+
+    async def _claim_first(
+        self,
+        node_id: str,
+        capabilities: list[str],
+        block: float | None,
+    ) -> TaskRecord | None:
+        while True:
+            for capability in capabilities:
+                record = await self._claim_head(node_id, self._queue_key(capability))
+                if record is not None:
+                    return record
+            if block is None:
+                return None
+            woke = await self.client.blpop([self._wake_key(capability) for capability in capabilities], timeout=block)
+            if not woke:
+                return None
+            block = None  # Peek once more; the caller's loop decides whether to wait again.
+
+    async def _claim(
+        self,
+        node_id: str,
+        capabilities: list[str],
+        block: float | None = None,
+    ) -> TaskRecord | None:
+        # The claim runs shielded; a cancelled caller hands any lease it
+        # already took back to the queue instead of waiting for it to expire.
+        inner = asyncio.ensure_future(self._claim_first(node_id, list(capabilities), block))
+        try:
+            return await asyncio.shield(inner)
+        except asyncio.CancelledError:
+            inner.add_done_callback(self._release_orphan)
+            raise
+
+    def _release_orphan(self, inner: asyncio.Future[Any]):
+        if inner.cancelled() or inner.exception() is not None:
+            return
+        record = inner.result()
+        if record is None:
+            return
+        release = asyncio.ensure_future(self._release(record))
+        self._releases.add(release)
+        release.add_done_callback(self._releases.discard)
+
+    async def claim_next(self, node_id: str, capability: str) -> TaskRecord | None:
+        await self.requeue_expired()
+        return await self._claim(node_id, [capability])
+
+    async def claim_next_available(
+        self,
+        node_id: str,
+        capabilities: list[str] | tuple[str, ...] | set[str],
+        timeout: float | None = None,
+    ) -> TaskRecord | None:
+        deadline = None if timeout is None else time.time() + max(float(timeout), 0.0)
+        ordered = [str(capability) for capability in capabilities]
+        if not ordered:
+            return None
+
+        while True:
+            await self.requeue_expired()
+            now = time.time()
+            block = self.block_timeout
+            leases = await self.client.zrange(self._leases_key(), 0, 0, withscores=True)
+            if leases:
+                block = min(block, max(float(leases[0][1]) - now, 0.0))
+            if deadline is not None:
+                block = min(block, deadline - now)
+
+            # BLPOP treats 0 as "block forever", so short waits go non-blocking.
+            record = await self._claim(node_id, ordered, block=block if block >= 0.01 else None)
+            if record is not None:
+                return record
+            if deadline is not None and time.time() >= deadline:
+                return None
+
+    async def renew_lease(
+        self,
+        task_id: str,
+        node_id: str,
+        lease_seconds: float | None = None,
+    ) -> TaskRecord | None:
+        def mutate(record: TaskRecord, pipe: Any):
+            if record.state != TaskState.RUNNING or record.lease_owner != node_id:
+                return False
+            record.lease_deadline = time.time() + max(lease_seconds or record.task.lease_seconds, 0.1)
+            record.updated_at = time.time()
+            pipe.zadd(self._leases_key(), {task_id: record.lease_deadline})
+
+        return await self._transition(task_id, mutate)
+
+    async def complete(self, task_id: str, node_id: str, result: TaskResult) -> TaskRecord | None:
+        def mutate(record: TaskRecord, pipe: Any):
+            record.state = TaskState.COMPLETED
+            record.result = result
+            record.lease_owner = node_id
+            record.lease_deadline = 0.0
+            record.error = ""
+            record.updated_at = time.time()
+            pipe.srem(self._worker_key(node_id), task_id)
+            pipe.zrem(self._leases_key(), task_id)
+            pipe.xadd(self._events_key(), self._record_event_for(
+                "task_completed", record, node_id=node_id, message="task completed",
+            ))
+            pipe.publish(self._terminal_channel(task_id), record.state.value)
+
+        return await self._transition(task_id, mutate)
+
+    def _fail_mutation(self, node_id: str, error: str, expired_before: float | None = None):
+        def mutate(record: TaskRecord, pipe: Any):
+            if expired_before is not None:
+                if record.state != TaskState.RUNNING or not 0 < record.lease_deadline <= expired_before:
+                    return False
+                node = record.lease_owner
+                message = record.error or error
+                pipe.xadd(self._events_key(), self._record_event_for(
+                    "lease_expired", record, node_id=node, message="lease expired",
+                ))
+            else:
+                node = node_id
+                message = error
+            retrying = record.attempts < max(record.task.max_attempts, 1)
+            record.updated_at = time.time()
+            record.error = message
+            pipe.zrem(self._leases_key(), record.task_id)
+            if retrying:
+                record.state = TaskState.PENDING
+                record.lease_owner = ""
+                record.lease_deadline = 0.0
+                self._enqueue(pipe, record.task)
+            else:
+                record.state = TaskState.FAILED
+                record.lease_owner = node
+                record.lease_deadline = 0.0
+                pipe.publish(self._terminal_channel(record.task_id), record.state.value)
+            pipe.srem(self._worker_key(node), record.task_id)
+            pipe.xadd(self._events_key(), self._record_event_for(
+                "task_failed", record, node_id=node, message=message, metadata={"retrying": retrying},
+            ))
+
+        return mutate
+
+    async def fail(self, task_id: str, node_id: str, error: str) -> TaskRecord | None:
+        return await self._transition(task_id, self._fail_mutation(node_id, error))
+
+    async def cancel(self, task_id: str, reason: str = "cancelled") -> TaskRecord | None:
+        terminal: list[TaskRecord] = []
+
+        def mutate(record: TaskRecord, pipe: Any):
+            if record.state in _TERMINAL_STATES:
+                terminal.append(record)
+                return False
+            previous_owner = record.lease_owner
+            record.state = TaskState.CANCELLED
+            record.error = reason
+            record.lease_owner = ""
+            record.lease_deadline = 0.0
+            record.updated_at = time.time()
+            pipe.zrem(self._leases_key(), task_id)
+            if previous_owner:
+                pipe.srem(self._worker_key(previous_owner), task_id)
+            pipe.xadd(self._events_key(), self._record_event_for(
+                "task_failed", record, message=reason, metadata={"cancelled": True},
+            ))
+            pipe.publish(self._terminal_channel(task_id), record.state.value)
+
+        record = await self._transition(task_id, mutate)
+        if record is None and terminal:
+            return terminal[0]
+        return record
+
+    async def requeue_expired(self) -> int:
+        now = time.time()
+        task_ids = await self.client.zrangebyscore(self._leases_key(), 0, now)
+        count = 0
+        for task_id in task_ids:
+            record = await self._transition(
+                task_id,
+                self._fail_mutation("", "lease expired", expired_before=now),
+            )
+            if record is not None:
+                count += 1
+            elif not await self.client.exists(self._task_key(task_id)):
+                await self.client.zrem(self._leases_key(), task_id)
+        return count
+
+    async def get(self, task_id: str) -> TaskRecord | None:
+        raw = await self.client.hget(self._task_key(task_id), "record")
+        if not raw:
+            return None
+        return TaskRecord.from_dict(json.loads(raw))
+
+    async def record_event(self, event: AuditEvent | dict[str, Any]):
+        await self.client.xadd(self._events_key(), self._event_fields(event))
+
+    async def list_events(self, task_id: str | None = None, limit: int = 100) -> list[AuditEvent]:
+        rows = await self.client.xrevrange(self._events_key(), count=max(limit, 1))
+        events = [AuditEvent.from_dict(row) for _, row in reversed(rows)]
+        if task_id:
+            events = [event for event in events if event.task_id == task_id]
+        return events[-limit:]
+
+    async def wait_for_terminal(
+        self,
+        task_id: str,
+        timeout: float | None = None,
+    ) -> TaskRecord | None:
+        deadline = None if timeout is None else time.time() + max(float(timeout), 0.0)
+        pubsub = self.client.pubsub(ignore_subscribe_messages=True)
+        try:
+            await pubsub.subscribe(self._terminal_channel(task_id))
+            while True:
+                # Re-read after subscribing so a transition racing the
+                # subscription is never missed.
+                record = await self.get(task_id)
+                if record is not None and record.state in _TERMINAL_STATES:
+                    return record
+                remaining = None if deadline is None else deadline - time.time()
+                if remaining is not None and remaining <= 0:
+                    return None
+                await pubsub.get_message(
+                    ignore_subscribe_messages=True,
+                    timeout=self.block_timeout if remaining is None else min(remaining, self.block_timeout),
+                )
+        finally:
+            await close_async_redis(pubsub)
+
+    async def close(self):
+        if self._releases:
+            await asyncio.gather(*self._releases, return_exceptions=True)
+        if self._owns_client and self._client is not None:
+            await close_async_redis(self._client)
+        self._client = None
+
+
 def adapt_task_store(store: TaskStore | AsyncTaskStore) -> AsyncTaskStore:
     """Wrap a sync store when needed, preserving async call sites."""
     if isinstance(store, AsyncTaskStore):
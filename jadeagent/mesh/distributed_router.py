@@ -5,14 +5,29 @@ Distributed mesh router with Redis-backed node discovery.
 from __future__ import annotations
 
 import json
+import logging
+import threading
 import time
 from typing import Any
 
-from .router import NodeState, _delegation_allowed, _tenant_compatible
-from ..governance import trust_tier_allows
+from .route_index import RouteEntry, RouteIndex
+from .router import NodeState
+
+logger = logging.getLogger("jadeagent.mesh.distributed_router")
 
 
 class DistributedMeshRouter:
+    """
+    Capability router whose node registry lives in Redis.
+
+    Local node changes are published as deltas: assign/done become one
+    coalesced HINCRBY per flush, heartbeats only rewrite fields that changed,
+    and pure liveness refreshes are written at most every third of
+    `stale_after`. Every flush bumps a registry version and records which
+    nodes it touched, so readers fetch only the nodes changed since their last
+    refresh instead of re-reading the whole registry.
+    """
+
     def __init__(
         self,
         redis_url: str = "redis://localhost:6379/0",
@@ -26,6 +41,8 @@ class DistributedMeshRouter:
         tls_keyfile: str | None = None,
         tls_cert_reqs: str | None = "required",
         redis_kwargs: dict[str, Any] | None = None,
+        flush_interval: float = 0.05,
+        client: Any = None,
     ):
         try:
             import redis
@@ -33,6 +50,7 @@ class DistributedMeshRouter:
             raise ImportError(
                 "DistributedMeshRouter requires redis package. Install with: pip install redis"
             ) from exc
+        self._watch_error = redis.exceptions.WatchError
 
         kwargs = dict(redis_kwargs or {})
         if tls:
@@ -46,17 +64,32 @@ class DistributedMeshRouter:
             if tls_cert_reqs:
                 kwargs["ssl_cert_reqs"] = tls_cert_reqs
 
-        self._client = redis.Redis.from_url(redis_url, decode_responses=True, **kwargs)
+        if client is None:
+            client = redis.Redis.from_url(redis_url, decode_responses=True, **kwargs)
+        self._client = client
         self._client.ping()
 
         self.registry_prefix = registry_prefix.rstrip(":")
         self.stale_after = stale_after
         self.heartbeat_ttl = heartbeat_ttl or int(max(stale_after * 3, 10))
         self.refresh_interval = refresh_interval
+        self.flush_interval = max(float(flush_interval), 0.0)
+        self.liveness_interval = max(stale_after / 3.0, 0.0)
 
         self._local_nodes: dict[str, NodeState] = {}
         self._cache: dict[str, NodeState] = {}
+        self._remote: dict[str, NodeState] = {}
+        self._index = RouteIndex()
         self._last_refresh: float = 0.0
+        self._seen_version = 0
+
+        self._lock = threading.RLock()
+        self._dirty_fields: dict[str, set[str]] = {}
+        self._inflight_deltas: dict[str, int] = {}
+        self._full_publish: set[str] = set()
+        self._published_seen: dict[str, float] = {}
+        self._flush_timer: threading.Timer | None = None
+        self.metrics = {"flushes": 0, "full_publishes": 0, "delta_publishes": 0, "nodes_fetched": 0}
 
     @property
     def _nodes_key(self) -> str:
@@ -65,6 +98,14 @@ class DistributedMeshRouter:
     def _node_key(self, node_id: str) -> str:
         return f"{self.registry_prefix}:node:{node_id}"
 
+    @property
+    def _version_key(self) -> str:
+        return f"{self.registry_prefix}:version"
+
+    @property
+    def _changes_key(self) -> str:
+        return f"{self.registry_prefix}:changes"
+
     def register_node(
         self,
         node_id: str,
@@ -78,47 +119,175 @@ class DistributedMeshRouter:
             max_inflight=max_inflight,
             metadata=dict(metadata or {}),
         )
-        self._local_nodes[node_id] = state
-        self._publish_state(state)
-        self._cache[node_id] = state
+        with self._lock:
+            self._local_nodes[node_id] = state
+            self._cache[node_id] = state
+            self._index.upsert(state)
+            self._inflight_deltas.pop(node_id, None)
+            self._dirty_fields.pop(node_id, None)
+            self._full_publish.add(node_id)
+        self.flush()
 
     def unregister_node(self, node_id: str):
-        self._local_nodes.pop(node_id, None)
-        self._cache.pop(node_id, None)
-
-        pipe = self._client.pipeline(transaction=False)
-        pipe.srem(self._nodes_key, node_id)
-        pipe.delete(self._node_key(node_id))
-        pipe.execute()
+        with self._lock:
+            self._local_nodes.pop(node_id, None)
+            self._cache.pop(node_id, None)
+            self._remote.pop(node_id, None)
+            self._index.discard(node_id)
+            self._inflight_deltas.pop(node_id, None)
+            self._dirty_fields.pop(node_id, None)
+            self._full_publish.discard(node_id)
+            self._published_seen.pop(node_id, None)
+
+        def write(pipe: Any, version: int):
+            pipe.srem(self._nodes_key, node_id)
+            pipe.delete(self._node_key(node_id))
+            pipe.zadd(self._changes_key, {node_id: version})
+
+        self._versioned_write(write)
 
     def update_heartbeat(self, node_id: str, queue_depth: int | None = None):
-        state = self._local_nodes.get(node_id)
-        if state is None:
-            return
-        state.last_seen = time.time()
-        if queue_depth is not None:
-            state.queue_depth = max(int(queue_depth), 0)
-        self._publish_state(state)
-        self._cache[node_id] = state
+        with self._lock:
+            state = self._local_nodes.get(node_id)
+            if state is None:
+                return
+            state.last_seen = time.time()
+            if queue_depth is not None and max(int(queue_depth), 0) != state.queue_depth:
+                state.queue_depth = max(int(queue_depth), 0)
+                self._mark_dirty(node_id, "queue_depth")
+            elif state.last_seen - self._published_seen.get(node_id, 0.0) >= self.liveness_interval:
+                self._full_publish.add(node_id)
+            else:
+                self._index.upsert(state)
+                return
+            self._index.upsert(state)
+        self._schedule_flush()
 
     def mark_assigned(self, node_id: str):
-        state = self._local_nodes.get(node_id)
-        if state is None:
-            return
-        state.inflight += 1
-        state.last_seen = time.time()
-        self._publish_state(state)
-        self._cache[node_id] = state
+        self._adjust_inflight(node_id, 1)
 
     def mark_done(self, node_id: str):
-        state = self._local_nodes.get(node_id)
-        if state is None:
+        self._adjust_inflight(node_id, -1)
+
+    def _adjust_inflight(self, node_id: str, delta: int):
+        with self._lock:
+            state = self._local_nodes.get(node_id)
+            if state is None:
+                return
+            if delta < 0 and state.inflight <= 0:
+                delta = 0
+            state.inflight += delta
+            state.last_seen = time.time()
+            if state.last_seen - self._published_seen.get(node_id, 0.0) >= self.liveness_interval:
+                # Periodic full writes recreate the hash if its TTL lapsed.
+                self._full_publish.add(node_id)
+            if delta:
+                self._inflight_deltas[node_id] = self._inflight_deltas.get(node_id, 0) + delta
+            self._mark_dirty(node_id, "last_seen")
+            self._index.upsert(state)
+        self._schedule_flush()
+
+    def _mark_dirty(self, node_id: str, field: str):
+        self._dirty_fields.setdefault(node_id, set()).add(field)
+
+    def _schedule_flush(self):
+        if self.flush_interval <= 0:
+            self.flush()
             return
-        if state.inflight > 0:
-            state.inflight -= 1
-        state.last_seen = time.time()
-        self._publish_state(state)
-        self._cache[node_id] = state
+        with self._lock:
+            if self._flush_timer is not None:
+                return
+            timer = threading.Timer(self.flush_interval, self._flush_from_timer)
+            timer.daemon = True
+            self._flush_timer = timer
+        timer.start()
+
+    def _flush_from_timer(self):
+        with self._lock:
+            self._flush_timer = None
+        try:
+            self.flush()
+        except Exception:
+            # flush() already queued the failed nodes for a full publish.
+            logger.warning("Registry flush failed; retrying in %.2fs", self.flush_interval, exc_info=True)
+            self._schedule_flush()
+
+    def flush(self):
+        """Publish pending node deltas in one versioned registry transaction."""
+        with self._lock:
+            full = {node_id for node_id in self._full_publish if node_id in self._local_nodes}
+            deltas = {
+                node_id: delta
+                for node_id, delta in self._inflight_deltas.items()
+                if node_id in self._local_nodes and node_id not in full
+            }
+            dirty = {
+                node_id: set(fields)
+                for node_id, fields in self._dirty_fields.items()
+                if node_id in self._local_nodes and node_id not in full
+            }
+            states = {
+                node_id: self._local_nodes[node_id]
+                for node_id in full | set(deltas) | set(dirty)
+            }
+            self._full_publish.clear()
+            self._inflight_deltas.clear()
+            self._dirty_fields.clear()
+            payloads = {node_id: self._state_payload(state) for node_id, state in states.items()}
+        if not states:
+            return
+
+        def write(pipe: Any, version: int):
+            for node_id, payload in payloads.items():
+                key = self._node_key(node_id)
+                if node_id in full:
+                    pipe.sadd(self._nodes_key, node_id)
+                    pipe.hset(key, mapping=payload)
+                else:
+                    if deltas.get(node_id):
+                        pipe.hincrby(key, "inflight", deltas[node_id])
+                    fields = dirty.get(node_id, set()) | {"last_seen"}
+                    pipe.hset(key, mapping={name: payload[name] for name in sorted(fields)})
+                pipe.expire(key, self.heartbeat_ttl)
+                pipe.zadd(self._changes_key, {node_id: version})
+
+        try:
+            self._versioned_write(write)
+        except Exception:
+            # The EXEC may or may not have landed, so replaying the HINCRBY
+            # deltas could double count; republish the absolute state instead.
+            with self._lock:
+                self._full_publish.update(node_id for node_id in states if node_id in self._local_nodes)
+            raise
+        with self._lock:
+            for node_id, payload in payloads.items():
+                self._published_seen[node_id] = float(payload["last_seen"])
+            self.metrics["flushes"] += 1
+            self.metrics["full_publishes"] += len(full)
+            self.metrics["delta_publishes"] += len(payloads) - len(full)
+
+    def _versioned_write(self, write):
+        """Run `write(pipe, version)` atomically with a registry version bump."""
+        with self._client.pipeline(transaction=True) as pipe:
+            while True:
+                try:
+                    pipe.watch(self._version_key)
+                    version = int(pipe.get(self._version_key) or 0) + 1
+                    pipe.multi()
+                    pipe.set(self._version_key, version)
+                    write(pipe, version)
+                    pipe.execute()
+                    return version
+                except self._watch_error:
+                    continue
+
+    def close(self):
+        with self._lock:
+            timer = self._flush_timer
+            self._flush_timer = None
+        if timer is not None:
+            timer.cancel()
+        self.flush()
 
     def route(
         self,
@@ -130,30 +299,19 @@ class DistributedMeshRouter:
         requester: str | None = None,
     ) -> str | None:
         exclude = exclude or set()
-        candidates = [
-            state
-            for state in self._discover_nodes().values()
-            if state.node_id not in exclude
-            and capability in state.capabilities
-            and _tenant_compatible(state.metadata, tenant_id)
-            and trust_tier_allows(str(state.metadata.get("trust_tier", "standard")), min_trust_tier)
-            and _delegation_allowed(state.metadata, requester)
-        ]
-        if not candidates:
-            return None
-
-        if affinity:
-            ordered = sorted(candidates, key=lambda s: s.node_id)
-            idx = sum(ord(ch) for ch in affinity) % len(ordered)
-            return ordered[idx].node_id
-
-        now = time.time()
+        self._discover_nodes()
 
-        def score(s: NodeState) -> tuple[float, float, str]:
-            freshness = -(now - s.last_seen)
-            return (-s.load_factor, freshness, s.node_id)
+        def accept(entry: RouteEntry) -> bool:
+            return entry.node_id not in exclude and entry.allows(min_trust_tier, requester)
 
-        return max(candidates, key=score).node_id
+        # Queries pop and re-push the index heaps, so they share the lock
+        # with the heartbeat and inflight updates that reorder them.
+        with self._lock:
+            if affinity:
+                chosen = self._index.by_affinity(capability, tenant_id, affinity, accept)
+            else:
+                chosen = self._index.least_loaded(capability, tenant_id, accept)
+        return None if chosen is None else chosen.node_id
 
     def snapshot(self) -> list[dict[str, Any]]:
         nodes = self._discover_nodes()
@@ -177,37 +335,68 @@ class DistributedMeshRouter:
         if now - self._last_refresh < self.refresh_interval:
             return self._cache
 
-        node_ids = [str(x) for x in self._client.smembers(self._nodes_key)]
-        if not node_ids:
-            self._cache = {}
-            self._last_refresh = now
-            return self._cache
+        # Version 0 means the registry is written by writers that predate
+        # versioning, so fall back to a full read on every refresh.
+        version = int(self._client.get(self._version_key) or 0)
+        if version == 0 or self._seen_version == 0 or version < self._seen_version:
+            node_ids = [str(x) for x in self._client.smembers(self._nodes_key)]
+            self._remote = self._fetch_nodes(x for x in node_ids if x not in self._local_nodes)
+        elif version > self._seen_version:
+            changed = [
+                str(x)
+                for x in self._client.zrangebyscore(self._changes_key, f"({self._seen_version}", version)
+                if str(x) not in self._local_nodes
+            ]
+            fetched = self._fetch_nodes(changed)
+            for node_id in changed:
+                if node_id in fetched:
+                    self._remote[node_id] = fetched[node_id]
+                else:
+                    self._remote.pop(node_id, None)
+        self._seen_version = version
 
+        discovered: dict[str, NodeState] = {}
+        for node_id, state in list(self._remote.items()):
+            age = now - state.last_seen
+            if age > self.heartbeat_ttl:
+                self._remote.pop(node_id, None)
+            elif age <= self.stale_after:
+                discovered[node_id] = state
+        with self._lock:
+            discovered.update(self._local_nodes)
+            self._replace_cache(discovered)
+        self._last_refresh = now
+        return self._cache
+
+    def _fetch_nodes(self, node_ids) -> dict[str, NodeState]:
+        node_ids = list(node_ids)
+        if not node_ids:
+            return {}
         pipe = self._client.pipeline(transaction=False)
         for node_id in node_ids:
             pipe.hgetall(self._node_key(node_id))
         rows = pipe.execute()
+        self.metrics["nodes_fetched"] += len(node_ids)
 
-        discovered: dict[str, NodeState] = {}
+        fetched: dict[str, NodeState] = {}
         for node_id, row in zip(node_ids, rows):
             if not row:
                 continue
             state = self._parse_state(node_id, row)
-            if state is None:
-                continue
-            if now - state.last_seen > self.stale_after:
-                continue
-            discovered[node_id] = state
-
-        for node_id, state in self._local_nodes.items():
-            discovered[node_id] = state
-
+            if state is not None:
+                fetched[node_id] = state
+        return fetched
+
+    def _replace_cache(self, discovered: dict[str, NodeState]):
+        for node_id in set(self._cache) - set(discovered):
+            self._index.discard(node_id)
+        for state in discovered.values():
+            self._index.upsert(state)
         self._cache = discovered
-        self._last_refresh = now
-        return self._cache
 
-    def _publish_state(self, state: NodeState):
-        payload = {
+    @staticmethod
+    def _state_payload(state: NodeState) -> dict[str, str]:
+        return {
             "node_id": state.node_id,
             "capabilities": json.dumps(sorted(state.capabilities), separators=(",", ":")),
             "max_inflight": str(int(state.max_inflight)),
@@ -217,13 +406,6 @@ class DistributedMeshRouter:
             "metadata": json.dumps(state.metadata, separators=(",", ":")),
         }
 
-        key = self._node_key(state.node_id)
-        pipe = self._client.pipeline(transaction=False)
-        pipe.sadd(self._nodes_key, state.node_id)
-        pipe.hset(key, mapping=payload)
-        pipe.expire(key, self.heartbeat_ttl)
-        pipe.execute()
-
     @staticmethod
     def _parse_state(node_id: str, row: dict[str, str]) -> NodeState | None:
         try:
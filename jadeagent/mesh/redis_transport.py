@@ -14,6 +14,65 @@ from .security import HMACSigner, ReplayProtector
 logger = logging.getLogger("jadeagent.mesh.redis_transport")
 
 
+def encode_wire(envelope_data: dict[str, Any], signer: HMACSigner | None = None) -> bytes:
+    """Serialize an envelope for the wire, signing it when a signer is set."""
+    wire = {"envelope": envelope_data}
+    if signer is not None:
+        wire["auth"] = {
+            "scheme": "hmac-sha256",
+            "key_id": signer.key_id,
+            "signature": signer.sign(envelope_data),
+        }
+    return json.dumps(wire, separators=(",", ":"), ensure_ascii=True).encode("utf-8")
+
+
+def decode_wire(
+    raw_data: Any,
+    signer: HMACSigner | None = None,
+    replay: ReplayProtector | None = None,
+) -> MeshEnvelope | None:
+    """Parse and authenticate one wire message; returns None when it must be dropped."""
+    try:
+        if isinstance(raw_data, bytes):
+            raw_text = raw_data.decode("utf-8")
+        else:
+            raw_text = str(raw_data)
+        wire = json.loads(raw_text)
+    except Exception:
+        logger.warning("Dropping invalid JSON wire message.")
+        return None
+
+    envelope_data = wire.get("envelope")
+    if not isinstance(envelope_data, dict):
+        logger.warning("Dropping wire message without envelope payload.")
+        return None
+
+    if signer is not None:
+        auth = wire.get("auth", {})
+        signature = auth.get("signature") if isinstance(auth, dict) else None
+        if not isinstance(signature, str):
+            logger.warning("Dropping unsigned wire message.")
+            return None
+        if not signer.verify(envelope_data, signature):
+            logger.warning("Dropping wire message with invalid signature.")
+            return None
+
+    source = str(envelope_data.get("source", ""))
+    message_id = str(envelope_data.get("message_id", ""))
+    created_at = float(envelope_data.get("created_at", 0.0))
+    if replay is not None:
+        ok, reason = replay.check(source, message_id, created_at)
+        if not ok:
+            logger.warning("Dropping replay/stale message: %s", reason)
+            return None
+
+    try:
+        return envelope_from_dict(envelope_data)
+    except Exception as exc:
+        logger.warning("Failed to decode envelope: %s", exc)
+        return None
+
+
 class RedisMeshTransport:
     """
     Publish/subscribe transport for distributed mesh nodes.
@@ -145,55 +204,11 @@ class RedisMeshTransport:
         return pubsub
 
     def _encode_wire(self, envelope_data: dict[str, Any]) -> bytes:
-        wire = {"envelope": envelope_data}
-        if self.signer is not None:
-            wire["auth"] = {
-                "scheme": "hmac-sha256",
-                "key_id": self.signer.key_id,
-                "signature": self.signer.sign(envelope_data),
-            }
-        return json.dumps(wire, separators=(",", ":"), ensure_ascii=True).encode("utf-8")
+        return encode_wire(envelope_data, self.signer)
 
     def _decode_wire(self, raw_data: Any, channel: Any) -> MeshEnvelope | None:
-        try:
-            if isinstance(raw_data, bytes):
-                raw_text = raw_data.decode("utf-8")
-            else:
-                raw_text = str(raw_data)
-            wire = json.loads(raw_text)
-        except Exception:
-            logger.warning("Dropping invalid JSON wire message.")
-            return None
-
-        envelope_data = wire.get("envelope")
-        if not isinstance(envelope_data, dict):
-            logger.warning("Dropping wire message without envelope payload.")
-            return None
-
-        if self.signer is not None:
-            auth = wire.get("auth", {})
-            signature = auth.get("signature") if isinstance(auth, dict) else None
-            if not isinstance(signature, str):
-                logger.warning("Dropping unsigned wire message.")
-                return None
-            if not self.signer.verify(envelope_data, signature):
-                logger.warning("Dropping wire message with invalid signature.")
-                return None
-
-        source = str(envelope_data.get("source", ""))
-        message_id = str(envelope_data.get("message_id", ""))
-        created_at = float(envelope_data.get("created_at", 0.0))
-        if self.replay is not None:
-            ok, reason = self.replay.check(source, message_id, created_at)
-            if not ok:
-                logger.warning("Dropping replay/stale message: %s", reason)
-                return None
-
-        try:
-            return envelope_from_dict(envelope_data)
-        except Exception as exc:
-            logger.warning("Failed to decode envelope: %s", exc)
-            return None
+        del channel
+        return decode_wire(raw_data, self.signer, self.replay)
 
     def __del__(self):
         try:
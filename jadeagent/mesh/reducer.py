@@ -16,13 +16,20 @@ T = TypeVar("T")
 def hillis_steele_scan(values: Iterable[T], op: Callable[[T, T], T] = operator.add) -> list[T]:
     """
     Inclusive prefix scan using the Hillis-Steele update pattern.
+
+    Levels ping-pong between two buffers, so the scan allocates twice rather
+    than once per doubling step.
     """
     result = list(values)
+    if len(result) < 2:
+        return result
+    scratch = list(result)
     step = 1
     while step < len(result):
-        prev = list(result)
+        scratch[:step] = result[:step]
         for index in range(step, len(result)):
-            result[index] = op(prev[index - step], prev[index])
+            scratch[index] = op(result[index - step], result[index])
+        result, scratch = scratch, result
         step <<= 1
     return result
 
@@ -32,10 +39,15 @@ def hillis_steele_reduce(
     op: Callable[[T, T], T] = operator.add,
     identity: T | None = None,
 ) -> T | None:
-    items = list(values)
-    if not items:
+    """Reduce with an associative `op`; a single left fold gives the same total as the scan."""
+    items = iter(values)
+    try:
+        total = next(items)
+    except StopIteration:
         return identity
-    return hillis_steele_scan(items, op=op)[-1]
+    for item in items:
+        total = op(total, item)
+    return total
 
 
 @dataclass(frozen=True)
@@ -0,0 +1,342 @@
+"""
+Incremental shard rollups maintained from pushed deltas.
+"""
+
+from __future__ import annotations
+
+import bisect
+import time
+from dataclasses import dataclass, field, fields
+from typing import Any, Iterable
+
+from .reducer import ReductionSummary, ShardSummary, TenantBudgetSummary, hillis_steele_scan
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - optional acceleration
+    np = None
+
+
+@dataclass(frozen=True)
+class ShardAggregate:
+    """
+    Additive shard counters.
+
+    Aggregates form a commutative group under `+`, so a shard's change is
+    `new - old` and can be folded into any rollup that contains it without
+    revisiting the other shards.
+    """
+
+    queued: int = 0
+    inflight: int = 0
+    completed: int = 0
+    dead_letter: int = 0
+    worker_count: int = 0
+    healthy_workers: int = 0
+    busy_workers: int = 0
+    total_permits: int = 0
+    available_permits: int = 0
+    queue_pressure: float = 0.0
+    shard_count: int = 0
+    event_counts: dict[str, int] = field(default_factory=dict)
+
+    def __add__(self, other: ShardAggregate) -> ShardAggregate:
+        events = dict(self.event_counts)
+        for event_type, count in other.event_counts.items():
+            total = events.get(event_type, 0) + count
+            if total:
+                events[event_type] = total
+            else:
+                events.pop(event_type, None)
+        return ShardAggregate(
+            **{name: getattr(self, name) + getattr(other, name) for name in AGGREGATE_FIELDS},
+            event_counts=events,
+        )
+
+    def __neg__(self) -> ShardAggregate:
+        return ShardAggregate(
+            **{name: -getattr(self, name) for name in AGGREGATE_FIELDS},
+            event_counts={event_type: -count for event_type, count in self.event_counts.items()},
+        )
+
+    def __sub__(self, other: ShardAggregate) -> ShardAggregate:
+        return self + (-other)
+
+    @property
+    def failed(self) -> int:
+        return int(self.event_counts.get("task_failed", 0))
+
+    @property
+    def is_zero(self) -> bool:
+        return not self.event_counts and not any(getattr(self, name) for name in AGGREGATE_FIELDS)
+
+    @classmethod
+    def from_summary(cls, summary: ShardSummary) -> ShardAggregate:
+        return cls(
+            queued=summary.queued,
+            inflight=summary.inflight,
+            completed=summary.completed,
+            dead_letter=summary.dead_letter,
+            worker_count=summary.worker_count,
+            healthy_workers=summary.healthy_workers,
+            busy_workers=summary.busy_workers,
+            total_permits=summary.total_permits,
+            available_permits=summary.available_permits,
+            queue_pressure=summary.queue_pressure,
+            shard_count=1,
+            event_counts={key: int(value) for key, value in summary.event_counts.items() if value},
+        )
+
+    def as_vector(self) -> list[float]:
+        return [float(getattr(self, name)) for name in AGGREGATE_FIELDS]
+
+    @classmethod
+    def from_vector(cls, vector: Iterable[float], event_counts: dict[str, int] | None = None) -> ShardAggregate:
+        values = dict(zip(AGGREGATE_FIELDS, vector))
+        return cls(
+            **{name: (float(values[name]) if name == "queue_pressure" else int(round(values[name]))) for name in AGGREGATE_FIELDS},
+            event_counts=dict(event_counts or {}),
+        )
+
+    def to_budget(self, tenant_id: str) -> TenantBudgetSummary:
+        return TenantBudgetSummary(
+            tenant_id=tenant_id,
+            queued=self.queued,
+            inflight=self.inflight,
+            completed=self.completed,
+            failed=self.failed,
+            dead_letter=self.dead_letter,
+            policy_denied=int(self.event_counts.get("policy_denied", 0)),
+            lease_expired=int(self.event_counts.get("lease_expired", 0)),
+            total_permits=self.total_permits,
+            available_permits=self.available_permits,
+            queue_pressure=self.queue_pressure,
+            headroom=self.available_permits,
+            budget_pressure=(self.queued + self.inflight) / max(self.total_permits, 1),
+        )
+
+
+AGGREGATE_FIELDS = tuple(item.name for item in fields(ShardAggregate) if item.name != "event_counts")
+ZERO = ShardAggregate()
+
+
+@dataclass
+class _ShardSlot:
+    tenant_id: str
+    capability: str
+    region: str
+    aggregate: ShardAggregate = ZERO
+
+    @property
+    def tenant_key(self) -> str:
+        return self.tenant_id or "default"
+
+
+class IncrementalReducer:
+    """
+    Continuously maintained fleet, tenant and region rollups.
+
+    Shard supervisors push deltas as their counters move; each push touches
+    one shard slot plus its tenant, region and fleet totals, so every read is
+    O(1) no matter how many shards report. Full summaries can still be
+    ingested (they are diffed against the shard's last state), in batches
+    merged with NumPy when it is available.
+
+    Shards are kept in ReducerNode order as they register, and the queue
+    pressure prefix is rescanned only after a shard's pressure or the shard
+    set has changed, so `reduce` costs O(tenants) while pressures are steady.
+    """
+
+    def __init__(self, reducer_id: str = "root", *, region: str = ""):
+        self.reducer_id = reducer_id
+        self.region = region
+        self._shards: dict[str, _ShardSlot] = {}
+        self._fleet = ZERO
+        self._tenants: dict[str, ShardAggregate] = {}
+        self._regions: dict[str, ShardAggregate] = {}
+        self._order: list[tuple[str, str, str]] = []
+        self._pressure_version = 0
+        self._prefix_cache: tuple[int, tuple[float, ...], tuple[str, ...]] | None = None
+        self.version = 0
+        self.updated_at = time.time()
+
+    def register_shard(self, supervisor_id: str, *, tenant_id: str = "", capability: str = "", region: str = ""):
+        """Declare a shard so later deltas know which tenant and region they roll into."""
+        slot = self._shards.get(supervisor_id)
+        if slot is not None and (slot.tenant_id, slot.capability, slot.region) != (tenant_id, capability, region):
+            self.remove_shard(supervisor_id)
+            slot = None
+        if slot is None:
+            self._shards[supervisor_id] = _ShardSlot(tenant_id=tenant_id, capability=capability, region=region)
+            bisect.insort(self._order, (tenant_id, capability, supervisor_id))
+            self._pressure_version += 1
+            self.push_delta(supervisor_id, ShardAggregate(shard_count=1))
+
+    def remove_shard(self, supervisor_id: str):
+        slot = self._shards.get(supervisor_id)
+        if slot is None:
+            return
+        self.push_delta(supervisor_id, -slot.aggregate)
+        self._shards.pop(supervisor_id, None)
+        key = (slot.tenant_id, slot.capability, supervisor_id)
+        index = bisect.bisect_left(self._order, key)
+        if index < len(self._order) and self._order[index] == key:
+            del self._order[index]
+        self._pressure_version += 1
+
+    def push_delta(self, supervisor_id: str, delta: ShardAggregate | dict[str, Any]):
+        """Fold one shard's counter change into its rollups."""
+        if isinstance(delta, dict):
+            delta = ShardAggregate(**delta)
+        slot = self._shards.get(supervisor_id)
+        if slot is None:
+            self.register_shard(supervisor_id)
+            slot = self._shards[supervisor_id]
+        if delta.is_zero:
+            return
+        if delta.queue_pressure:
+            self._pressure_version += 1
+        slot.aggregate = slot.aggregate + delta
+        self._fleet = self._fleet + delta
+        self._tenants[slot.tenant_key] = self._tenants.get(slot.tenant_key, ZERO) + delta
+        self._regions[slot.region] = self._regions.get(slot.region, ZERO) + delta
+        self.version += 1
+        self.updated_at = time.time()
+
+    def ingest_shard(self, summary: ShardSummary, *, region: str = ""):
+        """Replace a shard's state with a full summary, applying only the difference."""
+        self.ingest_many([summary], region=region)
+
+    def ingest_many(self, summaries: Iterable[ShardSummary], *, region: str = ""):
+        """Batch variant of ingest_shard; counter deltas are merged with one vectorized group-sum."""
+        summaries = list(summaries)
+        for summary in summaries:
+            self.register_shard(
+                summary.supervisor_id,
+                tenant_id=summary.tenant_id,
+                capability=summary.capability,
+                region=region,
+            )
+        targets = [ShardAggregate.from_summary(summary) for summary in summaries]
+        deltas = [
+            target - self._shards[summary.supervisor_id].aggregate
+            for summary, target in zip(summaries, targets)
+        ]
+        if np is None or len(summaries) < 16:
+            for summary, delta in zip(summaries, deltas):
+                self.push_delta(summary.supervisor_id, delta)
+            return
+
+        matrix = np.array([delta.as_vector() for delta in deltas], dtype=np.float64)
+        tenant_ids = sorted({self._shards[s.supervisor_id].tenant_key for s in summaries})
+        tenant_pos = {tenant_id: pos for pos, tenant_id in enumerate(tenant_ids)}
+        groups = np.array([tenant_pos[self._shards[s.supervisor_id].tenant_key] for s in summaries])
+        tenant_sums = np.zeros((len(tenant_ids), matrix.shape[1]), dtype=np.float64)
+        np.add.at(tenant_sums, groups, matrix)
+
+        tenant_events: dict[str, ShardAggregate] = {}
+        event_delta = ZERO
+        if matrix[:, AGGREGATE_FIELDS.index("queue_pressure")].any():
+            self._pressure_version += 1
+        for summary, target, delta in zip(summaries, targets, deltas):
+            slot = self._shards[summary.supervisor_id]
+            slot.aggregate = target
+            events_only = ShardAggregate(event_counts=delta.event_counts)
+            tenant_events[slot.tenant_key] = tenant_events.get(slot.tenant_key, ZERO) + events_only
+            event_delta = event_delta + events_only
+
+        for tenant_id, pos in tenant_pos.items():
+            tenant_delta = ShardAggregate.from_vector(tenant_sums[pos]) + tenant_events.get(tenant_id, ZERO)
+            self._tenants[tenant_id] = self._tenants.get(tenant_id, ZERO) + tenant_delta
+        total = ShardAggregate.from_vector(matrix.sum(axis=0)) + event_delta
+        self._fleet = self._fleet + total
+        self._regions[region] = self._regions.get(region, ZERO) + total
+        self.version += 1
+        self.updated_at = time.time()
+
+    def fleet(self) -> ShardAggregate:
+        return self._fleet
+
+    def tenant(self, tenant_id: str) -> ShardAggregate:
+        return self._tenants.get(tenant_id or "default", ZERO)
+
+    def region_rollup(self, region: str) -> ShardAggregate:
+        return self._regions.get(region, ZERO)
+
+    def shard(self, supervisor_id: str) -> ShardAggregate:
+        slot = self._shards.get(supervisor_id)
+        return ZERO if slot is None else slot.aggregate
+
+    def shard_region(self, supervisor_id: str) -> str:
+        slot = self._shards.get(supervisor_id)
+        return "" if slot is None else slot.region
+
+    @property
+    def queue_pressure(self) -> float:
+        return self._fleet.queue_pressure
+
+    def tenant_budgets(self) -> dict[str, TenantBudgetSummary]:
+        return {
+            tenant_id: aggregate.to_budget(tenant_id)
+            for tenant_id, aggregate in sorted(self._tenants.items())
+            if aggregate.shard_count > 0
+        }
+
+    def _pressure_prefix(self) -> tuple[tuple[float, ...], tuple[str, ...]]:
+        """Queue pressure prefix and shard ids in ReducerNode order, rescanned only when stale."""
+        cached = self._prefix_cache
+        if cached is not None and cached[0] == self._pressure_version:
+            return cached[1], cached[2]
+        sources = tuple(supervisor_id for _, _, supervisor_id in self._order)
+        prefix = tuple(hillis_steele_scan([
+            float(self._shards[supervisor_id].aggregate.queue_pressure) for supervisor_id in sources
+        ]))
+        self._prefix_cache = (self._pressure_version, prefix, sources)
+        return prefix, sources
+
+    def reduce(self, reducer_id: str | None = None, *, region: str | None = None) -> ReductionSummary:
+        """
+        Materialize a ReductionSummary from the maintained rollups.
+
+        Totals are read directly; the per-shard queue pressure prefix is
+        cached until a pressure or the shard set changes.
+        """
+        fleet = self._fleet
+        prefix, sources = self._pressure_prefix()
+        return ReductionSummary(
+            reducer_id=reducer_id or self.reducer_id,
+            region=self.region if region is None else region,
+            shard_count=fleet.shard_count,
+            child_count=0,
+            total_queued=fleet.queued,
+            total_inflight=fleet.inflight,
+            total_completed=fleet.completed,
+            total_failed=fleet.failed,
+            total_dead_letter=fleet.dead_letter,
+            total_workers=fleet.worker_count,
+            healthy_workers=fleet.healthy_workers,
+            busy_workers=fleet.busy_workers,
+            total_permits=fleet.total_permits,
+            available_permits=fleet.available_permits,
+            queue_pressure_total=float(prefix[-1]) if prefix else 0.0,
+            queue_pressure_prefix=prefix,
+            event_totals=dict(sorted(fleet.event_counts.items())),
+            tenant_budgets=self.tenant_budgets(),
+            sources=sources,
+        )
+
+
+def worker_contribution(state: Any) -> ShardAggregate:
+    """What one LocalWorkerIndex entry adds to its shard's aggregate."""
+    if state is None:
+        return ZERO
+    return ShardAggregate(
+        inflight=state.inflight,
+        worker_count=1,
+        healthy_workers=1 if state.health > 0.0 else 0,
+        busy_workers=1 if state.inflight > 0 else 0,
+        total_permits=state.permits,
+        available_permits=state.available_permits,
+        queue_pressure=state.queue_pressure,
+    )
+
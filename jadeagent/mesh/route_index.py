@@ -0,0 +1,262 @@
+"""
+Incremental capability index for mesh routing.
+"""
+
+from __future__ import annotations
+
+import bisect
+import hashlib
+import heapq
+import os
+import re
+from dataclasses import dataclass
+from fnmatch import translate
+from typing import TYPE_CHECKING, Any, Callable
+
+from ..governance import TRUST_TIER_RANK
+
+if TYPE_CHECKING:
+    from .router import NodeState
+
+ANY_TENANT = "*"
+_RING_SPACE = 1 << 64
+
+
+def ring_hash(value: str) -> int:
+    """Stable 64-bit hash used for consistent-hash ring placement."""
+    return int.from_bytes(hashlib.blake2b(value.encode("utf-8"), digest_size=8).digest(), "big")
+
+
+def compile_allowlist(allowlist: Any) -> re.Pattern[str] | None:
+    """Compile fnmatch delegation patterns into one regex; None allows everyone."""
+    if not allowlist:
+        return None
+    patterns = [translate(os.path.normcase(str(pattern))) for pattern in allowlist]
+    return re.compile("|".join(f"(?:{pattern})" for pattern in patterns))
+
+
+@dataclass
+class RouteEntry:
+    """Routing facts for one node, compiled once per registration."""
+
+    state: NodeState
+    version: int
+    tenant_id: str
+    trust_rank: int
+    allowlist: re.Pattern[str] | None
+    buckets: tuple[tuple[str, str], ...]
+    # Metadata the filters were compiled from, snapshotted by value so an
+    # in-place edit of the node's metadata dict is still seen as a change.
+    filter_key: tuple[Any, ...] = ()
+
+    @property
+    def node_id(self) -> str:
+        return self.state.node_id
+
+    def allows_requester(self, requester: str | None) -> bool:
+        if self.allowlist is None:
+            return True
+        if not requester:
+            return False
+        return self.allowlist.match(os.path.normcase(str(requester))) is not None
+
+    def allows(self, min_trust_tier: str | None, requester: str | None) -> bool:
+        if min_trust_tier and self.trust_rank < TRUST_TIER_RANK.get(min_trust_tier, 0):
+            return False
+        return self.allows_requester(requester)
+
+
+class RouteIndex:
+    """
+    Capability/tenant-bucketed load heaps and consistent-hash rings.
+
+    Every node is indexed under `(capability, tenant)` and `(capability, "*")`
+    for each capability it serves. Load changes push a new heap entry and the
+    previous one is evicted lazily by version, so heartbeats, assignments and
+    completions cost O(log n) and routing pops only past ineligible nodes.
+    Affinity keys resolve on a per-bucket hash ring, so adding a node only
+    moves the keys that land on its virtual points.
+    """
+
+    def __init__(self, virtual_nodes: int = 16):
+        self.virtual_nodes = max(int(virtual_nodes), 1)
+        self._entries: dict[str, RouteEntry] = {}
+        self._heaps: dict[tuple[str, str], list[tuple[float, float, int, str]]] = {}
+        self._members: dict[tuple[str, str], set[str]] = {}
+        self._rings: dict[tuple[str, str], list[tuple[int, str]]] = {}
+        self._version = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, node_id: str) -> bool:
+        return node_id in self._entries
+
+    def get(self, node_id: str) -> RouteEntry | None:
+        return self._entries.get(node_id)
+
+    def upsert(self, state: NodeState) -> RouteEntry:
+        """Index a node, recompiling its filters only when they changed."""
+        tenant_id = str(state.metadata.get("tenant_id", ""))
+        trust_tier = str(state.metadata.get("trust_tier", "standard"))
+        allowlist = state.metadata.get("delegation_allowlist", [])
+        filter_key = (tenant_id, trust_tier, tuple(str(pattern) for pattern in allowlist or ()))
+        buckets = tuple(dict.fromkeys(
+            bucket
+            for capability in sorted(state.capabilities)
+            for bucket in ((capability, ANY_TENANT), (capability, tenant_id))
+        ))
+        current = self._entries.get(state.node_id)
+        if current is not None and current.buckets == buckets and current.filter_key == filter_key:
+            current.state = state
+            return self.touch(state.node_id)
+
+        self.discard(state.node_id)
+        self._version += 1
+        entry = RouteEntry(
+            state=state,
+            version=self._version,
+            tenant_id=tenant_id,
+            trust_rank=TRUST_TIER_RANK.get(trust_tier, 0),
+            allowlist=compile_allowlist(allowlist),
+            buckets=buckets,
+            filter_key=filter_key,
+        )
+        self._entries[state.node_id] = entry
+        points = [ring_hash(f"{state.node_id}#{i}") for i in range(self.virtual_nodes)]
+        for bucket in buckets:
+            self._members.setdefault(bucket, set()).add(state.node_id)
+            ring = self._rings.setdefault(bucket, [])
+            for point in points:
+                bisect.insort(ring, (point, state.node_id))
+        self._push(entry)
+        return entry
+
+    def touch(self, node_id: str) -> RouteEntry | None:
+        """Re-key a node after its load or liveness changed."""
+        entry = self._entries.get(node_id)
+        if entry is None:
+            return None
+        self._version += 1
+        entry.version = self._version
+        self._push(entry)
+        return entry
+
+    def discard(self, node_id: str) -> RouteEntry | None:
+        entry = self._entries.pop(node_id, None)
+        if entry is None:
+            return None
+        for bucket in entry.buckets:
+            members = self._members.get(bucket)
+            if members is not None:
+                members.discard(node_id)
+                if not members:
+                    self._members.pop(bucket, None)
+                    self._heaps.pop(bucket, None)
+                    self._rings.pop(bucket, None)
+                    continue
+            ring = self._rings.get(bucket)
+            if ring is not None:
+                ring[:] = [point for point in ring if point[1] != node_id]
+        return entry
+
+    def _buckets_for(self, capability: str, tenant_id: str | None) -> list[tuple[str, str]]:
+        if not tenant_id:
+            return [(capability, ANY_TENANT)]
+        return [(capability, ""), (capability, tenant_id)]
+
+    def _push(self, entry: RouteEntry):
+        state = entry.state
+        item = (state.load_factor, -state.last_seen, entry.version, state.node_id)
+        for bucket in entry.buckets:
+            heap = self._heaps.setdefault(bucket, [])
+            heapq.heappush(heap, item)
+            if len(heap) > 4 * len(self._members.get(bucket, ())) + 64:
+                self._compact(bucket)
+
+    def _compact(self, bucket: tuple[str, str]):
+        heap = [
+            item
+            for item in self._heaps.get(bucket, [])
+            if (entry := self._entries.get(item[3])) is not None and entry.version == item[2]
+        ]
+        heapq.heapify(heap)
+        self._heaps[bucket] = heap
+
+    def _best_in(
+        self,
+        bucket: tuple[str, str],
+        accept: Callable[[RouteEntry], bool],
+    ) -> tuple[float, float, int, str] | None:
+        heap = self._heaps.get(bucket)
+        if not heap:
+            return None
+        skipped: list[tuple[float, float, int, str]] = []
+        found = None
+        while heap:
+            item = heap[0]
+            entry = self._entries.get(item[3])
+            if entry is None or entry.version != item[2]:
+                heapq.heappop(heap)
+                continue
+            if accept(entry):
+                found = item
+                break
+            skipped.append(heapq.heappop(heap))
+        for item in skipped:
+            heapq.heappush(heap, item)
+        return found
+
+    def least_loaded(
+        self,
+        capability: str,
+        tenant_id: str | None,
+        accept: Callable[[RouteEntry], bool],
+    ) -> RouteEntry | None:
+        """Lowest load factor, then freshest heartbeat, among accepted nodes."""
+        best = None
+        for bucket in self._buckets_for(capability, tenant_id):
+            item = self._best_in(bucket, accept)
+            if item is not None and (best is None or item < best):
+                best = item
+        return None if best is None else self._entries[best[3]]
+
+    def by_affinity(
+        self,
+        capability: str,
+        tenant_id: str | None,
+        affinity: str,
+        accept: Callable[[RouteEntry], bool],
+    ) -> RouteEntry | None:
+        """First accepted node clockwise from the affinity key on the hash ring."""
+        key = ring_hash(affinity)
+        best: tuple[int, str] | None = None
+        for bucket in self._buckets_for(capability, tenant_id):
+            ring = self._rings.get(bucket)
+            if not ring:
+                continue
+            checked: set[str] = set()
+            remaining = len(self._members.get(bucket, ()))
+            start = bisect.bisect_left(ring, (key, ""))
+            for offset in range(len(ring)):
+                if remaining <= 0:
+                    break
+                point, node_id = ring[(start + offset) % len(ring)]
+                distance = (point - key) % _RING_SPACE
+                if best is not None and distance >= best[0]:
+                    break
+                if node_id in checked:
+                    continue
+                checked.add(node_id)
+                remaining -= 1
+                entry = self._entries.get(node_id)
+                if entry is not None and accept(entry):
+                    best = (distance, node_id)
+                    break
+        return None if best is None else self._entries[best[1]]
+
+    def nodes_for(self, capability: str, tenant_id: str | None = None) -> list[NodeState]:
+        node_ids: set[str] = set()
+        for bucket in self._buckets_for(capability, tenant_id):
+            node_ids.update(self._members.get(bucket, ()))
+        return [self._entries[node_id].state for node_id in sorted(node_ids)]
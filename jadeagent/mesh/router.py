@@ -6,10 +6,9 @@ from __future__ import annotations
 
 import time
 from dataclasses import dataclass, field
-from fnmatch import fnmatch
 from typing import Any
 
-from ..governance import trust_tier_allows
+from .route_index import RouteEntry, RouteIndex
 
 
 @dataclass
@@ -33,30 +32,18 @@ class NodeState:
         return slots if slots > 0 else 0
 
 
-def _tenant_compatible(node_meta: dict[str, Any], tenant_id: str | None) -> bool:
-    if not tenant_id:
-        return True
-    node_tenant = str(node_meta.get("tenant_id", ""))
-    return node_tenant in ("", tenant_id)
-
-
-def _delegation_allowed(node_meta: dict[str, Any], requester: str | None) -> bool:
-    allowlist = node_meta.get("delegation_allowlist", [])
-    if not allowlist:
-        return True
-    if not requester:
-        return False
-    return any(fnmatch(str(requester), str(pattern)) for pattern in allowlist)
-
-
 class MeshRouter:
     """
     In-memory capability router for task placement.
+
+    Candidates are served from a RouteIndex that is updated on register,
+    heartbeat, assign and done, so routing does not scan the whole fleet.
     """
 
     def __init__(self, stale_after: float = 30.0):
         self.stale_after = stale_after
         self._nodes: dict[str, NodeState] = {}
+        self._index = RouteIndex()
 
     def register_node(
         self,
@@ -65,15 +52,18 @@ class MeshRouter:
         max_inflight: int = 4,
         metadata: dict[str, Any] | None = None,
     ):
-        self._nodes[node_id] = NodeState(
+        state = NodeState(
             node_id=node_id,
             capabilities=set(capabilities),
             max_inflight=max_inflight,
             metadata=dict(metadata or {}),
         )
+        self._nodes[node_id] = state
+        self._index.upsert(state)
 
     def unregister_node(self, node_id: str):
         self._nodes.pop(node_id, None)
+        self._index.discard(node_id)
 
     def update_heartbeat(self, node_id: str, queue_depth: int | None = None):
         state = self._nodes.get(node_id)
@@ -82,16 +72,19 @@ class MeshRouter:
         state.last_seen = time.time()
         if queue_depth is not None:
             state.queue_depth = max(queue_depth, 0)
+        self._index.touch(node_id)
 
     def mark_assigned(self, node_id: str):
         state = self._nodes.get(node_id)
         if state is not None:
             state.inflight += 1
+            self._index.touch(node_id)
 
     def mark_done(self, node_id: str):
         state = self._nodes.get(node_id)
         if state is not None and state.inflight > 0:
             state.inflight -= 1
+            self._index.touch(node_id)
 
     def route(
         self,
@@ -105,35 +98,18 @@ class MeshRouter:
         exclude = exclude or set()
         now = time.time()
 
-        candidates: list[NodeState] = []
-        for state in self._nodes.values():
-            if state.node_id in exclude:
-                continue
-            if capability not in state.capabilities:
-                continue
-            if now - state.last_seen > self.stale_after:
-                continue
-            if not _tenant_compatible(state.metadata, tenant_id):
-                continue
-            if not trust_tier_allows(str(state.metadata.get("trust_tier", "standard")), min_trust_tier):
-                continue
-            if not _delegation_allowed(state.metadata, requester):
-                continue
-            candidates.append(state)
-
-        if not candidates:
-            return None
+        def accept(entry: RouteEntry) -> bool:
+            return (
+                entry.node_id not in exclude
+                and now - entry.state.last_seen <= self.stale_after
+                and entry.allows(min_trust_tier, requester)
+            )
 
         if affinity:
-            ordered = sorted(candidates, key=lambda s: s.node_id)
-            idx = sum(ord(ch) for ch in affinity) % len(ordered)
-            return ordered[idx].node_id
-
-        def score(s: NodeState) -> tuple[float, float, str]:
-            freshness = -(now - s.last_seen)
-            return (-s.load_factor, freshness, s.node_id)
-
-        return max(candidates, key=score).node_id
+            chosen = self._index.by_affinity(capability, tenant_id, affinity, accept)
+        else:
+            chosen = self._index.least_loaded(capability, tenant_id, accept)
+        return None if chosen is None else chosen.node_id
 
     def snapshot(self) -> list[dict[str, Any]]:
         now = time.time()
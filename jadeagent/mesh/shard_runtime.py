@@ -7,7 +7,8 @@ from __future__ import annotations
 from typing import Any
 
 from .protocol import MeshTask
-from .reducer import ReducerNode, ReductionSummary, ShardSummary
+from .reducer import ReductionSummary, ShardSummary
+from .rollup import IncrementalReducer
 from .sharding import ShardAssignment, ShardDirectory
 from .supervisor import ShardSupervisor
 
@@ -24,6 +25,7 @@ class ShardRuntime:
     def __init__(self, directory: ShardDirectory | None = None):
         self.directory = directory or ShardDirectory()
         self._supervisors: dict[str, ShardSupervisor] = {}
+        self.rollup = IncrementalReducer()
 
     def register_supervisor(
         self,
@@ -46,9 +48,13 @@ class ShardRuntime:
             weight=weight,
             metadata=merged_metadata,
         )
+        supervisor.attach_rollup(self.rollup, region=str(merged_metadata.get("region", "")))
 
     def unregister_supervisor(self, supervisor_id: str):
-        self._supervisors.pop(supervisor_id, None)
+        supervisor = self._supervisors.pop(supervisor_id, None)
+        if supervisor is not None:
+            supervisor.attach_rollup(None)
+        self.rollup.remove_shard(supervisor_id)
         self.directory.unregister_supervisor(supervisor_id)
 
     def get_supervisor(self, supervisor_id: str) -> ShardSupervisor | None:
@@ -77,6 +83,19 @@ class ShardRuntime:
         await supervisor.submit(task)
         return assignment
 
+    async def submit_many(self, tasks: list[MeshTask]) -> list[ShardAssignment]:
+        """Submit a batch, placing each distinct tenant/capability shard once."""
+        assignments = self.directory.route_many((task.tenant_id, task.capability) for task in tasks)
+        for task, assignment in zip(tasks, assignments):
+            supervisor = self._supervisors.get(assignment.supervisor_id) if assignment else None
+            if assignment is None or supervisor is None:
+                raise LookupError(
+                    f"No shard supervisor available for tenant '{task.tenant_id}' "
+                    f"and capability '{task.capability}'."
+                )
+            await supervisor.submit(task)
+        return assignments
+
     async def run_until_idle(self, max_cycles_per_supervisor: int = 1000) -> dict[str, int]:
         cycles: dict[str, int] = {}
         for supervisor in sorted(self._supervisors.values(), key=lambda item: item.supervisor_id):
@@ -90,10 +109,13 @@ class ShardRuntime:
         ]
 
     def reduce(self, reducer_id: str = "root", *, region: str = "") -> ReductionSummary:
-        reducer = ReducerNode(reducer_id, region=region)
-        for summary in self.collect_shard_summaries():
-            reducer.ingest_shard(summary)
-        return reducer.reduce()
+        """Read the streaming rollup; supervisors keep it current as they work."""
+        return self.rollup.reduce(reducer_id, region=region)
+
+    def resync_rollup(self):
+        """Rebuild rollup baselines from full supervisor snapshots."""
+        for supervisor_id, supervisor in self._supervisors.items():
+            supervisor.attach_rollup(self.rollup, region=self.rollup.shard_region(supervisor_id))
 
     def snapshot(self) -> dict[str, Any]:
         return {
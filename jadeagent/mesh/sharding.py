@@ -6,25 +6,84 @@ from __future__ import annotations
 
 import hashlib
 import math
+from collections import OrderedDict
 from dataclasses import dataclass, field
-from typing import Any
+from functools import lru_cache
+from typing import Any, Iterable
 
 from .protocol import MeshTask
 
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - optional acceleration
+    np = None
+
 
 def shard_key(tenant_id: str, capability: str) -> str:
     tenant = tenant_id or "default"
     return f"{tenant}::{capability}"
 
 
+_MASK64 = (1 << 64) - 1
+_MIX1 = 0xBF58476D1CE4E5B9
+_MIX2 = 0x94D049BB133111EB
+
+
+@lru_cache(maxsize=65536)
+def _hash64(text: str) -> int:
+    """First 8 bytes of SHA-256; shard keys and supervisor ids are hashed once each."""
+    return int.from_bytes(hashlib.sha256(text.encode("utf-8")).digest()[:8], "big")
+
+
+def _mix64(value: int) -> int:
+    """SplitMix64 finalizer over a (key hash ^ supervisor hash) pair."""
+    value = ((value ^ (value >> 30)) * _MIX1) & _MASK64
+    value = ((value ^ (value >> 27)) * _MIX2) & _MASK64
+    return value ^ (value >> 31)
+
+
 def _rendezvous_score(key: str, supervisor_id: str, weight: float = 1.0) -> float:
-    digest = hashlib.sha256(f"{key}::{supervisor_id}".encode("utf-8")).digest()
-    raw = int.from_bytes(digest[:8], "big")
+    raw = _mix64(_hash64(key) ^ _hash64(supervisor_id))
     unit = (raw + 1) / float(2**64)
     effective_weight = max(float(weight), 1e-9)
     return effective_weight / -math.log(unit)
 
 
+def _rendezvous_scores(key: str, specs: list[SupervisorSpec]) -> list[float]:
+    """
+    Score one key against many supervisors, vectorized when NumPy is available.
+
+    The pair hash is integer arithmetic on uint64 (wrapping like the masked
+    Python ints of `_mix64`), so both paths produce the same raw values; only
+    the final float conversion can differ in the last bit.
+    """
+    if np is None or len(specs) < 8:
+        return [_rendezvous_score(key, spec.supervisor_id, spec.weight) for spec in specs]
+    value = np.fromiter((_hash64(spec.supervisor_id) for spec in specs), dtype=np.uint64, count=len(specs))
+    value ^= np.uint64(_hash64(key))
+    value = (value ^ (value >> np.uint64(30))) * np.uint64(_MIX1)
+    value = (value ^ (value >> np.uint64(27))) * np.uint64(_MIX2)
+    value ^= value >> np.uint64(31)
+    weights = np.maximum(np.array([spec.weight for spec in specs], dtype=np.float64), 1e-9)
+    scores = weights / -np.log((value.astype(np.float64) + 1.0) / float(2**64))
+    return scores.tolist()
+
+
+# Vectorized scores within this relative distance of the best are re-scored
+# exactly, so placement never depends on NumPy rounding.
+_NEAR_TIE_TOLERANCE = 1e-9
+
+
+def _rendezvous_winner(key: str, specs: list[SupervisorSpec]) -> tuple[int, float]:
+    """Index and exact score of the highest-scoring supervisor (first wins ties)."""
+    scores = _rendezvous_scores(key, specs)
+    top = max(scores)
+    near = [i for i, score in enumerate(scores) if score >= top * (1.0 - _NEAR_TIE_TOLERANCE)]
+    exact = {i: _rendezvous_score(key, specs[i].supervisor_id, specs[i].weight) for i in near}
+    best = max(near, key=exact.__getitem__)
+    return best, exact[best]
+
+
 @dataclass(frozen=True)
 class SupervisorSpec:
     supervisor_id: str
@@ -51,13 +110,43 @@ class ShardAssignment:
     score: float
 
 
+@dataclass(frozen=True)
+class ShardMove:
+    shard_key: str
+    tenant_id: str
+    capability: str
+    from_supervisor: str | None
+    to_supervisor: str | None
+
+
 class ShardDirectory:
     """
     Deterministic shard directory using rendezvous hashing.
+
+    Placements are cached per `(tenant_id, capability)` in an LRU of at most
+    `max_placements` keys, so steady-state routing is a dict lookup. Each
+    entry is tagged with the membership version it was computed under; a
+    register/unregister drops every cached assignment at once but keeps the
+    keys, which `known_shards` and `plan_rebalance` still report.
     """
 
-    def __init__(self):
+    def __init__(self, max_placements: int = 65536):
         self._supervisors: dict[str, SupervisorSpec] = {}
+        self._version = 0
+        self.max_placements = max(1, int(max_placements))
+        self._placements: OrderedDict[tuple[str, str], tuple[int, ShardAssignment | None] | None] = OrderedDict()
+        self._by_capability: dict[str, list[SupervisorSpec]] | None = None
+        self._wildcard: list[SupervisorSpec] = []
+
+    @property
+    def version(self) -> int:
+        """Membership version; bumps on every supervisor register/unregister."""
+        return self._version
+
+    def _membership_changed(self):
+        self._version += 1
+        self._by_capability = None
+        self._placements = OrderedDict.fromkeys(self._placements)
 
     def register_supervisor(
         self,
@@ -75,25 +164,34 @@ class ShardDirectory:
             weight=float(weight),
             metadata=dict(metadata or {}),
         )
+        self._membership_changed()
 
     def unregister_supervisor(self, supervisor_id: str):
-        self._supervisors.pop(supervisor_id, None)
+        if self._supervisors.pop(supervisor_id, None) is not None:
+            self._membership_changed()
 
-    def route(self, tenant_id: str, capability: str) -> ShardAssignment | None:
-        key = shard_key(tenant_id, capability)
-        best: tuple[float, SupervisorSpec] | None = None
+    def _candidates(self, tenant_id: str, capability: str) -> list[SupervisorSpec]:
+        if self._by_capability is None:
+            by_capability: dict[str, list[SupervisorSpec]] = {}
+            wildcard: list[SupervisorSpec] = []
+            for spec in self._supervisors.values():
+                if not spec.capabilities:
+                    wildcard.append(spec)
+                for item in spec.capabilities:
+                    by_capability.setdefault(item, []).append(spec)
+            self._by_capability = by_capability
+            self._wildcard = wildcard
+        specs = self._by_capability.get(capability, []) + self._wildcard
+        return [spec for spec in specs if spec.matches(tenant_id, capability)]
 
-        for spec in self._supervisors.values():
-            if not spec.matches(tenant_id, capability):
-                continue
-            score = _rendezvous_score(key, spec.supervisor_id, spec.weight)
-            if best is None or score > best[0]:
-                best = (score, spec)
-
-        if best is None:
+    def _place(self, tenant_id: str, capability: str) -> ShardAssignment | None:
+        key = shard_key(tenant_id, capability)
+        candidates = self._candidates(tenant_id, capability)
+        if not candidates:
             return None
 
-        score, spec = best
+        best, score = _rendezvous_winner(key, candidates)
+        spec = candidates[best]
         return ShardAssignment(
             shard_id=f"shard::{key}::{spec.supervisor_id}",
             shard_key=key,
@@ -103,9 +201,66 @@ class ShardDirectory:
             score=score,
         )
 
+    def route(self, tenant_id: str, capability: str) -> ShardAssignment | None:
+        key = (tenant_id, capability)
+        cached = self._placements.get(key)
+        if cached is not None and cached[0] == self._version:
+            self._placements.move_to_end(key)
+            return cached[1]
+        assignment = self._place(tenant_id, capability)
+        self._placements[key] = (self._version, assignment)
+        self._placements.move_to_end(key)
+        if len(self._placements) > self.max_placements:
+            self._placements.popitem(last=False)
+        return assignment
+
     def route_task(self, task: MeshTask) -> ShardAssignment | None:
         return self.route(task.tenant_id, task.capability)
 
+    def route_many(self, keys: Iterable[tuple[str, str]]) -> list[ShardAssignment | None]:
+        """Place a batch of `(tenant_id, capability)` keys, hashing each distinct key once."""
+        keys = list(keys)
+        resolved = {key: self.route(*key) for key in dict.fromkeys(keys)}
+        return [resolved[key] for key in keys]
+
+    def known_shards(self) -> list[tuple[str, str]]:
+        """`(tenant_id, capability)` keys this directory has placed, most recent `max_placements`."""
+        return sorted(self._placements)
+
+    def plan_rebalance(
+        self,
+        *,
+        join: Iterable[SupervisorSpec] = (),
+        leave: Iterable[str] = (),
+        keys: Iterable[tuple[str, str]] | None = None,
+    ) -> list[ShardMove]:
+        """
+        Report which shards would change owner if supervisors joined or left.
+
+        Nothing is mutated. `keys` defaults to every shard placed so far.
+        """
+        planned = ShardDirectory()
+        leaving = set(leave)
+        for spec in list(self._supervisors.values()) + list(join):
+            if spec.supervisor_id not in leaving:
+                planned._supervisors[spec.supervisor_id] = spec
+
+        moves: list[ShardMove] = []
+        for tenant_id, capability in (self.known_shards() if keys is None else list(keys)):
+            before = self.route(tenant_id, capability)
+            after = planned.route(tenant_id, capability)
+            before_id = before.supervisor_id if before else None
+            after_id = after.supervisor_id if after else None
+            if before_id != after_id:
+                moves.append(ShardMove(
+                    shard_key=shard_key(tenant_id, capability),
+                    tenant_id=tenant_id,
+                    capability=capability,
+                    from_supervisor=before_id,
+                    to_supervisor=after_id,
+                ))
+        return moves
+
     def snapshot(self) -> list[dict[str, Any]]:
         rows: list[dict[str, Any]] = []
         for spec in sorted(self._supervisors.values(), key=lambda item: item.supervisor_id):
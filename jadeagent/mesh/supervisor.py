@@ -12,8 +12,13 @@ from typing import Any
 
 from .async_node import AsyncMeshNode
 from .protocol import MeshTask, TaskResult
+from .reducer import ShardSummary
+from .rollup import ZERO, IncrementalReducer, ShardAggregate, worker_contribution
 from .worker_pool import LocalWorkerIndex, WorkerState
 
+_QUEUED = ShardAggregate(queued=1, queue_pressure=1.0)
+_DEQUEUED = -_QUEUED
+
 
 class ShardSupervisor:
     """
@@ -45,6 +50,33 @@ class ShardSupervisor:
         self._last_updated_at = time.time()
         self._seq = 0
         self._lock = asyncio.Lock()
+        self._rollup: IncrementalReducer | None = None
+
+    def attach_rollup(self, rollup: IncrementalReducer | None, *, region: str = ""):
+        """
+        Stream this shard's counter changes into `rollup`.
+
+        The current state is ingested once; after that every queue, worker and
+        event change is pushed as a delta so the rollup never rescans shards.
+        """
+        if self._rollup is not None and self._rollup is not rollup:
+            self._rollup.remove_shard(self.supervisor_id)
+        self._rollup = rollup
+        if rollup is not None:
+            rollup.ingest_shard(ShardSummary.from_supervisor_snapshot(self.snapshot()), region=region)
+
+    def _push(self, delta: ShardAggregate):
+        if self._rollup is not None:
+            self._rollup.push_delta(self.supervisor_id, delta)
+
+    def _push_worker_change(self, before: ShardAggregate, node_id: str):
+        if self._rollup is not None:
+            self._rollup.push_delta(self.supervisor_id, worker_contribution(self._worker_index.get(node_id)) - before)
+
+    def _worker_contribution(self, node_id: str) -> ShardAggregate:
+        if self._rollup is None:
+            return ZERO
+        return worker_contribution(self._worker_index.get(node_id))
 
     @property
     def dead_letter(self) -> dict[str, TaskResult]:
@@ -68,14 +100,19 @@ class ShardSupervisor:
         permits: int = 1,
         metadata: dict[str, Any] | None = None,
     ):
-        return self._worker_index.register_worker(
+        before = self._worker_contribution(worker.node_id)
+        state = self._worker_index.register_worker(
             worker=worker,
             permits=max(int(permits), 1),
             metadata=dict(metadata or {}),
         )
+        self._push_worker_change(before, worker.node_id)
+        return state
 
     def unregister_worker(self, node_id: str):
+        before = self._worker_contribution(node_id)
         self._worker_index.unregister_worker(node_id)
+        self._push_worker_change(before, node_id)
 
     def update_worker(
         self,
@@ -86,13 +123,16 @@ class ShardSupervisor:
         metadata: dict[str, Any] | None = None,
         merge_metadata: bool = True,
     ) -> WorkerState | None:
-        return self._worker_index.update_worker(
+        before = self._worker_contribution(node_id)
+        state = self._worker_index.update_worker(
             node_id,
             permits=permits,
             inflight=inflight,
             metadata=metadata,
             merge_metadata=merge_metadata,
         )
+        self._push_worker_change(before, node_id)
+        return state
 
     async def submit(self, task: MeshTask):
         if not self.matches(task):
@@ -102,11 +142,13 @@ class ShardSupervisor:
         async with self._lock:
             self._seq += 1
             heapq.heappush(self._ready, (-int(task.priority), self._seq, task))
+        self._push(_QUEUED)
         await self._emit("task_submitted", task, "task submitted to shard supervisor")
 
     async def _emit(self, event_type: str, task: MeshTask, message: str, metadata: dict[str, Any] | None = None):
         self._stats[event_type] += 1
         self._last_updated_at = time.time()
+        self._push(ShardAggregate(event_counts={event_type: 1}))
         if self.audit_sink is None:
             return
         record_fn = getattr(self.audit_sink, "record_event", None)
@@ -154,19 +196,27 @@ class ShardSupervisor:
                 heapq.heappush(self._ready, (-int(task.priority), self._seq, task))
             return False
 
-        if not self._worker_index.reserve(worker_state.worker.node_id):
+        node_id = worker_state.worker.node_id
+        before = self._worker_contribution(node_id)
+        if not self._worker_index.reserve(node_id):
             async with self._lock:
                 self._seq += 1
                 heapq.heappush(self._ready, (-int(task.priority), self._seq, task))
             return False
+        self._push(_DEQUEUED)
+        self._push_worker_change(before, node_id)
         self._attempts[task.task_id] = self._attempts.get(task.task_id, 0) + 1
         await self._emit("task_claimed", task, "task claimed by shard supervisor", {"worker_id": worker_state.worker.node_id})
         try:
             result = await worker_state.worker.execute_assigned_task(task)
         finally:
-            self._worker_index.release(worker_state.worker.node_id)
+            before = self._worker_contribution(node_id)
+            self._worker_index.release(node_id)
+            self._push_worker_change(before, node_id)
 
         if result.success:
+            if result.task_id not in self._completed:
+                self._push(ShardAggregate(completed=1))
             self._completed[result.task_id] = result
             await self._emit("task_completed", task, "task completed", {"worker_id": result.node_id})
             return True
@@ -177,6 +227,7 @@ class ShardSupervisor:
             async with self._lock:
                 self._seq += 1
                 heapq.heappush(self._retry, (ready_at, self._seq, task))
+            self._push(_QUEUED)
             await self._emit(
                 "task_failed",
                 task,
@@ -184,6 +235,8 @@ class ShardSupervisor:
                 {"worker_id": result.node_id, "retrying": True, "attempts": attempts},
             )
         else:
+            if result.task_id not in self._dead_letter:
+                self._push(ShardAggregate(dead_letter=1))
             self._dead_letter[result.task_id] = result
             await self._emit(
                 "task_failed",
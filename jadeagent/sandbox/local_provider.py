@@ -3,28 +3,60 @@ Local subprocess-based sandbox provider.
 
 This provider is useful for development and on-prem workers where each node
 owns an isolated environment/container.
+
+With ``pool_size > 0``, Python jobs run on warm pre-started interpreters
+(see `warm_pool`) instead of paying interpreter startup on every call.
 """
 
 from __future__ import annotations
 
 import subprocess
-from typing import Any
+from typing import Any, Sequence
 
 from .base import SandboxProvider, SandboxRunRequest, SandboxRunResult
+from .warm_pool import DEFAULT_PRELOAD_MODULES, InterpreterPool
 
 
 class SubprocessSandboxProvider(SandboxProvider):
-    """Execute tasks using local subprocess commands."""
+    """
+    Execute tasks using local subprocess commands.
+
+    Args:
+        default_shell: Shell used for shell-mode commands.
+        allow_shell_mode: Whether shell-mode requests are accepted.
+        python_executable: Interpreter for python-mode requests.
+        pool_size: Number of warm interpreters for python-mode requests.
+            0 starts a fresh interpreter per request.
+        max_uses_per_worker: Jobs a pooled interpreter serves before it is
+            replaced. Each job still runs in its own forked process, or on
+            platforms without fork, in a worker used only once.
+        preload_modules: Modules imported by pooled interpreters up front.
+        memory_limit_mb: Address-space limit for pooled interpreters and
+            their jobs (POSIX only).
+    """
 
     def __init__(
         self,
         default_shell: str = "bash",
         allow_shell_mode: bool = True,
         python_executable: str = "python",
+        pool_size: int = 0,
+        max_uses_per_worker: int = 100,
+        preload_modules: Sequence[str] = DEFAULT_PRELOAD_MODULES,
+        memory_limit_mb: int | None = None,
     ):
         self.default_shell = default_shell
         self.allow_shell_mode = allow_shell_mode
         self.python_executable = python_executable
+        self._pool: InterpreterPool | None = None
+        if pool_size > 0:
+            self._pool = InterpreterPool(
+                python_executable,
+                size=pool_size,
+                max_uses=max_uses_per_worker,
+                preload_modules=preload_modules,
+                memory_limit_mb=memory_limit_mb,
+            )
 
     @property
     def name(self) -> str:
@@ -38,6 +70,8 @@ class SubprocessSandboxProvider(SandboxProvider):
         )
 
         mode = request.mode.strip().lower()
+        if mode == "python" and self._pool is not None:
+            return self._run_pooled(request, result)
         if mode == "python":
             cmd = [self.python_executable, "-c", request.content]
             shell = False
@@ -92,3 +126,40 @@ class SubprocessSandboxProvider(SandboxProvider):
 
         return result
 
+
+    def _run_pooled(self, request: SandboxRunRequest, result: SandboxRunResult) -> SandboxRunResult:
+        timeout = max(float(request.timeout_seconds), 0.1)
+        try:
+            response, worker_pid = self._pool.run(request.content, request.workdir, timeout)
+        except Exception as exc:
+            result.finalize(
+                success=False,
+                exit_code=1,
+                error=str(exc),
+            )
+            return result
+
+        result.metadata["worker_pid"] = worker_pid
+        if response is None:
+            result.finalize(
+                success=False,
+                exit_code=124,
+                error=f"Timeout after {request.timeout_seconds}s.",
+            )
+            return result
+
+        exit_code = int(response.get("exit_code", 1))
+        result.finalize(
+            success=(exit_code == 0),
+            exit_code=exit_code,
+            stdout=response.get("stdout", ""),
+            stderr=response.get("stderr", ""),
+            error=None if exit_code == 0 else "Sandbox command failed.",
+        )
+        return result
+
+    def close(self):
+        """Stop pooled interpreters, if any."""
+        if self._pool is not None:
+            self._pool.close()
+            self._pool = None
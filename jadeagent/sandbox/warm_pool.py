@@ -0,0 +1,318 @@
+"""
+Warm interpreter pool for the subprocess sandbox provider.
+
+Each pooled worker is a Python interpreter started ahead of time with common
+modules already imported. Jobs are sent to a worker as JSON lines over stdin
+and results come back on stdout.
+
+Isolation matches a fresh ``python -c`` per job:
+
+- Where ``os.fork`` exists, a worker never runs job code itself. Each job
+  runs in a fresh fork of the warm worker, which starts from the clean
+  preloaded state and is discarded afterwards. The worker is replaced
+  after ``max_uses`` jobs.
+- Elsewhere, a worker runs exactly one job in-process and then exits, and
+  the pool starts its replacement in the background.
+
+A job that times out kills its worker, together with any forked child, and
+the pool replaces the worker.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import os
+import queue
+import signal
+import subprocess
+import threading
+from typing import Any, Sequence
+
+logger = logging.getLogger("jadeagent.sandbox")
+
+DEFAULT_PRELOAD_MODULES = (
+    "collections",
+    "datetime",
+    "decimal",
+    "functools",
+    "itertools",
+    "json",
+    "math",
+    "random",
+    "re",
+    "statistics",
+    "string",
+    "textwrap",
+    "traceback",
+)
+
+# Time a cold worker may take to import its preload modules and report ready.
+WORKER_STARTUP_TIMEOUT = 30.0
+
+_WORKER_SOURCE = r'''
+import json, os, sys, tempfile, traceback
+
+config = json.loads(sys.argv[1])
+for name in config["preload"]:
+    try:
+        __import__(name)
+    except Exception:
+        pass
+if config.get("memory_limit_mb"):
+    try:
+        import resource
+        limit = int(config["memory_limit_mb"]) * 1024 * 1024
+        resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
+    except (ImportError, ValueError, OSError):
+        pass
+
+proto_in = os.fdopen(os.dup(0), "r", encoding="utf-8")
+proto_out = os.fdopen(os.dup(1), "w", encoding="utf-8")
+os.dup2(os.open(os.devnull, os.O_RDONLY), 0)
+sys.argv = ["-c"]
+can_fork = hasattr(os, "fork")
+
+
+def send(message):
+    proto_out.write(json.dumps(message) + "\n")
+    proto_out.flush()
+
+
+def execute(job, out, err):
+    os.dup2(out.fileno(), 1)
+    os.dup2(err.fileno(), 2)
+    status = 1
+    try:
+        if job.get("workdir"):
+            os.chdir(job["workdir"])
+        namespace = {"__name__": "__main__", "__builtins__": __builtins__}
+        exec(compile(job["code"], "<string>", "exec"), namespace)
+        status = 0
+    except SystemExit as exc:
+        if exc.code is None:
+            status = 0
+        elif isinstance(exc.code, int):
+            status = exc.code
+        else:
+            print(exc.code, file=sys.stderr)
+    except BaseException as exc:
+        traceback.print_exception(type(exc), exc, exc.__traceback__.tb_next)
+    finally:
+        for stream in (sys.stdout, sys.stderr):
+            try:
+                stream.flush()
+            except Exception:
+                pass
+    return status & 0xFF
+
+
+def exit_code(status):
+    if os.WIFSIGNALED(status):
+        return -os.WTERMSIG(status)
+    return os.WEXITSTATUS(status)
+
+
+send({"ready": True, "fork": can_fork})
+for line in proto_in:
+    job = json.loads(line)
+    out = tempfile.TemporaryFile()
+    err = tempfile.TemporaryFile()
+    if can_fork:
+        pid = os.fork()
+        if pid == 0:
+            os.close(proto_in.fileno())
+            os.close(proto_out.fileno())
+            status = 1
+            try:
+                status = execute(job, out, err)
+            finally:
+                os._exit(status)
+        code = exit_code(os.waitpid(pid, 0)[1])
+    else:
+        code = execute(job, out, err)
+    out.seek(0)
+    err.seek(0)
+    send({
+        "exit_code": code,
+        "stdout": out.read().decode("utf-8", "replace"),
+        "stderr": err.read().decode("utf-8", "replace"),
+    })
+    if not can_fork:
+        break
+'''
+
+
+class PooledInterpreter:
+    """One warm worker process and the thread reading its responses."""
+
+    def __init__(
+        self,
+        python_executable: str,
+        preload_modules: Sequence[str],
+        memory_limit_mb: int | None = None,
+    ):
+        config = {"preload": list(preload_modules), "memory_limit_mb": memory_limit_mb}
+        self.process = subprocess.Popen(
+            [python_executable, "-c", _WORKER_SOURCE, json.dumps(config)],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+            text=True,
+            encoding="utf-8",
+            bufsize=1,
+            start_new_session=(os.name == "posix"),
+        )
+        self.uses = 0
+        self.forks: bool | None = None
+        self._responses: queue.Queue[dict | None] = queue.Queue()
+        threading.Thread(
+            target=self._read_responses, name=f"sandbox-worker-{self.process.pid}", daemon=True,
+        ).start()
+
+    @property
+    def pid(self) -> int:
+        return self.process.pid
+
+    def _read_responses(self):
+        try:
+            for line in self.process.stdout:
+                try:
+                    self._responses.put(json.loads(line))
+                except json.JSONDecodeError:
+                    logger.warning("Ignoring malformed sandbox worker output: %s", line[:200])
+        except (OSError, ValueError):
+            pass
+        self._responses.put(None)
+
+    def _next_response(self, timeout: float) -> dict | None:
+        """Next message from the worker; raises queue.Empty on timeout, None on exit."""
+        return self._responses.get(timeout=timeout)
+
+    def wait_ready(self, timeout: float = WORKER_STARTUP_TIMEOUT) -> bool:
+        if self.forks is not None:
+            return True
+        try:
+            message = self._next_response(timeout)
+        except queue.Empty:
+            return False
+        if not message or not message.get("ready"):
+            return False
+        self.forks = bool(message.get("fork"))
+        return True
+
+    def run(self, code: str, workdir: str | None, timeout: float) -> dict[str, Any] | None:
+        """
+        Run one job. Returns the worker's response, or None if it timed out.
+
+        Raises:
+            RuntimeError: If the worker died before answering.
+        """
+        self.uses += 1
+        try:
+            self.process.stdin.write(json.dumps({"code": code, "workdir": workdir}) + "\n")
+            self.process.stdin.flush()
+        except (BrokenPipeError, OSError, ValueError) as exc:
+            raise RuntimeError(f"Sandbox worker is not accepting jobs: {exc}") from None
+        try:
+            message = self._next_response(timeout)
+        except queue.Empty:
+            return None
+        if message is None:
+            raise RuntimeError(f"Sandbox worker exited with code {self.process.wait()}.")
+        return message
+
+    def kill(self):
+        if self.process.poll() is None:
+            try:
+                if os.name == "posix":
+                    os.killpg(self.process.pid, signal.SIGKILL)
+                else:
+                    self.process.kill()
+            except OSError:
+                pass
+        for stream in (self.process.stdin, self.process.stdout):
+            try:
+                stream.close()
+            except (OSError, ValueError):
+                pass
+        try:
+            self.process.wait(timeout=5)
+        except subprocess.TimeoutExpired:
+            pass
+
+
+class InterpreterPool:
+    """
+    Fixed-size pool of warm interpreters.
+
+    `run()` blocks until a worker is free, so `size` also bounds how many
+    jobs execute at once. Workers are replaced after `max_uses` jobs, after
+    a timeout, or after dying; replacements start warming immediately.
+    """
+
+    def __init__(
+        self,
+        python_executable: str,
+        size: int,
+        max_uses: int = 100,
+        preload_modules: Sequence[str] = DEFAULT_PRELOAD_MODULES,
+        memory_limit_mb: int | None = None,
+    ):
+        if size < 1:
+            raise ValueError("pool size must be at least 1")
+        self.python_executable = python_executable
+        self.size = int(size)
+        self.max_uses = max(1, int(max_uses))
+        self.preload_modules = tuple(preload_modules)
+        self.memory_limit_mb = memory_limit_mb
+        self._lock = threading.Lock()
+        self._closed = False
+        self._idle: queue.Queue[PooledInterpreter] = queue.Queue()
+        self._workers: set[PooledInterpreter] = set()
+        for _ in range(self.size):
+            self._idle.put(self._spawn())
+
+    def _spawn(self) -> PooledInterpreter:
+        worker = PooledInterpreter(self.python_executable, self.preload_modules, self.memory_limit_mb)
+        with self._lock:
+            self._workers.add(worker)
+        return worker
+
+    def _retire(self, worker: PooledInterpreter):
+        worker.kill()
+        with self._lock:
+            self._workers.discard(worker)
+            closed = self._closed
+        if not closed:
+            self._idle.put(self._spawn())
+
+    def run(self, code: str, workdir: str | None, timeout: float) -> tuple[dict[str, Any] | None, int]:
+        """
+        Run `code` on a warm worker.
+
+        Returns:
+            ``(response, worker_pid)``; `response` is None on timeout.
+        """
+        if self._closed:
+            raise RuntimeError("Interpreter pool is closed.")
+        worker = self._idle.get()
+        reusable = False
+        try:
+            if not worker.wait_ready():
+                raise RuntimeError(f"Sandbox worker failed to start (exit code {worker.process.poll()}).")
+            response = worker.run(code, workdir, timeout)
+            reusable = response is not None and worker.forks and worker.uses < self.max_uses
+            return response, worker.pid
+        finally:
+            if reusable and not self._closed:
+                self._idle.put(worker)
+            else:
+                self._retire(worker)
+
+    def close(self):
+        with self._lock:
+            self._closed = True
+            workers, self._workers = list(self._workers), set()
+        for worker in workers:
+            worker.kill()
@@ -5,6 +5,11 @@ Saves agent-generated tools as Python files on disk,
 indexes them by name/description, and retrieves by
 keyword similarity for reuse in future tasks.
 
+Loaded skill modules are cached and only re-imported when their file
+changes, and keyword search runs over a persisted inverted index that is
+updated as skills are saved or removed. With an embedder, keyword hits
+are reranked by embedding similarity.
+
 Inspired by Voyager (NeurIPS 2023) skill library.
 
 Example:
@@ -15,6 +20,7 @@ Example:
 
 from __future__ import annotations
 
+import hashlib
 import importlib.util
 import json
 import logging
@@ -31,6 +37,11 @@ logger = logging.getLogger("jadeagent.skills")
 # Default skill storage path
 DEFAULT_SKILLS_DIR = os.path.expanduser("~/.jadeagent/skills")
 INDEX_FILE = "skills_index.json"
+SEARCH_INDEX_FILE = "skills_search.json"
+
+# Keyword weights: a query word matching the skill name counts more.
+NAME_WEIGHT = 3
+DESCRIPTION_WEIGHT = 1
 
 
 class SkillLibrary:
@@ -42,6 +53,10 @@ class SkillLibrary:
 
     Args:
         path: Directory to store skill files. Created if missing.
+        embedder: Optional sentence embedder (anything with
+            ``encode(texts, convert_to_numpy=True)``). When set, search
+            reranks keyword candidates by cosine similarity to the query,
+            and falls back to pure embedding search when no keyword matches.
 
     Example:
         lib = SkillLibrary()
@@ -59,15 +74,27 @@ class SkillLibrary:
         result = tools[0].execute({"text": "hello"})  # → "olleh"
     """
 
-    def __init__(self, path: str | None = None):
+    def __init__(self, path: str | None = None, embedder: Any | None = None):
         self.path = Path(path or DEFAULT_SKILLS_DIR).expanduser()
         self.path.mkdir(parents=True, exist_ok=True)
+        self.embedder = embedder
         self._index: dict[str, dict] = {}
+        # name -> ((mtime_ns, size), sha256 of source, Tool)
+        self._modules: dict[str, tuple[tuple[int, int], str, Tool]] = {}
+        # term -> {skill name: weight}, and the reverse for incremental updates
+        self._postings: dict[str, dict[str, int]] = {}
+        self._doc_terms: dict[str, dict[str, int]] = {}
+        # name -> (description hash, embedding)
+        self._embeddings: dict[str, tuple[str, Any]] = {}
         self._load_index()
+        self._load_search_index()
 
     def _index_path(self) -> Path:
         return self.path / INDEX_FILE
 
+    def _search_index_path(self) -> Path:
+        return self.path / SEARCH_INDEX_FILE
+
     def _load_index(self):
         """Load the skill index from disk."""
         idx_path = self._index_path()
@@ -87,6 +114,67 @@ class SkillLibrary:
             json.dumps(self._index, indent=2, ensure_ascii=False),
             encoding="utf-8",
         )
+        self._save_search_index()
+
+    def _index_fingerprint(self) -> list[int]:
+        try:
+            stat = self._index_path().stat()
+        except OSError:
+            return [0, 0]
+        return [stat.st_mtime_ns, stat.st_size]
+
+    def _load_search_index(self):
+        """Load the persisted search index, rebuilding it if the skill index changed."""
+        search_path = self._search_index_path()
+        if search_path.exists():
+            try:
+                data = json.loads(search_path.read_text(encoding="utf-8"))
+                if data.get("fingerprint") == self._index_fingerprint():
+                    self._doc_terms = data["doc_terms"]
+                    self._postings = {}
+                    for name, terms in self._doc_terms.items():
+                        for term, weight in terms.items():
+                            self._postings.setdefault(term, {})[name] = weight
+                    return
+            except (json.JSONDecodeError, OSError, KeyError, AttributeError) as e:
+                logger.warning(f"Failed to load skill search index: {e}")
+
+        self._postings = {}
+        self._doc_terms = {}
+        for name, info in self._index.items():
+            self._index_skill(name, info)
+        if self._index:
+            self._save_search_index()
+
+    def _save_search_index(self):
+        self._search_index_path().write_text(
+            json.dumps({"fingerprint": self._index_fingerprint(), "doc_terms": self._doc_terms}, ensure_ascii=False),
+            encoding="utf-8",
+        )
+
+    def _skill_terms(self, name: str, info: dict) -> dict[str, int]:
+        terms: dict[str, int] = {}
+        for term in set(self._normalize(name).split()):
+            terms[term] = terms.get(term, 0) + NAME_WEIGHT
+        for term in set(self._normalize(info.get("description", "")).split()):
+            terms[term] = terms.get(term, 0) + DESCRIPTION_WEIGHT
+        return terms
+
+    def _index_skill(self, name: str, info: dict):
+        self._unindex_skill(name)
+        terms = self._skill_terms(name, info)
+        self._doc_terms[name] = terms
+        for term, weight in terms.items():
+            self._postings.setdefault(term, {})[name] = weight
+
+    def _unindex_skill(self, name: str):
+        for term in self._doc_terms.pop(name, {}):
+            postings = self._postings.get(term)
+            if postings is None:
+                continue
+            postings.pop(name, None)
+            if not postings:
+                del self._postings[term]
 
     def save(
         self,
@@ -135,6 +223,7 @@ class SkillLibrary:
             full_code = header + code
 
         skill_file.write_text(full_code, encoding="utf-8")
+        self._modules.pop(name, None)
 
         # Update index
         self._index[name] = {
@@ -143,6 +232,7 @@ class SkillLibrary:
             "file": f"{name}.py",
             "parameters": parameters or {},
         }
+        self._index_skill(name, self._index[name])
         self._save_index()
 
         logger.info(f"Saved skill: {name}")
@@ -151,16 +241,38 @@ class SkillLibrary:
         return self._load_skill(name)
 
     def _load_skill(self, name: str) -> Tool:
-        """Load a single skill from disk and return as Tool."""
+        """
+        Load a single skill and return it as a Tool.
+
+        The module is imported once and cached; it is imported again only
+        when the file's mtime/size change and its content hash differs.
+        """
         if name not in self._index:
             raise KeyError(f"Skill '{name}' not found in index")
 
         info = self._index[name]
         skill_file = self.path / info["file"]
 
-        if not skill_file.exists():
+        try:
+            stat = skill_file.stat()
+        except FileNotFoundError:
+            self._modules.pop(name, None)
             raise FileNotFoundError(f"Skill file not found: {skill_file}")
 
+        signature = (stat.st_mtime_ns, stat.st_size)
+        cached = self._modules.get(name)
+        if cached is not None and cached[0] == signature:
+            return cached[2]
+        digest = hashlib.sha256(skill_file.read_bytes()).hexdigest()
+        if cached is not None and cached[1] == digest:
+            self._modules[name] = (signature, digest, cached[2])
+            return cached[2]
+
+        tool = self._import_skill(name, info, skill_file)
+        self._modules[name] = (signature, digest, tool)
+        return tool
+
+    def _import_skill(self, name: str, info: dict, skill_file: Path) -> Tool:
         # Dynamically import the module
         spec = importlib.util.spec_from_file_location(
             f"jadeagent_skill_{name}", str(skill_file)
@@ -202,16 +314,20 @@ class SkillLibrary:
             logger.warning(f"Failed to get skill '{name}': {e}")
             return None
 
-    def search(self, query: str, top_k: int = 5) -> list[Tool]:
+    def search(self, query: str, top_k: int = 5, rerank: bool | None = None) -> list[Tool]:
         """
         Search for skills matching a query.
 
-        Uses keyword overlap scoring on skill names and descriptions.
-        Returns up to top_k matching tools, sorted by relevance.
+        Uses keyword overlap scoring on skill names and descriptions,
+        read from the inverted index so only skills sharing a word with
+        the query are scored. Returns up to top_k matching tools, sorted
+        by relevance.
 
         Args:
             query: Natural language description of needed skill.
             top_k: Maximum number of results.
+            rerank: Rerank keyword candidates with the embedder. Defaults
+                to True when the library has one.
 
         Returns:
             List of matching Tool objects.
@@ -219,33 +335,50 @@ class SkillLibrary:
         if not self._index:
             return []
 
-        query_words = set(self._normalize(query).split())
-        scored = []
-
-        for name, info in self._index.items():
-            # Score by keyword overlap
-            desc_words = set(self._normalize(info["description"]).split())
-            name_words = set(self._normalize(name).split("_"))
+        scores: dict[str, int] = {}
+        for word in set(self._normalize(query).split()):
+            for name, weight in self._postings.get(word, {}).items():
+                scores[name] = scores.get(name, 0) + weight
 
-            # Name match is worth more
-            name_overlap = len(query_words & name_words)
-            desc_overlap = len(query_words & desc_words)
-            score = name_overlap * 3 + desc_overlap
+        # Sort by score descending; name match is worth more
+        scored = sorted(((score, name) for name, score in scores.items()), reverse=True)
+        names = [name for _, name in scored]
 
-            if score > 0:
-                scored.append((score, name))
-
-        # Sort by score descending
-        scored.sort(reverse=True)
+        if self.embedder is not None and (rerank is None or rerank):
+            candidates = names[:max(top_k * 4, top_k)] or list(self._index)
+            names = self._rerank(query, candidates)
 
         tools = []
-        for _, name in scored[:top_k]:
+        for name in names[:top_k]:
             tool = self.get(name)
             if tool:
                 tools.append(tool)
 
         return tools
 
+    def _rerank(self, query: str, names: list[str]) -> list[str]:
+        """Order `names` by cosine similarity of their descriptions to `query`."""
+        import numpy as np
+
+        missing = []
+        for name in names:
+            description = self._index[name]["description"]
+            key = hashlib.sha256(f"{name}\n{description}".encode("utf-8")).hexdigest()
+            cached = self._embeddings.get(name)
+            if cached is None or cached[0] != key:
+                missing.append((name, key, f"{name.replace('_', ' ')}: {description}"))
+        if missing:
+            vectors = self.embedder.encode([text for _, _, text in missing], convert_to_numpy=True)
+            for (name, key, _), vector in zip(missing, vectors):
+                self._embeddings[name] = (key, np.asarray(vector, dtype=np.float32))
+
+        query_vector = np.asarray(self.embedder.encode([query], convert_to_numpy=True)[0], dtype=np.float32)
+        matrix = np.stack([self._embeddings[name][1] for name in names])
+        norms = np.linalg.norm(matrix, axis=1) * (np.linalg.norm(query_vector) or 1.0)
+        similarity = (matrix @ query_vector) / np.where(norms == 0, 1.0, norms)
+        order = sorted(range(len(names)), key=lambda i: -similarity[i])  # stable: keyword order breaks ties
+        return [names[i] for i in order]
+
     @staticmethod
     def _normalize(text: str) -> str:
         """Normalize text for keyword matching."""
@@ -276,6 +409,9 @@ class SkillLibrary:
             if skill_file.exists():
                 skill_file.unlink()
             del self._index[name]
+            self._modules.pop(name, None)
+            self._embeddings.pop(name, None)
+            self._unindex_skill(name)
             self._save_index()
             logger.info(f"Removed skill: {name}")
 
@@ -12,42 +12,96 @@ from .artifact import (
     load_jgx,
     write_jgx,
 )
+from .blobs import BlobStore, FileBlobStore
+from .codec import RecordCodec, decode_record, get_codec
 from .compatibility import CompatibilityReport, validate_restore_compatibility
 from .events import JadeStateEvent
-from .integrity import event_chain_hash, find_secret_paths, redact_secrets, snapshot_hashes, verify_capsule
+from .integrity import (
+    ChainRecord,
+    chain_record,
+    event_chain_hash,
+    find_secret_paths,
+    redact_secrets,
+    snapshot_hashes,
+    verify_capsule,
+    verify_run,
+)
 from .manifest import JadeStateManifest, canonical_json_hash, fingerprint_mapping
+from .packed import (
+    PackedCapsule,
+    PackedCapsuleWriter,
+    append_packed_jgx,
+    is_packed_jgx,
+    open_packed_jgx,
+    pack_jgx,
+    unpack_jgx,
+)
+from .retention import GcReport, RetentionPolicy, SnapshotInfo, collect_garbage, compact_run, keep_checkpoint_chains
+from .segments import EventSegment, SegmentedEventLog
 from .snapshot import (
     AgentRuntimeSnapshot,
     GraphRuntimeSnapshot,
     MeshRuntimeSnapshot,
     SessionSnapshot,
 )
-from .sqlite_store import SqliteStateStore
+from .sharded_store import ShardedBlobStore, ShardedSqliteStateStore
+from .sqlite_store import SqliteBlobStore, SqliteStateStore
 from .store import FileStateStore, InMemoryStateStore, StateStore
+from .view import CapsuleView, DirectoryCapsuleView, MemoryCapsuleView, SqliteCapsuleView
 
 __all__ = [
     "JGX_MAGIC",
     "AgentRuntimeSnapshot",
+    "BlobStore",
+    "CapsuleView",
+    "ChainRecord",
     "CompatibilityReport",
+    "DirectoryCapsuleView",
+    "EventSegment",
+    "FileBlobStore",
     "FileStateStore",
+    "GcReport",
     "GraphRuntimeSnapshot",
     "InMemoryStateStore",
     "JadeExecutionCapsule",
     "JadeStateEvent",
     "JadeStateManifest",
+    "MemoryCapsuleView",
     "MeshRuntimeSnapshot",
+    "PackedCapsule",
+    "PackedCapsuleWriter",
+    "RecordCodec",
+    "RetentionPolicy",
+    "SegmentedEventLog",
     "SessionSnapshot",
+    "SnapshotInfo",
+    "ShardedBlobStore",
+    "ShardedSqliteStateStore",
+    "SqliteBlobStore",
+    "SqliteCapsuleView",
     "SqliteStateStore",
     "StateStore",
+    "append_packed_jgx",
     "canonical_json_hash",
+    "chain_record",
+    "collect_garbage",
+    "compact_run",
+    "decode_record",
     "event_chain_hash",
     "find_secret_paths",
     "fingerprint_mapping",
+    "get_codec",
     "inspect_jgx",
+    "is_packed_jgx",
+    "keep_checkpoint_chains",
     "load_jgx",
+    "open_packed_jgx",
+    "pack_jgx",
     "redact_secrets",
     "snapshot_hashes",
+    "unpack_jgx",
     "validate_restore_compatibility",
     "verify_capsule",
+    "verify_run",
     "write_jgx",
 ]
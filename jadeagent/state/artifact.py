@@ -4,14 +4,19 @@ from __future__ import annotations
 
 import json
 import os
+import shutil
 from dataclasses import dataclass, field
 from pathlib import Path
-from typing import Any
+from typing import TYPE_CHECKING, Any
 
 from .events import JadeStateEvent
-from .manifest import JGX_MAGIC, JadeStateManifest
+from .manifest import JGX_MAGIC, JadeStateManifest, base_schema_version
 from .snapshot import AgentRuntimeSnapshot
 
+if TYPE_CHECKING:
+    from .blobs import BlobStore
+    from .view import CapsuleView
+
 
 def _write_json(path: Path, data: dict[str, Any]) -> None:
     path.parent.mkdir(parents=True, exist_ok=True)
@@ -67,6 +72,13 @@ class JadeExecutionCapsule:
                     return snapshot
         return self.snapshots[-1]
 
+    def view(self) -> "CapsuleView":
+        """Wrap this capsule in the lazy CapsuleView interface."""
+
+        from .view import MemoryCapsuleView
+
+        return MemoryCapsuleView(self)
+
     def to_directory(self, path: str | Path) -> Path:
         root = Path(path)
         root.mkdir(parents=True, exist_ok=True)
@@ -77,11 +89,15 @@ class JadeExecutionCapsule:
             _write_json(root / "snapshots" / f"{snapshot.snapshot_id}.json", snapshot.to_dict())
             self.manifest.latest_snapshot_id = snapshot.snapshot_id
         self.manifest.touch()
+        # Directory capsules are plain JSON whichever record codec the source store used.
+        self.manifest.schema_version = base_schema_version(self.manifest.schema_version)
         _write_json(root / "manifest.json", self.manifest.to_dict())
 
         events_path = root / "events.jsonl"
         if events_path.exists():
             events_path.unlink()
+        if (root / "events").is_dir():
+            shutil.rmtree(root / "events")
         for event in self.events:
             _append_jsonl(events_path, event.to_dict())
 
@@ -91,16 +107,22 @@ class JadeExecutionCapsule:
         return root
 
     @classmethod
-    def from_directory(cls, path: str | Path) -> "JadeExecutionCapsule":
+    def from_directory(cls, path: str | Path, *, blobs: "BlobStore | None" = None) -> "JadeExecutionCapsule":
+        """Load a .jgx directory, resolving blob references from `blobs` or the run's store."""
+
+        from .blobs import directory_blob_resolver, rehydrate
+        from .segments import SegmentedEventLog
+
         root = Path(path)
+        resolve = directory_blob_resolver(root, blobs)
         manifest = JadeStateManifest.from_dict(_read_json(root / "manifest.json"))
         snapshots = [
-            AgentRuntimeSnapshot.from_dict(_read_json(snapshot_path))
+            AgentRuntimeSnapshot.from_dict(rehydrate(_read_json(snapshot_path), resolve))
             for snapshot_path in sorted((root / "snapshots").glob("*.json"))
         ]
         events = [
-            JadeStateEvent.from_dict(row)
-            for row in _read_jsonl(root / "events.jsonl")
+            JadeStateEvent.from_dict(rehydrate(row, resolve))
+            for row in SegmentedEventLog(root).read()
         ]
         payloads = {
             payload_path.name: payload_path.read_bytes()
@@ -130,19 +152,33 @@ class JadeExecutionCapsule:
         }
 
 
-def write_jgx(path: str | Path, capsule: JadeExecutionCapsule) -> Path:
-    """Write a .jgx directory capsule."""
+def write_jgx(path: str | Path, capsule: JadeExecutionCapsule, *, packed: bool = False) -> Path:
+    """Write a .jgx capsule as a directory, or as a single packed file."""
+
+    if packed:
+        from .packed import pack_jgx
 
+        return pack_jgx(capsule, path)
     return capsule.to_directory(path)
 
 
 def load_jgx(path: str | Path) -> JadeExecutionCapsule:
-    """Load a .jgx directory capsule."""
+    """Load a .jgx directory or packed capsule."""
 
+    from .packed import PackedCapsule, is_packed_jgx
+
+    if is_packed_jgx(path):
+        with PackedCapsule(path) as packed:
+            return packed.to_capsule()
     return JadeExecutionCapsule.from_directory(path)
 
 
 def inspect_jgx(path: str | Path) -> dict[str, Any]:
     """Return lightweight metadata for a .jgx capsule."""
 
+    from .packed import PackedCapsule, is_packed_jgx
+
+    if is_packed_jgx(path):
+        with PackedCapsule(path) as packed:
+            return packed.inspect()
     return load_jgx(path).inspect()
@@ -0,0 +1,228 @@
+"""Content-addressed blob storage for large strings in events and snapshots.
+
+Tool outputs and chat messages are often recorded several times per run: inline
+in a ``tool_result_recorded`` event, again as the next snapshot's
+``last_observation``, and again in every later snapshot's message list. Stores
+move strings of at least ``blob_threshold`` characters into a shared
+`BlobStore` keyed by the SHA-256 of their UTF-8 bytes, and keep a small
+reference in their place::
+
+    {"$jgx_blob": "<sha256>", "size": 18231}
+
+Identical strings share one blob, within a run and across runs. Stores replace
+references with the original strings on read, so callers never see them.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import os
+import tempfile
+import threading
+import zlib
+from abc import ABC, abstractmethod
+from pathlib import Path
+from typing import Any, Callable, Iterator
+
+
+BLOB_REF_KEY = "$jgx_blob"
+BLOB_DIR = "blobs"
+DEFAULT_BLOB_THRESHOLD = 4096
+
+
+def blob_digest(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+def is_blob_ref(value: Any) -> bool:
+    return isinstance(value, dict) and len(value) == 2 and isinstance(value.get(BLOB_REF_KEY), str) and "size" in value
+
+
+def externalize(value: Any, put: Callable[[bytes], str], threshold: int) -> Any:
+    """Return a copy of `value` with strings of `threshold`+ characters replaced by blob references."""
+
+    if isinstance(value, str):
+        if len(value) < threshold:
+            return value
+        data = value.encode("utf-8")
+        return {BLOB_REF_KEY: put(data), "size": len(data)}
+    if isinstance(value, dict):
+        return {key: externalize(item, put, threshold) for key, item in value.items()}
+    if isinstance(value, list):
+        return [externalize(item, put, threshold) for item in value]
+    return value
+
+
+def rehydrate(value: Any, get: Callable[[str], bytes]) -> Any:
+    """Return a copy of `value` with blob references replaced by their strings."""
+
+    if isinstance(value, dict):
+        if is_blob_ref(value):
+            return get(value[BLOB_REF_KEY]).decode("utf-8")
+        return {key: rehydrate(item, get) for key, item in value.items()}
+    if isinstance(value, list):
+        return [rehydrate(item, get) for item in value]
+    return value
+
+
+def blob_refs(value: Any) -> set[str]:
+    """Digests of every blob referenced inside `value`."""
+
+    found: set[str] = set()
+    stack = [value]
+    while stack:
+        item = stack.pop()
+        if is_blob_ref(item):
+            found.add(item[BLOB_REF_KEY])
+        elif isinstance(item, dict):
+            stack.extend(item.values())
+        elif isinstance(item, list):
+            stack.extend(item)
+    return found
+
+
+class BlobStore(ABC):
+    """Deduplicating byte store keyed by SHA-256 digest."""
+
+    @abstractmethod
+    def put(self, data: bytes) -> str:
+        """Store `data` once and return its digest."""
+
+    @abstractmethod
+    def get(self, digest: str) -> bytes:
+        """Return the bytes for `digest`; raises KeyError when missing."""
+
+    @abstractmethod
+    def has(self, digest: str) -> bool:
+        ...
+
+    @abstractmethod
+    def digests(self) -> Iterator[str]:
+        ...
+
+    @abstractmethod
+    def stored_size(self, digest: str) -> int:
+        """Bytes `digest` occupies on disk, after compression; 0 when missing."""
+
+    @abstractmethod
+    def delete(self, digest: str) -> int:
+        """Remove a blob and return the bytes freed."""
+
+    def touched_at(self, digest: str) -> float | None:
+        """When `digest` was last written or deduplicated; None when not tracked."""
+
+        return None
+
+
+class FileBlobStore(BlobStore):
+    """Blobs as files under ``<root>/<digest[:2]>/<digest>``.
+
+    With `compress=True`, a blob is written zlib-compressed as ``<digest>.z``
+    when that is smaller than the raw bytes.
+    """
+
+    def __init__(self, root: str | Path, *, compress: bool = True, level: int = 6):
+        self.root = Path(root)
+        self.compress = compress
+        self.level = level
+        self._lock = threading.RLock()
+
+    def _path(self, digest: str) -> Path:
+        return self.root / digest[:2] / digest
+
+    def put(self, data: bytes) -> str:
+        digest = blob_digest(data)
+        with self._lock:
+            # Always stat: another process (e.g. `jade state gc`) may have
+            # deleted a blob this process wrote earlier. A hit is touched so
+            # a concurrent sweep sees the blob as freshly referenced.
+            existing = self._stored_path(digest)
+            if existing is not None:
+                try:
+                    os.utime(existing)
+                    return digest
+                except FileNotFoundError:
+                    pass
+            path = self._path(digest)
+            content = data
+            if self.compress:
+                packed = zlib.compress(data, self.level)
+                if len(packed) < len(data):
+                    path, content = path.with_name(digest + ".z"), packed
+            path.parent.mkdir(parents=True, exist_ok=True)
+            # A unique temp name: other processes may be writing the same blob.
+            fd, tmp_name = tempfile.mkstemp(prefix=path.name + ".", suffix=".tmp", dir=path.parent)
+            try:
+                with os.fdopen(fd, "wb") as handle:
+                    handle.write(content)
+                os.replace(tmp_name, path)
+            except BaseException:
+                Path(tmp_name).unlink(missing_ok=True)
+                raise
+        return digest
+
+    def get(self, digest: str) -> bytes:
+        path = self._path(digest)
+        if path.is_file():
+            return path.read_bytes()
+        compressed = path.with_name(digest + ".z")
+        if compressed.is_file():
+            return zlib.decompress(compressed.read_bytes())
+        raise KeyError(f"blob not found: {digest}")
+
+    def has(self, digest: str) -> bool:
+        path = self._path(digest)
+        return path.is_file() or path.with_name(digest + ".z").is_file()
+
+    def _stored_path(self, digest: str) -> Path | None:
+        path = self._path(digest)
+        for candidate in (path, path.with_name(digest + ".z")):
+            if candidate.is_file():
+                return candidate
+        return None
+
+    def stored_size(self, digest: str) -> int:
+        path = self._stored_path(digest)
+        return path.stat().st_size if path is not None else 0
+
+    def touched_at(self, digest: str) -> float | None:
+        path = self._stored_path(digest)
+        return path.stat().st_mtime if path is not None else None
+
+    def delete(self, digest: str) -> int:
+        with self._lock:
+            path = self._stored_path(digest)
+            if path is None:
+                return 0
+            size = path.stat().st_size
+            path.unlink()
+            return size
+
+    def digests(self) -> Iterator[str]:
+        if not self.root.exists():
+            return iter(())
+        names = {
+            path.name[:-2] if path.name.endswith(".z") else path.name
+            for path in self.root.glob("??/*")
+            if path.is_file() and not path.name.endswith(".tmp")
+        }
+        return iter(sorted(names))
+
+
+def directory_blob_resolver(root: str | Path, blobs: BlobStore | None = None) -> Callable[[str], bytes]:
+    """Resolve blobs for a .jgx directory: its own ``payloads/`` first, then a shared store.
+
+    Without `blobs`, the shared store is the ``blobs/`` folder next to the run,
+    which is where `FileStateStore` keeps it.
+    """
+
+    root = Path(root)
+    shared = blobs if blobs is not None else FileBlobStore(root.parent / BLOB_DIR)
+
+    def resolve(digest: str) -> bytes:
+        local = root / "payloads" / digest
+        if local.is_file():
+            return local.read_bytes()
+        return shared.get(digest)
+
+    return resolve
@@ -0,0 +1,299 @@
+"""Record codecs for stored events and snapshots.
+
+Stores that keep records as opaque values (SQLite rows) encode them through a
+`RecordCodec`. The default writes the same canonical JSON text the stores
+always wrote. Other codecs write a framed byte record::
+
+    b"JR" | encoding (1 byte) | flags (1 byte) | body
+
+The body is either compact JSON or JGXB, a MessagePack-compatible binary
+encoding implemented with the standard library. Bodies of at least
+`compress_threshold` bytes are zlib- or lzma-compressed when that makes them
+smaller. Records are self-describing, so one table can mix JSON text rows
+written by older versions with framed rows, and changing a store's codec
+never requires rewriting existing data.
+
+Codecs only affect storage. Chain hashes and `canonical_json_hash` are always
+computed over canonical JSON of the decoded values, so they do not depend on
+how a record was stored.
+"""
+
+from __future__ import annotations
+
+import json
+import lzma
+import struct
+import zlib
+from dataclasses import dataclass
+from typing import Any
+
+from .blobs import BLOB_REF_KEY
+from .manifest import JGX_SCHEMA_VERSION
+
+
+RECORD_MAGIC = b"JR"
+JGXB_VERSION = 1
+
+_ENCODINGS = {"json": ord("j"), "binary": ord("b")}
+_COMPRESSIONS = {None: 0, "zlib": 1, "lzma": 2}
+_COMPRESSION_MASK = 0x0F
+_FLAG_BLOB_REFS = 0x80
+_BLOB_MARKER = BLOB_REF_KEY.encode("utf-8")
+# Integers outside int64 are stored as decimal text: tag 0xC1 with a 1-byte
+# length up to 255 digits, then as ext32 values of this type.
+_EXT_BIG_INT = 1
+
+_pack_float = struct.Struct(">d").pack
+_unpack_float = struct.Struct(">d").unpack_from
+
+
+def _encode_value(value: Any, out: list[bytes]) -> None:
+    kind = type(value)
+    if kind is str:
+        data = value.encode("utf-8")
+        size = len(data)
+        if size < 32:
+            out.append(bytes((0xA0 | size,)))
+        elif size < 0x100:
+            out.append(bytes((0xD9, size)))
+        elif size < 0x10000:
+            out.append(b"\xda" + size.to_bytes(2, "big"))
+        else:
+            out.append(b"\xdb" + size.to_bytes(4, "big"))
+        out.append(data)
+    elif kind is dict:
+        size = len(value)
+        if size < 16:
+            out.append(bytes((0x80 | size,)))
+        elif size < 0x10000:
+            out.append(b"\xde" + size.to_bytes(2, "big"))
+        else:
+            out.append(b"\xdf" + size.to_bytes(4, "big"))
+        for key, item in value.items():
+            if type(key) is not str:
+                # Convert keys the way json.dumps does, so both encodings decode alike.
+                key = next(iter(json.loads(json.dumps({key: None}))))
+            _encode_value(key, out)
+            _encode_value(item, out)
+    elif kind is list or kind is tuple:
+        size = len(value)
+        if size < 16:
+            out.append(bytes((0x90 | size,)))
+        elif size < 0x10000:
+            out.append(b"\xdc" + size.to_bytes(2, "big"))
+        else:
+            out.append(b"\xdd" + size.to_bytes(4, "big"))
+        for item in value:
+            _encode_value(item, out)
+    elif value is None:
+        out.append(b"\xc0")
+    elif value is True:
+        out.append(b"\xc3")
+    elif value is False:
+        out.append(b"\xc2")
+    elif isinstance(value, int):
+        if 0 <= value < 0x80:
+            out.append(bytes((value,)))
+        elif -32 <= value < 0:
+            out.append(bytes((value & 0xFF,)))
+        elif -(1 << 63) <= value < (1 << 63):
+            out.append(b"\xd3" + value.to_bytes(8, "big", signed=True))
+        else:
+            text = str(value).encode("ascii")
+            if len(text) < 0x100:
+                out.append(bytes((0xC1, len(text))))
+            else:
+                out.append(b"\xc9" + len(text).to_bytes(4, "big") + bytes((_EXT_BIG_INT,)))
+            out.append(text)
+    elif isinstance(value, float):
+        out.append(b"\xcb" + _pack_float(value))
+    elif isinstance(value, str):
+        _encode_value(str(value), out)
+    elif isinstance(value, dict):
+        _encode_value(dict(value), out)
+    elif isinstance(value, (bytes, bytearray)):
+        size = len(value)
+        out.append(b"\xc6" + size.to_bytes(4, "big"))
+        out.append(bytes(value))
+    else:
+        raise TypeError(f"Object of type {type(value).__name__} is not JGXB serializable")
+
+
+def jgxb_dumps(value: Any) -> bytes:
+    """Encode a JSON-compatible value as JGXB (MessagePack wire format)."""
+
+    out: list[bytes] = []
+    _encode_value(value, out)
+    return b"".join(out)
+
+
+def _decode_value(data: bytes, pos: int) -> tuple[Any, int]:
+    tag = data[pos]
+    pos += 1
+    if tag < 0x80:
+        return tag, pos
+    if 0xA0 <= tag <= 0xBF:
+        end = pos + (tag & 0x1F)
+        return data[pos:end].decode("utf-8"), end
+    if 0x80 <= tag <= 0x8F:
+        return _decode_map(data, pos, tag & 0x0F)
+    if 0x90 <= tag <= 0x9F:
+        return _decode_array(data, pos, tag & 0x0F)
+    if tag >= 0xE0:
+        return tag - 0x100, pos
+    if tag == 0xC0:
+        return None, pos
+    if tag == 0xC2:
+        return False, pos
+    if tag == 0xC3:
+        return True, pos
+    if tag == 0xCB:
+        return _unpack_float(data, pos)[0], pos + 8
+    if tag == 0xD3:
+        return int.from_bytes(data[pos:pos + 8], "big", signed=True), pos + 8
+    if tag in (0xD9, 0xDA, 0xDB):
+        width = {0xD9: 1, 0xDA: 2, 0xDB: 4}[tag]
+        start = pos + width
+        end = start + int.from_bytes(data[pos:start], "big")
+        return data[start:end].decode("utf-8"), end
+    if tag in (0xDC, 0xDD):
+        width = 2 if tag == 0xDC else 4
+        return _decode_array(data, pos + width, int.from_bytes(data[pos:pos + width], "big"))
+    if tag in (0xDE, 0xDF):
+        width = 2 if tag == 0xDE else 4
+        return _decode_map(data, pos + width, int.from_bytes(data[pos:pos + width], "big"))
+    if tag == 0xC1:
+        end = pos + 1 + data[pos]
+        return int(data[pos + 1:end].decode("ascii")), end
+    if tag == 0xC6:
+        start = pos + 4
+        end = start + int.from_bytes(data[pos:start], "big")
+        return data[start:end], end
+    if tag == 0xC9 and data[pos + 4] == _EXT_BIG_INT:
+        start = pos + 5
+        end = start + int.from_bytes(data[pos:pos + 4], "big")
+        return int(data[start:end].decode("ascii")), end
+    raise ValueError(f"invalid JGXB tag 0x{tag:02x} at offset {pos - 1}")
+
+
+def _decode_array(data: bytes, pos: int, size: int) -> tuple[list[Any], int]:
+    items = []
+    for _ in range(size):
+        item, pos = _decode_value(data, pos)
+        items.append(item)
+    return items, pos
+
+
+def _decode_map(data: bytes, pos: int, size: int) -> tuple[dict[str, Any], int]:
+    result = {}
+    for _ in range(size):
+        key, pos = _decode_value(data, pos)
+        result[key], pos = _decode_value(data, pos)
+    return result, pos
+
+
+def jgxb_loads(data: bytes) -> Any:
+    value, end = _decode_value(bytes(data), 0)
+    if end != len(data):
+        raise ValueError(f"trailing data after JGXB value at offset {end}")
+    return value
+
+
+@dataclass(frozen=True)
+class RecordCodec:
+    """How a store encodes event and snapshot records.
+
+    `encoding` is ``"json"`` or ``"binary"`` (JGXB); `compression` is None,
+    ``"zlib"``, or ``"lzma"``. The default codec writes plain canonical JSON
+    text, exactly as stores did before codecs existed.
+    """
+
+    encoding: str = "json"
+    compression: str | None = None
+    compress_threshold: int = 1024
+    level: int = 6
+
+    def __post_init__(self) -> None:
+        if self.encoding not in _ENCODINGS:
+            raise ValueError(f"unknown record encoding: {self.encoding!r}")
+        if self.compression not in _COMPRESSIONS:
+            raise ValueError(f"unknown record compression: {self.compression!r}")
+
+    @property
+    def is_plain_json(self) -> bool:
+        return self.encoding == "json" and self.compression is None
+
+    @property
+    def tag(self) -> str:
+        """Short codec id recorded in manifests, e.g. ``jgxb1.zlib``."""
+
+        name = "json" if self.encoding == "json" else f"jgxb{JGXB_VERSION}"
+        return f"{name}.{self.compression}" if self.compression else name
+
+    @property
+    def schema_version(self) -> str:
+        return JGX_SCHEMA_VERSION if self.is_plain_json else f"{JGX_SCHEMA_VERSION}+{self.tag}"
+
+    def encode(self, data: dict[str, Any]) -> str | bytes:
+        if self.is_plain_json:
+            return json.dumps(data, sort_keys=True, ensure_ascii=True, separators=(",", ":"))
+        if self.encoding == "binary":
+            body = jgxb_dumps(data)
+        else:
+            body = json.dumps(data, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+        flags = _FLAG_BLOB_REFS if _BLOB_MARKER in body else 0
+        if self.compression is not None and len(body) >= self.compress_threshold:
+            if self.compression == "zlib":
+                packed = zlib.compress(body, self.level)
+            else:
+                packed = lzma.compress(body, preset=min(max(self.level, 0), 9))
+            if len(packed) < len(body):
+                body = packed
+                flags |= _COMPRESSIONS[self.compression]
+        return RECORD_MAGIC + bytes((_ENCODINGS[self.encoding], flags)) + body
+
+
+def decode_record(raw: str | bytes) -> dict[str, Any]:
+    """Decode a record written by any `RecordCodec`."""
+
+    if isinstance(raw, str):
+        return json.loads(raw)
+    raw = bytes(raw)
+    if raw[:2] != RECORD_MAGIC:
+        return json.loads(raw)
+    encoding, flags = raw[2], raw[3]
+    body = raw[4:]
+    compression = flags & _COMPRESSION_MASK
+    if compression == 1:
+        body = zlib.decompress(body)
+    elif compression == 2:
+        body = lzma.decompress(body)
+    elif compression:
+        raise ValueError(f"unknown record compression flag: {compression}")
+    if encoding == _ENCODINGS["binary"]:
+        return jgxb_loads(body)
+    if encoding == _ENCODINGS["json"]:
+        return json.loads(body)
+    raise ValueError(f"unknown record encoding byte: {encoding}")
+
+
+def may_reference_blobs(raw: str | bytes) -> bool:
+    """Cheap check, without decoding, for whether a record can contain blob references."""
+
+    if isinstance(raw, str):
+        return BLOB_REF_KEY in raw
+    raw = bytes(raw)
+    if raw[:2] == RECORD_MAGIC:
+        return bool(raw[3] & _FLAG_BLOB_REFS)
+    return _BLOB_MARKER in raw
+
+
+def get_codec(spec: RecordCodec | str | None) -> RecordCodec:
+    """Resolve a codec or a ``"<encoding>[+<compression>]"`` shorthand such as ``"binary+zlib"``."""
+
+    if spec is None:
+        return RecordCodec()
+    if isinstance(spec, RecordCodec):
+        return spec
+    encoding, _, compression = str(spec).partition("+")
+    return RecordCodec(encoding=encoding or "json", compression=compression or None)
@@ -5,7 +5,7 @@ from __future__ import annotations
 from dataclasses import dataclass, field
 from typing import Any
 
-from .manifest import JGX_MAGIC, JGX_SCHEMA_VERSION, JadeStateManifest
+from .manifest import JGX_MAGIC, JGX_SCHEMA_VERSION, JadeStateManifest, base_schema_version
 
 
 @dataclass
@@ -58,8 +58,9 @@ def validate_restore_compatibility(
     if manifest.magic != JGX_MAGIC:
         issues.append(f"unsupported magic: {manifest.magic!r}")
 
-    if manifest.schema_version != JGX_SCHEMA_VERSION:
-        if allow_schema_minor_mismatch and manifest.schema_version.split(".")[0] == JGX_SCHEMA_VERSION.split(".")[0]:
+    schema_version = base_schema_version(manifest.schema_version)
+    if schema_version != JGX_SCHEMA_VERSION:
+        if allow_schema_minor_mismatch and schema_version.split(".")[0] == JGX_SCHEMA_VERSION.split(".")[0]:
             warnings.append(
                 f"schema version differs: manifest={manifest.schema_version!r} runtime={JGX_SCHEMA_VERSION!r}"
             )
@@ -2,12 +2,18 @@
 
 from __future__ import annotations
 
+import random
 import re
-from typing import Any
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Any, Iterable
 
 from .artifact import JadeExecutionCapsule
 from .manifest import JGX_FORMAT, JGX_MAGIC, canonical_json_hash
 
+if TYPE_CHECKING:
+    from .store import StateStore
+    from .view import CapsuleView
+
 
 SECRET_PATTERNS = (
     re.compile(r"sk-or-v1-[A-Za-z0-9_-]+"),
@@ -64,17 +70,61 @@ def find_secret_paths(value: Any, *, path: str = "$") -> list[str]:
     return paths
 
 
+@dataclass(frozen=True)
+class ChainRecord:
+    """Rolling chain hash and cached secret scan for one stored event."""
+
+    seq: int
+    chain_hash: str
+    secret_paths: tuple[str, ...] = ()
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "seq": self.seq,
+            "chain_hash": self.chain_hash,
+            "secret_paths": list(self.secret_paths),
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any]) -> "ChainRecord":
+        return cls(
+            seq=int(data.get("seq", 0)),
+            chain_hash=str(data.get("chain_hash", "")),
+            secret_paths=tuple(str(path) for path in data.get("secret_paths") or ()),
+        )
+
+
+def chain_record(previous_hash: str, seq: int, event: Any) -> ChainRecord:
+    """Extend the event chain by the `seq`-th event (1-based)."""
+
+    data = event.to_dict() if hasattr(event, "to_dict") else dict(event)
+    index = seq - 1
+    return ChainRecord(
+        seq=seq,
+        chain_hash=canonical_json_hash({
+            "index": index,
+            "previous": previous_hash,
+            "event": redact_secrets(data),
+        }),
+        secret_paths=tuple(find_secret_paths(data, path=f"events[{index}]")),
+    )
+
+
+def iter_chain_records(events: Iterable[Any], *, previous_hash: str = "", after_seq: int = 0):
+    """Yield chain records for `events`, continuing from a known chain head."""
+
+    for offset, event in enumerate(events, start=1):
+        record = chain_record(previous_hash, after_seq + offset, event)
+        previous_hash = record.chain_hash
+        yield record
+
+
 def event_chain_hash(events: list[Any]) -> str:
     """Compute a deterministic chained hash over event order."""
 
     previous = ""
-    for index, event in enumerate(events):
-        data = event.to_dict() if hasattr(event, "to_dict") else dict(event)
-        previous = canonical_json_hash({
-            "index": index,
-            "previous": previous,
-            "event": redact_secrets(data),
-        })
+    for record in iter_chain_records(events):
+        previous = record.chain_hash
     return previous
 
 
@@ -92,54 +142,180 @@ def snapshot_hashes(snapshots: list[Any]) -> list[dict[str, str]]:
     return rows
 
 
-def verify_capsule(capsule: JadeExecutionCapsule) -> dict[str, Any]:
-    """Return a verification report for a JGX capsule."""
+def verify_capsule(capsule: JadeExecutionCapsule | CapsuleView) -> dict[str, Any]:
+    """Return a verification report for a JGX capsule or a lazy capsule view.
 
+    Events and snapshots are streamed once each, so a view is verified without
+    holding the whole run in memory.
+    """
+
+    view = capsule.view() if isinstance(capsule, JadeExecutionCapsule) else capsule
     issues: list[str] = []
-    manifest = capsule.manifest
-    latest = capsule.latest_snapshot
-    snapshot_ids = {snapshot.snapshot_id for snapshot in capsule.snapshots}
+    manifest = view.manifest
+    latest = view.latest_snapshot()
 
     if manifest.magic != JGX_MAGIC:
         issues.append(f"unexpected magic: {manifest.magic}")
     if manifest.format != JGX_FORMAT:
         issues.append(f"unexpected format: {manifest.format}")
+
+    event_count = 0
+    chain = ""
+    monotonic = True
+    previous_timestamp = None
+    event_secret_paths: list[str] = []
+    for index, event in enumerate(view.iter_events()):
+        event_count += 1
+        data = event.to_dict()
+        if monotonic and previous_timestamp is not None and event.timestamp < previous_timestamp:
+            monotonic = False
+        previous_timestamp = event.timestamp
+        event_secret_paths.extend(find_secret_paths(data, path=f"events[{index}]"))
+        chain = canonical_json_hash({
+            "index": index,
+            "previous": chain,
+            "event": redact_secrets(data),
+        })
+
+    snapshot_ids: set[str] = set()
+    snapshot_rows: list[dict[str, str]] = []
+    snapshot_secret_paths: list[str] = []
+    for index, snapshot in enumerate(view.iter_snapshots()):
+        snapshot_ids.add(snapshot.snapshot_id)
+        snapshot_rows.extend(snapshot_hashes([snapshot]))
+        snapshot_secret_paths.extend(find_secret_paths(snapshot.to_dict(), path=f"snapshots[{index}]"))
+
     if manifest.latest_snapshot_id and manifest.latest_snapshot_id not in snapshot_ids:
         issues.append("manifest latest_snapshot_id does not exist in snapshots")
-    if capsule.snapshots and latest is None:
+    if snapshot_rows and latest is None:
         issues.append("capsule has snapshots but no latest snapshot")
+    if not monotonic:
+        issues.append("event timestamps are not monotonic in stored order")
 
-    previous_timestamp = None
-    for event in capsule.events:
-        if previous_timestamp is not None and event.timestamp < previous_timestamp:
+    manifest_secret_paths = find_secret_paths(manifest.to_dict(), path="manifest")
+    secret_paths = manifest_secret_paths + event_secret_paths + snapshot_secret_paths
+
+    if secret_paths:
+        issues.append(f"possible secret material found in {len(secret_paths)} field(s)")
+
+    return {
+        "ok": not issues,
+        "run_id": manifest.run_id,
+        "magic": manifest.magic,
+        "format": manifest.format,
+        "schema_version": manifest.schema_version,
+        "event_count": event_count,
+        "snapshot_count": len(snapshot_rows),
+        "latest_snapshot_id": latest.snapshot_id if latest is not None else "",
+        "latest_phase": latest.phase if latest is not None else "",
+        "event_chain_hash": chain,
+        "snapshot_hash": canonical_json_hash(snapshot_rows),
+        "snapshot_hashes": snapshot_rows,
+        "secret_leak_count": len(secret_paths),
+        "secret_paths": secret_paths,
+        "issues": issues,
+    }
+
+
+def verify_run(
+    store: "StateStore",
+    run_id: str,
+    *,
+    mode: str = "incremental",
+    sample_size: int = 64,
+    seed: int | None = None,
+) -> dict[str, Any]:
+    """Verify a stored run against the chain records kept at append time.
+
+    `incremental` re-hashes only events after the last verified checkpoint,
+    `full` re-hashes every event, and `sample` re-hashes `sample_size` random
+    events against their stored predecessors. Secret findings for events come
+    from the per-event scan cached at append time.
+    """
+
+    if mode not in {"incremental", "full", "sample"}:
+        raise ValueError(f"unsupported verify mode: {mode}")
+    view = store.view_run(run_id)
+    records = list(store.chain_records(run_id))
+    by_seq = {record.seq: record for record in records}
+    issues: list[str] = []
+    checked = 0
+
+    if mode == "sample":
+        population = [record.seq for record in records]
+        chosen = sorted(random.Random(seed).sample(population, min(max(int(sample_size), 0), len(population))))
+        for seq in chosen:
+            event = next(view.iter_events(after_seq=seq - 1, limit=1), None)
+            previous = by_seq[seq - 1].chain_hash if seq > 1 else ""
+            checked += 1
+            if event is None or chain_record(previous, seq, event).chain_hash != by_seq[seq].chain_hash:
+                issues.append(f"event chain mismatch at seq {seq}")
+                break
+    else:
+        checkpoint = store.verified_checkpoint(run_id) if mode == "incremental" else None
+        start_seq, previous = 0, ""
+        if checkpoint is not None and by_seq.get(checkpoint.seq) == checkpoint:
+            start_seq, previous = checkpoint.seq, checkpoint.chain_hash
+        last_good: ChainRecord | None = checkpoint if start_seq else None
+        order = {"previous": None, "monotonic": True}
+
+        def read_events():
+            for event in view.iter_events(after_seq=start_seq):
+                if order["previous"] is not None and event.timestamp < order["previous"]:
+                    order["monotonic"] = False
+                order["previous"] = event.timestamp
+                yield event
+
+        for record in iter_chain_records(read_events(), previous_hash=previous, after_seq=start_seq):
+            checked += 1
+            if by_seq.get(record.seq) != record:
+                issues.append(f"event chain mismatch at seq {record.seq}")
+                break
+            last_good = record
+        if not order["monotonic"]:
             issues.append("event timestamps are not monotonic in stored order")
-            break
-        previous_timestamp = event.timestamp
+        if not issues and start_seq + checked != len(records):
+            issues.append(f"chain has {len(records)} record(s) but {start_seq + checked} event(s) were read")
+        if not issues and last_good is not None:
+            store.record_verified(run_id, last_good)
 
-    manifest_secret_paths = find_secret_paths(manifest.to_dict(), path="manifest")
-    event_secret_paths: list[str] = []
-    for index, event in enumerate(capsule.events):
-        event_secret_paths.extend(find_secret_paths(event.to_dict(), path=f"events[{index}]"))
+    manifest = view.manifest
+    latest = view.latest_snapshot()
+    if manifest.magic != JGX_MAGIC:
+        issues.insert(0, f"unexpected magic: {manifest.magic}")
+    if manifest.format != JGX_FORMAT:
+        issues.insert(0, f"unexpected format: {manifest.format}")
+    snapshot_ids: set[str] = set()
+    snapshot_rows: list[dict[str, str]] = []
     snapshot_secret_paths: list[str] = []
-    for index, snapshot in enumerate(capsule.snapshots):
+    for index, snapshot in enumerate(view.iter_snapshots()):
+        snapshot_ids.add(snapshot.snapshot_id)
+        snapshot_rows.extend(snapshot_hashes([snapshot]))
         snapshot_secret_paths.extend(find_secret_paths(snapshot.to_dict(), path=f"snapshots[{index}]"))
-    secret_paths = manifest_secret_paths + event_secret_paths + snapshot_secret_paths
+    if manifest.latest_snapshot_id and manifest.latest_snapshot_id not in snapshot_ids:
+        issues.append("manifest latest_snapshot_id does not exist in snapshots")
 
+    secret_paths = (
+        find_secret_paths(manifest.to_dict(), path="manifest")
+        + [path for record in records for path in record.secret_paths]
+        + snapshot_secret_paths
+    )
     if secret_paths:
         issues.append(f"possible secret material found in {len(secret_paths)} field(s)")
 
-    snapshot_rows = snapshot_hashes(capsule.snapshots)
     return {
         "ok": not issues,
+        "mode": mode,
         "run_id": manifest.run_id,
         "magic": manifest.magic,
         "format": manifest.format,
         "schema_version": manifest.schema_version,
-        "event_count": len(capsule.events),
-        "snapshot_count": len(capsule.snapshots),
+        "event_count": len(records),
+        "checked_events": checked,
+        "snapshot_count": len(snapshot_rows),
         "latest_snapshot_id": latest.snapshot_id if latest is not None else "",
         "latest_phase": latest.phase if latest is not None else "",
-        "event_chain_hash": event_chain_hash(capsule.events),
+        "event_chain_hash": records[-1].chain_hash if records else "",
         "snapshot_hash": canonical_json_hash(snapshot_rows),
         "snapshot_hashes": snapshot_rows,
         "secret_leak_count": len(secret_paths),
@@ -25,7 +25,11 @@ def _json_default(value: Any) -> Any:
 
 
 def canonical_json_hash(value: Any) -> str:
-    """Return a stable sha256 hash for JSON-compatible runtime metadata."""
+    """Return a stable sha256 hash for JSON-compatible runtime metadata.
+
+    The hash is always taken over canonical JSON, independent of the record
+    codec a store used to persist the value.
+    """
 
     payload = json.dumps(
         value,
@@ -37,6 +41,12 @@ def canonical_json_hash(value: Any) -> str:
     return hashlib.sha256(payload).hexdigest()
 
 
+def base_schema_version(schema_version: str) -> str:
+    """Schema version without a record codec suffix: ``"1.0+jgxb1.zlib"`` -> ``"1.0"``."""
+
+    return schema_version.split("+", 1)[0]
+
+
 def fingerprint_mapping(value: dict[str, Any] | None) -> str:
     """Hash a mapping, returning an empty string for empty metadata."""
 
@@ -128,7 +138,7 @@ class JadeStateManifest:
 
         return canonical_json_hash({
             "format": self.format,
-            "schema_version": self.schema_version,
+            "schema_version": base_schema_version(self.schema_version),
             "tenant_id": self.tenant_id,
             "capability": self.capability,
             "state_kind": self.state_kind,
@@ -0,0 +1,507 @@
+"""Single-file packed .jgx capsules with a trailing offset index.
+
+Layout::
+
+    header   8 bytes   b"JGXPACK\\x01"
+    data     records   compact JSON (manifest, events, snapshots) or raw payload bytes
+    index    JSON      offsets of every live record, keyed by type
+    footer   24 bytes  index offset, index length, b"JGXINDEX"
+
+The file is append-only: appending events or snapshots writes the new
+records after the current footer, then a fresh index, and only then (after an
+fsync) a new footer. Until that footer is durable the previous footer is the
+last valid one, so a crash mid-append leaves the previous capsule readable and
+the next writer truncates the torn tail. Superseded indexes stay behind as
+dead bytes until the capsule is repacked. Readers memory-map the file and
+decode only the records they ask for, so opening the latest snapshot of a
+capsule with thousands of snapshots reads the footer, the index, and one
+record.
+"""
+
+from __future__ import annotations
+
+import json
+import mmap
+import os
+import shutil
+import struct
+from itertools import islice
+from pathlib import Path
+from typing import Any, Iterable, Iterator
+
+from .artifact import JadeExecutionCapsule, _append_jsonl, _read_json, _write_json
+from .blobs import blob_refs, directory_blob_resolver, rehydrate
+from .events import JadeStateEvent
+from .manifest import JadeStateManifest
+from .segments import LEGACY_EVENTS, SEGMENT_DIR, SegmentedEventLog
+from .snapshot import AgentRuntimeSnapshot
+from .view import CapsuleView
+
+
+PACKED_HEADER = b"JGXPACK\x01"
+PACKED_INDEX_VERSION = 1
+_FOOTER = struct.Struct("<QQ8s")
+_FOOTER_MAGIC = b"JGXINDEX"
+
+
+def _dump(data: dict[str, Any]) -> bytes:
+    return json.dumps(data, sort_keys=True, ensure_ascii=True, separators=(",", ":")).encode("utf-8")
+
+
+def is_packed_jgx(path: str | Path) -> bool:
+    """Return True when `path` is a packed single-file capsule."""
+
+    target = Path(path)
+    if not target.is_file():
+        return False
+    with target.open("rb") as handle:
+        return handle.read(len(PACKED_HEADER)) == PACKED_HEADER
+
+
+def _empty_index() -> dict[str, Any]:
+    return {
+        "version": PACKED_INDEX_VERSION,
+        "manifest": None,
+        "events": [],
+        "snapshots": [],
+        "payloads": {},
+        "files": {},
+    }
+
+
+def _index_at(handle: Any, footer_offset: int) -> tuple[dict[str, Any], int] | None:
+    """The index whose footer starts at `footer_offset`, or None if that is not a valid footer."""
+
+    handle.seek(footer_offset)
+    index_offset, index_length, magic = _FOOTER.unpack(handle.read(_FOOTER.size))
+    if magic != _FOOTER_MAGIC or index_offset < len(PACKED_HEADER) or index_offset + index_length != footer_offset:
+        return None
+    handle.seek(index_offset)
+    try:
+        index = json.loads(handle.read(index_length).decode("utf-8"))
+    except (UnicodeDecodeError, json.JSONDecodeError):
+        return None
+    if not isinstance(index, dict) or index.get("version") != PACKED_INDEX_VERSION:
+        return None
+    return index, index_offset
+
+
+def _read_index(handle: Any, size: int) -> tuple[dict[str, Any], int, int]:
+    """Return the committed index, its offset, and the committed file length.
+
+    The committed footer is normally the last 24 bytes. After a crash
+    mid-append the tail is torn, and the last valid footer before it is used.
+    """
+
+    if size < len(PACKED_HEADER) + _FOOTER.size:
+        raise ValueError("file is too small to be a packed .jgx capsule")
+    handle.seek(0)
+    if handle.read(len(PACKED_HEADER)) != PACKED_HEADER:
+        raise ValueError("not a packed .jgx capsule")
+    found = _index_at(handle, size - _FOOTER.size)
+    if found is not None:
+        return found[0], found[1], size
+    with mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ) as view:
+        end = size
+        while True:
+            magic_at = view.rfind(_FOOTER_MAGIC, len(PACKED_HEADER), end)
+            if magic_at < 0:
+                break
+            footer_offset = magic_at - (_FOOTER.size - len(_FOOTER_MAGIC))
+            found = _index_at(handle, footer_offset) if footer_offset >= len(PACKED_HEADER) else None
+            if found is not None:
+                return found[0], found[1], footer_offset + _FOOTER.size
+            end = magic_at + len(_FOOTER_MAGIC) - 1
+    raise ValueError("packed .jgx capsule has a missing or truncated index")
+
+
+class PackedCapsuleWriter:
+    """Append records to a packed capsule and write a new trailing index on close.
+
+    Appending to an existing capsule writes after its committed footer, which
+    stays the valid one until close() has fsynced the new index and footer;
+    leaving the context with an exception truncates the partial append away.
+    """
+
+    def __init__(self, path: str | Path, *, create: bool = False):
+        self.path = Path(path)
+        self._appending = not create and self.path.exists()
+        if not self._appending:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self._handle = self.path.open("w+b")
+            self._handle.write(PACKED_HEADER)
+            self.index = _empty_index()
+            self._end = len(PACKED_HEADER)
+        else:
+            self._handle = self.path.open("r+b")
+            try:
+                self.index, _, self._end = _read_index(self._handle, os.fstat(self._handle.fileno()).st_size)
+            except Exception:
+                self._handle.close()
+                raise
+        self._committed = self._end
+        self._handle.seek(self._end)
+        self._handle.truncate()  # drops the torn tail of a crashed append, if any
+
+    def _write_record(self, data: bytes) -> list[int]:
+        offset = self._end
+        self._handle.write(data)
+        self._end += len(data)
+        return [offset, len(data)]
+
+    def write_manifest(self, manifest: JadeStateManifest | dict[str, Any]) -> None:
+        data = manifest.to_dict() if isinstance(manifest, JadeStateManifest) else manifest
+        self.index["manifest"] = self._write_record(_dump(data))
+
+    def append_event(self, event: JadeStateEvent | dict[str, Any]) -> None:
+        data = event.to_dict() if isinstance(event, JadeStateEvent) else event
+        offset, length = self._write_record(_dump(data))
+        self.index["events"].append([offset, length, int(data.get("step", 0)), str(data.get("event_type", ""))])
+
+    def append_snapshot(self, snapshot: AgentRuntimeSnapshot | dict[str, Any], *, name: str | None = None) -> None:
+        data = snapshot.to_dict() if isinstance(snapshot, AgentRuntimeSnapshot) else snapshot
+        snapshot_id = str(data.get("snapshot_id", ""))
+        name = name or snapshot_id
+        offset, length = self._write_record(_dump(data))
+        entry = [offset, length, snapshot_id, int(data.get("step", 0)), str(data.get("phase", "")), name]
+        snapshots = self.index["snapshots"]
+        for position, existing in enumerate(snapshots):
+            if existing[5] == name:
+                snapshots[position] = entry
+                break
+        else:
+            snapshots.append(entry)
+
+    def add_payload(self, digest: str, payload: bytes) -> None:
+        self.index["payloads"][digest] = self._write_record(bytes(payload))
+
+    def add_file(self, name: str, content: bytes) -> None:
+        """Carry an extra top-level capsule file (such as chain.jsonl) verbatim."""
+
+        self.index.setdefault("files", {})[name] = self._write_record(bytes(content))
+
+    def close(self) -> None:
+        if self._handle.closed:
+            return
+        if self.index["manifest"] is None:
+            self._handle.close()
+            raise ValueError("packed .jgx capsule needs a manifest")
+        index_bytes = _dump(self.index)
+        self._handle.write(index_bytes)
+        # Records and index must be durable before the footer that commits them.
+        self._handle.flush()
+        os.fsync(self._handle.fileno())
+        self._handle.write(_FOOTER.pack(self._end, len(index_bytes), _FOOTER_MAGIC))
+        self._handle.flush()
+        os.fsync(self._handle.fileno())
+        self._handle.close()
+
+    def abort(self) -> None:
+        """Drop an in-progress append, leaving the original capsule untouched."""
+
+        if self._handle.closed:
+            return
+        if self._appending:
+            self._handle.truncate(self._committed)
+        self._handle.close()
+
+    def __enter__(self) -> "PackedCapsuleWriter":
+        return self
+
+    def __exit__(self, exc_type: Any, *exc: Any) -> None:
+        if exc_type is not None and self._appending:
+            self.abort()
+        else:
+            self.close()
+
+
+class PackedCapsule(CapsuleView):
+    """Memory-mapped, random-access reader for a packed .jgx capsule."""
+
+    def __init__(self, path: str | Path):
+        self.path = Path(path)
+        self._handle = self.path.open("rb")
+        try:
+            self.index, _, _ = _read_index(self._handle, os.fstat(self._handle.fileno()).st_size)
+            self._map = mmap.mmap(self._handle.fileno(), 0, access=mmap.ACCESS_READ)
+        except Exception:
+            self._handle.close()
+            raise
+        self._manifest: JadeStateManifest | None = None
+
+    def close(self) -> None:
+        if not self._map.closed:
+            self._map.close()
+        self._handle.close()
+
+    def __enter__(self) -> "PackedCapsule":
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self.close()
+
+    def _record(self, offset: int, length: int) -> bytes:
+        return self._map[offset:offset + length]
+
+    def _json(self, offset: int, length: int) -> dict[str, Any]:
+        return json.loads(self._record(offset, length).decode("utf-8"))
+
+    def _blob(self, digest: str) -> bytes:
+        entry = self.index["payloads"].get(digest)
+        if entry is None:
+            raise KeyError(f"blob not found: {digest}")
+        return self._record(*entry)
+
+    def _row(self, entry: list[Any]) -> dict[str, Any]:
+        """Decode an event or snapshot record, resolving blob references from the payloads."""
+
+        return rehydrate(self._json(entry[0], entry[1]), self._blob)
+
+    @property
+    def manifest(self) -> JadeStateManifest:
+        if self._manifest is None:
+            self._manifest = JadeStateManifest.from_dict(self._json(*self.index["manifest"]))
+        return self._manifest
+
+    @property
+    def event_count(self) -> int:
+        return len(self.index["events"])
+
+    @property
+    def snapshot_count(self) -> int:
+        return len(self.index["snapshots"])
+
+    def snapshot_ids(self) -> list[str]:
+        return [entry[2] for entry in self.index["snapshots"]]
+
+    def _snapshot_entry(self, snapshot_id: str) -> list[Any] | None:
+        for entry in reversed(self.index["snapshots"]):
+            if entry[2] == snapshot_id:
+                return entry
+        return None
+
+    def _latest_entry(self) -> list[Any] | None:
+        entries = self.index["snapshots"]
+        if not entries:
+            return None
+        latest_id = self.manifest.latest_snapshot_id
+        if latest_id:
+            entry = self._snapshot_entry(latest_id)
+            if entry is not None:
+                return entry
+        return entries[-1]
+
+    @property
+    def payload_count(self) -> int:
+        return len(self.index["payloads"])
+
+    def iter_events(self, after_seq: int = 0, limit: int | None = None) -> Iterator[JadeStateEvent]:
+        entries = self.index["events"][max(after_seq, 0):]
+        for entry in entries if limit is None else entries[:max(limit, 0)]:
+            yield JadeStateEvent.from_dict(self._row(entry))
+
+    def iter_snapshots(self, after_seq: int = 0, limit: int | None = None) -> Iterator[AgentRuntimeSnapshot]:
+        entries = self.index["snapshots"][max(after_seq, 0):]
+        for entry in entries if limit is None else entries[:max(limit, 0)]:
+            yield AgentRuntimeSnapshot.from_dict(self._row(entry))
+
+    def get_snapshot(self, snapshot_id: str) -> AgentRuntimeSnapshot | None:
+        return self.snapshot(snapshot_id)
+
+    def snapshot(self, snapshot_id: str) -> AgentRuntimeSnapshot | None:
+        entry = self._snapshot_entry(snapshot_id)
+        if entry is None:
+            return None
+        return AgentRuntimeSnapshot.from_dict(self._row(entry))
+
+    def latest_snapshot(self) -> AgentRuntimeSnapshot | None:
+        entry = self._latest_entry()
+        if entry is None:
+            return None
+        return AgentRuntimeSnapshot.from_dict(self._row(entry))
+
+    def events(self, start: int = 0, stop: int | None = None) -> list[JadeStateEvent]:
+        """Decode events by position; negative indexes count from the end."""
+
+        return [
+            JadeStateEvent.from_dict(self._row(entry))
+            for entry in self.index["events"][start:stop]
+        ]
+
+    def events_for_steps(self, first_step: int, last_step: int | None = None) -> list[JadeStateEvent]:
+        """Decode only the events whose step falls in `[first_step, last_step]`."""
+
+        upper = first_step if last_step is None else last_step
+        return [
+            JadeStateEvent.from_dict(self._row(entry))
+            for entry in self.index["events"]
+            if first_step <= entry[2] <= upper
+        ]
+
+    def payload_digests(self) -> list[str]:
+        return sorted(self.index["payloads"])
+
+    def payload(self, digest: str) -> bytes | None:
+        entry = self.index["payloads"].get(digest)
+        return None if entry is None else self._record(*entry)
+
+    def payloads(self) -> dict[str, bytes]:
+        return {digest: self.payload(digest) or b"" for digest in self.payload_digests()}
+
+    def inspect(self) -> dict[str, Any]:
+        """Same shape as JadeExecutionCapsule.inspect(), answered from the index."""
+
+        manifest = self.manifest
+        latest = self._latest_entry()
+        return {
+            "magic": manifest.magic,
+            "format": manifest.format,
+            "schema_version": manifest.schema_version,
+            "run_id": manifest.run_id,
+            "task_id": manifest.task_id,
+            "agent_id": manifest.agent_id,
+            "tenant_id": manifest.tenant_id,
+            "capability": manifest.capability,
+            "backend": manifest.backend,
+            "event_count": self.event_count,
+            "snapshot_count": self.snapshot_count,
+            "latest_snapshot_id": latest[2] if latest is not None else "",
+            "latest_phase": latest[4] if latest is not None else "",
+            "latest_step": latest[3] if latest is not None else 0,
+            "payload_count": len(self.index["payloads"]),
+        }
+
+
+def open_packed_jgx(path: str | Path) -> PackedCapsule:
+    """Open a packed capsule for lazy, memory-mapped reads."""
+
+    return PackedCapsule(path)
+
+
+def _write_capsule(writer: PackedCapsuleWriter, capsule: JadeExecutionCapsule) -> None:
+    for event in capsule.events:
+        writer.append_event(event)
+    for snapshot in capsule.snapshots:
+        writer.append_snapshot(snapshot)
+    for digest, payload in sorted(capsule.payloads.items()):
+        writer.add_payload(digest, payload)
+    writer.write_manifest(capsule.manifest)
+
+
+def _is_record_file(name: str) -> bool:
+    """True for directory files whose contents are stored as indexed records."""
+
+    parent, _, leaf = name.rpartition("/")
+    if not parent:
+        return leaf in {"manifest.json", LEGACY_EVENTS}
+    if parent == SEGMENT_DIR:
+        return leaf.endswith(".jsonl")
+    return (parent == "snapshots" and leaf.endswith(".json")) or parent == "payloads"
+
+
+def pack_jgx(source: str | Path | JadeExecutionCapsule, destination: str | Path) -> Path:
+    """Pack a capsule or a .jgx directory into a single file.
+
+    Directory records are copied as parsed JSON, so unpacking reproduces the
+    original files, including fields this version does not model. Blobs that
+    a store run references from its shared blob store are packed as payloads,
+    so the packed file is self-contained.
+    """
+
+    output = Path(destination)
+    tmp_path = output.with_name(output.name + ".tmp")
+    with PackedCapsuleWriter(tmp_path, create=True) as writer:
+        if isinstance(source, JadeExecutionCapsule):
+            _write_capsule(writer, source)
+        else:
+            root = Path(source)
+            log = SegmentedEventLog(root)
+            refs: set[str] = set()
+            for segment in log.segments:
+                for row in log.read_segment(segment):
+                    refs.update(blob_refs(row))
+                    writer.append_event(row)
+            writer.index["segments"] = [[segment.name, segment.count] for segment in log.segments]
+            for snapshot_path in sorted((root / "snapshots").glob("*.json")):
+                row = _read_json(snapshot_path)
+                refs.update(blob_refs(row))
+                writer.append_snapshot(row, name=snapshot_path.stem)
+            for payload_path in sorted((root / "payloads").glob("*")):
+                if payload_path.is_file():
+                    writer.add_payload(payload_path.name, payload_path.read_bytes())
+                    refs.discard(payload_path.name)
+            resolve = directory_blob_resolver(root)
+            for digest in sorted(refs):
+                writer.add_payload(digest, resolve(digest))
+            for extra_path in sorted(root.rglob("*")):
+                name = extra_path.relative_to(root).as_posix()
+                if extra_path.is_file() and not _is_record_file(name):
+                    writer.add_file(name, extra_path.read_bytes())
+            writer.write_manifest(_read_json(root / "manifest.json"))
+    os.replace(tmp_path, output)
+    return output
+
+
+def unpack_jgx(source: str | Path, destination: str | Path) -> Path:
+    """Expand a packed capsule back into the transparent directory layout."""
+
+    root = Path(destination)
+    (root / "snapshots").mkdir(parents=True, exist_ok=True)
+    (root / "payloads").mkdir(parents=True, exist_ok=True)
+    with PackedCapsule(source) as packed:
+        for entry in packed.index["snapshots"]:
+            _write_json(root / "snapshots" / f"{entry[5]}.json", packed._json(entry[0], entry[1]))
+        if (root / SEGMENT_DIR).is_dir():
+            shutil.rmtree(root / SEGMENT_DIR)
+        if (root / LEGACY_EVENTS).exists():
+            (root / LEGACY_EVENTS).unlink()
+        events = iter(packed.index["events"])
+        segments = packed.index.get("segments") or [[LEGACY_EVENTS, len(packed.index["events"])]]
+        written = 0
+        for name, count in segments:
+            events_path = root / name
+            events_path.parent.mkdir(parents=True, exist_ok=True)
+            events_path.touch()
+            for entry in islice(events, count):
+                _append_jsonl(events_path, packed._json(entry[0], entry[1]))
+                written += 1
+        appended = root / SEGMENT_DIR / f"{written + 1:012d}.jsonl"
+        for entry in events:
+            _append_jsonl(appended, packed._json(entry[0], entry[1]))
+        for digest, (offset, length) in packed.index["payloads"].items():
+            (root / "payloads" / digest).write_bytes(packed._record(offset, length))
+        for name, (offset, length) in packed.index.get("files", {}).items():
+            (root / name).parent.mkdir(parents=True, exist_ok=True)
+            (root / name).write_bytes(packed._record(offset, length))
+        _write_json(root / "manifest.json", packed._json(*packed.index["manifest"]))
+    return root
+
+
+def append_packed_jgx(
+    path: str | Path,
+    *,
+    events: Iterable[JadeStateEvent] = (),
+    snapshots: Iterable[AgentRuntimeSnapshot] = (),
+    manifest: JadeStateManifest | None = None,
+) -> Path:
+    """Append events and snapshots to an existing packed capsule."""
+
+    with PackedCapsuleWriter(path) as writer:
+        latest_id = ""
+        for event in events:
+            writer.append_event(event)
+        for snapshot in snapshots:
+            writer.append_snapshot(snapshot)
+            latest_id = snapshot.snapshot_id
+        if manifest is None and latest_id:
+            offset, length = writer.index["manifest"]
+            writer._handle.seek(offset)
+            data = json.loads(writer._handle.read(length).decode("utf-8"))
+            writer._handle.seek(writer._end)
+            manifest = JadeStateManifest.from_dict(data)
+        if manifest is not None:
+            if latest_id:
+                manifest.latest_snapshot_id = latest_id
+            manifest.touch()
+            writer.write_manifest(manifest)
+    return Path(path)
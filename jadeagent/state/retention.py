@@ -0,0 +1,229 @@
+"""Retention, compaction, and garbage collection for stored .jgx runs.
+
+`collect_garbage` applies a `RetentionPolicy` to every run in a store:
+
+- finished runs past their time-to-live are deleted, when the policy sets one
+  (COMPLETED and FAILED runs have separate TTLs, measured from their latest
+  snapshot; both are unset by default, so no run is deleted unless asked);
+- the remaining runs are compacted down to their last few snapshots plus the
+  newest snapshot of each phase, and the latest snapshot is always kept, as is
+  every snapshot a kept diff checkpoint is rebuilt from;
+- blobs no longer referenced by any surviving record are swept, except those
+  written or deduplicated within `blob_grace` seconds of the pass starting,
+  which a concurrent writer may be about to reference;
+- the store is vacuumed so the freed space goes back to the filesystem.
+
+Compaction never rewrites events. Before dropping snapshots it appends a
+``state_compacted`` event recording the chain hash, event count, and snapshot
+hash the run had beforehand, so `verify_run` still checks the whole chain and
+the dropped history stays attestable.
+"""
+
+from __future__ import annotations
+
+import time
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Any
+
+from .events import JadeStateEvent
+from .integrity import snapshot_hashes
+from .manifest import canonical_json_hash
+
+if TYPE_CHECKING:
+    from .store import StateStore
+    from .view import CapsuleView
+
+
+DAY = 86400.0
+COMPACTION_EVENT = "state_compacted"
+
+
+@dataclass(frozen=True)
+class SnapshotInfo:
+    """Stored snapshot metadata, without decoding the snapshot body."""
+
+    snapshot_id: str
+    phase: str
+    step: int
+    created_at: float
+    size: int = 0
+
+
+@dataclass
+class RetentionPolicy:
+    """How much state each run keeps.
+
+    TTLs are in seconds; `None` (the default) keeps those runs forever. Runs
+    whose latest phase is neither COMPLETED nor FAILED are never deleted.
+    """
+
+    keep_last_snapshots: int = 5
+    keep_phase_keyframes: bool = True
+    completed_ttl: float | None = None
+    failed_ttl: float | None = None
+    sweep_blobs: bool = True
+    blob_grace: float = 3600.0
+    vacuum: bool = True
+
+    def ttl_for(self, phase: str) -> float | None:
+        if phase == "COMPLETED":
+            return self.completed_ttl
+        if phase == "FAILED":
+            return self.failed_ttl
+        return None
+
+    def snapshots_to_keep(self, snapshots: list[SnapshotInfo], latest_snapshot_id: str = "") -> set[str]:
+        ordered = sorted(snapshots, key=lambda info: info.created_at)
+        keep = {info.snapshot_id for info in ordered[-self.keep_last_snapshots:]} if self.keep_last_snapshots > 0 else set()
+        if self.keep_phase_keyframes:
+            newest_by_phase = {info.phase: info.snapshot_id for info in ordered}
+            keep.update(newest_by_phase.values())
+        if latest_snapshot_id:
+            keep.add(latest_snapshot_id)
+        elif ordered:
+            keep.add(ordered[-1].snapshot_id)
+        return keep
+
+
+@dataclass
+class GcReport:
+    """What a garbage-collection pass removed, or would remove when `dry_run`."""
+
+    dry_run: bool = False
+    runs_scanned: int = 0
+    deleted_runs: list[str] = field(default_factory=list)
+    compacted_runs: dict[str, int] = field(default_factory=dict)
+    deleted_blobs: int = 0
+    reclaimed_bytes: int = 0
+    vacuumed_bytes: int = 0
+
+    @property
+    def deleted_snapshots(self) -> int:
+        return sum(self.compacted_runs.values())
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "dry_run": self.dry_run,
+            "runs_scanned": self.runs_scanned,
+            "deleted_runs": list(self.deleted_runs),
+            "compacted_runs": dict(self.compacted_runs),
+            "deleted_snapshots": self.deleted_snapshots,
+            "deleted_blobs": self.deleted_blobs,
+            "reclaimed_bytes": self.reclaimed_bytes,
+            "vacuumed_bytes": self.vacuumed_bytes,
+        }
+
+
+def _latest_info(snapshots: list[SnapshotInfo], latest_snapshot_id: str) -> SnapshotInfo | None:
+    for info in snapshots:
+        if info.snapshot_id == latest_snapshot_id:
+            return info
+    return max(snapshots, key=lambda info: info.created_at) if snapshots else None
+
+
+def keep_checkpoint_chains(view: "CapsuleView", keep: set[str]) -> set[str]:
+    """Extend `keep` with the parents every kept diff checkpoint depends on.
+
+    A snapshot whose metadata has ``checkpoint == "diff"`` (graph runs with
+    diff checkpoints) only stores the updates since ``parent_snapshot_id``,
+    so its chain back to the last full checkpoint must survive with it.
+    Only kept snapshots and their parents are decoded.
+    """
+
+    keep = set(keep)
+    pending = list(keep)
+    while pending:
+        snapshot = view.get_snapshot(pending.pop())
+        if snapshot is None or snapshot.metadata.get("checkpoint") != "diff":
+            continue
+        parent_id = str(snapshot.metadata.get("parent_snapshot_id") or "")
+        if parent_id and parent_id not in keep:
+            keep.add(parent_id)
+            pending.append(parent_id)
+    return keep
+
+
+def compact_run(store: "StateStore", run_id: str, drop: list[SnapshotInfo]) -> int:
+    """Record a compaction event for `run_id`, then delete the `drop` snapshots."""
+
+    view = store.view_run(run_id)
+    head = None
+    for head in store.chain_records(run_id):
+        pass
+    store.append_event(run_id, JadeStateEvent(
+        event_type=COMPACTION_EVENT,
+        run_id=run_id,
+        message=f"dropped {len(drop)} snapshot(s)",
+        payload={
+            "chain_hash": head.chain_hash if head is not None else "",
+            "event_count": head.seq if head is not None else 0,
+            "snapshot_hash": canonical_json_hash(snapshot_hashes(list(view.iter_snapshots()))),
+            "snapshot_count": view.snapshot_count,
+            "dropped_snapshot_ids": [info.snapshot_id for info in drop],
+        },
+    ))
+    return store.delete_snapshots(run_id, [info.snapshot_id for info in drop])
+
+
+def collect_garbage(
+    store: "StateStore",
+    policy: RetentionPolicy | None = None,
+    *,
+    dry_run: bool = False,
+    now: float | None = None,
+) -> GcReport:
+    """Apply `policy` to every run in `store` and report the bytes reclaimed.
+
+    Another process may append while the pass runs: a blob it writes or
+    reuses after the reference scan is kept because its touch time falls
+    inside `policy.blob_grace` of the pass start.
+    """
+
+    policy = policy or RetentionPolicy()
+    started = time.time()
+    now = started if now is None else now
+    report = GcReport(dry_run=dry_run)
+    surviving: list[str] = []
+    kept_snapshots: dict[str, set[str]] = {}
+
+    for run_id in store.list_runs():
+        report.runs_scanned += 1
+        manifest = store.view_run(run_id).manifest
+        snapshots = store.snapshot_index(run_id)
+        latest = _latest_info(snapshots, manifest.latest_snapshot_id)
+        ttl = policy.ttl_for(latest.phase if latest is not None else "")
+        finished_at = latest.created_at if latest is not None else manifest.updated_at
+        if ttl is not None and now - finished_at >= ttl:
+            report.deleted_runs.append(run_id)
+            report.reclaimed_bytes += store.run_size(run_id) if dry_run else store.delete_run(run_id)
+            continue
+
+        surviving.append(run_id)
+        keep = policy.snapshots_to_keep(snapshots, latest.snapshot_id if latest is not None else "")
+        keep = keep_checkpoint_chains(store.view_run(run_id), keep)
+        kept_snapshots[run_id] = keep
+        drop = [info for info in snapshots if info.snapshot_id not in keep]
+        if drop:
+            report.compacted_runs[run_id] = len(drop)
+            report.reclaimed_bytes += sum(info.size for info in drop) if dry_run else compact_run(store, run_id, drop)
+
+    if policy.sweep_blobs and store.blobs is not None:
+        live: set[str] = set()
+        for run_id in surviving:
+            event_refs, snapshot_refs = store.blob_refs(run_id)
+            live.update(event_refs)
+            for snapshot_id, refs in snapshot_refs.items():
+                if snapshot_id in kept_snapshots[run_id]:
+                    live.update(refs)
+        cutoff = started - policy.blob_grace
+        for digest in list(store.blobs.digests()):
+            if digest in live:
+                continue
+            touched = store.blobs.touched_at(digest)
+            if touched is None or touched < cutoff:
+                report.deleted_blobs += 1
+                report.reclaimed_bytes += store.blobs.stored_size(digest) if dry_run else store.blobs.delete(digest)
+
+    if policy.vacuum and not dry_run:
+        report.vacuumed_bytes = store.vacuum()
+    return report
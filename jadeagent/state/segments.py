@@ -0,0 +1,296 @@
+"""Segmented, append-only event log for directory .jgx runs.
+
+Events live in rolling segment files under ``events/``, each named after the
+sequence number of its first event (``events/000000000001.jsonl``). When a
+segment fills up it is sealed and recorded in ``events/index.json`` with its
+event count, first and last timestamps, and a sparse list of byte offsets (one
+every ``index_stride`` lines). Range and tail reads jump straight to the right
+segment and offset, so they cost O(limit) instead of parsing the whole log.
+
+A legacy single ``events.jsonl`` is read as the first segment; new events for
+such a run go into ``events/``.
+
+Other processes may append to the same run, so cached segment state is
+checked on every access: a changed ``index.json`` or ``events/`` directory
+(a sealed or new segment) reloads it, and rows another writer appended to the
+active segment are read from the last known byte offset.
+"""
+
+from __future__ import annotations
+
+import bisect
+import json
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Iterator
+
+from .artifact import _read_json, _write_json
+
+
+SEGMENT_DIR = "events"
+LEGACY_EVENTS = "events.jsonl"
+SEGMENT_INDEX = "index.json"
+
+
+@dataclass
+class EventSegment:
+    """Location and summary of one segment file."""
+
+    name: str
+    first_seq: int
+    count: int = 0
+    first_ts: float = 0.0
+    last_ts: float = 0.0
+    size: int = 0
+    offsets: list[int] = field(default_factory=list)
+
+    @property
+    def last_seq(self) -> int:
+        return self.first_seq + self.count - 1
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "name": self.name,
+            "first_seq": self.first_seq,
+            "count": self.count,
+            "first_ts": self.first_ts,
+            "last_ts": self.last_ts,
+            "size": self.size,
+            "offsets": list(self.offsets),
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any]) -> "EventSegment":
+        return cls(
+            name=str(data["name"]),
+            first_seq=int(data["first_seq"]),
+            count=int(data.get("count", 0)),
+            first_ts=float(data.get("first_ts", 0.0)),
+            last_ts=float(data.get("last_ts", 0.0)),
+            size=int(data.get("size", 0)),
+            offsets=[int(offset) for offset in data.get("offsets", [])],
+        )
+
+
+class SegmentedEventLog:
+    """Append and read the event log of one run directory."""
+
+    def __init__(self, root: str | Path, *, segment_events: int = 4096, index_stride: int = 64):
+        self.root = Path(root)
+        self.segment_events = max(int(segment_events), 1)
+        self.index_stride = max(int(index_stride), 1)
+        self._sealed: list[EventSegment] = []
+        self._active: EventSegment | None = None
+        self._loaded = False
+        self._fingerprint: tuple[Any, ...] = ()
+
+    @property
+    def index_path(self) -> Path:
+        return self.root / SEGMENT_DIR / SEGMENT_INDEX
+
+    def _scan(self, name: str, first_seq: int) -> EventSegment:
+        """Rebuild a segment's offsets from its file; only the first and last rows are parsed."""
+
+        segment = EventSegment(name=name, first_seq=first_seq)
+        path = self.root / name
+        if not path.exists():
+            return segment
+        first_line = last_line = b""
+        with path.open("rb") as handle:
+            for line in handle:
+                if line.strip():
+                    if segment.count % self.index_stride == 0:
+                        segment.offsets.append(segment.size)
+                    segment.count += 1
+                    first_line = first_line or line
+                    last_line = line
+                segment.size += len(line)
+        if segment.count:
+            segment.first_ts = float(json.loads(first_line).get("timestamp", 0.0) or 0.0)
+            segment.last_ts = float(json.loads(last_line).get("timestamp", 0.0) or 0.0)
+        return segment
+
+    def _track(self, segment: EventSegment, timestamp: Any) -> None:
+        if segment.count % self.index_stride == 0:
+            segment.offsets.append(segment.size)
+        timestamp = float(timestamp or 0.0)
+        if segment.count == 0:
+            segment.first_ts = timestamp
+        segment.last_ts = timestamp
+        segment.count += 1
+
+    def _disk_fingerprint(self) -> tuple[Any, ...]:
+        """Stat of the index and segment directory; changes when segments are sealed or added."""
+
+        stats: list[Any] = []
+        for path in (self.index_path, self.root / SEGMENT_DIR):
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                stats.append(None)
+            else:
+                stats.append((stat.st_mtime_ns, stat.st_size))
+        return tuple(stats)
+
+    def _catch_up(self) -> bool:
+        """Track complete rows other writers appended to the active segment.
+
+        Returns False when the file no longer extends what was tracked (it
+        shrank or was rewritten), so the caller rescans it.
+        """
+
+        segment = self._active
+        if segment is None:
+            return True
+        path = self.root / segment.name
+        try:
+            size = path.stat().st_size
+        except FileNotFoundError:
+            return False
+        if size == segment.size:
+            return True
+        if size < segment.size:
+            return False
+        rows: list[tuple[int, dict[str, Any]]] = []
+        end = segment.size
+        with path.open("rb") as handle:
+            if end:
+                handle.seek(end - 1)
+                if handle.read(1) != b"\n":
+                    return False
+            for line in handle:
+                if not line.endswith(b"\n"):
+                    break  # a row still being written
+                if line.strip():
+                    try:
+                        rows.append((end, json.loads(line)))
+                    except json.JSONDecodeError:
+                        return False
+                end += len(line)
+        for offset, row in rows:
+            if segment.count % self.index_stride == 0:
+                segment.offsets.append(offset)
+            if segment.count == 0:
+                segment.first_ts = float(row.get("timestamp", 0.0) or 0.0)
+            segment.last_ts = float(row.get("timestamp", 0.0) or 0.0)
+            segment.count += 1
+        segment.size = end
+        return True
+
+    def _load(self) -> None:
+        fingerprint = self._disk_fingerprint()
+        if self._loaded and fingerprint == self._fingerprint and self._catch_up():
+            return
+        sealed: list[EventSegment] = []
+        if self.index_path.exists():
+            sealed = [EventSegment.from_dict(row) for row in _read_json(self.index_path).get("segments", [])]
+        known = {segment.name for segment in sealed}
+        if not sealed and (self.root / LEGACY_EVENTS).exists():
+            legacy = self._scan(LEGACY_EVENTS, 1)
+            if legacy.count:
+                sealed.append(legacy)
+                known.add(LEGACY_EVENTS)
+        active: EventSegment | None = None
+        segment_dir = self.root / SEGMENT_DIR
+        if segment_dir.exists():
+            for path in sorted(segment_dir.glob("*.jsonl")):
+                name = f"{SEGMENT_DIR}/{path.name}"
+                if name in known:
+                    continue
+                if active is not None:
+                    sealed.append(active)
+                active = self._scan(name, int(path.stem))
+        self._sealed = sealed
+        self._active = active
+        self._loaded = True
+        self._fingerprint = fingerprint
+
+    def refresh(self) -> None:
+        """Forget cached segment state so the next call re-reads the directory."""
+
+        self._loaded = False
+
+    @property
+    def segments(self) -> list[EventSegment]:
+        self._load()
+        return self._sealed + ([self._active] if self._active is not None else [])
+
+    @property
+    def count(self) -> int:
+        segments = self.segments
+        return segments[-1].last_seq if segments else 0
+
+    @property
+    def last_timestamp(self) -> float:
+        segments = [segment for segment in self.segments if segment.count]
+        return segments[-1].last_ts if segments else 0.0
+
+    def _seal_active(self) -> None:
+        if self._active is None:
+            return
+        self._sealed.append(self._active)
+        self._active = None
+        _write_json(self.index_path, {"segments": [segment.to_dict() for segment in self._sealed]})
+
+    def append(self, data: dict[str, Any]) -> int:
+        """Append one event row and return its 1-based sequence number."""
+
+        self._load()
+        if self._active is not None and self._active.count >= self.segment_events:
+            self._seal_active()
+        if self._active is None:
+            if self._sealed and not self.index_path.exists():
+                _write_json(self.index_path, {"segments": [segment.to_dict() for segment in self._sealed]})
+            first_seq = self.count + 1
+            self._active = EventSegment(name=f"{SEGMENT_DIR}/{first_seq:012d}.jsonl", first_seq=first_seq)
+        line = json.dumps(data, sort_keys=True, ensure_ascii=True, separators=(",", ":")).encode("utf-8") + b"\n"
+        path = self.root / self._active.name
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with path.open("ab") as handle:
+            handle.write(line)
+        self._track(self._active, data.get("timestamp", 0.0))
+        self._active.size += len(line)
+        return self._active.last_seq
+
+    def _read_segment(self, segment: EventSegment, skip: int, limit: int | None) -> Iterator[dict[str, Any]]:
+        if skip >= segment.count or limit == 0:
+            return
+        block = skip // self.index_stride
+        skip -= block * self.index_stride
+        produced = 0
+        with (self.root / segment.name).open("rb") as handle:
+            handle.seek(segment.offsets[block] if block < len(segment.offsets) else 0)
+            for line in handle:
+                if not line.strip():
+                    continue
+                if skip:
+                    skip -= 1
+                    continue
+                yield json.loads(line)
+                produced += 1
+                if limit is not None and produced >= limit:
+                    return
+
+    def read(self, after_seq: int = 0, limit: int | None = None) -> Iterator[dict[str, Any]]:
+        """Yield event rows with sequence numbers after `after_seq`."""
+
+        segments = self.segments
+        if not segments:
+            return
+        after_seq = max(int(after_seq), 0)
+        remaining = None if limit is None else max(int(limit), 0)
+        position = max(bisect.bisect_right([segment.first_seq for segment in segments], after_seq + 1) - 1, 0)
+        for segment in segments[position:]:
+            if remaining == 0:
+                return
+            skip = max(after_seq + 1 - segment.first_seq, 0)
+            for row in self._read_segment(segment, skip, remaining):
+                yield row
+                if remaining is not None:
+                    remaining -= 1
+
+    def read_segment(self, segment: EventSegment) -> Iterator[dict[str, Any]]:
+        return self._read_segment(segment, 0, None)
+
+    def tail(self, limit: int) -> list[dict[str, Any]]:
+        return list(self.read(after_seq=max(self.count - max(int(limit), 0), 0)))
@@ -0,0 +1,472 @@
+"""StateStore that spreads runs over several SQLite files.
+
+SQLite allows one writer per database file. `ShardedSqliteStateStore` hashes
+each `run_id` onto one of N shard files, so agents writing different runs
+commit in parallel instead of queueing on one file lock. The shard layout is
+recorded in ``shards.json`` under the store root, and `reshard()` moves runs
+to a new layout while other threads of the same store keep using it.
+
+Each open store holds a shared lock on ``shards.lock``; `reshard()` needs it
+exclusively, so it refuses to run while another handle, in this process or
+another one, has the store open with the old layout.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import heapq
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Iterator
+
+from .artifact import JadeExecutionCapsule, _read_json, _write_json
+from .blobs import BlobStore
+from .events import JadeStateEvent
+from .integrity import ChainRecord
+from .manifest import JadeStateManifest
+from .retention import SnapshotInfo
+from .snapshot import AgentRuntimeSnapshot
+from .sqlite_store import SqliteStateStore
+from .store import StateStore
+from .view import CapsuleView
+
+
+SHARD_LAYOUT = "shards.json"
+SHARD_LOCK = "shards.lock"
+_LOCK_STRIPES = 64
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - Windows
+    fcntl = None
+    import msvcrt
+
+
+def shard_index(run_id: str, shard_count: int) -> int:
+    """Stable shard for `run_id`; independent of Python's per-process hash seed."""
+
+    digest = hashlib.sha256(run_id.encode("utf-8")).digest()
+    return int.from_bytes(digest[:8], "big") % shard_count
+
+
+def _shard_file(root: Path, shard_count: int, index: int) -> Path:
+    return root / f"shard-{shard_count:03d}-{index:03d}.sqlite3"
+
+
+def _remove_sqlite_files(path: Path) -> None:
+    for suffix in ("", "-wal", "-shm"):
+        candidate = Path(str(path) + suffix)
+        if candidate.exists():
+            candidate.unlink()
+
+
+class _LayoutLock:
+    """Reader/writer lock on ``shards.lock`` shared by every process.
+
+    POSIX uses `flock`. Windows has no shared file locks, so each holder
+    locks its own byte among `slots`, and the exclusive lock is the whole
+    slot range: it is only granted while no other holder exists, and new
+    holders wait for it to be released.
+    """
+
+    slots = 1024
+
+    def __init__(self, path: Path):
+        self._handle = open(path, "a+b")
+        self._slot: int | None = None
+
+    def _try_lock(self, offset: int, length: int) -> bool:
+        self._handle.seek(offset)
+        try:
+            msvcrt.locking(self._handle.fileno(), msvcrt.LK_NBLCK, length)
+        except OSError:
+            return False
+        return True
+
+    def _unlock(self, offset: int, length: int) -> None:
+        self._handle.seek(offset)
+        msvcrt.locking(self._handle.fileno(), msvcrt.LK_UNLCK, length)
+
+    def acquire_shared(self) -> None:
+        if fcntl is not None:
+            fcntl.flock(self._handle.fileno(), fcntl.LOCK_SH)
+            return
+        while True:
+            for slot in range(self.slots):
+                if self._try_lock(slot, 1):
+                    self._slot = slot
+                    return
+            time.sleep(0.05)
+
+    def try_exclusive(self) -> bool:
+        """Trade the shared lock for the exclusive one; False while others hold it."""
+
+        if fcntl is not None:
+            try:
+                fcntl.flock(self._handle.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                # flock may drop the shared lock on a failed conversion.
+                fcntl.flock(self._handle.fileno(), fcntl.LOCK_SH)
+                return False
+            return True
+        if self._slot is not None:
+            self._unlock(self._slot, 1)
+            self._slot = None
+        if self._try_lock(0, self.slots):
+            return True
+        self.acquire_shared()
+        return False
+
+    def release_exclusive(self) -> None:
+        """Go back to holding the lock shared."""
+
+        if fcntl is not None:
+            fcntl.flock(self._handle.fileno(), fcntl.LOCK_SH)
+            return
+        self._unlock(0, self.slots)
+        self.acquire_shared()
+
+    def close(self) -> None:
+        self._handle.close()
+
+
+class ShardedBlobStore(BlobStore):
+    """Blob view across every shard of a ShardedSqliteStateStore.
+
+    Each shard stores the blobs its own runs reference, so a digest may live
+    in several shards; `delete` removes it from all of them.
+    """
+
+    def __init__(self, store: "ShardedSqliteStateStore"):
+        self.store = store
+
+    def put(self, data: bytes) -> str:
+        from .blobs import blob_digest
+
+        digest = blob_digest(data)
+        shards = self.store._shards
+        return shards[shard_index(digest, len(shards))].blobs.put(data)
+
+    def get(self, digest: str) -> bytes:
+        for shard in self.store._shards:
+            if shard.blobs.has(digest):
+                return shard.blobs.get(digest)
+        raise KeyError(f"blob not found: {digest}")
+
+    def has(self, digest: str) -> bool:
+        return any(shard.blobs.has(digest) for shard in self.store._shards)
+
+    def digests(self) -> Iterator[str]:
+        return iter(sorted(set().union(*(set(shard.blobs.digests()) for shard in self.store._shards))))
+
+    def stored_size(self, digest: str) -> int:
+        return sum(shard.blobs.stored_size(digest) for shard in self.store._shards)
+
+    def touched_at(self, digest: str) -> float | None:
+        times = [shard.blobs.touched_at(digest) for shard in self.store._shards]
+        return max((value for value in times if value is not None), default=None)
+
+    def delete(self, digest: str) -> int:
+        return sum(shard.blobs.delete(digest) for shard in self.store._shards)
+
+
+class ShardedSqliteStateStore(StateStore):
+    """Route runs to `shards` SQLite files by a stable hash of `run_id`.
+
+    `store_options` are passed to every shard's `SqliteStateStore`. An existing
+    store keeps the shard count recorded in ``shards.json``; use `reshard()` to
+    change it. Opening waits while another process is resharding the store.
+    """
+
+    def __init__(self, root: str | Path = ".jade_state_shards", *, shards: int = 4, **store_options: Any):
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+        self.store_options = store_options
+        self._file_lock = _LayoutLock(self.root / SHARD_LOCK)
+        self._file_lock.acquire_shared()
+        layout_path = self.root / SHARD_LAYOUT
+        if layout_path.exists():
+            shards = int(_read_json(layout_path)["shards"])
+        else:
+            _write_json(layout_path, {"shards": max(int(shards), 1)})
+        self._shards = self._open_layout(max(int(shards), 1))
+        self._pending: list[SqliteStateStore] | None = None
+        self._moved: set[str] = set()
+        self._layout_lock = threading.RLock()
+        self._run_locks = [threading.RLock() for _ in range(_LOCK_STRIPES)]
+        self.blobs = ShardedBlobStore(self)
+
+    def _open_layout(self, shard_count: int) -> list[SqliteStateStore]:
+        return [
+            SqliteStateStore(_shard_file(self.root, shard_count, index), **self.store_options)
+            for index in range(shard_count)
+        ]
+
+    @property
+    def shard_count(self) -> int:
+        return len(self._shards)
+
+    @property
+    def shards(self) -> list[SqliteStateStore]:
+        return list(self._shards)
+
+    @contextmanager
+    def _run(self, run_id: str) -> Iterator[SqliteStateStore]:
+        """Hold the run's lock stripe and yield the shard that currently owns the run."""
+
+        with self._run_locks[shard_index(run_id, _LOCK_STRIPES)]:
+            with self._layout_lock:
+                pending = self._pending
+                if pending is not None and run_id in self._moved:
+                    shard = pending[shard_index(run_id, len(pending))]
+                else:
+                    shard = self._shards[shard_index(run_id, len(self._shards))]
+            yield shard
+
+    def store_for(self, run_id: str) -> SqliteStateStore:
+        with self._run(run_id) as shard:
+            return shard
+
+    def close(self) -> None:
+        with self._layout_lock:
+            for shard in self._shards:
+                shard.close()
+            self._file_lock.close()
+
+    @property
+    def metrics(self) -> dict[str, float]:
+        merged: dict[str, float] = {}
+        for shard in self._shards:
+            for name, value in shard.metrics.items():
+                merged[name] = merged.get(name, 0) + value
+        merged["busy_timeout_ms"] = self._shards[0].metrics["busy_timeout_ms"]
+        return merged
+
+    def _migrate(self, run_id: str) -> None:
+        """Copy `run_id` into the pending layout; the caller holds the run's lock stripe."""
+
+        with self._layout_lock:
+            pending, old = self._pending, self._shards
+            if pending is None or run_id in self._moved:
+                return
+        _copy_run(old[shard_index(run_id, len(old))], pending[shard_index(run_id, len(pending))], run_id)
+        with self._layout_lock:
+            self._moved.add(run_id)
+
+    def create_run(self, manifest: JadeStateManifest) -> JadeStateManifest:
+        with self._run_locks[shard_index(manifest.run_id, _LOCK_STRIPES)]:
+            self._migrate(manifest.run_id)
+            with self._run(manifest.run_id) as shard:
+                return shard.create_run(manifest)
+
+    def append_event(self, run_id: str, event: JadeStateEvent | dict[str, Any]) -> JadeStateEvent:
+        with self._run(run_id) as shard:
+            return shard.append_event(run_id, event)
+
+    def save_snapshot(self, run_id: str, snapshot: AgentRuntimeSnapshot) -> AgentRuntimeSnapshot:
+        with self._run(run_id) as shard:
+            return shard.save_snapshot(run_id, snapshot)
+
+    def latest_snapshot(self, run_id: str) -> AgentRuntimeSnapshot | None:
+        with self._run(run_id) as shard:
+            return shard.latest_snapshot(run_id)
+
+    def restore_latest(self, run_id: str) -> tuple[JadeStateManifest, AgentRuntimeSnapshot | None]:
+        with self._run(run_id) as shard:
+            return shard.restore_latest(run_id)
+
+    def load_run(self, run_id: str) -> JadeExecutionCapsule:
+        with self._run(run_id) as shard:
+            return shard.load_run(run_id)
+
+    def view_run(self, run_id: str) -> CapsuleView:
+        with self._run(run_id) as shard:
+            return shard.view_run(run_id)
+
+    def list_events(self, run_id: str, limit: int = 100) -> list[JadeStateEvent]:
+        with self._run(run_id) as shard:
+            return shard.list_events(run_id, limit=limit)
+
+    def inspect(self, run_id: str) -> dict[str, Any]:
+        with self._run(run_id) as shard:
+            return shard.inspect(run_id)
+
+    def chain_records(self, run_id: str, after_seq: int = 0) -> Iterator[ChainRecord]:
+        with self._run(run_id) as shard:
+            return shard.chain_records(run_id, after_seq)
+
+    def verified_checkpoint(self, run_id: str) -> ChainRecord | None:
+        with self._run(run_id) as shard:
+            return shard.verified_checkpoint(run_id)
+
+    def record_verified(self, run_id: str, record: ChainRecord) -> None:
+        with self._run(run_id) as shard:
+            shard.record_verified(run_id, record)
+
+    def snapshot_index(self, run_id: str) -> list[SnapshotInfo]:
+        with self._run(run_id) as shard:
+            return shard.snapshot_index(run_id)
+
+    def run_size(self, run_id: str) -> int:
+        with self._run(run_id) as shard:
+            return shard.run_size(run_id)
+
+    def delete_snapshots(self, run_id: str, snapshot_ids: list[str]) -> int:
+        with self._run(run_id) as shard:
+            return shard.delete_snapshots(run_id, snapshot_ids)
+
+    def delete_run(self, run_id: str) -> int:
+        with self._run(run_id) as shard:
+            return shard.delete_run(run_id)
+
+    def blob_refs(self, run_id: str) -> tuple[set[str], dict[str, set[str]]]:
+        with self._run(run_id) as shard:
+            return shard.blob_refs(run_id)
+
+    def vacuum(self) -> int:
+        with ThreadPoolExecutor(max_workers=len(self._shards)) as pool:
+            return sum(pool.map(lambda shard: shard.vacuum(), self.shards))
+
+    def list_runs(self) -> list[str]:
+        """Run ids from every shard, most recently updated first."""
+
+        with self._layout_lock:
+            shards = self.shards + (list(self._pending) if self._pending is not None else [])
+        merged = heapq.merge(*(shard.run_index() for shard in shards), key=lambda item: -item[1])
+        seen: set[str] = set()
+        run_ids: list[str] = []
+        for run_id, _ in merged:
+            if run_id not in seen:
+                seen.add(run_id)
+                run_ids.append(run_id)
+        return run_ids
+
+    def export_run(self, run_id: str, destination: str | Path) -> Path:
+        with self._run(run_id) as shard:
+            return shard.export_run(run_id, destination)
+
+    def export_runs(self, run_ids: list[str], destination: str | Path, *, max_workers: int | None = None) -> list[Path]:
+        """Export runs to ``<destination>/<run_id>.jgx`` in parallel, one worker per shard by default."""
+
+        root = Path(destination)
+        root.mkdir(parents=True, exist_ok=True)
+        with ThreadPoolExecutor(max_workers=max_workers or len(self._shards)) as pool:
+            return list(pool.map(lambda run_id: self.export_run(run_id, root / f"{run_id}.jgx"), run_ids))
+
+    def reshard(self, shard_count: int, *, remove_old: bool = True) -> dict[str, Any]:
+        """Move every run to a layout with `shard_count` files while this store stays usable.
+
+        Runs are copied one at a time under their lock stripe, so other
+        threads' reads and writes to other runs continue, and a run's own
+        operations wait only while it is being copied. Runs created meanwhile
+        go straight to the new layout.
+
+        Other handles on the same root would keep writing to the old files,
+        so this raises RuntimeError while any is open; stores opened during
+        the reshard wait for it to finish and see the new layout.
+        """
+
+        shard_count = max(int(shard_count), 1)
+        with self._layout_lock:
+            if self._pending is not None:
+                raise RuntimeError("a reshard is already in progress")
+            if shard_count == len(self._shards):
+                return {"shards": shard_count, "moved_runs": 0}
+            if not self._file_lock.try_exclusive():
+                raise RuntimeError(f"{self.root} is open in another store handle or process; close it before resharding")
+            try:
+                # Files left by an earlier reshard that crashed may hold runs
+                # deleted since; start the target layout empty.
+                for index in range(shard_count):
+                    _remove_sqlite_files(_shard_file(self.root, shard_count, index))
+                self._pending = self._open_layout(shard_count)
+            except BaseException:
+                self._file_lock.release_exclusive()
+                raise
+            self._moved = set()
+            old = list(self._shards)
+
+        try:
+            moved = 0
+            for source in old:
+                for run_id, _ in source.run_index():
+                    with self._run_locks[shard_index(run_id, _LOCK_STRIPES)]:
+                        self._migrate(run_id)
+                    moved += 1
+
+            with self._layout_lock:
+                self._shards = self._pending
+                self._pending = None
+                self._moved = set()
+                _write_json(self.root / SHARD_LAYOUT, {"shards": shard_count})
+            for source in old:
+                source.close()
+                if remove_old:
+                    _remove_sqlite_files(Path(source.path))
+        finally:
+            self._file_lock.release_exclusive()
+        return {"shards": shard_count, "moved_runs": moved}
+
+
+def _copy_run(source: SqliteStateStore, target: SqliteStateStore, run_id: str) -> None:
+    """Copy one run's rows, chain state, and referenced blobs between shard files."""
+
+    with source._writing():
+        source._chain_head(run_id)
+    event_refs, snapshot_refs = source.blob_refs(run_id)
+    digests = sorted(event_refs.union(*snapshot_refs.values()))
+    with source._reading() as conn:
+        manifest = conn.execute("SELECT run_id, data, updated_at FROM manifests WHERE run_id = ?", (run_id,)).fetchone()
+        events = conn.execute(
+            """
+            SELECT run_id, event_id, timestamp, data, seq, chain_hash, secret_paths FROM events
+            WHERE run_id = ?
+            ORDER BY sequence ASC
+            """,
+            (run_id,),
+        ).fetchall()
+        snapshots = conn.execute(
+            """
+            SELECT run_id, snapshot_id, created_at, phase, step, data FROM snapshots
+            WHERE run_id = ?
+            ORDER BY sequence ASC
+            """,
+            (run_id,),
+        ).fetchall()
+        checkpoint = conn.execute(
+            "SELECT run_id, seq, chain_hash, secret_paths FROM chain_checkpoints WHERE run_id = ?",
+            (run_id,),
+        ).fetchone()
+        blobs = [
+            conn.execute("SELECT digest, encoding, size, data FROM blobs WHERE digest = ?", (digest,)).fetchone()
+            for digest in digests
+        ]
+    with target._writing() as conn:
+        for table in ("events", "snapshots", "chain_checkpoints", "manifests"):
+            conn.execute(f"DELETE FROM {table} WHERE run_id = ?", (run_id,))
+        if manifest is not None:
+            conn.execute("INSERT INTO manifests(run_id, data, updated_at) VALUES(?, ?, ?)", tuple(manifest))
+        conn.executemany(
+            """
+            INSERT INTO events(run_id, event_id, timestamp, data, seq, chain_hash, secret_paths)
+            VALUES(?, ?, ?, ?, ?, ?, ?)
+            """,
+            [tuple(row) for row in events],
+        )
+        conn.executemany(
+            "INSERT INTO snapshots(run_id, snapshot_id, created_at, phase, step, data) VALUES(?, ?, ?, ?, ?, ?)",
+            [tuple(row) for row in snapshots],
+        )
+        if checkpoint is not None:
+            conn.execute(
+                "INSERT INTO chain_checkpoints(run_id, seq, chain_hash, secret_paths) VALUES(?, ?, ?, ?)",
+                tuple(checkpoint),
+            )
+        conn.executemany(
+            "INSERT OR IGNORE INTO blobs(digest, encoding, size, data) VALUES(?, ?, ?, ?)",
+            [tuple(row) for row in blobs if row is not None],
+        )
+        conn.commit()
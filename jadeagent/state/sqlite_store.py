@@ -1,37 +1,299 @@
-"""SQLite-backed StateStore for Jade governed execution capsules."""
+"""SQLite-backed StateStore for Jade governed execution capsules.
+
+Writes go through one writer connection. Reads check out a connection from a
+small pool of read-only connections and run inside their own transaction, so
+under WAL they see a consistent snapshot and never wait for checkpoint writes.
+"""
 
 from __future__ import annotations
 
 import json
+import queue
 import sqlite3
 import threading
+import time
+import zlib
+from contextlib import contextmanager
 from pathlib import Path
-from typing import Any
+from typing import Any, Callable, Iterator
 
 from .artifact import JadeExecutionCapsule
+from .blobs import BLOB_REF_KEY, DEFAULT_BLOB_THRESHOLD, BlobStore, blob_digest, blob_refs
+from .codec import RecordCodec, decode_record, get_codec, may_reference_blobs
 from .events import JadeStateEvent
+from .integrity import ChainRecord, chain_record, iter_chain_records
 from .manifest import JadeStateManifest
+from .retention import SnapshotInfo
 from .snapshot import AgentRuntimeSnapshot
 from .store import StateStore
+from .view import CapsuleView, SqliteCapsuleView
+
+
+class SqliteBlobStore(BlobStore):
+    """Blobs in the ``blobs`` table of a SqliteStateStore, shared by all its runs.
+
+    Writes join the store's current transaction, so a blob commits together
+    with the event or snapshot that references it.
+    """
+
+    def __init__(self, store: "SqliteStateStore", *, compress: bool = True, level: int = 6):
+        self.store = store
+        self.compress = compress
+        self.level = level
+
+    def put(self, data: bytes) -> str:
+        digest = blob_digest(data)
+        encoding, content = "raw", bytes(data)
+        if self.compress:
+            packed = zlib.compress(data, self.level)
+            if len(packed) < len(data):
+                encoding, content = "zlib", packed
+        with self.store._writing() as conn:
+            conn.execute(
+                "INSERT INTO blobs(digest, encoding, size, data, touched_at) VALUES(?, ?, ?, ?, ?) "
+                "ON CONFLICT(digest) DO UPDATE SET touched_at = excluded.touched_at",
+                (digest, encoding, len(data), sqlite3.Binary(content), time.time()),
+            )
+        return digest
+
+    def get(self, digest: str) -> bytes:
+        with self.store._reading() as conn:
+            row = conn.execute(
+                "SELECT encoding, data FROM blobs WHERE digest = ?",
+                (digest,),
+            ).fetchone()
+        if row is None:
+            raise KeyError(f"blob not found: {digest}")
+        content = bytes(row["data"])
+        return zlib.decompress(content) if row["encoding"] == "zlib" else content
+
+    def has(self, digest: str) -> bool:
+        with self.store._reading() as conn:
+            row = conn.execute("SELECT 1 FROM blobs WHERE digest = ?", (digest,)).fetchone()
+        return row is not None
+
+    def digests(self) -> Iterator[str]:
+        with self.store._reading() as conn:
+            rows = conn.execute("SELECT digest FROM blobs ORDER BY digest").fetchall()
+        return iter(str(row["digest"]) for row in rows)
+
+    def stored_size(self, digest: str) -> int:
+        with self.store._reading() as conn:
+            row = conn.execute("SELECT length(data) AS size FROM blobs WHERE digest = ?", (digest,)).fetchone()
+        return int(row["size"]) if row is not None else 0
+
+    def touched_at(self, digest: str) -> float | None:
+        with self.store._reading() as conn:
+            row = conn.execute("SELECT touched_at FROM blobs WHERE digest = ?", (digest,)).fetchone()
+        return float(row["touched_at"]) if row is not None and row["touched_at"] is not None else None
+
+    def delete(self, digest: str) -> int:
+        with self.store._writing() as conn:
+            row = conn.execute("SELECT length(data) AS size FROM blobs WHERE digest = ?", (digest,)).fetchone()
+            conn.execute("DELETE FROM blobs WHERE digest = ?", (digest,))
+            conn.commit()
+        return int(row["size"]) if row is not None else 0
+
+
+def _is_busy(exc: sqlite3.OperationalError) -> bool:
+    message = str(exc).lower()
+    return "locked" in message or "busy" in message
+
+
+class SqliteReaderPool:
+    """Read-only connections to one database, opened on demand up to `size`.
+
+    Each checkout runs in its own read transaction, which under WAL pins a
+    consistent snapshot until the connection is returned. Statements are
+    compiled once per connection and reused from its statement cache.
+    """
+
+    def __init__(
+        self,
+        path: Path,
+        *,
+        size: int = 4,
+        busy_timeout: float = 5.0,
+        on_metric: Callable[[str, float], None] | None = None,
+    ):
+        self.uri = path.resolve().as_uri() + "?mode=ro"
+        self.size = max(int(size), 1)
+        self.busy_timeout = busy_timeout
+        self._on_metric = on_metric or (lambda name, value: None)
+        self._idle: queue.LifoQueue[sqlite3.Connection] = queue.LifoQueue()
+        self._connections: list[sqlite3.Connection] = []
+        self._lock = threading.Lock()
+        self._closed = False
+
+    def _open(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(
+            self.uri,
+            uri=True,
+            check_same_thread=False,
+            isolation_level=None,
+            cached_statements=256,
+        )
+        conn.row_factory = sqlite3.Row
+        conn.execute(f"PRAGMA busy_timeout={int(self.busy_timeout * 1000)}")
+        return conn
+
+    def _checkout(self) -> sqlite3.Connection:
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            pass
+        with self._lock:
+            if self._closed:
+                raise sqlite3.ProgrammingError("reader pool is closed")
+            if len(self._connections) < self.size:
+                conn = self._open()
+                self._connections.append(conn)
+                self._on_metric("readers_open", 1)
+                return conn
+        started = time.perf_counter()
+        conn = self._idle.get()
+        self._on_metric("read_waits", 1)
+        self._on_metric("read_wait_seconds", time.perf_counter() - started)
+        return conn
+
+    @contextmanager
+    def connection(self) -> Iterator[sqlite3.Connection]:
+        conn = self._checkout()
+        try:
+            conn.execute("BEGIN")
+            yield conn
+        finally:
+            if conn.in_transaction:
+                conn.execute("COMMIT")
+            self._idle.put(conn)
+
+    def close(self) -> None:
+        with self._lock:
+            self._closed = True
+            for conn in self._connections:
+                conn.close()
+            self._connections.clear()
 
 
 class SqliteStateStore(StateStore):
-    """Durable local SQLite store for JGX manifests, events, and snapshots."""
+    """Durable local SQLite store for JGX manifests, events, and snapshots.
 
-    def __init__(self, path: str | Path = ".jade_state.sqlite3"):
+    `readers` read-only connections serve reads concurrently with the single
+    writer; with `readers=0` (or an in-memory database) reads share the writer
+    connection. `metrics` counts reads, writes, lock waits, and busy errors.
+
+    `codec` controls how event and snapshot rows are encoded (see
+    `RecordCodec`); the default stores canonical JSON text.
+    """
+
+    def __init__(
+        self,
+        path: str | Path = ".jade_state.sqlite3",
+        *,
+        blob_threshold: int | None = DEFAULT_BLOB_THRESHOLD,
+        compress_blobs: bool = True,
+        readers: int = 4,
+        busy_timeout: float = 5.0,
+        codec: RecordCodec | str | None = None,
+    ):
         self.path = Path(path)
+        self.codec = get_codec(codec)
         self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.busy_timeout = busy_timeout
+        self.metrics: dict[str, float] = {
+            "reads": 0,
+            "writes": 0,
+            "read_waits": 0,
+            "read_wait_seconds": 0.0,
+            "write_waits": 0,
+            "write_wait_seconds": 0.0,
+            "busy_errors": 0,
+            "readers_open": 0,
+            "busy_timeout_ms": int(busy_timeout * 1000),
+        }
+        self._metrics_lock = threading.Lock()
+        self._local = threading.local()
         self._lock = threading.RLock()
-        self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False, cached_statements=256)
         self._conn.row_factory = sqlite3.Row
+        self._conn.execute(f"PRAGMA busy_timeout={int(busy_timeout * 1000)}")
         self._init_schema()
+        in_memory = str(path) == ":memory:" or str(path).startswith("file::memory:")
+        self._readers = (
+            SqliteReaderPool(self.path, size=readers, busy_timeout=busy_timeout, on_metric=self._metric)
+            if readers > 0 and not in_memory
+            else None
+        )
+        self.blobs = SqliteBlobStore(self, compress=compress_blobs)
+        self.blob_threshold = blob_threshold
 
     def close(self) -> None:
         with self._lock:
+            if self._readers is not None:
+                self._readers.close()
             self._conn.close()
 
+    def _metric(self, name: str, value: float = 1) -> None:
+        with self._metrics_lock:
+            self.metrics[name] = self.metrics.get(name, 0) + value
+
+    @contextmanager
+    def _writing(self) -> Iterator[sqlite3.Connection]:
+        """Hold the writer connection, counting time spent waiting for it."""
+
+        if not self._lock.acquire(blocking=False):
+            started = time.perf_counter()
+            self._lock.acquire()
+            self._metric("write_waits")
+            self._metric("write_wait_seconds", time.perf_counter() - started)
+        try:
+            self._metric("writes")
+            yield self._conn
+        except sqlite3.OperationalError as exc:
+            if _is_busy(exc):
+                self._metric("busy_errors")
+            raise
+        finally:
+            self._lock.release()
+
+    @contextmanager
+    def _reading(self) -> Iterator[sqlite3.Connection]:
+        """Check out a read connection; falls back to the writer without a pool.
+
+        Nested reads on one thread (blob lookups while decoding rows) reuse the
+        connection that thread already holds.
+        """
+
+        current = getattr(self._local, "conn", None)
+        if current is not None:
+            yield current
+            return
+        self._metric("reads")
+        try:
+            if self._readers is None:
+                with self._lock:
+                    self._local.conn = self._conn
+                    try:
+                        yield self._conn
+                    finally:
+                        self._local.conn = None
+            else:
+                with self._readers.connection() as conn:
+                    self._local.conn = conn
+                    try:
+                        yield conn
+                    finally:
+                        self._local.conn = None
+        except sqlite3.OperationalError as exc:
+            if _is_busy(exc):
+                self._metric("busy_errors")
+            raise
+
     def _init_schema(self) -> None:
         with self._lock:
+            # auto_vacuum only takes effect before the first table exists;
+            # older databases are converted by the first vacuum().
+            self._conn.execute("PRAGMA auto_vacuum=INCREMENTAL")
             self._conn.execute("PRAGMA journal_mode=WAL")
             self._conn.execute("PRAGMA foreign_keys=ON")
             self._conn.execute(
@@ -68,15 +330,57 @@ class SqliteStateStore(StateStore):
                 )
                 """
             )
+            self._conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS blobs (
+                    digest TEXT PRIMARY KEY,
+                    encoding TEXT NOT NULL,
+                    size INTEGER NOT NULL,
+                    data BLOB NOT NULL,
+                    touched_at REAL
+                )
+                """
+            )
+            self._conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS chain_checkpoints (
+                    run_id TEXT PRIMARY KEY,
+                    seq INTEGER NOT NULL,
+                    chain_hash TEXT NOT NULL,
+                    secret_paths TEXT NOT NULL
+                )
+                """
+            )
+            event_columns = {row["name"] for row in self._conn.execute("PRAGMA table_info(events)")}
+            for column, ddl in (
+                ("seq", "INTEGER"),
+                ("chain_hash", "TEXT"),
+                ("secret_paths", "TEXT"),
+            ):
+                if column not in event_columns:
+                    self._conn.execute(f"ALTER TABLE events ADD COLUMN {column} {ddl}")
+            blob_columns = {row["name"] for row in self._conn.execute("PRAGMA table_info(blobs)")}
+            if "touched_at" not in blob_columns:
+                self._conn.execute("ALTER TABLE blobs ADD COLUMN touched_at REAL")
             self._conn.execute("CREATE INDEX IF NOT EXISTS idx_events_run_seq ON events(run_id, sequence)")
             self._conn.execute("CREATE INDEX IF NOT EXISTS idx_snapshots_run_seq ON snapshots(run_id, sequence)")
+            self._conn.execute("CREATE INDEX IF NOT EXISTS idx_manifests_updated ON manifests(updated_at)")
             self._conn.commit()
 
     def _dump(self, data: dict[str, Any]) -> str:
         return json.dumps(data, sort_keys=True, ensure_ascii=True, separators=(",", ":"))
 
-    def _load_manifest(self, run_id: str) -> JadeStateManifest | None:
-        row = self._conn.execute(
+    def _encode(self, data: dict[str, Any]) -> str | bytes:
+        return self.codec.encode(self._externalize(data))
+
+    def _decode(self, raw: str | bytes) -> dict[str, Any]:
+        """Decode a stored event or snapshot row, resolving blob references if it has any."""
+
+        data = decode_record(raw)
+        return self._rehydrate(data) if may_reference_blobs(raw) else data
+
+    def _load_manifest(self, run_id: str, conn: sqlite3.Connection | None = None) -> JadeStateManifest | None:
+        row = (conn or self._conn).execute(
             "SELECT data FROM manifests WHERE run_id = ?",
             (run_id,),
         ).fetchone()
@@ -85,6 +389,8 @@ class SqliteStateStore(StateStore):
         return JadeStateManifest.from_dict(json.loads(row["data"]))
 
     def _save_manifest(self, manifest: JadeStateManifest) -> None:
+        if not self.codec.is_plain_json:
+            manifest.schema_version = self.codec.schema_version
         self._conn.execute(
             """
             INSERT INTO manifests(run_id, data, updated_at)
@@ -104,24 +410,32 @@ class SqliteStateStore(StateStore):
         return manifest
 
     def create_run(self, manifest: JadeStateManifest) -> JadeStateManifest:
-        with self._lock:
+        with self._writing():
             manifest.touch()
             self._save_manifest(manifest)
             self._conn.commit()
             return manifest
 
     def append_event(self, run_id: str, event: JadeStateEvent | dict[str, Any]) -> JadeStateEvent:
-        with self._lock:
+        with self._writing():
             state_event = event if isinstance(event, JadeStateEvent) else JadeStateEvent.from_dict(event)
             state_event.run_id = state_event.run_id or run_id
             manifest = self._ensure_run(run_id)
+            head = self._chain_head(run_id)
+            record = chain_record(head.chain_hash if head else "", (head.seq if head else 0) + 1, state_event)
             self._conn.execute(
-                "INSERT INTO events(run_id, event_id, timestamp, data) VALUES(?, ?, ?, ?)",
+                """
+                INSERT INTO events(run_id, event_id, timestamp, data, seq, chain_hash, secret_paths)
+                VALUES(?, ?, ?, ?, ?, ?, ?)
+                """,
                 (
                     run_id,
                     state_event.event_id,
                     state_event.timestamp,
-                    self._dump(state_event.to_dict()),
+                    self._encode(state_event.to_dict()),
+                    record.seq,
+                    record.chain_hash,
+                    json.dumps(list(record.secret_paths)),
                 ),
             )
             manifest.touch()
@@ -130,7 +444,7 @@ class SqliteStateStore(StateStore):
             return state_event
 
     def save_snapshot(self, run_id: str, snapshot: AgentRuntimeSnapshot) -> AgentRuntimeSnapshot:
-        with self._lock:
+        with self._writing():
             manifest = self._ensure_run(run_id)
             self._conn.execute(
                 """
@@ -148,7 +462,7 @@ class SqliteStateStore(StateStore):
                     snapshot.created_at,
                     snapshot.phase,
                     snapshot.step,
-                    self._dump(snapshot.to_dict()),
+                    self._encode(snapshot.to_dict()),
                 ),
             )
             manifest.latest_snapshot_id = snapshot.snapshot_id
@@ -157,48 +471,56 @@ class SqliteStateStore(StateStore):
             self._conn.commit()
             return snapshot
 
+    def _latest_snapshot(self, conn: sqlite3.Connection, manifest: JadeStateManifest) -> AgentRuntimeSnapshot | None:
+        row = None
+        if manifest.latest_snapshot_id:
+            row = conn.execute(
+                "SELECT data FROM snapshots WHERE run_id = ? AND snapshot_id = ?",
+                (manifest.run_id, manifest.latest_snapshot_id),
+            ).fetchone()
+        if row is None:
+            row = conn.execute(
+                "SELECT data FROM snapshots WHERE run_id = ? ORDER BY sequence DESC LIMIT 1",
+                (manifest.run_id,),
+            ).fetchone()
+        if row is None:
+            return None
+        return AgentRuntimeSnapshot.from_dict(self._decode(row["data"]))
+
     def latest_snapshot(self, run_id: str) -> AgentRuntimeSnapshot | None:
-        with self._lock:
-            manifest = self._load_manifest(run_id)
+        with self._reading() as conn:
+            manifest = self._load_manifest(run_id, conn)
+            return None if manifest is None else self._latest_snapshot(conn, manifest)
+
+    def restore_latest(self, run_id: str) -> tuple[JadeStateManifest, AgentRuntimeSnapshot | None]:
+        with self._reading() as conn:
+            manifest = self._load_manifest(run_id, conn)
             if manifest is None:
-                return None
-            row = None
-            if manifest.latest_snapshot_id:
-                row = self._conn.execute(
-                    "SELECT data FROM snapshots WHERE run_id = ? AND snapshot_id = ?",
-                    (run_id, manifest.latest_snapshot_id),
-                ).fetchone()
-            if row is None:
-                row = self._conn.execute(
-                    "SELECT data FROM snapshots WHERE run_id = ? ORDER BY sequence DESC LIMIT 1",
-                    (run_id,),
-                ).fetchone()
-            if row is None:
-                return None
-            return AgentRuntimeSnapshot.from_dict(json.loads(row["data"]))
+                raise KeyError(f"run not found: {run_id}")
+            return manifest, self._latest_snapshot(conn, manifest)
 
     def load_run(self, run_id: str) -> JadeExecutionCapsule:
-        with self._lock:
-            manifest = self._load_manifest(run_id)
+        with self._reading() as conn:
+            manifest = self._load_manifest(run_id, conn)
             if manifest is None:
                 raise KeyError(f"run not found: {run_id}")
-            event_rows = self._conn.execute(
+            event_rows = conn.execute(
                 "SELECT data FROM events WHERE run_id = ? ORDER BY sequence ASC",
                 (run_id,),
             ).fetchall()
-            snapshot_rows = self._conn.execute(
+            snapshot_rows = conn.execute(
                 "SELECT data FROM snapshots WHERE run_id = ? ORDER BY sequence ASC",
                 (run_id,),
             ).fetchall()
             return JadeExecutionCapsule(
                 manifest=manifest,
-                events=[JadeStateEvent.from_dict(json.loads(row["data"])) for row in event_rows],
-                snapshots=[AgentRuntimeSnapshot.from_dict(json.loads(row["data"])) for row in snapshot_rows],
+                events=[JadeStateEvent.from_dict(self._decode(row["data"])) for row in event_rows],
+                snapshots=[AgentRuntimeSnapshot.from_dict(self._decode(row["data"])) for row in snapshot_rows],
             )
 
     def list_events(self, run_id: str, limit: int = 100) -> list[JadeStateEvent]:
-        with self._lock:
-            rows = self._conn.execute(
+        with self._reading() as conn:
+            rows = conn.execute(
                 """
                 SELECT data FROM events
                 WHERE run_id = ?
@@ -208,18 +530,201 @@ class SqliteStateStore(StateStore):
                 (run_id, max(int(limit), 1)),
             ).fetchall()
             return [
-                JadeStateEvent.from_dict(json.loads(row["data"]))
+                JadeStateEvent.from_dict(self._decode(row["data"]))
                 for row in reversed(rows)
             ]
 
+    def view_run(self, run_id: str) -> CapsuleView:
+        return SqliteCapsuleView(self, run_id)
+
     def inspect(self, run_id: str) -> dict[str, Any]:
-        return self.load_run(run_id).inspect()
+        return self.view_run(run_id).inspect()
+
+    def run_index(self) -> list[tuple[str, float]]:
+        """`(run_id, updated_at)` pairs, most recently updated first."""
+
+        with self._reading() as conn:
+            rows = conn.execute("SELECT run_id, updated_at FROM manifests ORDER BY updated_at DESC").fetchall()
+            return [(str(row["run_id"]), float(row["updated_at"])) for row in rows]
 
     def list_runs(self) -> list[str]:
-        with self._lock:
-            rows = self._conn.execute("SELECT run_id FROM manifests ORDER BY updated_at DESC").fetchall()
-            return [str(row["run_id"]) for row in rows]
+        return [run_id for run_id, _ in self.run_index()]
 
     def export_run(self, run_id: str, destination: str | Path) -> Path:
         capsule = self.load_run(run_id)
         return capsule.to_directory(destination)
+
+    def snapshot_index(self, run_id: str) -> list[SnapshotInfo]:
+        with self._reading() as conn:
+            rows = conn.execute(
+                """
+                SELECT snapshot_id, phase, step, created_at, length(data) AS size FROM snapshots
+                WHERE run_id = ?
+                ORDER BY sequence ASC
+                """,
+                (run_id,),
+            ).fetchall()
+        return [
+            SnapshotInfo(
+                snapshot_id=str(row["snapshot_id"]),
+                phase=str(row["phase"]),
+                step=int(row["step"]),
+                created_at=float(row["created_at"]),
+                size=int(row["size"]),
+            )
+            for row in rows
+        ]
+
+    def run_size(self, run_id: str) -> int:
+        with self._reading() as conn:
+            total = 0
+            for table in ("manifests", "events", "snapshots"):
+                row = conn.execute(
+                    f"SELECT COALESCE(SUM(length(data)), 0) AS size FROM {table} WHERE run_id = ?",
+                    (run_id,),
+                ).fetchone()
+                total += int(row["size"])
+            return total
+
+    def delete_snapshots(self, run_id: str, snapshot_ids: list[str]) -> int:
+        with self._writing():
+            freed = 0
+            for start in range(0, len(snapshot_ids), 500):
+                chunk = list(snapshot_ids[start:start + 500])
+                marks = ", ".join("?" for _ in chunk)
+                row = self._conn.execute(
+                    f"SELECT COALESCE(SUM(length(data)), 0) AS size FROM snapshots WHERE run_id = ? AND snapshot_id IN ({marks})",
+                    (run_id, *chunk),
+                ).fetchone()
+                freed += int(row["size"])
+                self._conn.execute(
+                    f"DELETE FROM snapshots WHERE run_id = ? AND snapshot_id IN ({marks})",
+                    (run_id, *chunk),
+                )
+            self._conn.commit()
+            return freed
+
+    def delete_run(self, run_id: str) -> int:
+        with self._writing():
+            freed = self.run_size(run_id)
+            for table in ("events", "snapshots", "chain_checkpoints", "manifests"):
+                self._conn.execute(f"DELETE FROM {table} WHERE run_id = ?", (run_id,))
+            self._conn.commit()
+            return freed
+
+    def blob_refs(self, run_id: str) -> tuple[set[str], dict[str, set[str]]]:
+        with self._reading() as conn:
+            event_rows = conn.execute(
+                "SELECT data FROM events WHERE run_id = ? AND (typeof(data) = 'blob' OR instr(data, ?) > 0)",
+                (run_id, BLOB_REF_KEY),
+            ).fetchall()
+            snapshot_rows = conn.execute(
+                "SELECT snapshot_id, data FROM snapshots WHERE run_id = ? AND (typeof(data) = 'blob' OR instr(data, ?) > 0)",
+                (run_id, BLOB_REF_KEY),
+            ).fetchall()
+        event_refs: set[str] = set()
+        for row in event_rows:
+            if may_reference_blobs(row["data"]):
+                event_refs.update(blob_refs(decode_record(row["data"])))
+        return event_refs, {
+            str(row["snapshot_id"]): blob_refs(decode_record(row["data"]))
+            for row in snapshot_rows
+            if may_reference_blobs(row["data"])
+        }
+
+    def vacuum(self, max_pages: int | None = None) -> int:
+        """Release free pages with an incremental vacuum.
+
+        A database created before auto_vacuum was enabled gets one full VACUUM
+        to switch it to incremental mode.
+        """
+
+        with self._writing():
+            self._conn.commit()
+            page_size = int(self._conn.execute("PRAGMA page_size").fetchone()[0])
+            before = int(self._conn.execute("PRAGMA page_count").fetchone()[0])
+            if int(self._conn.execute("PRAGMA auto_vacuum").fetchone()[0]) != 2:
+                self._conn.execute("PRAGMA auto_vacuum=INCREMENTAL")
+                self._conn.execute("VACUUM")
+            elif max_pages is None:
+                self._conn.execute("PRAGMA incremental_vacuum").fetchall()
+            else:
+                self._conn.execute(f"PRAGMA incremental_vacuum({max(int(max_pages), 0)})").fetchall()
+            self._conn.commit()
+            self._conn.execute("PRAGMA wal_checkpoint(TRUNCATE)").fetchall()
+            after = int(self._conn.execute("PRAGMA page_count").fetchone()[0])
+            return max(before - after, 0) * page_size
+
+    def _chain_head(self, run_id: str) -> ChainRecord | None:
+        row = self._conn.execute(
+            "SELECT seq, chain_hash, secret_paths FROM events WHERE run_id = ? ORDER BY sequence DESC LIMIT 1",
+            (run_id,),
+        ).fetchone()
+        if row is None:
+            return None
+        if row["seq"] is None:
+            self._backfill_chain(run_id)
+            return self._chain_head(run_id)
+        return self._row_record(row)
+
+    def _backfill_chain(self, run_id: str) -> None:
+        """Compute chain records for events written before the chain columns existed."""
+
+        rows = self._conn.execute(
+            "SELECT sequence, data FROM events WHERE run_id = ? ORDER BY sequence ASC",
+            (run_id,),
+        ).fetchall()
+        events = (JadeStateEvent.from_dict(self._decode(row["data"])) for row in rows)
+        self._conn.executemany(
+            "UPDATE events SET seq = ?, chain_hash = ?, secret_paths = ? WHERE sequence = ?",
+            [
+                (record.seq, record.chain_hash, json.dumps(list(record.secret_paths)), row["sequence"])
+                for row, record in zip(rows, iter_chain_records(events))
+            ],
+        )
+        self._conn.commit()
+
+    @staticmethod
+    def _row_record(row: sqlite3.Row) -> ChainRecord:
+        return ChainRecord(
+            seq=int(row["seq"]),
+            chain_hash=str(row["chain_hash"]),
+            secret_paths=tuple(json.loads(row["secret_paths"] or "[]")),
+        )
+
+    def chain_records(self, run_id: str, after_seq: int = 0) -> Iterator[ChainRecord]:
+        with self._writing():
+            self._chain_head(run_id)
+        with self._reading() as conn:
+            rows = conn.execute(
+                """
+                SELECT seq, chain_hash, secret_paths FROM events
+                WHERE run_id = ? AND seq > ?
+                ORDER BY sequence ASC
+                """,
+                (run_id, int(after_seq)),
+            ).fetchall()
+        return (self._row_record(row) for row in rows)
+
+    def verified_checkpoint(self, run_id: str) -> ChainRecord | None:
+        with self._reading() as conn:
+            row = conn.execute(
+                "SELECT seq, chain_hash, secret_paths FROM chain_checkpoints WHERE run_id = ?",
+                (run_id,),
+            ).fetchone()
+        return None if row is None else self._row_record(row)
+
+    def record_verified(self, run_id: str, record: ChainRecord) -> None:
+        with self._writing():
+            self._conn.execute(
+                """
+                INSERT INTO chain_checkpoints(run_id, seq, chain_hash, secret_paths)
+                VALUES(?, ?, ?, ?)
+                ON CONFLICT(run_id) DO UPDATE SET
+                    seq = excluded.seq,
+                    chain_hash = excluded.chain_hash,
+                    secret_paths = excluded.secret_paths
+                """,
+                (run_id, record.seq, record.chain_hash, json.dumps(list(record.secret_paths))),
+            )
+            self._conn.commit()
@@ -3,10 +3,12 @@
 from __future__ import annotations
 
 import json
+import shutil
 import threading
+import time
 from abc import ABC, abstractmethod
 from pathlib import Path
-from typing import Any
+from typing import Any, Callable, Iterator
 
 from .artifact import (
     JadeExecutionCapsule,
@@ -15,13 +17,70 @@ from .artifact import (
     _read_jsonl,
     _write_json,
 )
+from .blobs import (
+    BLOB_DIR,
+    BLOB_REF_KEY,
+    DEFAULT_BLOB_THRESHOLD,
+    BlobStore,
+    FileBlobStore,
+    blob_refs,
+    directory_blob_resolver,
+    externalize,
+    rehydrate,
+)
 from .events import JadeStateEvent
+from .integrity import ChainRecord, chain_record, iter_chain_records
 from .manifest import JadeStateManifest
+from .retention import SnapshotInfo
+from .segments import SegmentedEventLog
 from .snapshot import AgentRuntimeSnapshot
+from .view import CapsuleView, DirectoryCapsuleView, MemoryCapsuleView
+
+
+def _file_size(path: Path) -> int:
+    try:
+        return path.stat().st_size
+    except FileNotFoundError:
+        return -1
+
+
+def _last_jsonl_line(path: Path, chunk_size: int = 4096) -> bytes | None:
+    """Return the last non-empty line of `path`, reading backwards one chunk at a time."""
+
+    with path.open("rb") as handle:
+        position = handle.seek(0, 2)
+        tail = b""
+        while position > 0:
+            step = min(chunk_size, position)
+            position -= step
+            handle.seek(position)
+            tail = handle.read(step) + tail
+            stripped = tail.rstrip(b"\r\n")
+            if stripped and (position == 0 or b"\n" in stripped):
+                return stripped.rsplit(b"\n", 1)[-1]
+    return None
 
 
 class StateStore(ABC):
-    """Durable state-machine storage for agent runs."""
+    """Durable state-machine storage for agent runs.
+
+    Stores that set `blobs` move strings of `blob_threshold` or more characters
+    out of event and snapshot records into that shared, content-addressed
+    `BlobStore` and resolve them again on read.
+    """
+
+    blobs: BlobStore | None = None
+    blob_threshold: int | None = None
+
+    def _externalize(self, data: dict[str, Any]) -> dict[str, Any]:
+        if self.blobs is None or not self.blob_threshold:
+            return data
+        return externalize(data, self.blobs.put, self.blob_threshold)
+
+    def _rehydrate(self, data: dict[str, Any]) -> dict[str, Any]:
+        if self.blobs is None:
+            return data
+        return rehydrate(data, self.blobs.get)
 
     @abstractmethod
     def create_run(self, manifest: JadeStateManifest) -> JadeStateManifest:
@@ -43,6 +102,20 @@ class StateStore(ABC):
     def load_run(self, run_id: str) -> JadeExecutionCapsule:
         ...
 
+    def view_run(self, run_id: str) -> CapsuleView:
+        """Return a lazy view of a run; stores override this to avoid load_run."""
+
+        return MemoryCapsuleView(self.load_run(run_id))
+
+    def restore_latest(self, run_id: str) -> tuple[JadeStateManifest, AgentRuntimeSnapshot | None]:
+        """Manifest and latest snapshot of a run, read without touching its events.
+
+        Raises KeyError for unknown runs.
+        """
+
+        view = self.view_run(run_id)
+        return view.manifest, view.latest_snapshot()
+
     @abstractmethod
     def list_events(self, run_id: str, limit: int = 100) -> list[JadeStateEvent]:
         ...
@@ -51,6 +124,61 @@ class StateStore(ABC):
     def inspect(self, run_id: str) -> dict[str, Any]:
         ...
 
+    def chain_records(self, run_id: str, after_seq: int = 0) -> Iterator[ChainRecord]:
+        """Rolling chain records per event; stores that keep them at append time override this."""
+
+        for record in iter_chain_records(self.view_run(run_id).iter_events()):
+            if record.seq > after_seq:
+                yield record
+
+    def verified_checkpoint(self, run_id: str) -> ChainRecord | None:
+        """Last chain record confirmed by verify_run, if the store keeps one."""
+
+        return None
+
+    def record_verified(self, run_id: str, record: ChainRecord) -> None:
+        """Remember that the chain is verified up to `record`."""
+
+        return None
+
+    def snapshot_index(self, run_id: str) -> list[SnapshotInfo]:
+        """Snapshot metadata in stored order, with the bytes each snapshot occupies."""
+
+        return [
+            SnapshotInfo(
+                snapshot_id=snapshot.snapshot_id,
+                phase=snapshot.phase,
+                step=snapshot.step,
+                created_at=snapshot.created_at,
+                size=len(json.dumps(snapshot.to_dict(), sort_keys=True)),
+            )
+            for snapshot in self.view_run(run_id).iter_snapshots()
+        ]
+
+    def run_size(self, run_id: str) -> int:
+        """Approximate bytes a run occupies in this store."""
+
+        events = sum(len(json.dumps(event.to_dict(), sort_keys=True)) for event in self.view_run(run_id).iter_events())
+        return events + sum(info.size for info in self.snapshot_index(run_id))
+
+    @abstractmethod
+    def delete_snapshots(self, run_id: str, snapshot_ids: list[str]) -> int:
+        """Delete snapshots from a run and return the bytes freed."""
+
+    @abstractmethod
+    def delete_run(self, run_id: str) -> int:
+        """Delete a run with its events, snapshots, and chain, returning the bytes freed."""
+
+    def blob_refs(self, run_id: str) -> tuple[set[str], dict[str, set[str]]]:
+        """Blob digests referenced by a run's events, and by each of its snapshots."""
+
+        return set(), {}
+
+    def vacuum(self) -> int:
+        """Return freed space to the filesystem; returns the bytes released."""
+
+        return 0
+
 
 class InMemoryStateStore(StateStore):
     """Non-durable store useful for tests and embedded runtimes."""
@@ -59,6 +187,8 @@ class InMemoryStateStore(StateStore):
         self._manifests: dict[str, JadeStateManifest] = {}
         self._events: dict[str, list[JadeStateEvent]] = {}
         self._snapshots: dict[str, list[AgentRuntimeSnapshot]] = {}
+        self._chains: dict[str, list[ChainRecord]] = {}
+        self._verified: dict[str, ChainRecord] = {}
         self._lock = threading.RLock()
 
     def create_run(self, manifest: JadeStateManifest) -> JadeStateManifest:
@@ -73,6 +203,8 @@ class InMemoryStateStore(StateStore):
             state_event = event if isinstance(event, JadeStateEvent) else JadeStateEvent.from_dict(event)
             state_event.run_id = state_event.run_id or run_id
             self._events.setdefault(run_id, []).append(state_event)
+            chain = self._chains.setdefault(run_id, [])
+            chain.append(chain_record(chain[-1].chain_hash if chain else "", len(chain) + 1, state_event))
             manifest = self._manifests.get(run_id)
             if manifest is not None:
                 manifest.touch()
@@ -92,6 +224,10 @@ class InMemoryStateStore(StateStore):
             snapshots = self._snapshots.get(run_id, [])
             return snapshots[-1] if snapshots else None
 
+    def restore_latest(self, run_id: str) -> tuple[JadeStateManifest, AgentRuntimeSnapshot | None]:
+        with self._lock:
+            return self._manifests[run_id], self.latest_snapshot(run_id)
+
     def load_run(self, run_id: str) -> JadeExecutionCapsule:
         with self._lock:
             manifest = self._manifests[run_id]
@@ -108,37 +244,129 @@ class InMemoryStateStore(StateStore):
     def inspect(self, run_id: str) -> dict[str, Any]:
         return self.load_run(run_id).inspect()
 
+    def chain_records(self, run_id: str, after_seq: int = 0) -> Iterator[ChainRecord]:
+        with self._lock:
+            return iter(list(self._chains.get(run_id, [])[max(after_seq, 0):]))
+
+    def verified_checkpoint(self, run_id: str) -> ChainRecord | None:
+        with self._lock:
+            return self._verified.get(run_id)
+
+    def record_verified(self, run_id: str, record: ChainRecord) -> None:
+        with self._lock:
+            self._verified[run_id] = record
+
+    def list_runs(self) -> list[str]:
+        with self._lock:
+            return sorted(self._manifests)
+
+    def delete_snapshots(self, run_id: str, snapshot_ids: list[str]) -> int:
+        with self._lock:
+            doomed = set(snapshot_ids)
+            snapshots = self._snapshots.get(run_id, [])
+            freed = sum(info.size for info in self.snapshot_index(run_id) if info.snapshot_id in doomed)
+            self._snapshots[run_id] = [snapshot for snapshot in snapshots if snapshot.snapshot_id not in doomed]
+            return freed
+
+    def delete_run(self, run_id: str) -> int:
+        with self._lock:
+            freed = self.run_size(run_id) if run_id in self._manifests else 0
+            for table in (self._manifests, self._events, self._snapshots, self._chains, self._verified):
+                table.pop(run_id, None)
+            return freed
+
 
 class FileStateStore(StateStore):
     """Local filesystem .jgx store.
 
     Each run is a directory named ``<run_id>.jgx`` with manifest, events,
     snapshots, and payload folders. The layout is deliberately transparent so
-    users can inspect state with normal filesystem tools.
+    users can inspect state with normal filesystem tools. Events go to rolling
+    segment files under ``events/`` (see `SegmentedEventLog`), and
+    ``chain.jsonl`` holds one rolling chain record per event, written at append
+    time.
+
+    Strings of `blob_threshold` or more characters are stored once in the
+    shared ``blobs/`` folder next to the runs (zlib-compressed when
+    `compress_blobs` is set), and records keep a digest reference instead.
+
+    Appending an event only bumps ``updated_at``, so the manifest is rewritten
+    at most once per `manifest_flush_interval` seconds per run. Pending
+    manifest updates are flushed before any read of the run, on snapshot
+    saves, and by `flush()` / `close()`.
+
+    Cached event counts and chain heads are checked against the files on
+    every use, so several store instances (a worker, a dashboard, the CLI)
+    can share one root and each sees events the others appended.
     """
 
-    def __init__(self, root: str | Path = ".jade_state"):
+    def __init__(
+        self,
+        root: str | Path = ".jade_state",
+        *,
+        segment_events: int = 4096,
+        manifest_flush_interval: float = 1.0,
+        blob_threshold: int | None = DEFAULT_BLOB_THRESHOLD,
+        compress_blobs: bool = True,
+    ):
         self.root = Path(root)
         self.root.mkdir(parents=True, exist_ok=True)
+        self.blobs = FileBlobStore(self.root / BLOB_DIR, compress=compress_blobs)
+        self.blob_threshold = blob_threshold
+        self.segment_events = segment_events
+        self.manifest_flush_interval = manifest_flush_interval
         self._lock = threading.RLock()
+        self._chain_heads: dict[str, tuple[int, ChainRecord | None]] = {}
+        self._logs: dict[str, SegmentedEventLog] = {}
+        self._pending_manifests: dict[str, JadeStateManifest] = {}
+        self._manifest_written: dict[str, float] = {}
 
     def _run_path(self, run_id: str) -> Path:
         return self.root / f"{run_id}.jgx"
 
+    def _resolver(self, run_id: str) -> Callable[[str], bytes]:
+        return directory_blob_resolver(self._run_path(run_id), self.blobs)
+
+    def _log(self, run_id: str) -> SegmentedEventLog:
+        log = self._logs.get(run_id)
+        if log is None:
+            log = SegmentedEventLog(self._run_path(run_id), segment_events=self.segment_events)
+            self._logs[run_id] = log
+        return log
+
     def create_run(self, manifest: JadeStateManifest) -> JadeStateManifest:
         with self._lock:
             run_path = self._run_path(manifest.run_id)
             (run_path / "snapshots").mkdir(parents=True, exist_ok=True)
             (run_path / "payloads").mkdir(parents=True, exist_ok=True)
-            _write_json(run_path / "manifest.json", manifest.to_dict())
-            (run_path / "events.jsonl").touch(exist_ok=True)
+            self._pending_manifests.pop(manifest.run_id, None)
+            self._save_manifest(manifest)
             return manifest
 
     def _load_manifest(self, run_id: str) -> JadeStateManifest:
+        pending = self._pending_manifests.get(run_id)
+        if pending is not None:
+            return pending
         return JadeStateManifest.from_dict(_read_json(self._run_path(run_id) / "manifest.json"))
 
     def _save_manifest(self, manifest: JadeStateManifest) -> None:
         _write_json(self._run_path(manifest.run_id) / "manifest.json", manifest.to_dict())
+        self._manifest_written[manifest.run_id] = time.monotonic()
+
+    def _flush_manifest(self, run_id: str) -> None:
+        manifest = self._pending_manifests.pop(run_id, None)
+        if manifest is not None:
+            self._save_manifest(manifest)
+
+    def flush(self) -> None:
+        """Write every deferred manifest update to disk."""
+
+        with self._lock:
+            for run_id in list(self._pending_manifests):
+                self._flush_manifest(run_id)
+
+    def close(self) -> None:
+        self.flush()
 
     def append_event(self, run_id: str, event: JadeStateEvent | dict[str, Any]) -> JadeStateEvent:
         with self._lock:
@@ -147,10 +375,17 @@ class FileStateStore(StateStore):
             run_path = self._run_path(run_id)
             if not run_path.exists():
                 self.create_run(JadeStateManifest(run_id=run_id))
-            _append_jsonl(run_path / "events.jsonl", state_event.to_dict())
+            head = self._chain_head(run_id)
+            record = chain_record(head.chain_hash if head else "", (head.seq if head else 0) + 1, state_event)
+            self._log(run_id).append(self._externalize(state_event.to_dict()))
+            _append_jsonl(run_path / "chain.jsonl", record.to_dict())
+            self._chain_heads[run_id] = (_file_size(run_path / "chain.jsonl"), record)
             manifest = self._load_manifest(run_id)
             manifest.touch()
-            self._save_manifest(manifest)
+            self._pending_manifests[run_id] = manifest
+            written = self._manifest_written.get(run_id)
+            if written is None or time.monotonic() - written >= self.manifest_flush_interval:
+                self._flush_manifest(run_id)
             return state_event
 
     def save_snapshot(self, run_id: str, snapshot: AgentRuntimeSnapshot) -> AgentRuntimeSnapshot:
@@ -158,43 +393,59 @@ class FileStateStore(StateStore):
             run_path = self._run_path(run_id)
             if not run_path.exists():
                 self.create_run(JadeStateManifest(run_id=run_id))
-            _write_json(run_path / "snapshots" / f"{snapshot.snapshot_id}.json", snapshot.to_dict())
+            _write_json(run_path / "snapshots" / f"{snapshot.snapshot_id}.json", self._externalize(snapshot.to_dict()))
             manifest = self._load_manifest(run_id)
             manifest.latest_snapshot_id = snapshot.snapshot_id
             manifest.touch()
+            self._pending_manifests.pop(run_id, None)
             self._save_manifest(manifest)
             return snapshot
 
     def latest_snapshot(self, run_id: str) -> AgentRuntimeSnapshot | None:
         with self._lock:
-            run_path = self._run_path(run_id)
-            if not run_path.exists():
+            if not self._run_path(run_id).exists():
                 return None
+            return self._latest_snapshot(run_id, self._load_manifest(run_id))
+
+    def restore_latest(self, run_id: str) -> tuple[JadeStateManifest, AgentRuntimeSnapshot | None]:
+        with self._lock:
+            if not self._run_path(run_id).exists():
+                raise KeyError(f"run not found: {run_id}")
             manifest = self._load_manifest(run_id)
-            snapshot_path: Path | None = None
-            if manifest.latest_snapshot_id:
-                candidate = run_path / "snapshots" / f"{manifest.latest_snapshot_id}.json"
-                if candidate.exists():
-                    snapshot_path = candidate
-            if snapshot_path is None:
-                snapshot_paths = sorted((run_path / "snapshots").glob("*.json"))
-                if not snapshot_paths:
-                    return None
-                snapshot_path = snapshot_paths[-1]
-            return AgentRuntimeSnapshot.from_dict(_read_json(snapshot_path))
+            return manifest, self._latest_snapshot(run_id, manifest)
+
+    def _latest_snapshot(self, run_id: str, manifest: JadeStateManifest) -> AgentRuntimeSnapshot | None:
+        run_path = self._run_path(run_id)
+        snapshot_path: Path | None = None
+        if manifest.latest_snapshot_id:
+            candidate = run_path / "snapshots" / f"{manifest.latest_snapshot_id}.json"
+            if candidate.exists():
+                snapshot_path = candidate
+        if snapshot_path is None:
+            snapshot_paths = sorted((run_path / "snapshots").glob("*.json"))
+            if not snapshot_paths:
+                return None
+            snapshot_path = snapshot_paths[-1]
+        return AgentRuntimeSnapshot.from_dict(rehydrate(_read_json(snapshot_path), self._resolver(run_id)))
 
     def load_run(self, run_id: str) -> JadeExecutionCapsule:
         with self._lock:
-            return JadeExecutionCapsule.from_directory(self._run_path(run_id))
+            self._flush_manifest(run_id)
+            return JadeExecutionCapsule.from_directory(self._run_path(run_id), blobs=self.blobs)
+
+    def view_run(self, run_id: str) -> CapsuleView:
+        with self._lock:
+            self._flush_manifest(run_id)
+            return DirectoryCapsuleView(self._run_path(run_id), log=self._log(run_id), blobs=self.blobs)
 
     def list_events(self, run_id: str, limit: int = 100) -> list[JadeStateEvent]:
         with self._lock:
-            rows = _read_jsonl(self._run_path(run_id) / "events.jsonl")
-            return [JadeStateEvent.from_dict(row) for row in rows[-limit:]]
+            resolve = self._resolver(run_id)
+            return [JadeStateEvent.from_dict(rehydrate(row, resolve)) for row in self._log(run_id).tail(limit)]
 
     def inspect(self, run_id: str) -> dict[str, Any]:
         with self._lock:
-            return self.load_run(run_id).inspect()
+            return self.view_run(run_id).inspect()
 
     def export_run(self, run_id: str, destination: str | Path) -> Path:
         """Write a copy of a stored run to another .jgx directory."""
@@ -208,3 +459,112 @@ class FileStateStore(StateStore):
             for path in sorted(self.root.glob("*.jgx"))
             if path.is_dir()
         ]
+
+    def _chain_head(self, run_id: str) -> ChainRecord | None:
+        """Return the newest chain record, repairing a missing or short chain file.
+
+        The cached head is reused only while ``chain.jsonl`` keeps the size it
+        had when cached; another store appending to the run invalidates it.
+        """
+
+        run_path = self._run_path(run_id)
+        chain_path = run_path / "chain.jsonl"
+        cached = self._chain_heads.get(run_id)
+        if cached is not None and cached[0] == _file_size(chain_path):
+            return cached[1]
+        head: ChainRecord | None = None
+        if chain_path.exists():
+            line = _last_jsonl_line(chain_path)
+            if line is not None:
+                head = ChainRecord.from_dict(json.loads(line))
+        view = (
+            DirectoryCapsuleView(run_path, log=self._log(run_id), blobs=self.blobs)
+            if (run_path / "manifest.json").exists()
+            else None
+        )
+        if view is not None and view.event_count > (head.seq if head else 0):
+            after_seq = head.seq if head else 0
+            for record in iter_chain_records(
+                view.iter_events(after_seq=after_seq),
+                previous_hash=head.chain_hash if head else "",
+                after_seq=after_seq,
+            ):
+                _append_jsonl(chain_path, record.to_dict())
+                head = record
+        self._chain_heads[run_id] = (_file_size(chain_path), head)
+        return head
+
+    def chain_records(self, run_id: str, after_seq: int = 0) -> Iterator[ChainRecord]:
+        with self._lock:
+            self._chain_head(run_id)
+            chain_path = self._run_path(run_id) / "chain.jsonl"
+            rows = _read_jsonl(chain_path)
+        return (
+            record
+            for record in (ChainRecord.from_dict(row) for row in rows)
+            if record.seq > after_seq
+        )
+
+    def snapshot_index(self, run_id: str) -> list[SnapshotInfo]:
+        with self._lock:
+            infos: list[SnapshotInfo] = []
+            for snapshot_path in sorted((self._run_path(run_id) / "snapshots").glob("*.json")):
+                data = _read_json(snapshot_path)
+                infos.append(SnapshotInfo(
+                    snapshot_id=str(data.get("snapshot_id") or snapshot_path.stem),
+                    phase=str(data.get("phase", "")),
+                    step=int(data.get("step", 0)),
+                    created_at=float(data.get("created_at", 0.0)),
+                    size=snapshot_path.stat().st_size,
+                ))
+            return infos
+
+    def run_size(self, run_id: str) -> int:
+        run_path = self._run_path(run_id)
+        return sum(path.stat().st_size for path in run_path.rglob("*") if path.is_file())
+
+    def delete_snapshots(self, run_id: str, snapshot_ids: list[str]) -> int:
+        with self._lock:
+            freed = 0
+            for snapshot_id in snapshot_ids:
+                snapshot_path = self._run_path(run_id) / "snapshots" / f"{snapshot_id}.json"
+                if snapshot_path.exists():
+                    freed += snapshot_path.stat().st_size
+                    snapshot_path.unlink()
+            return freed
+
+    def delete_run(self, run_id: str) -> int:
+        with self._lock:
+            run_path = self._run_path(run_id)
+            if not run_path.exists():
+                return 0
+            freed = self.run_size(run_id)
+            shutil.rmtree(run_path)
+            for cache in (self._logs, self._chain_heads, self._pending_manifests, self._manifest_written):
+                cache.pop(run_id, None)
+            return freed
+
+    def blob_refs(self, run_id: str) -> tuple[set[str], dict[str, set[str]]]:
+        with self._lock:
+            run_path = self._run_path(run_id)
+            marker = BLOB_REF_KEY.encode("utf-8")
+            event_refs: set[str] = set()
+            for segment in self._log(run_id).segments:
+                with (run_path / segment.name).open("rb") as handle:
+                    for line in handle:
+                        if marker in line:
+                            event_refs.update(blob_refs(json.loads(line)))
+            snapshot_refs: dict[str, set[str]] = {}
+            for snapshot_path in sorted((run_path / "snapshots").glob("*.json")):
+                text = snapshot_path.read_text(encoding="utf-8")
+                if BLOB_REF_KEY in text:
+                    snapshot_refs[snapshot_path.stem] = blob_refs(json.loads(text))
+            return event_refs, snapshot_refs
+
+    def verified_checkpoint(self, run_id: str) -> ChainRecord | None:
+        path = self._run_path(run_id) / "chain.verified.json"
+        return ChainRecord.from_dict(_read_json(path)) if path.exists() else None
+
+    def record_verified(self, run_id: str, record: ChainRecord) -> None:
+        with self._lock:
+            _write_json(self._run_path(run_id) / "chain.verified.json", record.to_dict())
@@ -0,0 +1,310 @@
+"""Lazy, paged views over stored .jgx runs.
+
+`StateStore.load_run` materializes every event and snapshot. A `CapsuleView`
+answers the same questions on demand: counts come from indexes, events and
+snapshots are decoded one page at a time, and a single snapshot can be fetched
+by id. `to_capsule()` still builds the eager `JadeExecutionCapsule` for callers
+that need everything.
+"""
+
+from __future__ import annotations
+
+from abc import ABC, abstractmethod
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Iterator
+
+from .artifact import JadeExecutionCapsule, _read_json
+from .blobs import BlobStore, directory_blob_resolver, rehydrate
+from .events import JadeStateEvent
+from .manifest import JadeStateManifest
+from .segments import SegmentedEventLog
+from .snapshot import AgentRuntimeSnapshot
+
+if TYPE_CHECKING:
+    from .sqlite_store import SqliteStateStore
+
+
+class CapsuleView(ABC):
+    """Read-only, lazily decoded view of one run.
+
+    Sequence numbers are 1-based positions in stored order, so
+    `iter_events(after_seq=n)` resumes right after the n-th event.
+    """
+
+    @property
+    @abstractmethod
+    def manifest(self) -> JadeStateManifest:
+        ...
+
+    @property
+    def run_id(self) -> str:
+        return self.manifest.run_id
+
+    @property
+    @abstractmethod
+    def event_count(self) -> int:
+        ...
+
+    @property
+    @abstractmethod
+    def snapshot_count(self) -> int:
+        ...
+
+    @property
+    def payload_count(self) -> int:
+        return 0
+
+    @abstractmethod
+    def iter_events(self, after_seq: int = 0, limit: int | None = None) -> Iterator[JadeStateEvent]:
+        ...
+
+    @abstractmethod
+    def iter_snapshots(self, after_seq: int = 0, limit: int | None = None) -> Iterator[AgentRuntimeSnapshot]:
+        ...
+
+    def get_snapshot(self, snapshot_id: str) -> AgentRuntimeSnapshot | None:
+        for snapshot in self.iter_snapshots():
+            if snapshot.snapshot_id == snapshot_id:
+                return snapshot
+        return None
+
+    def payloads(self) -> dict[str, bytes]:
+        return {}
+
+    def latest_snapshot(self) -> AgentRuntimeSnapshot | None:
+        latest_id = self.manifest.latest_snapshot_id
+        if latest_id:
+            snapshot = self.get_snapshot(latest_id)
+            if snapshot is not None:
+                return snapshot
+        count = self.snapshot_count
+        if not count:
+            return None
+        return next(self.iter_snapshots(after_seq=count - 1, limit=1), None)
+
+    def tail_events(self, limit: int) -> list[JadeStateEvent]:
+        return list(self.iter_events(after_seq=max(self.event_count - max(int(limit), 0), 0)))
+
+    def to_capsule(self) -> JadeExecutionCapsule:
+        return JadeExecutionCapsule(
+            manifest=self.manifest,
+            events=list(self.iter_events()),
+            snapshots=list(self.iter_snapshots()),
+            payloads=self.payloads(),
+        )
+
+    def inspect(self) -> dict[str, Any]:
+        """Same shape as JadeExecutionCapsule.inspect() without decoding the event log."""
+
+        manifest = self.manifest
+        latest = self.latest_snapshot()
+        return {
+            "magic": manifest.magic,
+            "format": manifest.format,
+            "schema_version": manifest.schema_version,
+            "run_id": manifest.run_id,
+            "task_id": manifest.task_id,
+            "agent_id": manifest.agent_id,
+            "tenant_id": manifest.tenant_id,
+            "capability": manifest.capability,
+            "backend": manifest.backend,
+            "event_count": self.event_count,
+            "snapshot_count": self.snapshot_count,
+            "latest_snapshot_id": latest.snapshot_id if latest is not None else "",
+            "latest_phase": latest.phase if latest is not None else "",
+            "latest_step": latest.step if latest is not None else 0,
+            "payload_count": self.payload_count,
+        }
+
+
+def _window(after_seq: int, limit: int | None) -> slice:
+    start = max(int(after_seq), 0)
+    return slice(start, None if limit is None else start + max(int(limit), 0))
+
+
+class MemoryCapsuleView(CapsuleView):
+    """View over an already materialized capsule."""
+
+    def __init__(self, capsule: JadeExecutionCapsule):
+        self.capsule = capsule
+
+    @property
+    def manifest(self) -> JadeStateManifest:
+        return self.capsule.manifest
+
+    @property
+    def event_count(self) -> int:
+        return len(self.capsule.events)
+
+    @property
+    def snapshot_count(self) -> int:
+        return len(self.capsule.snapshots)
+
+    @property
+    def payload_count(self) -> int:
+        return len(self.capsule.payloads)
+
+    def iter_events(self, after_seq: int = 0, limit: int | None = None) -> Iterator[JadeStateEvent]:
+        return iter(self.capsule.events[_window(after_seq, limit)])
+
+    def iter_snapshots(self, after_seq: int = 0, limit: int | None = None) -> Iterator[AgentRuntimeSnapshot]:
+        return iter(self.capsule.snapshots[_window(after_seq, limit)])
+
+    def payloads(self) -> dict[str, bytes]:
+        return dict(self.capsule.payloads)
+
+    def latest_snapshot(self) -> AgentRuntimeSnapshot | None:
+        return self.capsule.latest_snapshot
+
+    def to_capsule(self) -> JadeExecutionCapsule:
+        return self.capsule
+
+
+class DirectoryCapsuleView(CapsuleView):
+    """View over a .jgx directory, reading events through its segment index."""
+
+    def __init__(
+        self,
+        path: str | Path,
+        *,
+        log: SegmentedEventLog | None = None,
+        blobs: BlobStore | None = None,
+    ):
+        self.path = Path(path)
+        self._manifest = JadeStateManifest.from_dict(_read_json(self.path / "manifest.json"))
+        self._log = log if log is not None else SegmentedEventLog(self.path)
+        self._resolve = directory_blob_resolver(self.path, blobs)
+
+    @property
+    def manifest(self) -> JadeStateManifest:
+        return self._manifest
+
+    def _snapshot_paths(self) -> list[Path]:
+        return sorted((self.path / "snapshots").glob("*.json"))
+
+    def _load_snapshot(self, snapshot_path: Path) -> AgentRuntimeSnapshot:
+        return AgentRuntimeSnapshot.from_dict(rehydrate(_read_json(snapshot_path), self._resolve))
+
+    @property
+    def event_count(self) -> int:
+        return self._log.count
+
+    @property
+    def snapshot_count(self) -> int:
+        return len(self._snapshot_paths())
+
+    @property
+    def payload_count(self) -> int:
+        return sum(1 for path in (self.path / "payloads").glob("*") if path.is_file())
+
+    def iter_events(self, after_seq: int = 0, limit: int | None = None) -> Iterator[JadeStateEvent]:
+        for row in self._log.read(after_seq=after_seq, limit=limit):
+            yield JadeStateEvent.from_dict(rehydrate(row, self._resolve))
+
+    def iter_snapshots(self, after_seq: int = 0, limit: int | None = None) -> Iterator[AgentRuntimeSnapshot]:
+        for snapshot_path in self._snapshot_paths()[_window(after_seq, limit)]:
+            yield self._load_snapshot(snapshot_path)
+
+    def get_snapshot(self, snapshot_id: str) -> AgentRuntimeSnapshot | None:
+        snapshot_path = self.path / "snapshots" / f"{snapshot_id}.json"
+        if snapshot_path.exists():
+            return self._load_snapshot(snapshot_path)
+        return super().get_snapshot(snapshot_id)
+
+    def latest_snapshot(self) -> AgentRuntimeSnapshot | None:
+        latest_id = self._manifest.latest_snapshot_id
+        if latest_id:
+            snapshot_path = self.path / "snapshots" / f"{latest_id}.json"
+            if snapshot_path.exists():
+                return self._load_snapshot(snapshot_path)
+        paths = self._snapshot_paths()
+        return self._load_snapshot(paths[-1]) if paths else None
+
+    def payloads(self) -> dict[str, bytes]:
+        return {
+            payload_path.name: payload_path.read_bytes()
+            for payload_path in sorted((self.path / "payloads").glob("*"))
+            if payload_path.is_file()
+        }
+
+
+class SqliteCapsuleView(CapsuleView):
+    """View over one run in a SqliteStateStore, paged with keyset cursors."""
+
+    def __init__(self, store: "SqliteStateStore", run_id: str, *, page_size: int = 256):
+        self.store = store
+        self.page_size = max(int(page_size), 1)
+        with store._reading() as conn:
+            manifest = store._load_manifest(run_id, conn)
+        if manifest is None:
+            raise KeyError(f"run not found: {run_id}")
+        self._manifest = manifest
+
+    @property
+    def manifest(self) -> JadeStateManifest:
+        return self._manifest
+
+    def _count(self, table: str) -> int:
+        with self.store._reading() as conn:
+            row = conn.execute(
+                f"SELECT COUNT(*) AS total FROM {table} WHERE run_id = ?",
+                (self._manifest.run_id,),
+            ).fetchone()
+        return int(row["total"])
+
+    @property
+    def event_count(self) -> int:
+        return self._count("events")
+
+    @property
+    def snapshot_count(self) -> int:
+        return self._count("snapshots")
+
+    def _iter_rows(self, table: str, after_seq: int, limit: int | None) -> Iterator[str]:
+        run_id = self._manifest.run_id
+        remaining = None if limit is None else max(int(limit), 0)
+        cursor = 0
+        if after_seq > 0:
+            with self.store._reading() as conn:
+                row = conn.execute(
+                    f"SELECT sequence FROM {table} WHERE run_id = ? ORDER BY sequence ASC LIMIT 1 OFFSET ?",
+                    (run_id, int(after_seq) - 1),
+                ).fetchone()
+            if row is None:
+                return
+            cursor = int(row["sequence"])
+        while remaining is None or remaining > 0:
+            page = self.page_size if remaining is None else min(self.page_size, remaining)
+            with self.store._reading() as conn:
+                rows = conn.execute(
+                    f"SELECT sequence, data FROM {table} WHERE run_id = ? AND sequence > ? ORDER BY sequence ASC LIMIT ?",
+                    (run_id, cursor, page),
+                ).fetchall()
+            if not rows:
+                return
+            for row in rows:
+                yield row["data"]
+            cursor = int(rows[-1]["sequence"])
+            if remaining is not None:
+                remaining -= len(rows)
+            if len(rows) < page:
+                return
+
+    def iter_events(self, after_seq: int = 0, limit: int | None = None) -> Iterator[JadeStateEvent]:
+        for data in self._iter_rows("events", after_seq, limit):
+            yield JadeStateEvent.from_dict(self.store._decode(data))
+
+    def iter_snapshots(self, after_seq: int = 0, limit: int | None = None) -> Iterator[AgentRuntimeSnapshot]:
+        for data in self._iter_rows("snapshots", after_seq, limit):
+            yield AgentRuntimeSnapshot.from_dict(self.store._decode(data))
+
+    def get_snapshot(self, snapshot_id: str) -> AgentRuntimeSnapshot | None:
+        with self.store._reading() as conn:
+            row = conn.execute(
+                "SELECT data FROM snapshots WHERE run_id = ? AND snapshot_id = ?",
+                (self._manifest.run_id, snapshot_id),
+            ).fetchone()
+        return None if row is None else AgentRuntimeSnapshot.from_dict(self.store._decode(row["data"]))
+
+    def tail_events(self, limit: int) -> list[JadeStateEvent]:
+        return self.store.list_events(self._manifest.run_id, limit=limit) if limit > 0 else []
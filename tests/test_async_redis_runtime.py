@@ -0,0 +1,180 @@
+"""Native redis.asyncio task store and transport tests (fakeredis-backed)."""
+
+from __future__ import annotations
+
+import asyncio
+import sys
+import unittest
+
+sys.path.insert(0, r"c:\Users\gabri\JadeAgent")
+
+try:
+    import fakeredis
+except ImportError:  # pragma: no cover - optional test dependency
+    fakeredis = None
+
+from jadeagent.mesh import (
+    AsyncMeshNode,
+    AsyncRedisMeshTransport,
+    AsyncRedisTaskStore,
+    HMACSigner,
+    MeshRouter,
+    MeshTask,
+    TaskResult,
+    TaskState,
+)
+from jadeagent.mesh.protocol import make_task_envelope
+
+
+@unittest.skipUnless(fakeredis is not None, "fakeredis not installed")
+class AsyncRedisRuntimeTests(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.client = fakeredis.aioredis.FakeRedis(decode_responses=True)
+        self.store = AsyncRedisTaskStore(client=self.client, key_prefix="test:tasks", block_timeout=0.2)
+
+    async def asyncTearDown(self):
+        await self.store.close()
+        await self.client.aclose()
+
+    async def test_blocking_claim_wakes_on_submit_and_completes(self):
+        task = MeshTask(capability="summarize", prompt="hello")
+        claim = asyncio.create_task(self.store.claim_next_available("worker-1", ["summarize"], timeout=1.0))
+        await asyncio.sleep(0.05)
+        await self.store.submit(task)
+
+        claimed = await claim
+        self.assertIsNotNone(claimed)
+        self.assertEqual(claimed.task_id, task.task_id)
+        self.assertEqual(claimed.state, TaskState.RUNNING)
+        self.assertEqual(claimed.lease_owner, "worker-1")
+
+        result = TaskResult(task_id=task.task_id, capability=task.capability, node_id="worker-1")
+        result.finalize(TaskState.COMPLETED, output="done")
+        waiter = asyncio.create_task(self.store.wait_for_terminal(task.task_id, timeout=1.0))
+        await asyncio.sleep(0.01)
+        await self.store.complete(task.task_id, "worker-1", result)
+
+        waited = await waiter
+        self.assertEqual(waited.state, TaskState.COMPLETED)
+        self.assertEqual(waited.result.output, "done")
+        event_types = [event.event_type for event in await self.store.list_events(task.task_id)]
+        self.assertEqual(event_types, ["task_submitted", "task_claimed", "task_completed"])
+
+    async def test_claim_respects_priority_and_times_out_when_empty(self):
+        low = MeshTask(capability="echo", prompt="low", priority=0)
+        high = MeshTask(capability="echo", prompt="high", priority=5)
+        await self.store.submit(low)
+        await self.store.submit(high)
+
+        first = await self.store.claim_next("worker-1", "echo")
+        second = await self.store.claim_next("worker-1", "echo")
+        self.assertEqual(first.task_id, high.task_id)
+        self.assertEqual(second.task_id, low.task_id)
+        self.assertIsNone(await self.store.claim_next_available("worker-1", ["echo"], timeout=0.05))
+
+    async def test_cancelled_claim_returns_task_to_queue(self):
+        claim = asyncio.create_task(self.store.claim_next_available("worker-1", ["echo"], timeout=1.0))
+        await asyncio.sleep(0.05)
+        claim.cancel()
+        await asyncio.gather(claim, return_exceptions=True)
+        task = MeshTask(capability="echo", prompt="x")
+        await self.store.submit(task)
+        await asyncio.sleep(0.3)
+
+        record = await self.store.claim_next("worker-2", "echo")
+        self.assertIsNotNone(record)
+        self.assertEqual(record.lease_owner, "worker-2")
+        self.assertEqual(record.attempts, 1)
+
+    async def test_claim_error_mid_transaction_leaves_task_queued(self):
+        from redis.exceptions import ConnectionError as RedisConnectionError
+
+        task = MeshTask(capability="echo", prompt="x")
+        await self.store.submit(task)
+        make_pipeline = self.client.pipeline
+
+        def failing_pipeline(*args, **kwargs):
+            pipe = make_pipeline(*args, **kwargs)
+
+            async def execute(*_args, **_kwargs):
+                raise RedisConnectionError("connection lost")
+
+            pipe.execute = execute
+            return pipe
+
+        self.client.pipeline = failing_pipeline
+        try:
+            with self.assertRaises(RedisConnectionError):
+                await self.store.claim_next("worker-1", "echo")
+        finally:
+            self.client.pipeline = make_pipeline
+
+        self.assertEqual((await self.store.get(task.task_id)).state, TaskState.PENDING)
+        self.assertEqual(await self.client.zcard("test:tasks:queue:echo"), 1)
+        record = await self.store.claim_next("worker-2", "echo")
+        self.assertEqual(record.task_id, task.task_id)
+        self.assertEqual(record.attempts, 1)
+
+    async def test_expired_lease_is_requeued_then_fails_when_budget_exhausted(self):
+        task = MeshTask(capability="echo", prompt="x", lease_seconds=0.1, max_attempts=2)
+        await self.store.submit(task)
+        await self.store.claim_next("worker-1", "echo")
+
+        reclaimed = await self.store.claim_next_available("worker-2", ["echo"], timeout=1.0)
+        self.assertIsNotNone(reclaimed)
+        self.assertEqual(reclaimed.lease_owner, "worker-2")
+        self.assertEqual(reclaimed.attempts, 2)
+
+        await asyncio.sleep(0.15)
+        self.assertEqual(await self.store.requeue_expired(), 1)
+        failed = await self.store.get(task.task_id)
+        self.assertEqual(failed.state, TaskState.FAILED)
+        self.assertIn("lease_expired", [event.event_type for event in await self.store.list_events(task.task_id)])
+
+    async def test_transport_round_trip_with_signed_batch(self):
+        signer = HMACSigner(secret="mesh-secret", key_id="k1")
+        transport = AsyncRedisMeshTransport(client=self.client, signer=signer)
+        await transport.register("worker-a")
+
+        envelopes = [
+            make_task_envelope(MeshTask(capability="echo", prompt=str(i)), "coordinator", "worker-a")
+            for i in range(3)
+        ]
+        self.assertEqual(await transport.send_many(envelopes), 3)
+        received = await transport.recv("worker-a", max_messages=8, timeout=0.5)
+        self.assertEqual([env.payload["prompt"] for env in received], ["0", "1", "2"])
+        self.assertEqual(await transport.recv("worker-a", timeout=0.05), [])
+        await transport.close()
+
+    async def test_async_node_runs_on_native_redis_store(self):
+        router = MeshRouter()
+        transport = AsyncRedisMeshTransport(client=self.client)
+        worker = AsyncMeshNode(
+            node_id="worker-a",
+            capabilities={"summarize"},
+            router=router,
+            bus=transport,
+            task_store=self.store,
+            task_handler=lambda task: f"summary:{task.prompt}",
+        )
+        coordinator = AsyncMeshNode(
+            node_id="coordinator",
+            capabilities={"delegate"},
+            router=router,
+            bus=transport,
+            task_store=self.store,
+        )
+
+        task_id = await coordinator.submit_task(MeshTask(capability="summarize", prompt="report"))
+        await worker.astep(timeout=1.0)
+        result = await coordinator.wait_for_result(task_id, timeout=1.0)
+
+        self.assertIsNotNone(result)
+        self.assertEqual(result.output, "summary:report")
+        await worker.close()
+        await coordinator.close()
+        await transport.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,61 @@
+import sys
+import unittest
+
+sys.path.insert(0, r"c:\Users\gabri\JadeAgent")
+
+from jadeagent.memory import BufferMemory
+
+
+class BufferMemoryTests(unittest.TestCase):
+    def test_bm25_index_ranks_matches_and_follows_eviction(self):
+        memory = BufferMemory(max_size=4, stopwords={"the", "is"})
+        memory.memorize("The user likes Python.")
+        memory.memorize("Deploy target is Kubernetes")
+        memory.memorize("Python packaging uses uv; python everywhere")
+        memory.memorize("Lunch is at noon")
+
+        self.assertEqual(memory.remember("python", k=2), [
+            "Python packaging uses uv; python everywhere",
+            "The user likes Python.",
+        ])
+        self.assertEqual(memory.remember("deploy target", k=5), ["Deploy target is Kubernetes"])
+        # Stopwords score nothing, but a substring hit still earns the phrase boost.
+        self.assertEqual(memory.search("the", k=5), [("The user likes Python.", 2.0)])
+        self.assertEqual(memory.remember("pyth", k=5), [
+            "The user likes Python.",
+            "Python packaging uses uv; python everywhere",
+        ])
+        no_phrase = BufferMemory(phrase_boost=0)
+        no_phrase.memorize("User likes Python")
+        self.assertEqual(no_phrase.search("pyth", k=5), [])
+
+        memory.memorize("Rust rewrite planned")  # evicts "The user likes Python."
+        self.assertEqual(memory.remember("python likes", k=5), ["Python packaging uses uv; python everywhere"])
+        self.assertNotIn("likes", memory._postings)
+        self.assertEqual(memory.remember("nothing matches", k=2), ["Lunch is at noon", "Rust rewrite planned"])
+
+        whitespace = BufferMemory(tokenizer="whitespace")
+        whitespace.memorize("hello, world")
+        self.assertEqual(whitespace.search("hello", k=1), [("hello, world", 2.0)])  # substring only
+        self.assertGreater(whitespace.search("hello,", k=1)[0][1], 2.0)
+
+        memory.clear()
+        self.assertEqual((memory.size, memory._postings, memory._trigrams, memory._total_length), (0, {}, {}, 0))
+
+    def test_substring_matches_are_drawn_from_the_trigram_index(self):
+        memory = BufferMemory(max_size=500)
+        for index in range(499):
+            memory.memorize(f"routine log line {index}")
+        memory.memorize("User likes Python")
+
+        self.assertEqual(list(memory._phrase_candidates("pyth")), [499])
+        self.assertEqual(memory.search("ikes pyt", k=5), [("User likes Python", 2.0)])
+        self.assertEqual(len(list(memory._phrase_candidates("ne"))), 500)  # too short for trigrams: scanned
+
+        memory.memorize("Another entry")  # evicts "routine log line 0"
+        self.assertEqual(set(memory._phrase_candidates("line 0")), set())
+        self.assertNotIn(0, memory._trigrams["lin"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,147 @@
+"""Delta publishing and incremental discovery tests for DistributedMeshRouter."""
+
+from __future__ import annotations
+
+import sys
+import threading
+import time
+import unittest
+
+sys.path.insert(0, r"c:\Users\gabri\JadeAgent")
+
+try:
+    import fakeredis
+except ImportError:  # pragma: no cover - optional test dependency
+    fakeredis = None
+
+from jadeagent.mesh import DistributedMeshRouter
+
+
+@unittest.skipUnless(fakeredis is not None, "fakeredis not installed")
+class DistributedRouterTests(unittest.TestCase):
+    def setUp(self):
+        self.server = fakeredis.FakeServer()
+
+    def make_router(self, **kwargs) -> DistributedMeshRouter:
+        client = fakeredis.FakeRedis(server=self.server, decode_responses=True)
+        kwargs.setdefault("refresh_interval", 0.0)
+        return DistributedMeshRouter(client=client, **kwargs)
+
+    def test_assign_and_done_are_coalesced_into_one_increment(self):
+        writer = self.make_router(flush_interval=60.0)
+        writer.register_node("worker-a", {"summarize"}, max_inflight=8)
+        flushes = writer.metrics["flushes"]
+
+        for _ in range(3):
+            writer.mark_assigned("worker-a")
+        writer.mark_done("worker-a")
+        self.assertEqual(writer.metrics["flushes"], flushes)
+
+        raw = fakeredis.FakeRedis(server=self.server, decode_responses=True)
+        self.assertEqual(raw.hget("jade:mesh:registry:node:worker-a", "inflight"), "0")
+        writer.flush()
+        self.assertEqual(writer.metrics["flushes"], flushes + 1)
+        self.assertEqual(raw.hget("jade:mesh:registry:node:worker-a", "inflight"), "2")
+        writer.close()
+
+    def test_reader_fetches_only_changed_nodes(self):
+        writer = self.make_router(flush_interval=0.0)
+        for i in range(5):
+            writer.register_node(f"worker-{i}", {"summarize"})
+        reader = self.make_router()
+
+        self.assertEqual(len(reader), 5)
+        self.assertEqual(reader.metrics["nodes_fetched"], 5)
+
+        reader.snapshot()
+        self.assertEqual(reader.metrics["nodes_fetched"], 5)
+
+        writer.mark_assigned("worker-0")
+        writer.mark_assigned("worker-0")
+        rows = {row["node_id"]: row for row in reader.snapshot()}
+        self.assertEqual(rows["worker-0"]["inflight"], 2)
+        self.assertEqual(reader.metrics["nodes_fetched"], 6)
+        self.assertNotEqual(reader.route("summarize"), "worker-0")
+
+        writer.unregister_node("worker-1")
+        self.assertNotIn("worker-1", reader)
+        self.assertEqual(len(reader), 4)
+
+    def test_idle_heartbeats_skip_registry_writes(self):
+        writer = self.make_router(flush_interval=0.0, stale_after=30.0)
+        writer.register_node("worker-a", {"echo"})
+        flushes = writer.metrics["flushes"]
+
+        writer.update_heartbeat("worker-a")
+        writer.update_heartbeat("worker-a", queue_depth=0)
+        self.assertEqual(writer.metrics["flushes"], flushes)
+
+        writer.update_heartbeat("worker-a", queue_depth=3)
+        self.assertEqual(writer.metrics["flushes"], flushes + 1)
+        reader = self.make_router()
+        self.assertEqual(reader.snapshot()[0]["queue_depth"], 3)
+
+    def test_failed_timer_flush_keeps_pending_inflight(self):
+        from redis.exceptions import ConnectionError as RedisConnectionError
+
+        writer = self.make_router(flush_interval=0.05)
+        writer.register_node("worker-a", {"echo"}, max_inflight=8)
+        make_pipeline = writer._client.pipeline
+        failures = []
+
+        def failing_pipeline(*args, **kwargs):
+            pipe = make_pipeline(*args, **kwargs)
+
+            def execute(*_args, **_kwargs):
+                failures.append(1)
+                raise RedisConnectionError("connection lost")
+
+            pipe.execute = execute
+            return pipe
+
+        writer._client.pipeline = failing_pipeline
+        with self.assertLogs("jadeagent.mesh.distributed_router", "WARNING"):
+            writer.mark_assigned("worker-a")
+            writer.mark_assigned("worker-a")
+            deadline = time.time() + 2.0
+            while not failures and time.time() < deadline:
+                time.sleep(0.01)
+            time.sleep(0.02)
+        writer._client.pipeline = make_pipeline
+
+        raw = fakeredis.FakeRedis(server=self.server, decode_responses=True)
+        deadline = time.time() + 2.0
+        while raw.hget("jade:mesh:registry:node:worker-a", "inflight") != "2" and time.time() < deadline:
+            time.sleep(0.01)
+        self.assertEqual(raw.hget("jade:mesh:registry:node:worker-a", "inflight"), "2")
+        writer.mark_done("worker-a")
+        writer.close()
+        self.assertEqual(raw.hget("jade:mesh:registry:node:worker-a", "inflight"), "1")
+
+    def test_route_queries_the_index_under_the_router_lock(self):
+        router = self.make_router(flush_interval=60.0)
+        router.register_node("worker-a", {"echo"})
+        least_loaded = router._index.least_loaded
+        blocked = []
+
+        def probe_lock():
+            acquired = router._lock.acquire(timeout=0.05)
+            blocked.append(not acquired)
+            if acquired:
+                router._lock.release()
+
+        def checked(*args, **kwargs):
+            # A heartbeat on another thread must wait until the heap walk ends.
+            probe = threading.Thread(target=probe_lock)
+            probe.start()
+            probe.join()
+            return least_loaded(*args, **kwargs)
+
+        router._index.least_loaded = checked
+        self.assertEqual(router.route("echo"), "worker-a")
+        self.assertEqual(blocked, [True])
+        router.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
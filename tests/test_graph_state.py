@@ -0,0 +1,122 @@
+import json
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, r"c:\Users\gabri\JadeAgent")
+
+from jadeagent.graph import END, START, AppendList, StateGraph, load_graph_state, merge_state
+from jadeagent.state import FileStateStore, RetentionPolicy, SqliteStateStore, collect_garbage
+
+
+def _chat_graph(turns: int, shared: bool = False) -> StateGraph:
+    def speak(state):
+        assert isinstance(state["messages"], AppendList if shared else list)
+        return {"messages": [f"msg {len(state['messages'])}"], "turn": state["turn"] + 1}
+
+    graph = StateGraph()
+    graph.add_node("speak", speak)
+    graph.add_edge(START, "speak")
+    graph.add_conditional_edge("speak", lambda state: "speak" if state["turn"] < turns else END)
+    return graph
+
+
+class GraphStateTests(unittest.TestCase):
+    def test_append_list_shares_items_between_versions(self):
+        base = AppendList(["a", "b"])
+        newer = base.extended(["c"])
+        branch = base.extended(["x"])
+
+        self.assertEqual(base, ["a", "b"])
+        self.assertEqual(newer, ["a", "b", "c"])
+        self.assertEqual(branch, ["a", "b", "x"])
+        self.assertIs(newer._items, base._items)
+        self.assertIsNot(branch._items, base._items)
+        self.assertEqual(newer[-1], "c")
+        self.assertEqual(newer[1:], ["b", "c"])
+        self.assertEqual(newer + ["d"], ["a", "b", "c", "d"])
+        self.assertEqual(merge_state({"log": newer}, {"log": ["d"]})["log"], ["a", "b", "c", "d"])
+        self.assertEqual(merge_state({"log": ["a"]}, {"log": ["b"], "n": 1}), {"log": ["a", "b"], "n": 1})
+
+    def test_diff_checkpoints_rebuild_every_step(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            store = FileStateStore(tmpdir)
+            result = _chat_graph(20, shared=True).compile(max_iterations=30, structural_sharing=True).run(
+                {"messages": [], "turn": 0}, state_store=store, run_id="chat", full_checkpoint_every=8,
+            )
+            self.assertIs(type(result["messages"]), list)
+            self.assertEqual(result["messages"], [f"msg {i}" for i in range(20)])
+
+            snapshots = list(store.view_run("chat").iter_snapshots())
+            kinds = [snapshot.metadata["checkpoint"] for snapshot in snapshots]
+            self.assertEqual(kinds.count("full"), 4)  # steps 1, 9, 17 and COMPLETED
+            for snapshot in snapshots:
+                turn = snapshot.step
+                expected = {"messages": [f"msg {i}" for i in range(turn)], "turn": turn}
+                self.assertEqual(load_graph_state(store, "chat", snapshot.snapshot_id), expected)
+            self.assertEqual(load_graph_state(store, "chat")["turn"], 20)
+
+            diff = next(s for s in snapshots if s.metadata["checkpoint"] == "diff" and s.step == 16)
+            self.assertEqual(diff.graph.variables, {})
+            self.assertEqual(diff.graph.outputs["updates"], [["speak", {"messages": ["msg 15"], "turn": 16}]])
+
+    def test_default_state_holds_plain_lists_nodes_can_mutate_and_serialize(self):
+        def log(state):
+            state["log"].append("in place")
+            return {"dumped": json.dumps(state), "added": ["x"]}
+
+        def check(state):
+            assert isinstance(state["added"], list)
+            return {"log": ["check"]}
+
+        graph = StateGraph()
+        graph.add_node("log", log)
+        graph.add_node("check", check)
+        graph.add_edge(START, "log")
+        graph.add_edge("log", "check")
+        graph.add_edge("check", END)
+        result = graph.compile().run({"log": []})
+        self.assertEqual(result["log"], ["in place", "check"])
+        self.assertEqual(json.loads(result["dumped"]), {"log": ["in place"]})
+
+        # With sharing on, lists a node adds later are shared views as well.
+        def check_shared(state):
+            assert isinstance(state["added"], AppendList)
+            return {"added": ["y"]}
+
+        graph.nodes["log"] = lambda state: {"added": ["x"]}
+        graph.nodes["check"] = check_shared
+        result = graph.compile(structural_sharing=True).run({"log": []})
+        self.assertEqual(result, {"log": [], "added": ["x", "y"]})
+        self.assertIs(type(result["added"]), list)
+
+    def test_gc_keeps_the_chain_of_retained_diff_checkpoints(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            store = SqliteStateStore(f"{tmpdir}/state.sqlite3")
+            _chat_graph(40).compile().run({"messages": [], "turn": 0}, state_store=store, run_id="long")
+
+            report = collect_garbage(store, RetentionPolicy(completed_ttl=None))
+            self.assertGreater(report.compacted_runs["long"], 0)
+            snapshots = list(store.view_run("long").iter_snapshots())
+            # Steps 36-40 and COMPLETED are the last snapshots; 33-35 are their diff chain.
+            self.assertEqual(sorted({s.step for s in snapshots}), list(range(33, 41)))
+            for snapshot in snapshots:
+                turn = snapshot.step
+                expected = {"messages": [f"msg {i}" for i in range(turn)], "turn": turn}
+                self.assertEqual(load_graph_state(store, "long", snapshot.snapshot_id), expected)
+            store.close()
+
+    def test_full_checkpoint_every_one_keeps_full_snapshots(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            store = SqliteStateStore(f"{tmpdir}/state.sqlite3")
+            _chat_graph(5).compile().run(
+                {"messages": [], "turn": 0}, state_store=store, run_id="full", full_checkpoint_every=1,
+            )
+            snapshots = list(store.view_run("full").iter_snapshots())
+            self.assertTrue(all(s.metadata["checkpoint"] == "full" for s in snapshots))
+            self.assertEqual(json.loads(json.dumps(snapshots[2].graph.variables))["messages"], ["msg 0", "msg 1", "msg 2"])
+            store.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
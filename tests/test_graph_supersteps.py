@@ -0,0 +1,82 @@
+import sys
+import tempfile
+import threading
+import time
+import unittest
+
+sys.path.insert(0, r"c:\Users\gabri\JadeAgent")
+
+from jadeagent.graph import END, START, StateGraph
+from jadeagent.state import FileStateStore
+
+
+def _slow(name: str, delay: float = 0.2):
+    def node(state):
+        time.sleep(delay)
+        return {"visited": [name], name: threading.current_thread().name}
+    return node
+
+
+class GraphSuperstepTests(unittest.TestCase):
+    def test_fan_out_branches_run_concurrently_and_merge_in_order(self):
+        graph = StateGraph()
+        graph.add_node("plan", lambda state: {"visited": ["plan"]})
+        for name in ("web", "docs", "code"):
+            graph.add_node(name, _slow(name))
+            graph.add_edge("plan", name)
+            graph.add_edge(name, "summarize")
+        graph.add_node("summarize", lambda state: {"visited": ["summarize"], "count": len(state["visited"])})
+        graph.add_edge(START, "plan")
+        graph.add_edge("summarize", END)
+
+        started = time.perf_counter()
+        result = graph.compile().run({"visited": []})
+        elapsed = time.perf_counter() - started
+
+        self.assertLess(elapsed, 0.5)
+        # Branch updates merge in edge order regardless of finish order;
+        # "summarize" is reached from three branches but runs once.
+        self.assertEqual(result["visited"], ["plan", "web", "docs", "code", "summarize"])
+        self.assertEqual(result["count"], 4)
+        self.assertEqual(len({result["web"], result["docs"], result["code"]}), 3)
+
+    def test_join_edge_waits_for_uneven_branches(self):
+        graph = StateGraph()
+        graph.add_node("split", lambda state: None)
+        graph.add_node("short", lambda state: {"visited": ["short"]})
+        graph.add_node("long_1", lambda state: {"visited": ["long_1"]})
+        graph.add_node("long_2", lambda state: {"visited": ["long_2"]})
+        graph.add_node("join", lambda state: {"visited": ["join"]})
+        graph.add_edge(START, "split")
+        graph.add_edge("split", "short")
+        graph.add_edge("split", "long_1")
+        graph.add_edge("long_1", "long_2")
+        graph.add_edge(["short", "long_2"], "join")
+        graph.add_edge("join", END)
+
+        with tempfile.TemporaryDirectory() as tmpdir:
+            store = FileStateStore(tmpdir)
+            result = graph.compile(max_workers=1).run({"visited": []}, state_store=store, run_id="join_run")
+
+            self.assertEqual(result["visited"], ["short", "long_1", "long_2", "join"])
+            info = store.inspect("join_run")
+            self.assertEqual(info["latest_phase"], "COMPLETED")
+            self.assertEqual(info["snapshot_count"], 5)
+
+    def test_conditional_fan_out_and_branch_failure(self):
+        graph = StateGraph()
+        graph.add_node("route", lambda state: None)
+        graph.add_node("ok", lambda state: {"ok": True})
+        graph.add_node("boom", lambda state: 1 / 0)
+        graph.add_edge(START, "route")
+        graph.add_conditional_edge("route", lambda state: state["targets"])
+        graph.add_edge("ok", END)
+        graph.add_edge("boom", END)
+
+        self.assertTrue(graph.compile().run({"targets": ["ok", END]})["ok"])
+        with self.assertRaises(ZeroDivisionError):
+            graph.compile().run({"targets": ["ok", "boom"]})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,129 @@
+import json
+import sys
+import tempfile
+import textwrap
+import threading
+import time
+import unittest
+from pathlib import Path
+
+sys.path.insert(0, r"c:\Users\gabri\JadeAgent")
+
+from jadeagent.mcp import MCPClient
+
+
+FAKE_SERVER = textwrap.dedent(
+    """
+    import json
+    import sys
+    import threading
+    import time
+
+    lock = threading.Lock()
+    cancelled = []
+
+    def send(message):
+        with lock:
+            sys.stdout.write(json.dumps(message) + "\\n")
+            sys.stdout.flush()
+
+    def handle(request):
+        name = request["params"]["name"]
+        args = request["params"].get("arguments", {})
+        time.sleep(args.get("delay", 0))
+        if name == "stats":
+            text = json.dumps({"cancelled": cancelled})
+        else:
+            text = f"{name}:{args.get('value')}"
+        send({"jsonrpc": "2.0", "id": request["id"], "result": {"content": [{"type": "text", "text": text}]}})
+
+    for line in sys.stdin:
+        request = json.loads(line)
+        method = request.get("method")
+        if method == "initialize":
+            send({"jsonrpc": "2.0", "id": request["id"], "result": {"serverInfo": {"name": "fake"}}})
+            send({"jsonrpc": "2.0", "id": "srv-1", "method": "ping"})
+        elif method == "tools/list":
+            send({"jsonrpc": "2.0", "id": request["id"], "result": {"tools": [{"name": "echo"}, {"name": "stats"}]}})
+        elif method == "tools/call":
+            threading.Thread(target=handle, args=(request,), daemon=True).start()
+        elif method == "notifications/cancelled":
+            cancelled.append(request["params"]["requestId"])
+    """
+)
+
+
+class MCPClientTests(unittest.TestCase):
+    def test_tool_calls_are_pipelined_on_one_connection(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            script = Path(tmpdir) / "fake_mcp_server.py"
+            script.write_text(FAKE_SERVER, encoding="utf-8")
+            with MCPClient(f'"{sys.executable}" "{script}"', timeout=5.0) as client:
+                self.assertEqual(client.tool_names, ["echo", "stats"])
+
+                started = time.perf_counter()
+                futures = [client.call_tool_async("echo", {"value": index, "delay": 0.4}) for index in range(6)]
+                self.assertEqual([future.result(timeout=5) for future in futures], [f"echo:{index}" for index in range(6)])
+                self.assertLess(time.perf_counter() - started, 1.5)
+
+                results: dict[int, str] = {}
+                threads = [
+                    threading.Thread(target=lambda index=index: results.__setitem__(
+                        index, client.call_tool("echo", {"value": index, "delay": 0.3 - index * 0.1})
+                    ))
+                    for index in range(3)
+                ]
+                for thread in threads:
+                    thread.start()
+                for thread in threads:
+                    thread.join(timeout=5)
+                self.assertEqual(results, {0: "echo:0", 1: "echo:1", 2: "echo:2"})
+
+                with self.assertRaises(TimeoutError):
+                    client.call_tool("echo", {"value": "slow", "delay": 1.0}, timeout=0.1)
+                abandoned = client.call_tool_async("echo", {"value": "later", "delay": 1.0})
+                self.assertTrue(abandoned.cancel())
+                self.assertEqual(client.call_tool("echo", {"value": "after"}), "echo:after")
+                self.assertEqual(len(json.loads(client.call_tool("stats"))["cancelled"]), 2)
+                time.sleep(1.1)
+                self.assertEqual(client._pending, {})
+
+    def test_lazy_client_starts_on_first_call_from_cached_tools_and_stops_when_idle(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            script = Path(tmpdir) / "fake_mcp_server.py"
+            script.write_text(FAKE_SERVER, encoding="utf-8")
+            command = f'"{sys.executable}" "{script}"'
+            cache_dir = Path(tmpdir) / "mcp_cache"
+
+            with MCPClient(command, lazy=True, cache_dir=cache_dir) as first:
+                self.assertTrue(first.is_running)  # nothing cached yet
+                self.assertEqual(first.tool_names, ["echo", "stats"])
+            (cache_file,) = cache_dir.glob("*.json")
+            self.assertEqual(json.loads(cache_file.read_text(encoding="utf-8"))["server_info"], {"name": "fake"})
+
+            with MCPClient(command, lazy=True, cache_dir=cache_dir, idle_timeout=0.3) as client:
+                self.assertFalse(client.is_running)
+                self.assertEqual([tool.name for tool in client.tools], ["echo", "stats"])
+                self.assertFalse(client.is_running)
+                self.assertEqual(client.call_tool("echo", {"value": 1}), "echo:1")
+                self.assertTrue(client.is_running)
+                deadline = time.monotonic() + 3.0
+                while client.is_running and time.monotonic() < deadline:
+                    time.sleep(0.05)
+                self.assertFalse(client.is_running)
+                self.assertEqual(client.call_tool("echo", {"value": 2}), "echo:2")
+
+            entry = json.loads(cache_file.read_text(encoding="utf-8"))
+            entry.update(server_info={"name": "fake", "version": "0.9"}, tools=[{"name": "stale"}])
+            cache_file.write_text(json.dumps(entry), encoding="utf-8")
+            with MCPClient(command, lazy=True, cache_dir=cache_dir) as upgraded:
+                self.assertEqual(upgraded.tool_names, ["stale"])
+                self.assertEqual(upgraded.call_tool("echo", {"value": 3}), "echo:3")
+                self.assertEqual(upgraded.tool_names, ["echo", "stats"])
+
+            with MCPClient(command, env={"FAKE_MCP": "1"}, lazy=True, cache_dir=cache_dir) as other:
+                self.assertTrue(other.is_running)  # a different environment is a different cache entry
+
+
+if __name__ == "__main__":
+    unittest.main()
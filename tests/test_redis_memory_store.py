@@ -0,0 +1,101 @@
+"""RedisMemoryStore caching and batching tests (fakeredis-backed)."""
+
+from __future__ import annotations
+
+import sys
+import time
+import unittest
+
+sys.path.insert(0, r"c:\Users\gabri\JadeAgent")
+
+try:
+    import fakeredis
+except ImportError:  # pragma: no cover - optional test dependency
+    fakeredis = None
+
+from jadeagent.memory import RedisMemoryStore
+
+
+def _wait_for(predicate, timeout: float = 3.0) -> bool:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if predicate():
+            return True
+        time.sleep(0.02)
+    return predicate()
+
+
+@unittest.skipUnless(fakeredis is not None, "fakeredis not installed")
+class RedisMemoryStoreTests(unittest.TestCase):
+    def setUp(self):
+        self.server = fakeredis.FakeServer()
+
+    def _store(self, **kwargs) -> RedisMemoryStore:
+        client = fakeredis.FakeRedis(server=self.server, decode_responses=True)
+        store = RedisMemoryStore(client=client, key_prefix="test:memory", **kwargs)
+        self.addCleanup(store.close)
+        return store
+
+    def test_version_checked_cache_and_pipelined_batches(self):
+        writer = self._store()
+        reader = self._store()
+        raw = fakeredis.FakeRedis(server=self.server, decode_responses=True)
+
+        writer.write_states({("t1", "plan"): {"step": 1}, ("t1", "facts"): {"n": 2}}, "node-a")
+        self.assertEqual(reader.read_states([("t1", "plan"), ("t1", "facts"), ("t1", "missing")]), {
+            ("t1", "plan"): {"step": 1},
+            ("t1", "facts"): {"n": 2},
+            ("t1", "missing"): {},
+        })
+
+        # A write that skips the version bump stays invisible to the cache...
+        raw.hset("test:memory:state:t1:plan", "state", '{"step": 99}')
+        self.assertEqual(reader.read_state("t1", "plan"), {"step": 1})
+        # ...while a real write is picked up through the version check.
+        writer.write_state("t1", "plan", {"step": 2}, "node-a")
+        self.assertEqual(reader.read_state("t1", "plan"), {"step": 2})
+        reader.read_state("t1", "plan")["step"] = "mutated"
+        self.assertEqual(reader.read_state("t1", "plan"), {"step": 2})
+
+        writer.append_notes([("t1", "plan", f"note {i}", None) for i in range(5)], "node-a")
+        writer.append_note("t1", "facts", "fact", "node-b", {"source": "test"})
+        notes = reader.list_notes_many([("t1", "plan"), ("t1", "facts")], limit=3)
+        self.assertEqual([n["note"] for n in notes[("t1", "plan")]], ["note 2", "note 3", "note 4"])
+        self.assertEqual(notes[("t1", "facts")], [{"node_id": "node-b", "note": "fact", "metadata": {"source": "test"}}])
+        self.assertEqual([n["note"] for n in reader.list_notes("t1", "plan", limit=2)], ["note 3", "note 4"])
+        writer.append_note("t1", "plan", "note 5", "node-a")
+        self.assertEqual([n["note"] for n in reader.list_notes("t1", "plan", limit=2)], ["note 4", "note 5"])
+        self.assertEqual(len(reader.list_notes("t1", "plan", limit=0)), 6)
+
+        # Nested values are never shared with the cache, the writer, or other readers.
+        state = {"plan": {"steps": ["a"]}}
+        writer.write_state("t1", "nested", state, "node-a")
+        state["plan"]["steps"].append("written after")
+        cached_state = writer.read_state("t1", "nested")
+        self.assertEqual(cached_state, {"plan": {"steps": ["a"]}})
+        cached_state["plan"]["steps"].append("read and mutated")
+        self.assertEqual(writer.read_states([("t1", "nested")])[("t1", "nested")], {"plan": {"steps": ["a"]}})
+        reader.list_notes("t1", "facts")[0]["metadata"]["source"] = "mutated"
+        self.assertEqual(reader.list_notes("t1", "facts")[0]["metadata"], {"source": "test"})
+
+        uncached = self._store(local_cache=False)
+        self.assertEqual(uncached.read_state("t1", "plan"), {"step": 2})
+        self.assertEqual(len(uncached.list_notes("t1", "plan", limit=100)), 6)
+
+    def test_keyspace_invalidation_serves_hits_locally(self):
+        writer = self._store()
+        reader = self._store(invalidation="keyspace")
+        self.assertTrue(_wait_for(lambda: reader._subscribed))
+
+        writer.write_state("t1", "plan", {"step": 1}, "node-a")
+        self.assertEqual(reader.read_state("t1", "plan"), {"step": 1})
+        self.assertIn("test:memory:state:t1:plan", reader._cache)
+
+        raw = fakeredis.FakeRedis(server=self.server, decode_responses=True)
+        raw.hset("test:memory:state:t1:plan", "state", '{"step": 7}')
+        self.assertTrue(_wait_for(lambda: "test:memory:state:t1:plan" not in reader._cache))
+        self.assertEqual(reader.read_state("t1", "plan"), {"step": 7})
+
+
+if __name__ == "__main__":
+    unittest.main()
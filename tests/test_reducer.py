@@ -11,6 +11,7 @@ from jadeagent import NodeManifest
 from jadeagent.mesh import (
     AsyncInMemoryMeshBus,
     AsyncMeshNode,
+    IncrementalReducer,
     MeshRouter,
     MeshTask,
     ReducerNode,
@@ -142,5 +143,116 @@ class ReducerTests(unittest.IsolatedAsyncioTestCase):
         self.assertEqual(parent_summary.queue_pressure_prefix[-1], parent_summary.queue_pressure_total)
 
 
+class IncrementalReducerTests(unittest.IsolatedAsyncioTestCase):
+    def _shard(self, index: int, *, completed: int = 0, failed: int = 0) -> ShardSummary:
+        return ShardSummary(
+            shard_id=f"tenant-{index % 3}::summarize",
+            supervisor_id=f"sup-{index}",
+            tenant_id=f"tenant-{index % 3}",
+            capability="summarize",
+            ready_depth=index % 4,
+            inflight=index % 2,
+            completed=completed,
+            worker_count=2,
+            healthy_workers=2,
+            busy_workers=index % 2,
+            total_permits=4,
+            available_permits=4 - index % 2,
+            queue_pressure=float(index % 4) + 0.5,
+            event_counts={"task_completed": completed, "task_failed": failed},
+        )
+
+    def assertSameRollup(self, incremental, snapshot):
+        for name in (
+            "shard_count",
+            "total_queued",
+            "total_inflight",
+            "total_completed",
+            "total_failed",
+            "total_workers",
+            "busy_workers",
+            "total_permits",
+            "available_permits",
+            "event_totals",
+            "sources",
+        ):
+            self.assertEqual(getattr(incremental, name), getattr(snapshot, name), name)
+        self.assertAlmostEqual(incremental.queue_pressure_total, snapshot.queue_pressure_total)
+        self.assertEqual(
+            {key: value.to_dict() for key, value in incremental.tenant_budgets.items()},
+            {key: value.to_dict() for key, value in snapshot.tenant_budgets.items()},
+        )
+
+    def test_batch_ingest_matches_snapshot_reduce(self):
+        rollup = IncrementalReducer("root")
+        reference = ReducerNode("root")
+        shards = [self._shard(i, completed=i, failed=i % 3) for i in range(40)]
+        rollup.ingest_many(shards)
+        for shard in shards:
+            reference.ingest_shard(shard)
+        self.assertSameRollup(rollup.reduce(), reference.reduce())
+
+        updated = [self._shard(i, completed=i + 5) for i in range(0, 40, 2)]
+        rollup.ingest_many(updated)
+        rollup.ingest_shard(self._shard(1, completed=9))
+        rollup.remove_shard("sup-3")
+        for shard in updated + [self._shard(1, completed=9)]:
+            reference.ingest_shard(shard)
+        reference.remove_shard("sup-3")
+        self.assertSameRollup(rollup.reduce(), reference.reduce())
+        self.assertEqual(rollup.tenant("tenant-0").shard_count, 13)
+
+    def test_reduce_rescans_pressure_prefix_only_after_it_changes(self):
+        from unittest import mock
+
+        from jadeagent.mesh import rollup as rollup_module
+
+        rollup = IncrementalReducer("root")
+        rollup.ingest_many([self._shard(i) for i in range(20)])
+        with mock.patch.object(rollup_module, "hillis_steele_scan", wraps=hillis_steele_scan) as scan:
+            first = rollup.reduce()
+            rollup.push_delta("sup-4", {"completed": 2})
+            second = rollup.reduce()
+            self.assertEqual(scan.call_count, 1)
+            self.assertEqual(second.total_completed, first.total_completed + 2)
+            self.assertEqual(second.queue_pressure_prefix, first.queue_pressure_prefix)
+
+            rollup.push_delta("sup-4", {"queue_pressure": 1.0})
+            rollup.register_shard("sup-late", tenant_id="tenant-0", capability="summarize")
+            third = rollup.reduce()
+            self.assertEqual(scan.call_count, 2)
+        self.assertAlmostEqual(third.queue_pressure_total, first.queue_pressure_total + 1.0)
+        self.assertEqual(list(third.sources), sorted(third.sources, key=lambda sid: (
+            rollup._shards[sid].tenant_id, rollup._shards[sid].capability, sid)))
+
+    async def test_supervisor_deltas_track_snapshots(self):
+        runtime = ShardRuntime()
+        supervisor = ShardSupervisor("sup-acme", tenant_id="acme", capability="summarize")
+        supervisor.register_worker(_worker("worker-a", tenant_id="acme"), permits=2, metadata={"queue_pressure": 1})
+        runtime.register_supervisor(supervisor, metadata={"region": "sa-east"})
+        supervisor.register_worker(_worker("worker-b", tenant_id="acme"), permits=1)
+
+        def reference():
+            node = ReducerNode("root")
+            for summary in runtime.collect_shard_summaries():
+                node.ingest_shard(summary)
+            return node.reduce()
+
+        for index in range(3):
+            await runtime.submit(MeshTask(capability="summarize", prompt=str(index), tenant_id="acme"))
+        self.assertEqual(runtime.rollup.fleet().queued, 3)
+        self.assertSameRollup(runtime.reduce(), reference())
+
+        await runtime.run_until_idle()
+        supervisor.update_worker("worker-b", metadata={"health": 0.0})
+        self.assertSameRollup(runtime.reduce(), reference())
+        self.assertEqual(runtime.rollup.region_rollup("sa-east").completed, 3)
+
+        supervisor.unregister_worker("worker-a")
+        self.assertSameRollup(runtime.reduce(), reference())
+        runtime.unregister_supervisor("sup-acme")
+        self.assertEqual(runtime.reduce().shard_count, 0)
+
+
 if __name__ == "__main__":
     unittest.main()
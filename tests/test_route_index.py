@@ -0,0 +1,111 @@
+"""Tests for the incremental mesh routing index."""
+
+from __future__ import annotations
+
+import sys
+import time
+import unittest
+
+sys.path.insert(0, r"c:\Users\gabri\JadeAgent")
+
+from jadeagent.mesh import MeshRouter
+from jadeagent.mesh.route_index import RouteIndex, compile_allowlist
+from jadeagent.mesh.router import NodeState
+
+
+class RouteIndexTests(unittest.TestCase):
+    def test_least_loaded_follows_assign_and_done(self):
+        router = MeshRouter()
+        router.register_node("a", {"summarize"}, max_inflight=2)
+        router.register_node("b", {"summarize"}, max_inflight=2)
+
+        first = router.route("summarize")
+        router.mark_assigned(first)
+        second = router.route("summarize")
+        self.assertNotEqual(first, second)
+
+        router.mark_assigned(second)
+        router.mark_assigned(second)
+        self.assertEqual(router.route("summarize"), first)
+        router.mark_done(second)
+        router.mark_done(second)
+        router.mark_assigned(first)
+        self.assertEqual(router.route("summarize"), second)
+        self.assertEqual(router.route("summarize", exclude={second}), first)
+
+    def test_tenant_trust_and_stale_filters(self):
+        router = MeshRouter(stale_after=5.0)
+        router.register_node("shared", {"echo"}, metadata={"trust_tier": "standard"})
+        router.register_node("acme", {"echo"}, metadata={"tenant_id": "acme", "trust_tier": "trusted"})
+        router.register_node("beta", {"echo"}, metadata={"tenant_id": "beta"})
+
+        self.assertEqual(router.route("echo", tenant_id="acme", min_trust_tier="trusted"), "acme")
+        self.assertIsNone(router.route("echo", tenant_id="beta", min_trust_tier="trusted"))
+        self.assertIn(router.route("echo", tenant_id="beta"), {"shared", "beta"})
+
+        router._nodes["acme"].last_seen = time.time() - 60
+        self.assertIsNone(router.route("echo", tenant_id="acme", min_trust_tier="trusted"))
+        router.update_heartbeat("acme")
+        self.assertEqual(router.route("echo", tenant_id="acme", min_trust_tier="trusted"), "acme")
+
+        router.unregister_node("shared")
+        router.unregister_node("beta")
+        self.assertEqual(router.route("echo"), "acme")
+
+    def test_compiled_allowlist_matches_fnmatch_semantics(self):
+        pattern = compile_allowlist(["delegator-*", "ops-?"])
+        self.assertIsNotNone(pattern.match("delegator-7"))
+        self.assertIsNotNone(pattern.match("ops-1"))
+        self.assertIsNone(pattern.match("ops-12"))
+        self.assertIsNone(compile_allowlist([]))
+
+    def test_upsert_recompiles_after_in_place_metadata_edit(self):
+        index = RouteIndex()
+        state = NodeState("a", {"echo"}, metadata={"delegation_allowlist": ["ops-*"]})
+        index.upsert(state)
+        self.assertTrue(index.get("a").allows_requester("ops-1"))
+
+        state.metadata["delegation_allowlist"].append("dev-*")
+        state.metadata["trust_tier"] = "trusted"
+        entry = index.upsert(state)
+        self.assertTrue(entry.allows_requester("dev-2"))
+        self.assertTrue(entry.allows("trusted", "ops-1"))
+
+    def test_affinity_is_stable_when_a_node_joins(self):
+        router = MeshRouter()
+        for i in range(8):
+            router.register_node(f"node-{i}", {"embed"})
+        keys = [f"doc-{i}" for i in range(400)]
+        before = {key: router.route("embed", affinity=key) for key in keys}
+        self.assertEqual(before, {key: router.route("embed", affinity=key) for key in keys})
+
+        router.register_node("node-8", {"embed"})
+        after = {key: router.route("embed", affinity=key) for key in keys}
+        moved = [key for key in keys if before[key] != after[key]]
+        self.assertTrue(moved)
+        self.assertTrue(all(after[key] == "node-8" for key in moved))
+        self.assertLess(len(moved), len(keys) // 4)
+
+        excluded = router.route("embed", affinity=keys[0], exclude={after[keys[0]]})
+        self.assertNotIn(excluded, {None, after[keys[0]]})
+
+    def test_routing_stays_fast_with_thousands_of_nodes(self):
+        router = MeshRouter()
+        for i in range(5000):
+            router.register_node(
+                f"node-{i}",
+                {f"cap-{i % 10}", "common"},
+                max_inflight=4,
+                metadata={"tenant_id": f"tenant-{i % 50}", "delegation_allowlist": ["svc-*"]},
+            )
+
+        started = time.perf_counter()
+        for i in range(500):
+            node_id = router.route("common", tenant_id=f"tenant-{i % 50}", requester="svc-a")
+            router.mark_assigned(node_id)
+        elapsed = (time.perf_counter() - started) / 500
+        self.assertLess(elapsed, 0.005)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,57 @@
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+sys.path.insert(0, r"c:\Users\gabri\JadeAgent")
+
+from jadeagent.sandbox import SandboxRunRequest, SubprocessSandboxProvider
+
+
+class WarmInterpreterPoolTests(unittest.TestCase):
+    def test_pooled_python_jobs_are_isolated_recycled_and_time_out(self):
+        provider = SubprocessSandboxProvider(
+            python_executable=sys.executable,
+            pool_size=2,
+            max_uses_per_worker=3,
+        )
+        try:
+            first = provider.run(SandboxRunRequest(
+                mode="python",
+                content="import builtins, sys\nbuiltins.leaked = 1\nprint('hi')\nprint('warn', file=sys.stderr)",
+            ))
+            self.assertTrue(first.success)
+            self.assertEqual((first.stdout, first.stderr), ("hi\n", "warn\n"))
+
+            second = provider.run(SandboxRunRequest(mode="python", content="import builtins\nprint(hasattr(builtins, 'leaked'))"))
+            self.assertEqual(second.stdout, "False\n")
+
+            failed = provider.run(SandboxRunRequest(mode="python", content="1 / 0"))
+            self.assertFalse(failed.success)
+            self.assertEqual(failed.exit_code, 1)
+            self.assertIn("ZeroDivisionError", failed.stderr)
+            self.assertIn('File "<string>", line 1', failed.stderr)
+
+            exited = provider.run(SandboxRunRequest(mode="python", content="import sys\nsys.exit(7)"))
+            self.assertEqual(exited.exit_code, 7)
+
+            with tempfile.TemporaryDirectory() as tmpdir:
+                cwd = provider.run(SandboxRunRequest(mode="python", content="import os\nprint(os.getcwd())", workdir=tmpdir))
+                self.assertEqual(Path(cwd.stdout.strip()).resolve(), Path(tmpdir).resolve())
+
+            pids = {
+                provider.run(SandboxRunRequest(mode="python", content="pass")).metadata["worker_pid"]
+                for _ in range(8)
+            }
+            self.assertGreater(len(pids), 2)  # workers are replaced after max_uses_per_worker jobs
+
+            slow = provider.run(SandboxRunRequest(mode="python", content="import time\ntime.sleep(5)", timeout_seconds=0.3))
+            self.assertEqual(slow.exit_code, 124)
+            after = provider.run(SandboxRunRequest(mode="python", content="print(6 * 7)"))
+            self.assertEqual(after.stdout, "42\n")
+        finally:
+            provider.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -16,7 +16,9 @@ from jadeagent.mesh import (
     ShardDirectory,
     ShardRuntime,
     ShardSupervisor,
+    SupervisorSpec,
 )
+from jadeagent.mesh.sharding import _rendezvous_score, shard_key
 
 
 class ShardPhaseBTests(unittest.IsolatedAsyncioTestCase):
@@ -54,6 +56,97 @@ class ShardPhaseBTests(unittest.IsolatedAsyncioTestCase):
         routed = directory.route_task(task)
         self.assertEqual(routed, acme_first)
 
+    def test_shard_directory_caches_placement_until_membership_changes(self):
+        directory = ShardDirectory()
+        for i in range(32):
+            directory.register_supervisor(f"sup-{i}", capabilities={"summarize"})
+        version = directory.version
+
+        keys = [(f"tenant-{i}", "summarize") for i in range(200)]
+        placed = directory.route_many(keys)
+        scalar = {
+            key: max(
+                (f"sup-{i}" for i in range(32)),
+                key=lambda sup: _rendezvous_score(shard_key(*key), sup),
+            )
+            for key in keys
+        }
+        self.assertEqual([item.supervisor_id for item in placed], [scalar[key] for key in keys])
+        self.assertIs(directory.route("tenant-0", "summarize"), placed[0])
+
+        directory.register_supervisor("sup-new", capabilities={"summarize"})
+        self.assertGreater(directory.version, version)
+        rerouted = directory.route("tenant-0", "summarize")
+        self.assertIsNot(rerouted, placed[0])
+
+    def test_placement_cache_is_bounded_and_pruned_on_membership_change(self):
+        from jadeagent.mesh.sharding import _rendezvous_scores
+
+        directory = ShardDirectory(max_placements=50)
+        for i in range(12):
+            directory.register_supervisor(f"sup-{i}", capabilities={"summarize"})
+        specs = list(directory._supervisors.values())
+        key = shard_key("tenant-1", "summarize")
+        for fast, spec in zip(_rendezvous_scores(key, specs), specs):
+            self.assertAlmostEqual(fast / _rendezvous_score(key, spec.supervisor_id), 1.0, places=12)
+
+        keys = [(f"tenant-{i}", "summarize") for i in range(120)]
+        directory.route_many(keys)
+        directory.route(*keys[70])  # refreshes recency
+        self.assertEqual(len(directory._placements), 50)
+        self.assertEqual(set(directory.known_shards()), set(keys[70:]))
+
+        directory.unregister_supervisor("sup-0")
+        self.assertTrue(all(entry is None for entry in directory._placements.values()))
+        self.assertEqual(set(directory.known_shards()), set(keys[70:]))
+        self.assertNotEqual(directory.route(*keys[70]).supervisor_id, "sup-0")
+
+    def test_vectorized_near_ties_resolve_with_exact_scores(self):
+        from unittest import mock
+
+        from jadeagent.mesh import sharding
+
+        directory = ShardDirectory()
+        for i in range(16):
+            directory.register_supervisor(f"sup-{i}", capabilities={"summarize"})
+        key = shard_key("tenant-7", "summarize")
+        exact = {f"sup-{i}": _rendezvous_score(key, f"sup-{i}") for i in range(16)}
+        winner = max(exact, key=exact.__getitem__)
+        runner_up = sorted(exact, key=exact.__getitem__)[-2]
+
+        def rounded_scores(_key, specs):
+            # Simulate float rounding that flips the order of the top two.
+            scores = [exact[spec.supervisor_id] for spec in specs]
+            ids = [spec.supervisor_id for spec in specs]
+            scores[ids.index(runner_up)] = exact[winner] * (1 + 1e-12)
+            return scores
+
+        with mock.patch.object(sharding, "_rendezvous_scores", rounded_scores):
+            placed = directory.route("tenant-7", "summarize")
+        self.assertEqual(placed.supervisor_id, winner)
+        self.assertEqual(placed.score, exact[winner])
+
+    def test_plan_rebalance_reports_only_moving_shards(self):
+        directory = ShardDirectory()
+        for i in range(8):
+            directory.register_supervisor(f"sup-{i}", capabilities={"summarize"})
+        keys = [(f"tenant-{i}", "summarize") for i in range(300)]
+        before = {key: item.supervisor_id for key, item in zip(keys, directory.route_many(keys))}
+
+        joining = SupervisorSpec("sup-8", capabilities=("summarize",))
+        moves = directory.plan_rebalance(join=[joining])
+        self.assertTrue(moves)
+        self.assertLess(len(moves), len(keys) // 4)
+        self.assertTrue(all(move.to_supervisor == "sup-8" for move in moves))
+        self.assertEqual(directory.route_many(keys[:1])[0].supervisor_id, before[keys[0]])
+
+        leaving = directory.plan_rebalance(leave=["sup-3"])
+        self.assertEqual(
+            {(move.tenant_id, move.capability) for move in leaving},
+            {key for key, owner in before.items() if owner == "sup-3"},
+        )
+        self.assertTrue(all(move.from_supervisor == "sup-3" for move in leaving))
+
     async def test_shard_supervisor_dispatches_to_local_worker(self):
         router = MeshRouter()
         bus = AsyncInMemoryMeshBus()
@@ -188,6 +281,12 @@ class ShardPhaseBTests(unittest.IsolatedAsyncioTestCase):
         snapshot = runtime.snapshot()
         self.assertIn("sup-runtime", snapshot["supervisors"])
 
+        batch = [MeshTask(capability="summarize", prompt=f"batch-{i}", tenant_id="acme") for i in range(5)]
+        assignments = await runtime.submit_many(batch)
+        self.assertEqual({item.supervisor_id for item in assignments}, {"sup-runtime"})
+        with self.assertRaises(LookupError):
+            await runtime.submit_many([MeshTask(capability="translate", prompt="x", tenant_id="acme")])
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,168 @@
+import hashlib
+import json
+import os
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+sys.path.insert(0, r"c:\Users\gabri\JadeAgent")
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - optional test dependency
+    np = None
+
+from jadeagent.memory import NumpyVectorIndex
+from jadeagent.memory.shorestone import ShoreStoneMemory, rfr_scores
+
+
+class HashingEmbedder:
+    """Bag-of-words embedder; counts encode() calls to check batching."""
+
+    def __init__(self, dim: int = 64):
+        self.dim = dim
+        self.calls = 0
+
+    def encode(self, texts, convert_to_numpy=True, batch_size=32):
+        self.calls += 1
+        out = np.zeros((len(texts), self.dim), dtype=np.float32)
+        for row, text in enumerate(texts):
+            for word in text.lower().split():
+                out[row, int(hashlib.md5(word.encode()).hexdigest(), 16) % self.dim] += 1.0
+        return out
+
+
+@unittest.skipUnless(np is not None, "numpy not installed")
+class NumpyVectorIndexTests(unittest.TestCase):
+    def test_shorestone_numpy_index_batches_ingest_and_survives_reopen(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            embedder = HashingEmbedder()
+            memory = ShoreStoneMemory(collection="agent", persist_dir=tmpdir, index="numpy", embedder=embedder)
+            ids = memory.memorize_many([
+                "user prefers python for ml projects",
+                "project uses pytorch and cuda kernels",
+                "deploy target is kubernetes",
+            ], [{"source": "chat"}, None, None])
+            memory.memorize("favourite editor is vim")
+            self.assertEqual(embedder.calls, 2)
+            self.assertEqual(memory.size, 4)
+            self.assertEqual(memory.remember("which python projects", k=1), ["user prefers python for ml projects"])
+
+            memory._index.delete([ids[0]])
+            reopened = ShoreStoneMemory(
+                collection="agent", persist_dir=tmpdir, index="numpy", embedder=HashingEmbedder(),
+            )
+            self.assertEqual(reopened.size, 3)
+            self.assertNotIn("user prefers python for ml projects", reopened.remember("python projects", k=3))
+            self.assertEqual(reopened.remember("kubernetes deploy", k=1), ["deploy target is kubernetes"])
+
+    def test_ivf_mode_trains_partitions_and_finds_near_duplicates(self):
+        rng = np.random.default_rng(7)
+        vectors = rng.normal(size=(2000, 32)).astype(np.float32)
+        with tempfile.TemporaryDirectory() as tmpdir:
+            index = NumpyVectorIndex(Path(tmpdir) / "ivf", ivf_lists=8, nprobe=3, train_factor=16)
+            for start in range(0, len(vectors), 500):
+                rows = range(start, start + 500)
+                index.add([f"v{i}" for i in rows], vectors[start:start + 500], [f"doc{i}" for i in rows], [{}] * 500)
+            self.assertTrue(index.is_trained)
+
+            hits = [index.query(vectors[i] + 0.01, k=1)[0].id for i in range(0, 2000, 97)]
+            self.assertEqual(hits, [f"v{i}" for i in range(0, 2000, 97)])
+
+            index.delete([f"v{i}" for i in range(1500)])  # triggers compaction
+            reopened = NumpyVectorIndex(Path(tmpdir) / "ivf", ivf_lists=8, nprobe=3)
+            self.assertTrue(reopened.is_trained)
+            self.assertEqual(reopened.count(), 500)
+            self.assertEqual(reopened.query(vectors[1700], k=1)[0].id, "v1700")
+            self.assertTrue(all(int(match.id[1:]) >= 1500 for match in reopened.query(vectors[10], k=500)))
+
+    def test_crash_during_compaction_keeps_previous_generation(self):
+        rng = np.random.default_rng(3)
+        vectors = rng.normal(size=(10, 8)).astype(np.float32)
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = Path(tmpdir) / "flat"
+            index = NumpyVectorIndex(path)
+            index.add([f"v{i}" for i in range(10)], vectors, [f"doc{i}" for i in range(10)], [{}] * 10)
+            index.delete(["v0", "v1"])
+
+            index._write_meta = lambda: (_ for _ in ()).throw(OSError("disk full"))
+            with self.assertRaises(OSError):
+                index.compact()
+            self.assertTrue((path / "vectors.1.f32").exists())  # new generation written, never committed
+
+            reopened = NumpyVectorIndex(path)
+            self.assertFalse((path / "vectors.1.f32").exists())
+            self.assertEqual(reopened.count(), 8)
+            self.assertEqual(reopened.query(vectors[5], k=1)[0].id, "v5")
+
+            reopened.compact()
+            self.assertEqual(sorted(p.name for p in path.iterdir()),
+                             ["index.json", "items.1.jsonl", "stats.1.f64", "vectors.1.f32"])
+            again = NumpyVectorIndex(path)
+            self.assertEqual(again.ids(), [f"v{i}" for i in range(2, 10)])
+            self.assertEqual(again.query(vectors[9], k=1)[0].id, "v9")
+
+    def test_torn_append_is_truncated_so_later_adds_survive_reopen(self):
+        vectors = np.eye(4, dtype=np.float32)
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = Path(tmpdir) / "flat"
+            index = NumpyVectorIndex(path)
+            index.add(["a"], vectors[:1], ["doc a"], [{}])
+            # A crash while adding "b": its vector landed, its item line only partly.
+            with (path / "vectors.f32").open("ab") as handle:
+                vectors[1:2].tofile(handle)
+            with (path / "items.jsonl").open("a", encoding="utf-8") as handle:
+                handle.write('{"id": "b", "docum')
+
+            reopened = NumpyVectorIndex(path)
+            self.assertEqual(reopened.ids(), ["a"])
+            reopened.add(["c"], vectors[2:3], ["doc c"], [{}])
+            again = NumpyVectorIndex(path)
+            self.assertEqual(again.ids(), ["a", "c"])
+            self.assertEqual(again.query(vectors[2], k=1)[0].id, "c")
+
+            # The item log running ahead of the vector file is rewritten to match it.
+            os.truncate(path / "vectors.f32", 4 * 4)
+            shortened = NumpyVectorIndex(path)
+            self.assertEqual(shortened.ids(), ["a"])
+            shortened.add(["d"], vectors[3:4], ["doc d"], [{}])
+            last = NumpyVectorIndex(path)
+            self.assertEqual(last.ids(), ["a", "d"])
+            self.assertEqual(last.query(vectors[3], k=1)[0].id, "d")
+
+
+    def test_access_stats_persist_and_maintenance_prunes_in_chunks_with_archive(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            memory = ShoreStoneMemory(collection="agent", persist_dir=tmpdir, index="numpy", embedder=HashingEmbedder())
+            contents = [f"note {i} about topic{i}" for i in range(50)]
+            memory.memorize_many(contents)
+            for _ in range(3):
+                self.assertEqual(memory.remember("note 7 about topic7", k=1), ["note 7 about topic7"])
+            self.assertEqual(memory.remember("note 21 about topic21", k=1), ["note 21 about topic21"])
+
+            reopened = ShoreStoneMemory(collection="agent", persist_dir=tmpdir, index="numpy", embedder=HashingEmbedder())
+            ids = reopened._index.ids()
+            counts, last = reopened._index.access_stats(ids)
+            self.assertEqual(sorted(counts.tolist())[-2:], [1.0, 3.0])
+            self.assertEqual(int((last > 0).sum()), 2)
+
+            archive = Path(tmpdir) / "archive" / "evicted.jsonl"
+            thread = reopened.run_maintenance(chunk_size=7, archive_path=str(archive), background=True)
+            thread.join(timeout=10)
+            self.assertEqual(reopened.size, 2)
+            self.assertEqual(sorted(reopened.remember("note about", k=5)), ["note 21 about topic21", "note 7 about topic7"])
+            archived = [json.loads(line) for line in archive.read_text(encoding="utf-8").splitlines()]
+            self.assertEqual(len(archived), 48)
+            self.assertEqual(archived[0]["access_count"], 0)
+            self.assertIn("created_at", archived[0]["metadata"])
+
+            now = 1_000_000.0
+            expected = [0.4 * min(c / 10, 1.0) + 0.6 * (2 ** (-((now - t) / 3600) / 24) if t > 0 else 0.1)
+                        for c, t in [(0, 0.0), (3, now - 3600), (25, now - 86400)]]
+            self.assertEqual(np.round(rfr_scores([0, 3, 25], [0.0, now - 3600, now - 86400], now), 12).tolist(),
+                             np.round(expected, 12).tolist())
+
+
+if __name__ == "__main__":
+    unittest.main()
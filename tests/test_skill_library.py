@@ -0,0 +1,110 @@
+import json
+import os
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+sys.path.insert(0, r"c:\Users\gabri\JadeAgent")
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - optional test dependency
+    np = None
+
+from jadeagent.skills import SkillLibrary
+
+REVERSE_CODE = '''
+def reverse_text(text: str) -> str:
+    return text[::-1]
+'''
+
+UPPER_CODE = '''
+def shout_text(text: str) -> str:
+    return text.upper()
+'''
+
+
+class KeywordEmbedder:
+    """Tiny embedder: one dimension per known keyword."""
+
+    VOCAB = ["reverse", "backwards", "upper", "loud", "csv", "parse"]
+
+    def __init__(self):
+        self.texts = []
+
+    def encode(self, texts, convert_to_numpy=True):
+        self.texts.extend(texts)
+        out = np.zeros((len(texts), len(self.VOCAB)), dtype=np.float32)
+        for row, text in enumerate(texts):
+            for col, word in enumerate(self.VOCAB):
+                out[row, col] = text.lower().count(word)
+        return out
+
+
+class SkillLibraryTests(unittest.TestCase):
+    def test_loaded_skills_are_cached_until_the_file_changes(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            library = SkillLibrary(path=tmpdir)
+            library.save("reverse_text", REVERSE_CODE, "Reverse a string")
+            tool = library.get("reverse_text")
+            self.assertIs(library.get("reverse_text"), tool)
+
+            # Touching the file without changing it keeps the cached module.
+            skill_file = Path(tmpdir) / "reverse_text.py"
+            stat = skill_file.stat()
+            os.utime(skill_file, ns=(stat.st_atime_ns, stat.st_mtime_ns + 5_000_000_000))
+            self.assertIs(library.get("reverse_text"), tool)
+
+            skill_file.write_text(skill_file.read_text(encoding="utf-8").replace("[::-1]", "[::-1] + '!'"),
+                                  encoding="utf-8")
+            reloaded = library.get("reverse_text")
+            self.assertIsNot(reloaded, tool)
+            self.assertEqual(reloaded.func("abc"), "cba!")
+
+    def test_search_index_updates_incrementally_and_persists(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            library = SkillLibrary(path=tmpdir)
+            library.save("reverse_text", REVERSE_CODE, "Reverse a string of characters")
+            library.save("shout_text", UPPER_CODE, "Convert a string to upper case")
+
+            self.assertEqual([t.name for t in library.search("reverse", top_k=5)], ["reverse_text"])
+            # Name words outrank description words.
+            self.assertEqual([t.name for t in library.search("text string", top_k=5)][0], "shout_text")
+            self.assertEqual(library.search("nothing relevant"), [])
+
+            library.remove("shout_text")
+            self.assertEqual([t.name for t in library.search("upper text")], ["reverse_text"])
+            self.assertNotIn("upper", library._postings)
+
+            search_file = Path(tmpdir) / "skills_search.json"
+            self.assertEqual(set(json.loads(search_file.read_text(encoding="utf-8"))["doc_terms"]), {"reverse_text"})
+            reopened = SkillLibrary(path=tmpdir)
+            self.assertEqual(reopened._postings, library._postings)
+
+            # A stale search index is rebuilt from the skill index.
+            search_file.write_text(json.dumps({"fingerprint": [0, 0], "doc_terms": {}}), encoding="utf-8")
+            self.assertEqual([t.name for t in SkillLibrary(path=tmpdir).search("reverse")], ["reverse_text"])
+
+    @unittest.skipUnless(np is not None, "numpy not installed")
+    def test_embedder_reranks_keyword_candidates(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            embedder = KeywordEmbedder()
+            library = SkillLibrary(path=tmpdir, embedder=embedder)
+            library.save("reverse_text", REVERSE_CODE, "Reverse a string so it reads backwards")
+            library.save("shout_text", UPPER_CODE, "Make text loud by converting to upper case")
+
+            self.assertEqual([t.name for t in library.search("text backwards", top_k=2)],
+                             ["reverse_text", "shout_text"])
+            self.assertEqual([t.name for t in library.search("text backwards", top_k=2, rerank=False)],
+                             ["shout_text", "reverse_text"])
+            # No keyword hit: fall back to embedding search over all skills.
+            self.assertEqual([t.name for t in library.search("loudly", top_k=1)], ["shout_text"])
+
+            encoded = len(embedder.texts)
+            library.search("text backwards", top_k=2)
+            self.assertEqual(len(embedder.texts), encoded + 1)  # only the query is embedded again
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -2,6 +2,7 @@
 
 from __future__ import annotations
 
+import os
 import sys
 import tempfile
 import unittest
@@ -17,6 +18,7 @@ from jadeagent import (
     JadeStateEvent,
     JadeStateManifest,
     Session,
+    ShardedSqliteStateStore,
     SqliteStateStore,
     tool,
 )
@@ -25,8 +27,9 @@ from jadeagent.backends.base import LLMBackend
 from jadeagent.core.types import Message, Response, StreamChunk, ToolCall
 from jadeagent.graph import END, START, StateGraph
 from jadeagent.mesh import InMemoryMeshBus, MeshNode, MeshRouter, MeshTask
+from jadeagent.state import InMemoryStateStore, PackedCapsule, RetentionPolicy, collect_garbage, SqliteCapsuleView, event_chain_hash, verify_run, append_packed_jgx, inspect_jgx, load_jgx, pack_jgx, unpack_jgx
 from jadeagent.state.compatibility import validate_restore_compatibility
-from jadeagent.state.snapshot import AgentRuntimeSnapshot
+from jadeagent.state.snapshot import AgentRuntimeSnapshot, SessionSnapshot
 
 
 class FakeBackend(LLMBackend):
@@ -134,6 +137,39 @@ class JGXStateTests(unittest.TestCase):
             self.assertTrue(any(message["role"] == "tool" for message in snapshot.messages))
             self.assertTrue(any(message.role == "tool" for message in restored.session.messages))
 
+    def test_restore_latest_reads_only_manifest_and_latest_snapshot(self):
+        class NoEventReads(SqliteStateStore):
+            def load_run(self, run_id):
+                raise AssertionError("restore must not load the whole run")
+
+            def view_run(self, run_id):
+                raise AssertionError("restore must not open a run view")
+
+        with tempfile.TemporaryDirectory() as tmpdir:
+            stores = [InMemoryStateStore(), FileStateStore(f"{tmpdir}/files"), NoEventReads(f"{tmpdir}/state.sqlite3")]
+            for store in stores:
+                store.create_run(JadeStateManifest(run_id="long", tenant_id="t1"))
+                for step in range(50):
+                    store.append_event("long", JadeStateEvent(event_type="step", step=step))
+                for step in range(3):
+                    store.save_snapshot("long", AgentRuntimeSnapshot(
+                        phase="OBSERVING",
+                        step=step,
+                        session=SessionSnapshot(messages=[{"role": "user", "content": f"turn {step}"}]),
+                    ))
+
+                manifest, snapshot = store.restore_latest("long")
+                self.assertEqual((manifest.tenant_id, snapshot.step), ("t1", 2))
+                with self.assertRaises(KeyError):
+                    store.restore_latest("missing")
+
+                agent = Agent(backend=FakeBackend(), verbose=False, state_store=store)
+                restored = agent.restore_state("long")
+                self.assertEqual(restored.snapshot_id, manifest.latest_snapshot_id)
+                self.assertEqual(agent.session.messages[-1].content, "turn 2")
+                self.assertIsNone(agent._tool_results)
+            stores[2].close()
+
     def test_restore_compatibility_blocks_tenant_mismatch(self):
         manifest = JadeStateManifest(run_id="r", tenant_id="tenant_a")
 
@@ -215,6 +251,212 @@ class JGXStateTests(unittest.TestCase):
             self.assertEqual(events[0].event_type, "run_started")
             self.assertEqual(latest.phase, "COMPLETED")
 
+    def test_sqlite_reads_do_not_wait_for_the_writer(self):
+        import threading
+
+        with tempfile.TemporaryDirectory() as tmpdir:
+            store = SqliteStateStore(f"{tmpdir}/state.sqlite3", readers=2, busy_timeout=1.0)
+            store.create_run(JadeStateManifest(run_id="polled"))
+            store.append_event("polled", JadeStateEvent(event_type="run_started", payload={"body": "y" * 5000}))
+            store.save_snapshot("polled", AgentRuntimeSnapshot(phase="AWAITING_MODEL", step=1))
+
+            results: list[object] = []
+            with store._writing():
+                store._conn.execute("UPDATE manifests SET updated_at = updated_at WHERE run_id = ?", ("polled",))
+                reader = threading.Thread(target=lambda: results.extend([
+                    store.list_events("polled", limit=5)[0].payload["body"],
+                    store.inspect("polled")["latest_phase"],
+                    store.list_runs(),
+                ]))
+                reader.start()
+                reader.join(timeout=5)
+                self.assertFalse(reader.is_alive())
+                store._conn.commit()
+            self.assertEqual(results, ["y" * 5000, "AWAITING_MODEL", ["polled"]])
+
+            writer = threading.Thread(target=lambda: store.append_event("polled", JadeStateEvent(event_type="tick")))
+            with store._writing():
+                writer.start()
+                writer.join(timeout=0.2)
+            writer.join(timeout=5)
+            self.assertEqual(store.view_run("polled").event_count, 2)
+            self.assertEqual(store.metrics["write_waits"], 1)
+            self.assertGreater(store.metrics["reads"], 0)
+            self.assertLessEqual(store.metrics["readers_open"], 2)
+            self.assertEqual(store.metrics["busy_timeout_ms"], 1000)
+            store.close()
+
+    def test_sharded_store_routes_runs_merges_listing_and_reshards_online(self):
+        import threading
+        from pathlib import Path
+
+        from jadeagent.state.sharded_store import shard_index
+
+        with tempfile.TemporaryDirectory() as tmpdir:
+            store = ShardedSqliteStateStore(f"{tmpdir}/shards", shards=3)
+            run_ids = [f"run_{index}" for index in range(12)]
+            for run_id in run_ids:
+                store.create_run(JadeStateManifest(run_id=run_id))
+                store.append_event(run_id, JadeStateEvent(event_type="run_started", payload={"body": run_id * 1000}))
+                store.save_snapshot(run_id, AgentRuntimeSnapshot(phase="RUNNING", step=1))
+            store.append_event("run_0", JadeStateEvent(event_type="tick"))
+
+            self.assertEqual(len({shard_index(run_id, 3) for run_id in run_ids}), 3)
+            for run_id in run_ids:
+                self.assertEqual(store.shards[shard_index(run_id, 3)].list_runs().count(run_id), 1)
+            listed = store.list_runs()
+            self.assertEqual(sorted(listed), sorted(run_ids))
+            self.assertEqual(listed[0], "run_0")
+
+            exported = store.export_runs(run_ids[:4], f"{tmpdir}/exports")
+            self.assertEqual([path.name for path in exported], [f"{run_id}.jgx" for run_id in run_ids[:4]])
+            self.assertTrue(all((path / "manifest.json").exists() for path in exported))
+
+            errors: list[BaseException] = []
+
+            def keep_writing() -> None:
+                try:
+                    for step in range(20):
+                        store.append_event("run_5", JadeStateEvent(event_type="step", step=step))
+                    store.create_run(JadeStateManifest(run_id="during_reshard"))
+                except BaseException as exc:
+                    errors.append(exc)
+
+            writer = threading.Thread(target=keep_writing)
+            writer.start()
+            result = store.reshard(5)
+            writer.join(timeout=10)
+            self.assertEqual(errors, [])
+            self.assertEqual(result["shards"], 5)
+            self.assertEqual(store.shard_count, 5)
+            self.assertEqual(len(list(Path(f"{tmpdir}/shards").glob("*.sqlite3"))), 5)
+            self.assertEqual(store.view_run("run_5").event_count, 21)
+            self.assertIn("during_reshard", store.list_runs())
+            self.assertEqual(store.list_events("run_3", limit=1)[0].payload["body"], "run_3" * 1000)
+            for run_id in run_ids:
+                self.assertTrue(verify_run(store, run_id)["ok"], run_id)
+            store.close()
+
+            reopened = ShardedSqliteStateStore(f"{tmpdir}/shards", shards=2)
+            self.assertEqual(reopened.shard_count, 5)
+            self.assertEqual(len(reopened.list_runs()), 13)
+            reopened.close()
+
+    def test_reshard_ignores_files_left_by_a_crashed_reshard(self):
+        from pathlib import Path
+
+        from jadeagent.state.sharded_store import _shard_file, shard_index
+
+        with tempfile.TemporaryDirectory() as tmpdir:
+            root = Path(tmpdir) / "shards"
+            store = ShardedSqliteStateStore(root, shards=2)
+            store.create_run(JadeStateManifest(run_id="kept"))
+            # A reshard to 3 shards crashed after copying a run that was deleted afterwards.
+            leftover = SqliteStateStore(_shard_file(root, 3, shard_index("deleted", 3)))
+            leftover.create_run(JadeStateManifest(run_id="deleted"))
+            leftover.close()
+
+            store.reshard(3)
+            self.assertEqual(store.list_runs(), ["kept"])
+            store.close()
+
+    def test_reshard_refuses_while_another_handle_or_process_has_the_store_open(self):
+        import subprocess
+        import textwrap
+        from pathlib import Path
+
+        with tempfile.TemporaryDirectory() as tmpdir:
+            root = f"{tmpdir}/shards"
+            store = ShardedSqliteStateStore(root, shards=2)
+            store.create_run(JadeStateManifest(run_id="kept"))
+            other = ShardedSqliteStateStore(root)
+            with self.assertRaisesRegex(RuntimeError, "open in another"):
+                store.reshard(3)
+            other.append_event("kept", JadeStateEvent(event_type="still_routed"))
+            other.close()
+
+            child = subprocess.Popen(
+                [sys.executable, "-c", textwrap.dedent(f"""
+                    import sys
+                    sys.path.insert(0, {str(Path(__file__).resolve().parents[1])!r})
+                    from jadeagent.state import ShardedSqliteStateStore
+                    store = ShardedSqliteStateStore({root!r})
+                    print("open", flush=True)
+                    sys.stdin.readline()
+                    store.close()
+                """)],
+                stdin=subprocess.PIPE, stdout=subprocess.PIPE, text=True,
+            )
+            try:
+                self.assertEqual(child.stdout.readline().strip(), "open")
+                store.close()
+                stderr = StringIO()
+                with redirect_stdout(StringIO()), redirect_stderr(stderr):
+                    code = jade_cli_main(["state", "reshard", "--store", root, "--shards", "3"])
+                self.assertEqual(code, 1)
+                self.assertIn("close it before resharding", stderr.getvalue())
+            finally:
+                child.communicate("\n", timeout=30)
+
+            store = ShardedSqliteStateStore(root)
+            self.assertEqual(store.reshard(3)["moved_runs"], 1)
+            self.assertEqual([event.event_type for event in store.list_events("kept")], ["still_routed"])
+            store.close()
+
+    def test_record_codecs_round_trip_and_keep_hashes_codec_independent(self):
+        from jadeagent.state import RecordCodec, decode_record, validate_restore_compatibility
+        from jadeagent.state.codec import jgxb_dumps, jgxb_loads
+
+        value = {"a": [1, -1, -33, 2**40, -(2**70), 0.25, None, True, False], "ü": "ünïcode" * 40, "n": {"k": []}}
+        self.assertEqual(jgxb_loads(jgxb_dumps(value)), value)
+        self.assertEqual(jgxb_loads(jgxb_dumps({1: "x"})), {"1": "x"})
+        huge = [10**300, -(10**300), 10**254]
+        self.assertEqual(jgxb_loads(jgxb_dumps(huge)), huge)
+        self.assertEqual(jgxb_dumps(10**254)[:2], b"\xc1\xff")  # short form stays readable by older readers
+        self.assertIsInstance(RecordCodec().encode(value), str)
+        self.assertLess(len(RecordCodec("binary", "zlib", compress_threshold=64).encode(value)), len(jgxb_dumps(value)))
+
+        snapshot = AgentRuntimeSnapshot(snapshot_id="s1", phase="RUNNING", step=3, last_observation={"content": "q" * 6000})
+        with tempfile.TemporaryDirectory() as tmpdir:
+            hashes = {}
+            for spec in ("json", "json+zlib", "binary", "binary+zlib", "binary+lzma"):
+                store = SqliteStateStore(f"{tmpdir}/{spec}.sqlite3", codec=spec)
+                store.create_run(JadeStateManifest(run_id="coded", created_at=1.0))
+                for step in range(3):
+                    store.append_event("coded", JadeStateEvent(
+                        event_id=f"e{step}", event_type="step", step=step, timestamp=10.0 + step,
+                        payload={"text": "abc " * 400, "big": "z" * 5000},
+                    ))
+                store.save_snapshot("coded", snapshot)
+
+                capsule = store.load_run("coded")
+                self.assertEqual(capsule.events[2].payload["big"], "z" * 5000)
+                self.assertEqual(store.latest_snapshot("coded").last_observation["content"], "q" * 6000)
+                event_refs, snapshot_refs = store.blob_refs("coded")
+                self.assertEqual((len(event_refs), len(snapshot_refs["s1"])), (1, 1))
+                report = verify_run(store, "coded")
+                self.assertTrue(report["ok"], report["issues"])
+                hashes[spec] = (report["event_chain_hash"], report["snapshot_hash"], capsule.manifest.capsule_hash)
+
+                manifest = store.view_run("coded").manifest
+                expected = "1.0" if spec == "json" else "1.0+" + store.codec.tag
+                self.assertEqual(manifest.schema_version, expected)
+                report = validate_restore_compatibility(manifest)
+                self.assertEqual((report.allowed, report.warnings), (True, []))
+                exported = load_jgx(store.export_run("coded", f"{tmpdir}/{spec}.jgx"))
+                self.assertEqual(exported.manifest.schema_version, "1.0")
+                store.close()
+            self.assertEqual(len(set(hashes.values())), 1)
+
+            mixed = SqliteStateStore(f"{tmpdir}/json.sqlite3", codec="binary+zlib")
+            mixed.append_event("coded", JadeStateEvent(event_type="resumed", payload={"text": "x" * 2000}))
+            rows = mixed._conn.execute("SELECT data FROM events WHERE run_id = ? ORDER BY sequence", ("coded",)).fetchall()
+            self.assertEqual([type(row["data"]).__name__ for row in rows], ["str", "str", "str", "bytes"])
+            self.assertEqual(decode_record(rows[-1]["data"])["payload"]["text"], "x" * 2000)
+            self.assertEqual(mixed.view_run("coded").event_count, 4)
+            self.assertTrue(verify_run(mixed, "coded", mode="full")["ok"])
+            mixed.close()
+
     def test_cli_state_inspect_and_history_sqlite(self):
         with tempfile.TemporaryDirectory() as tmpdir:
             db_path = f"{tmpdir}/state.sqlite3"
@@ -275,6 +517,407 @@ class JGXStateTests(unittest.TestCase):
             exported = FileStateStore(tmpdir)
             self.assertEqual(exported.inspect("exported")["latest_phase"], "COMPLETED")
 
+    def test_capsule_views_page_events_and_snapshots_lazily(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            stores = [FileStateStore(f"{tmpdir}/files"), SqliteStateStore(f"{tmpdir}/state.sqlite3")]
+            for store in stores:
+                store.create_run(JadeStateManifest(run_id="other", agent_id="noise"))
+                store.create_run(JadeStateManifest(run_id="long_run", agent_id="pager"))
+                for step in range(25):
+                    store.append_event("long_run", JadeStateEvent(event_type="step", step=step))
+                    store.append_event("other", JadeStateEvent(event_type="noise", step=step))
+                    store.save_snapshot("long_run", AgentRuntimeSnapshot(phase=f"STEP_{step}", step=step, snapshot_id=f"snap_{step:03d}"))
+
+                view = store.view_run("long_run")
+                self.assertEqual((view.event_count, view.snapshot_count), (25, 25))
+                self.assertEqual([event.step for event in view.iter_events(after_seq=10, limit=3)], [10, 11, 12])
+                self.assertEqual([event.step for event in view.iter_events(after_seq=23)], [23, 24])
+                self.assertEqual([snap.step for snap in view.iter_snapshots(after_seq=20, limit=2)], [20, 21])
+                self.assertEqual(view.get_snapshot("snap_007").phase, "STEP_7")
+                self.assertIsNone(view.get_snapshot("missing"))
+                self.assertEqual(view.latest_snapshot().phase, "STEP_24")
+                self.assertEqual(view.inspect(), store.load_run("long_run").inspect())
+                self.assertEqual([event.step for event in store.list_events("long_run", limit=2)], [23, 24])
+                self.assertEqual(len(view.to_capsule().events), 25)
+            paged = SqliteCapsuleView(stores[1], "long_run", page_size=4)
+            self.assertEqual([event.step for event in paged.iter_events(after_seq=5, limit=9)], list(range(5, 14)))
+            self.assertEqual(len(list(paged.iter_events())), 25)
+            stores[1].close()
+
+    def test_file_store_segments_events_and_coalesces_manifest_writes(self):
+        import json
+        from pathlib import Path
+
+        with tempfile.TemporaryDirectory() as tmpdir:
+            store = FileStateStore(tmpdir, segment_events=10, manifest_flush_interval=3600)
+            store.create_run(JadeStateManifest(run_id="segmented"))
+            run_path = Path(tmpdir) / "segmented.jgx"
+            manifest_path = run_path / "manifest.json"
+            created = json.loads(manifest_path.read_text(encoding="utf-8"))["updated_at"]
+            for step in range(95):
+                store.append_event("segmented", JadeStateEvent(event_type="step", step=step, timestamp=1000.0 + step))
+
+            self.assertEqual(json.loads(manifest_path.read_text(encoding="utf-8"))["updated_at"], created)
+            self.assertEqual(len(list((run_path / "events").glob("*.jsonl"))), 10)
+            index = json.loads((run_path / "events" / "index.json").read_text(encoding="utf-8"))
+            self.assertEqual([row["first_seq"] for row in index["segments"]], list(range(1, 91, 10)))
+            self.assertEqual(index["segments"][-1]["last_ts"], 1089.0)
+
+            self.assertEqual([event.step for event in store.list_events("segmented", limit=7)], list(range(88, 95)))
+            view = store.view_run("segmented")
+            self.assertGreater(json.loads(manifest_path.read_text(encoding="utf-8"))["updated_at"], created)
+            self.assertEqual(view.event_count, 95)
+            self.assertEqual([event.step for event in view.iter_events(after_seq=37, limit=5)], [37, 38, 39, 40, 41])
+            self.assertEqual([event.step for event in store.load_run("segmented").events], list(range(95)))
+
+            reopened = FileStateStore(tmpdir, segment_events=10)
+            self.assertEqual([event.step for event in reopened.list_events("segmented", limit=2)], [93, 94])
+            self.assertEqual(verify_run(reopened, "segmented", mode="full")["checked_events"], 95)
+
+            legacy = Path(tmpdir) / "legacy.jgx"
+            legacy.mkdir()
+            manifest_path = legacy / "manifest.json"
+            manifest_path.write_text(json.dumps(JadeStateManifest(run_id="legacy").to_dict()), encoding="utf-8")
+            (legacy / "events.jsonl").write_text(
+                "".join(json.dumps(JadeStateEvent(event_type="old", step=step).to_dict()) + "\n" for step in range(3)),
+                encoding="utf-8",
+            )
+            reopened.append_event("legacy", JadeStateEvent(event_type="new", step=3))
+            reopened.close()
+            self.assertTrue((legacy / "events" / "000000000004.jsonl").exists())
+            self.assertEqual([event.step for event in reopened.load_run("legacy").events], [0, 1, 2, 3])
+            self.assertEqual([event.event_type for event in reopened.list_events("legacy", limit=2)], ["old", "new"])
+
+    def test_large_strings_are_stored_once_as_shared_blobs(self):
+        import shutil
+        import sqlite3
+        from pathlib import Path
+
+        big = "tool output line\n" * 2000
+        with tempfile.TemporaryDirectory() as tmpdir:
+            db_path = f"{tmpdir}/state.sqlite3"
+            stores = [FileStateStore(f"{tmpdir}/files"), SqliteStateStore(db_path)]
+            for store in stores:
+                for run_id in ("first", "second"):
+                    store.create_run(JadeStateManifest(run_id=run_id))
+                    store.append_event(run_id, JadeStateEvent(event_type="tool_result_recorded", payload={"result": big}))
+                    store.save_snapshot(run_id, AgentRuntimeSnapshot(phase="RUNNING", last_observation={"content": big}, snapshot_id="s1"))
+
+                self.assertEqual(len(list(store.blobs.digests())), 1)
+                self.assertEqual(store.list_events("second", limit=1)[0].payload["result"], big)
+                self.assertEqual(store.latest_snapshot("first").last_observation["content"], big)
+                self.assertEqual(store.load_run("first").events[0].payload["result"], big)
+                self.assertEqual(store.view_run("second").get_snapshot("s1").last_observation["content"], big)
+                self.assertTrue(verify_run(store, "first", mode="full")["ok"])
+
+            run_path = Path(tmpdir) / "files" / "first.jgx"
+            self.assertLess((run_path / "snapshots" / "s1.json").stat().st_size, len(big) // 4)
+            packed_path = pack_jgx(run_path, Path(tmpdir) / "first.jgxp")
+            shutil.rmtree(Path(tmpdir) / "files" / "blobs")
+            with PackedCapsule(packed_path) as packed:
+                self.assertEqual(packed.latest_snapshot().last_observation["content"], big)
+            restored = unpack_jgx(packed_path, Path(tmpdir) / "restored" / "first.jgx")
+            self.assertEqual(load_jgx(restored).events[0].payload["result"], big)
+
+            stores[1].close()
+            conn = sqlite3.connect(db_path)
+            self.assertEqual(conn.execute("SELECT COUNT(*) FROM blobs").fetchone()[0], 1)
+            self.assertLess(max(len(row[0]) for row in conn.execute("SELECT data FROM snapshots")), 1024)
+            conn.close()
+
+    def test_file_blob_store_rewrites_blob_deleted_by_another_process(self):
+        from jadeagent.state import FileBlobStore
+
+        with tempfile.TemporaryDirectory() as tmpdir:
+            writer = FileBlobStore(tmpdir)
+            digest = writer.put(b"x" * 4096)
+            FileBlobStore(tmpdir).delete(digest)  # e.g. `jade state gc` in another process
+
+            self.assertEqual(writer.put(b"x" * 4096), digest)
+            self.assertEqual(writer.get(digest), b"x" * 4096)
+
+    def test_file_blob_stores_writing_the_same_blob_do_not_share_a_temp_file(self):
+        from unittest import mock
+
+        from jadeagent.state import FileBlobStore, blobs
+
+        with tempfile.TemporaryDirectory() as tmpdir:
+            first, second = FileBlobStore(tmpdir), FileBlobStore(tmpdir)
+            real_replace = os.replace
+            temp_names = []
+
+            def replace(src, dst):
+                temp_names.append(str(src))
+                if len(temp_names) == 1:
+                    second.put(b"y" * 4096)  # another process lands in the middle of this write
+                real_replace(src, dst)
+
+            with mock.patch.object(blobs.os, "replace", replace):
+                digest = first.put(b"y" * 4096)
+            self.assertEqual(len(set(temp_names)), 2)
+            self.assertEqual(first.get(digest), b"y" * 4096)
+            self.assertEqual(list(first.digests()), [digest])
+
+    def test_gc_compacts_snapshots_expires_finished_runs_and_sweeps_blobs(self):
+        import json
+        import time
+
+        old = time.time() - 40 * 86400
+        big = "x" * 5000
+        with tempfile.TemporaryDirectory() as tmpdir:
+            db_path = f"{tmpdir}/state.sqlite3"
+            stores = [InMemoryStateStore(), FileStateStore(f"{tmpdir}/files"), SqliteStateStore(db_path)]
+            for store in stores:
+                store.create_run(JadeStateManifest(run_id="live"))
+                store.append_event("live", JadeStateEvent(event_type="run_started"))
+                store.save_snapshot("live", AgentRuntimeSnapshot(phase="PLANNING", step=0, created_at=1.0))
+                for step in range(1, 20):
+                    observation = {"content": big + str(step)}
+                    store.save_snapshot("live", AgentRuntimeSnapshot(phase="AWAITING_MODEL", step=step, created_at=1.0 + step, last_observation=observation))
+                store.create_run(JadeStateManifest(run_id="done"))
+                store.save_snapshot("done", AgentRuntimeSnapshot(phase="COMPLETED", created_at=old, last_observation={"content": big}))
+                store.create_run(JadeStateManifest(run_id="broken"))
+                store.save_snapshot("broken", AgentRuntimeSnapshot(phase="FAILED", created_at=old))
+
+                policy = RetentionPolicy(keep_last_snapshots=3, completed_ttl=7 * 86400, failed_ttl=60 * 86400, blob_grace=0)
+                preview = collect_garbage(store, policy, dry_run=True)
+                self.assertEqual(len(store.snapshot_index("live")), 20)
+                report = collect_garbage(store, policy)
+                self.assertEqual(report.deleted_runs, ["done"])
+                self.assertEqual(report.compacted_runs, {"live": 16})
+                self.assertEqual(preview.to_dict()["deleted_snapshots"], 16)
+                self.assertEqual(sorted(store.list_runs()), ["broken", "live"])
+                self.assertEqual(sorted(info.step for info in store.snapshot_index("live")), [0, 17, 18, 19])
+                self.assertEqual(store.latest_snapshot("live").step, 19)
+                if store.blobs is not None:
+                    self.assertEqual(report.deleted_blobs, 17)
+                    self.assertEqual(preview.reclaimed_bytes, report.reclaimed_bytes)
+                    self.assertEqual(len(list(store.blobs.digests())), 3)
+
+                compaction = store.list_events("live", limit=1)[0]
+                self.assertEqual(compaction.event_type, "state_compacted")
+                self.assertEqual(compaction.payload["event_count"], 1)
+                self.assertEqual(compaction.payload["snapshot_count"], 20)
+                self.assertTrue(verify_run(store, "live", mode="full")["ok"])
+                self.assertEqual(collect_garbage(store, RetentionPolicy(keep_last_snapshots=3, failed_ttl=None)).deleted_snapshots, 0)
+            stores[2].close()
+
+            stdout = StringIO()
+            stderr = StringIO()
+            with redirect_stdout(stdout), redirect_stderr(stderr):
+                code = jade_cli_main(["state", "gc", "--store", db_path, "--dry-run", "--failed-days", "1", "--json"])
+            self.assertEqual(code, 0, stderr.getvalue())
+            self.assertEqual(json.loads(stdout.getvalue())["deleted_runs"], ["broken"])
+
+    def test_gc_keeps_runs_by_default_and_blobs_reused_during_the_sweep(self):
+        import time
+        from unittest import mock
+
+        old = time.time() - 40 * 86400
+        with tempfile.TemporaryDirectory() as tmpdir:
+            stores = [FileStateStore(f"{tmpdir}/files"), SqliteStateStore(f"{tmpdir}/state.sqlite3")]
+            for store in stores:
+                store.create_run(JadeStateManifest(run_id="done"))
+                store.save_snapshot("done", AgentRuntimeSnapshot(phase="COMPLETED", created_at=old))
+                orphan, reused = store.blobs.put(b"o" * 5000), store.blobs.put(b"r" * 5000)
+                if isinstance(store, SqliteStateStore):
+                    with store._writing() as conn:
+                        conn.execute("UPDATE blobs SET touched_at = ?", (old,))
+                        conn.commit()
+                else:
+                    for digest in (orphan, reused):
+                        os.utime(store.blobs._stored_path(digest), (old, old))
+
+                scan = store.blob_refs
+
+                def blob_refs(run_id):
+                    refs = scan(run_id)
+                    store.blobs.put(b"r" * 5000)  # another process appends an event reusing the blob
+                    return refs
+
+                with mock.patch.object(store, "blob_refs", blob_refs):
+                    report = collect_garbage(store, RetentionPolicy(blob_grace=60))
+                self.assertEqual(report.deleted_runs, [])
+                self.assertEqual(store.list_runs(), ["done"])
+                self.assertEqual(report.deleted_blobs, 1)
+                self.assertFalse(store.blobs.has(orphan))
+                self.assertTrue(store.blobs.has(reused))
+            stores[1].close()
+
+    def test_chain_hash_is_kept_at_append_and_verified_incrementally(self):
+        import json
+        import sqlite3
+
+        with tempfile.TemporaryDirectory() as tmpdir:
+            db_path = f"{tmpdir}/state.sqlite3"
+            stores = [InMemoryStateStore(), FileStateStore(f"{tmpdir}/files"), SqliteStateStore(db_path)]
+            for store in stores:
+                store.create_run(JadeStateManifest(run_id="chained"))
+                for step in range(6):
+                    store.append_event("chained", JadeStateEvent(event_type="step", step=step, timestamp=1000.0 + step))
+                store.save_snapshot("chained", AgentRuntimeSnapshot(phase="RUNNING", step=6))
+
+                expected = event_chain_hash(store.load_run("chained").events)
+                first = verify_run(store, "chained")
+                self.assertTrue(first["ok"], first["issues"])
+                self.assertEqual(first["event_chain_hash"], expected)
+                self.assertEqual(first["checked_events"], 6)
+
+                store.append_event("chained", JadeStateEvent(event_type="step", step=6, payload={"token": "sk-" + "a" * 24}, timestamp=1006.0))
+                second = verify_run(store, "chained")
+                self.assertEqual(second["checked_events"], 1)
+                self.assertEqual(second["secret_paths"], ["events[6].payload.token"])
+                self.assertEqual(verify_run(store, "chained", mode="sample", sample_size=3, seed=7)["checked_events"], 3)
+                self.assertEqual(verify_run(store, "chained", mode="full")["checked_events"], 7)
+
+            events_path = stores[1]._run_path("chained") / "events" / "000000000001.jsonl"
+            lines = events_path.read_text(encoding="utf-8").splitlines()
+            tampered = json.loads(lines[2])
+            tampered["message"] = "rewritten"
+            lines[2] = json.dumps(tampered, sort_keys=True, separators=(",", ":"))
+            events_path.write_text("\n".join(lines) + "\n", encoding="utf-8")
+            self.assertIn("event chain mismatch at seq 3", verify_run(stores[1], "chained", mode="full")["issues"])
+            stores[2].close()
+
+            conn = sqlite3.connect(db_path)
+            conn.execute("UPDATE events SET seq = NULL, chain_hash = NULL, secret_paths = NULL")
+            conn.execute("DELETE FROM chain_checkpoints")
+            conn.commit()
+            conn.close()
+            legacy = SqliteStateStore(db_path)
+            legacy.append_event("chained", JadeStateEvent(event_type="resumed", step=7, timestamp=1007.0))
+            report = verify_run(legacy, "chained")
+            legacy.close()
+            self.assertEqual(report["event_count"], 8)
+            self.assertEqual(report["checked_events"], 8)
+            self.assertEqual(report["issues"], ["possible secret material found in 1 field(s)"])
+
+    def test_chain_head_reads_records_longer_than_one_block(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            store = FileStateStore(tmpdir)
+            store.create_run(JadeStateManifest(run_id="wide"))
+            tokens = {f"api_key_number_{i:04d}": "sk-" + "a" * 24 for i in range(300)}
+            store.append_event("wide", JadeStateEvent(event_type="step", step=0, payload=tokens))
+            chain_path = store._run_path("wide") / "chain.jsonl"
+            self.assertGreater(chain_path.stat().st_size, 8192)
+
+            reopened = FileStateStore(tmpdir)
+            reopened.append_event("wide", JadeStateEvent(event_type="step", step=1))
+            report = verify_run(reopened, "wide", mode="full")
+            self.assertEqual(report["checked_events"], 2)
+            self.assertEqual(len(report["secret_paths"]), 300)
+
+    def test_file_stores_sharing_a_directory_see_each_others_appends(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            writer = FileStateStore(tmpdir)
+            reader = FileStateStore(tmpdir)
+            writer.create_run(JadeStateManifest(run_id="shared"))
+            writer.append_event("shared", JadeStateEvent(event_type="step", message="a", timestamp=1000.0))
+            self.assertEqual(reader.inspect("shared")["event_count"], 1)
+
+            for step, message in enumerate("bcd", start=1):
+                writer.append_event("shared", JadeStateEvent(event_type="step", step=step, message=message, timestamp=1000.0 + step))
+            self.assertEqual(reader.inspect("shared")["event_count"], 4)
+            self.assertEqual([event.message for event in reader.list_events("shared", limit=1)], ["d"])
+
+            reader.append_event("shared", JadeStateEvent(event_type="step", step=4, message="e", timestamp=1004.0))
+            writer.append_event("shared", JadeStateEvent(event_type="step", step=5, message="f", timestamp=1005.0))
+            report = verify_run(FileStateStore(tmpdir), "shared", mode="full")
+            self.assertTrue(report["ok"], report["issues"])
+            self.assertEqual(report["checked_events"], 6)
+            self.assertEqual([event.message for event in writer.list_events("shared", limit=6)], list("abcdef"))
+
+    def test_incomplete_capsule_view_fails_at_instantiation(self):
+        from jadeagent.state.view import CapsuleView
+
+        class CountsOnly(CapsuleView):
+            event_count = 0
+            snapshot_count = 0
+
+        with self.assertRaises(TypeError):
+            CountsOnly()
+
+    def test_packed_capsule_round_trips_directory_and_reads_lazily(self):
+        from pathlib import Path
+
+        with tempfile.TemporaryDirectory() as tmpdir:
+            store = FileStateStore(tmpdir, segment_events=8)
+            store.create_run(JadeStateManifest(run_id="packed_run", agent_id="packer"))
+            for step in range(30):
+                store.append_event("packed_run", JadeStateEvent(event_type="step", step=step))
+                store.save_snapshot("packed_run", AgentRuntimeSnapshot(phase=f"STEP_{step}", step=step))
+            source = Path(tmpdir) / "packed_run.jgx"
+            (source / "payloads" / "abc123").write_bytes(b"\x00binary\xff")
+
+            packed_path = pack_jgx(source, Path(tmpdir) / "packed_run.jgxp")
+            with PackedCapsule(packed_path) as packed:
+                self.assertEqual(packed.event_count, 30)
+                self.assertEqual(packed.latest_snapshot().phase, "STEP_29")
+                self.assertEqual([event.step for event in packed.events(-3)], [27, 28, 29])
+                self.assertEqual([event.step for event in packed.events_for_steps(4, 5)], [4, 5])
+                self.assertEqual(packed.payload("abc123"), b"\x00binary\xff")
+            self.assertEqual(inspect_jgx(packed_path), store.inspect("packed_run"))
+
+            restored = unpack_jgx(packed_path, Path(tmpdir) / "restored.jgx")
+            for original in sorted(source.rglob("*")):
+                if original.is_file():
+                    copy = restored / original.relative_to(source)
+                    self.assertEqual(copy.read_bytes(), original.read_bytes(), str(original))
+
+            append_packed_jgx(
+                packed_path,
+                events=[JadeStateEvent(event_type="resumed", step=30)],
+                snapshots=[AgentRuntimeSnapshot(phase="COMPLETED", step=30)],
+            )
+            capsule = load_jgx(packed_path)
+            self.assertEqual(len(capsule.events), 31)
+            self.assertEqual(capsule.latest_snapshot.phase, "COMPLETED")
+
+            # A writer that dies mid-append leaves the published capsule readable.
+            from jadeagent.state.packed import PackedCapsuleWriter
+
+            committed = Path(packed_path).read_bytes()
+            crashed = PackedCapsuleWriter(packed_path)
+            crashed.append_event(JadeStateEvent(event_type="lost", step=31))
+            crashed._handle.write(b'{"version":1,"events":[]}JGXINDEX')  # torn index and footer
+            crashed._handle.close()
+            self.assertEqual(len(load_jgx(packed_path).events), 31)
+
+            # The next append truncates the torn tail and writes in place after the old footer.
+            append_packed_jgx(packed_path, events=[JadeStateEvent(event_type="kept", step=31)])
+            appended = Path(packed_path).read_bytes()
+            self.assertEqual(appended[:len(committed)], committed)
+            self.assertEqual([event.event_type for event in load_jgx(packed_path).events[-2:]], ["resumed", "kept"])
+
+            with self.assertRaises(RuntimeError):
+                with PackedCapsuleWriter(packed_path) as writer:
+                    writer.append_event(JadeStateEvent(event_type="aborted", step=32))
+                    raise RuntimeError("stop")
+            self.assertEqual(Path(packed_path).read_bytes(), appended)
+
+    def test_cli_state_pack_and_unpack(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            db_path = f"{tmpdir}/state.sqlite3"
+            store = SqliteStateStore(db_path)
+            store.create_run(JadeStateManifest(run_id="cli_pack", agent_id="cli_agent"))
+            store.append_event("cli_pack", JadeStateEvent(event_type="run_started", phase="NEW"))
+            store.save_snapshot("cli_pack", AgentRuntimeSnapshot(phase="COMPLETED", step=2))
+            store.close()
+
+            stdout = StringIO()
+            stderr = StringIO()
+            with redirect_stdout(stdout), redirect_stderr(stderr):
+                code = jade_cli_main(["state", "pack", "cli_pack", "--store", db_path, "--out", f"{tmpdir}/cli_pack.jgxp"])
+            self.assertEqual(code, 0, stderr.getvalue())
+            self.assertIn("packed cli_pack", stdout.getvalue())
+
+            stdout = StringIO()
+            stderr = StringIO()
+            with redirect_stdout(stdout), redirect_stderr(stderr):
+                code = jade_cli_main(["state", "unpack", f"{tmpdir}/cli_pack.jgxp", "--out", f"{tmpdir}/cli_pack.jgx"])
+            self.assertEqual(code, 0, stderr.getvalue())
+            self.assertEqual(FileStateStore(tmpdir).inspect("cli_pack")["latest_phase"], "COMPLETED")
+
     def test_agent_reuses_recorded_tool_result_for_same_idempotency_key(self):
         with tempfile.TemporaryDirectory() as tmpdir:
             store = SqliteStateStore(f"{tmpdir}/state.sqlite3")